@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+:mod: `blob_download` - Blob download throughput and allocation benchmark
+=========================================================================
+
+    module:: blob_download
+    :platform: Unix, Windows
+    :synopsis: Serves one random blob from a local stand-in registry (a
+               threaded :mod:`http.server` in a child process answering
+               ``GET /v2/bench/blobs/<digest>``) and downloads it with
+               :func:`regshape.libs.blobs.get_blob` through each body path:
+
+               * ``iter_content`` — a new ``bytes`` object per chunk;
+               * ``readinto`` — ``readinto()`` into reused buffers;
+
+               each with and without the hashing/writing worker pipeline.
+               Reports median throughput and the peak memory traced by
+               :mod:`tracemalloc` during one extra download per mode.
+
+               Usage::
+
+                   python benchmarks/blob_download.py [--size-mib N] [--runs N]
+                       [--chunk-size BYTES] [--algorithm sha256|sha512]
+
+    moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import argparse
+import hashlib
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from regshape.libs.blobs import get_blob
+from regshape.libs.transport import RegistryClient, TransportConfig
+
+_REPO = "bench"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    payload = memoryview(b"")
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(self.payload)))
+        self.end_headers()
+        for offset in range(0, len(self.payload), 1 << 20):
+            self.wfile.write(self.payload[offset:offset + (1 << 20)])
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(payload: bytes, port) -> None:
+    _Handler.payload = memoryview(payload)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    port.value = server.server_address[1]
+    server.serve_forever()
+
+
+def _start_server(payload: bytes) -> tuple[multiprocessing.Process, int]:
+    # A separate process, so the server does not compete for the GIL.
+    port = multiprocessing.Value("i", 0)
+    process = multiprocessing.Process(target=_serve, args=(payload, port), daemon=True)
+    process.start()
+    while not port.value:
+        time.sleep(0.01)
+    return process, port.value
+
+
+def _download(client, digest, output, chunk_size, pipelined, zero_copy) -> float:
+    # The iter_content path is what get_blob falls back to when the raw
+    # body reader is unavailable.
+    fallback = nullcontext() if zero_copy else patch(
+        "regshape.libs.blobs.operations._raw_body_reader", return_value=None
+    )
+    with fallback:
+        start = time.perf_counter()
+        get_blob(client, _REPO, digest, output_path=output,
+                 chunk_size=chunk_size, pipelined=pipelined)
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mib", type=int, default=256, help="Blob size in MiB.")
+    parser.add_argument("--runs", type=int, default=5, help="Downloads per mode.")
+    parser.add_argument("--chunk-size", type=int, default=1 << 20, help="Read size in bytes.")
+    parser.add_argument("--algorithm", choices=["sha256", "sha512"], default="sha256")
+    args = parser.parse_args()
+
+    payload = os.urandom(args.size_mib << 20)
+    digest = f"{args.algorithm}:{hashlib.new(args.algorithm, payload).hexdigest()}"
+    server, port = _start_server(payload)
+    client = RegistryClient(TransportConfig(registry=f"127.0.0.1:{port}", insecure=True))
+
+    print(f"{args.size_mib} MiB {args.algorithm} blob, {args.chunk_size} byte chunks, "
+          f"{args.runs} runs")
+    print(f"{'mode':<28}{'MiB/s':>10}{'peak MiB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "blob")
+        for zero_copy in (False, True):
+            for pipelined in (False, True):
+                label = ("readinto" if zero_copy else "iter_content") + (
+                    " + pipeline" if pipelined else ""
+                )
+                times = [
+                    _download(client, digest, output, args.chunk_size, pipelined, zero_copy)
+                    for _ in range(args.runs)
+                ]
+                tracemalloc.start()
+                _download(client, digest, output, args.chunk_size, pipelined, zero_copy)
+                _current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                rate = args.size_mib / statistics.median(times)
+                print(f"{label:<28}{rate:>10.0f}{peak / (1 << 20):>12.2f}")
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""
+:mod: `compression` - Layer compression throughput and ratio benchmark
+======================================================================
+
+    module:: compression
+    :platform: Unix, Windows
+    :synopsis: Compresses one synthetic layer (a mix of random and
+               repetitive, text-like bytes, so the ratio is neither 1 nor
+               trivially high) with
+               :class:`regshape.libs.compression.CompressingReader`:
+
+               * gzip on the calling thread — the current default path;
+               * gzip with N threads — pigz-style parallel blocks;
+               * zstd with 1 and N threads, when :mod:`zstandard` is
+                 installed.
+
+               Reports median throughput of the uncompressed input and the
+               compressed/uncompressed size ratio per mode.
+
+               Usage::
+
+                   python benchmarks/compression.py [--size-mib N] [--runs N]
+                       [--threads N] [--level N]
+
+    moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import argparse
+import io
+import os
+import random
+import statistics
+import time
+
+from regshape.libs.compression import CompressingReader
+
+
+def _payload(size: int) -> bytes:
+    # One quarter random, three quarters words from a small vocabulary.
+    rng = random.Random(0)
+    words = [os.urandom(rng.randint(2, 8)).hex().encode() for _ in range(4096)]
+    parts, total = [], 0
+    while total < size:
+        if rng.random() < 0.25:
+            part = os.urandom(64 * 1024)
+        else:
+            part = b" ".join(rng.choices(words, k=8192))
+        parts.append(part)
+        total += len(part)
+    return b"".join(parts)[:size]
+
+
+def _compress(payload: bytes, compression: str, level, threads) -> tuple[float, int]:
+    reader = CompressingReader(io.BytesIO(payload), compression, level=level, threads=threads)
+    start = time.perf_counter()
+    while reader.read(1 << 20):
+        pass
+    return time.perf_counter() - start, reader.result().size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mib", type=int, default=256, help="Layer size in MiB.")
+    parser.add_argument("--runs", type=int, default=3, help="Compressions per mode.")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1,
+                        help="Threads for the parallel modes.")
+    parser.add_argument("--level", type=int, default=None,
+                        help="Compression level (default: gzip 9, zstd 3).")
+    args = parser.parse_args()
+
+    payload = _payload(args.size_mib << 20)
+    modes = [("gzip", 1), ("gzip", args.threads)]
+    try:
+        import zstandard  # noqa: F401  # type: ignore[import]
+        modes += [("zstd", 1), ("zstd", args.threads)]
+    except ImportError:
+        print("zstandard not installed; skipping zstd")
+
+    print(f"{args.size_mib} MiB layer, level {args.level or 'default'}, {args.runs} runs")
+    print(f"{'mode':<28}{'MiB/s':>10}{'ratio':>10}")
+    for compression, threads in modes:
+        results = [
+            _compress(payload, compression, args.level, threads) for _ in range(args.runs)
+        ]
+        rate = args.size_mib / statistics.median(t for t, _size in results)
+        ratio = results[0][1] / len(payload)
+        label = f"{compression}, {threads} thread{'s' if threads > 1 else ''}"
+        print(f"{label:<28}{rate:>10.0f}{ratio:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
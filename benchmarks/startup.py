@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+:mod: `startup` - CLI startup-time benchmark
+=============================================
+
+    module:: startup
+    :platform: Unix, Windows
+    :synopsis: Measures wall-clock time of short ``regshape`` invocations in
+               fresh interpreter processes and reports min/median/max per
+               scenario.  ``tag list`` is run against a closed local port so
+               that it measures startup plus one refused connection, not
+               network latency.
+
+               Usage::
+
+                   python benchmarks/startup.py [--runs N] [--importtime]
+
+    moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+_ENTRY = "from regshape.cli.main import regshape; regshape()"
+
+SCENARIOS = {
+    "--help": ["--help"],
+    "tag --help": ["tag", "--help"],
+    "tag list": ["tag", "list", "-i", "127.0.0.1:9/bench/repo"],
+    "ping": ["--insecure", "ping", "-r", "127.0.0.1:9"],
+}
+
+
+def _time_invocation(argv: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", _ENTRY, *argv],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=False,
+    )
+    return time.perf_counter() - start
+
+
+def _baseline() -> float:
+    """Interpreter start-up alone, for reference."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=False)
+    return time.perf_counter() - start
+
+
+def _importtime(argv: list[str], top: int = 10) -> None:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _ENTRY, *argv],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = (
+            part.strip() for part in line.split(":", 1)[1].split("|")
+        )
+        rows.append((int(cumulative_us), name))
+    rows.sort(reverse=True)
+    for cumulative_us, name in rows[:top]:
+        print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Runs per scenario.")
+    parser.add_argument(
+        "--importtime", action="store_true",
+        help="Also print the slowest imports (cumulative) per scenario.",
+    )
+    args = parser.parse_args()
+
+    base = statistics.median(_baseline() for _ in range(args.runs))
+    print(f"{'python -c pass':<14} median {base * 1000:7.1f} ms")
+    for label, argv in SCENARIOS.items():
+        _time_invocation(argv)   # warm the bytecode cache
+        samples = [_time_invocation(argv) for _ in range(args.runs)]
+        print(
+            f"{label:<14} median {statistics.median(samples) * 1000:7.1f} ms"
+            f"  min {min(samples) * 1000:7.1f} ms  max {max(samples) * 1000:7.1f} ms"
+        )
+        if args.importtime:
+            _importtime(argv)
+
+
+if __name__ == "__main__":
+    main()
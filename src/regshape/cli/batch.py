@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+
+"""
+:mod:`regshape.cli.batch` - Run many regshape operations in one process
+=======================================================================
+
+.. module:: regshape.cli.batch
+   :platform: Unix, Windows
+   :synopsis: ``regshape batch`` reads newline-delimited operations from a
+              file or stdin, runs them on a pool of worker threads inside a
+              single warm process and streams one NDJSON result per
+              operation to stdout.
+
+              Each input line is either a CLI-style command line::
+
+                  tag list -i ghcr.io/org/app --json
+
+              or a JSON object::
+
+                  {"id": "t1", "argv": ["tag", "list", "-i", "ghcr.io/org/app"]}
+                  {"id": "t2", "command": "manifest get",
+                   "options": {"image-ref": "ghcr.io/org/app:1.0", "json": true}}
+
+              Blank lines and lines starting with ``#`` are ignored.  All
+              operations share one
+              :class:`~regshape.libs.transport.pool.RegistryClientPool`, so
+              credentials are resolved, tokens negotiated and connections
+              opened once per registry rather than once per operation.
+
+.. moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import contextvars
+import io
+import json
+import shlex
+import sys
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+import click
+
+from click.core import ParameterSource
+
+from regshape.libs.decorators import telemetry_options
+from regshape.libs.decorators.scenario import track_scenario
+from regshape.libs.transport.pool import RegistryClientPool, use_client_pool
+
+
+@dataclass
+class BatchOperation:
+    """One parsed batch input line.
+
+    :param id: Caller-supplied identifier, or the line number as a string.
+    :param line: 1-based input line number.
+    :param argv: Command-line arguments (without the ``regshape`` prefix).
+    :param error: Parse error message; when set the operation is not run.
+    """
+    id: str
+    line: int
+    argv: list[str]
+    error: Optional[str] = None
+
+
+def _options_to_argv(options: dict) -> list[str]:
+    argv: list[str] = []
+    for name, value in options.items():
+        flag = name if name.startswith("-") else f"--{name.replace('_', '-')}"
+        if value is True:
+            argv.append(flag)
+        elif value is False or value is None:
+            continue
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                argv.extend([flag, str(item)])
+        else:
+            argv.extend([flag, str(value)])
+    return argv
+
+
+def parse_batch_line(text: str, line: int) -> Optional[BatchOperation]:
+    """Parse one input line into a :class:`BatchOperation`.
+
+    :param text: Raw input line.
+    :param line: 1-based line number.
+    :return: The operation, or ``None`` for blank and comment lines.
+    """
+    text = text.strip()
+    if not text or text.startswith("#"):
+        return None
+
+    op_id = str(line)
+    try:
+        if text.startswith("{"):
+            spec = json.loads(text)
+            op_id = str(spec.get("id", op_id))
+            if "argv" in spec:
+                argv = [str(arg) for arg in spec["argv"]]
+            elif "command" in spec:
+                argv = shlex.split(spec["command"])
+                argv += _options_to_argv(spec.get("options", {}))
+                argv += [str(arg) for arg in spec.get("args", [])]
+            else:
+                raise ValueError("JSON operation needs 'argv' or 'command'")
+        else:
+            argv = shlex.split(text)
+    except (ValueError, AttributeError, TypeError) as exc:
+        return BatchOperation(id=op_id, line=line, argv=[], error=str(exc))
+
+    if argv and argv[0] == "regshape":
+        argv = argv[1:]
+    if not argv:
+        return BatchOperation(id=op_id, line=line, argv=[], error="empty command")
+    if argv[0] == "batch":
+        return BatchOperation(id=op_id, line=line, argv=argv, error="batch cannot be nested")
+    return BatchOperation(id=op_id, line=line, argv=argv)
+
+
+class _ThreadLocalStream(io.TextIOBase):
+    """Text stream that writes to a per-thread buffer when one is set.
+
+    Installed as ``sys.stdout`` / ``sys.stderr`` while a batch runs so that
+    concurrent operations capture their own output.
+    """
+
+    def __init__(self, fallback) -> None:
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def capture(self, buffer: Optional[io.StringIO]) -> None:
+        self._local.buffer = buffer
+
+    def _target(self):
+        return getattr(self._local, "buffer", None) or self._fallback
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def isatty(self) -> bool:
+        return False
+
+    def writable(self) -> bool:
+        return True
+
+
+def run_batch_operation(
+    op: BatchOperation,
+    global_args: list[str],
+    stdout: _ThreadLocalStream,
+    stderr: _ThreadLocalStream,
+) -> dict:
+    """Run one operation through the ``regshape`` CLI and describe the outcome.
+
+    :param op: Operation to run.
+    :param global_args: Top-level options prepended to every command.
+    :param stdout: Capturing stdout installed for the batch.
+    :param stderr: Capturing stderr installed for the batch.
+    :return: NDJSON-ready result dict.
+    """
+    from regshape.cli.main import regshape
+
+    result = {"id": op.id, "line": op.line, "argv": op.argv}
+    if op.error is not None:
+        result.update(exit_code=2, ok=False, elapsed_s=0.0, stdout="", stderr=op.error)
+        return result
+
+    out_buf, err_buf = io.StringIO(), io.StringIO()
+    stdout.capture(out_buf)
+    stderr.capture(err_buf)
+    start = time.perf_counter()
+    try:
+        exit_code = regshape.main(
+            args=global_args + op.argv,
+            prog_name="regshape",
+            standalone_mode=False,
+        )
+        exit_code = exit_code if isinstance(exit_code, int) else 0
+    except click.ClickException as exc:
+        exc.show(file=err_buf)
+        exit_code = exc.exit_code
+    except click.Abort:
+        err_buf.write("Aborted!\n")
+        exit_code = 1
+    except SystemExit as exc:
+        exit_code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+    except Exception as exc:  # noqa: BLE001 - report, keep the batch going
+        err_buf.write(f"{type(exc).__name__}: {exc}\n")
+        exit_code = 1
+    finally:
+        elapsed = time.perf_counter() - start
+        stdout.capture(None)
+        stderr.capture(None)
+
+    output = out_buf.getvalue()
+    result.update(
+        exit_code=exit_code,
+        ok=exit_code == 0,
+        elapsed_s=round(elapsed, 6),
+        stdout=output,
+        stderr=err_buf.getvalue(),
+    )
+    try:
+        result["result"] = json.loads(output)
+    except ValueError:
+        pass
+    return result
+
+
+def iter_batch_results(
+    lines: Iterable[str],
+    global_args: list[str],
+    workers: int = 4,
+    fail_fast: bool = False,
+) -> Iterator[dict]:
+    """Run batch *lines* concurrently and yield results as they complete.
+
+    Input is consumed lazily with at most ``2 * workers`` operations in
+    flight, so arbitrarily long streams run in constant memory.
+
+    :param lines: Input lines (CLI-style or JSON).
+    :param global_args: Top-level ``regshape`` options for every command.
+    :param workers: Number of worker threads.
+    :param fail_fast: After the first failure, submit no new operations and
+        drop queued ones that have not started; operations already running
+        finish and are reported.
+    :return: Iterator of result dicts in completion order.
+    """
+    stdout = _ThreadLocalStream(sys.stdout)
+    stderr = _ThreadLocalStream(sys.stderr)
+    saved = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        with use_client_pool(RegistryClientPool(max_connections=workers)), \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="regshape-batch") as pool:
+            pending: set = set()
+            failed = False
+
+            def report(done) -> Iterator[dict]:
+                nonlocal failed
+                pending.difference_update(done)
+                for future in done:
+                    if future.cancelled():
+                        continue
+                    result = future.result()
+                    if not result["ok"]:
+                        failed = True
+                        if fail_fast:
+                            # Queued operations that have not started are dropped.
+                            for queued in pending:
+                                queued.cancel()
+                    yield result
+
+            for number, text in enumerate(lines, start=1):
+                op = parse_batch_line(text, number)
+                if op is None:
+                    continue
+                # Report what has finished without blocking, so a failure
+                # is seen before the next operation is submitted.
+                done = {future for future in pending if future.done()}
+                if not done and len(pending) >= 2 * workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from report(done)
+                if failed and fail_fast:
+                    break
+                # Each operation runs in a copy of the batch context so it
+                # sees the client pool but its telemetry config stays private.
+                ctx = contextvars.copy_context()
+                pending.add(pool.submit(ctx.run, run_batch_operation, op, global_args, stdout, stderr))
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from report(done)
+    finally:
+        sys.stdout, sys.stderr = saved
+
+
+def _global_args(ctx: click.Context) -> list[str]:
+    """Rebuild the top-level ``regshape`` options given before ``batch``.
+
+    Every option of the root command that was not left at its default is
+    turned back into arguments, so options added to the root command later
+    are forwarded too.
+
+    :param ctx: Context of the ``batch`` command.
+    :return: Arguments to prepend to every operation.
+    """
+    root = ctx.find_root()
+    if root is ctx:
+        return []
+    args: list[str] = []
+    for param in root.command.params:
+        source = root.get_parameter_source(param.name)
+        if not isinstance(param, click.Option) or source in (None, ParameterSource.DEFAULT):
+            continue
+        flag = max(param.opts, key=len)
+        value = root.params.get(param.name)
+        if param.is_flag:
+            if value:
+                args.append(flag)
+        elif value is not None:
+            args.extend([flag, str(value)])
+    return args
+
+
+# ===========================================================================
+# batch command
+# ===========================================================================
+
+@click.command()
+@telemetry_options
+@click.option(
+    "--file",
+    "-f",
+    "input_file",
+    type=click.File("r"),
+    default="-",
+    show_default=True,
+    help="File with one operation per line ('-' reads stdin).",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of operations run concurrently.",
+)
+@click.option(
+    "--fail-fast",
+    is_flag=True,
+    default=False,
+    help="Stop starting new operations after the first failure.",
+)
+@click.pass_context
+@track_scenario("batch")
+def batch(ctx, input_file, workers, fail_fast):
+    """Run many operations in one process, one NDJSON result per line.
+
+    Reads operations from FILE (or stdin), either CLI-style
+    (``tag list -i ghcr.io/org/app``) or JSON
+    (``{"id": "x", "argv": ["tag", "list", "-i", "ghcr.io/org/app"]}``),
+    and writes one JSON object per operation with its ``id``, ``exit_code``,
+    captured ``stdout`` / ``stderr`` and, when stdout is JSON, the parsed
+    ``result``.  Top-level options given before ``batch`` (``--insecure``,
+    ``--break-rules``, ...) apply to every operation.  Exits with status 1 if any operation failed.
+    """
+    global_args = _global_args(ctx)
+
+    out = sys.stdout
+    all_ok = True
+    for result in iter_batch_results(input_file, global_args, workers, fail_fast):
+        all_ok = all_ok and result["ok"]
+        out.write(json.dumps(result, separators=(",", ":")) + "\n")
+        out.flush()
+
+    if not all_ok:
+        sys.exit(1)
@@ -12,6 +12,10 @@
 .. moduleauthor:: ToddySM <toddysm@gmail.com>
 """
 
+import sys
+
+from contextlib import nullcontext
+
 import click
 import requests
 
@@ -19,11 +23,16 @@ from regshape.cli.formatting import emit_error, emit_json
 from regshape.libs.blobs import (
     delete_blob,
     get_blob,
+    get_blobs,
     head_blob,
+    head_blobs,
     mount_blob,
     upload_blob,
     upload_blob_chunked,
+    upload_blob_streamed,
 )
+from regshape.libs.compression import CompressingReader
+from regshape.libs.concurrency import DEFAULT_CONCURRENCY
 from regshape.libs.decorators import telemetry_options
 from regshape.libs.decorators.scenario import track_scenario
 from regshape.libs.errors import AuthError, BlobError
@@ -59,18 +68,32 @@ def blob():
 @click.option(
     "--digest",
     "-d",
+    "digests",
     required=True,
+    multiple=True,
     metavar="DIGEST",
-    help="Blob digest in 'algorithm:hex' format (e.g. sha256:abc...).",
+    help="Blob digest in 'algorithm:hex' format (e.g. sha256:abc...). "
+         "Repeat to check several blobs; '-' reads digests from stdin, one per line.",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CONCURRENCY,
+    show_default=True,
+    help="Maximum number of concurrent HEAD requests when checking several blobs.",
 )
 @click.pass_context
 @track_scenario("blob head")
-def blob_head(ctx, repo, digest):
+def blob_head(ctx, repo, digests, concurrency):
     """Check blob existence and retrieve metadata without downloading content.
 
     Issues a HEAD request to the registry for the blob identified by REPO
     and DIGEST.  Credentials are resolved automatically from the credential
     store populated by ``auth login``.
+
+    With more than one digest (repeated ``--digest`` or ``--digest -`` for
+    stdin) the blobs are checked concurrently and a JSON object mapping each
+    digest to its metadata, or ``null`` when missing, is printed instead.
     """
     insecure = ctx.obj.get("insecure", False) if ctx.obj else False
 
@@ -88,12 +111,25 @@ def blob_head(ctx, repo, digest):
 
     client = RegistryClient(TransportConfig(registry=registry, insecure=insecure))
 
+    if len(digests) == 1 and digests[0] != "-":
+        digest = digests[0]
+        try:
+            info = head_blob(client=client, repo=repo_name, digest=digest)
+        except (AuthError, BlobError, requests.exceptions.RequestException) as exc:
+            emit_error(f"{repo}@{digest}", str(exc))
+
+        emit_json(info.to_dict())
+        return
+
+    requested = _expand_stdin_digests(digests)
     try:
-        info = head_blob(client=client, repo=repo_name, digest=digest)
+        found = head_blobs(
+            client=client, repo=repo_name, digests=requested, concurrency=concurrency
+        )
     except (AuthError, BlobError, requests.exceptions.RequestException) as exc:
-        emit_error(f"{repo}@{digest}", str(exc))
+        emit_error(repo, str(exc))
 
-    emit_json(info.to_dict())
+    emit_json({d: (info.to_dict() if info else None) for d, info in found.items()})
 
 
 # ===========================================================================
@@ -113,9 +149,12 @@ def blob_head(ctx, repo, digest):
 @click.option(
     "--digest",
     "-d",
+    "digests",
     required=True,
+    multiple=True,
     metavar="DIGEST",
-    help="Blob digest (e.g. sha256:abc...).",
+    help="Blob digest (e.g. sha256:abc...). Repeat to fetch several blobs; "
+         "'-' reads digests from stdin, one per line.",
 )
 @click.option(
     "--output",
@@ -125,23 +164,42 @@ def blob_head(ctx, repo, digest):
     metavar="PATH",
     help="File path to write blob content to. Omit to verify without saving.",
 )
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    metavar="DIR",
+    help="Directory to download several blobs into, as DIR/<algorithm>/<hex>.",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CONCURRENCY,
+    show_default=True,
+    help="Maximum number of concurrent downloads with --output-dir.",
+)
 @click.option(
     "--chunk-size",
     type=int,
-    default=65536,
+    default=1048576,
     show_default=True,
     metavar="BYTES",
     help="Streaming chunk size in bytes.",
 )
 @click.pass_context
 @track_scenario("blob get")
-def blob_get(ctx, repo, digest, output, chunk_size):
+def blob_get(ctx, repo, digests, output, output_dir, concurrency, chunk_size):
     """Download a blob and verify its digest.
 
     The blob content is streamed from the registry and the SHA-256 digest is
     verified against DIGEST. When --output is supplied the streamed content
     is written to the specified file path; otherwise it is not saved locally.
 
+    With --output-dir, any number of digests are downloaded concurrently
+    into DIR/<algorithm>/<hex>.  Repeated digests are fetched once, files
+    already present with a matching digest are skipped, and a JSON summary
+    is printed; the exit status is 1 if any blob failed.
+
     The --chunk-size option controls the size of streaming chunks used when
     downloading the blob. Credentials are resolved automatically.
     """
@@ -163,8 +221,38 @@ def blob_get(ctx, repo, digest, output, chunk_size):
     except ValueError as exc:
         emit_error(repo, str(exc))
 
+    bulk = output_dir is not None
+    if not bulk and (len(digests) > 1 or digests[0] == "-"):
+        emit_error(repo, "--output-dir is required to fetch several blobs")
+    if bulk and output is not None:
+        emit_error(repo, "--output and --output-dir are mutually exclusive")
+
     client = RegistryClient(TransportConfig(registry=registry, insecure=insecure))
 
+    if bulk:
+        downloads = get_blobs(
+            client=client,
+            repo=repo_name,
+            digests=_expand_stdin_digests(digests),
+            output_dir=output_dir,
+            concurrency=concurrency,
+            chunk_size=chunk_size,
+        )
+        counts = {status: 0 for status in ("downloaded", "skipped", "failed")}
+        for download in downloads:
+            counts[download.status] += 1
+        emit_json({
+            **counts,
+            "bytes_downloaded": sum(
+                d.size for d in downloads if d.status == "downloaded"
+            ),
+            "blobs": [d.to_dict() for d in downloads],
+        })
+        if counts["failed"]:
+            sys.exit(1)
+        return
+
+    digest = digests[0]
     try:
         info = get_blob(
             client=client,
@@ -251,16 +339,17 @@ def blob_delete(ctx, repo, digest):
     "-f",
     "source_file",
     required=True,
-    type=click.Path(exists=True),
+    type=click.Path(exists=True, allow_dash=True),
     metavar="FILE",
-    help="Local file to upload.",
+    help="Local file to upload ('-' reads stdin; --streamed only).",
 )
 @click.option(
     "--digest",
     "-d",
-    required=True,
+    default=None,
     metavar="DIGEST",
-    help="Expected digest of the blob (e.g. sha256:abc...).",
+    help="Expected digest of the blob (e.g. sha256:abc...). "
+         "Required unless --streamed, which computes it while uploading.",
 )
 @click.option(
     "--media-type",
@@ -275,22 +364,51 @@ def blob_delete(ctx, repo, digest):
     default=False,
     help="Use chunked (streaming) upload protocol instead of monolithic.",
 )
+@click.option(
+    "--compress",
+    type=click.Choice(["gzip", "zstd"], case_sensitive=False),
+    default=None,
+    metavar="FORMAT",
+    help="Compress FILE (gzip or zstd) while uploading it; implies --streamed.",
+)
+@click.option(
+    "--streamed",
+    is_flag=True,
+    default=False,
+    help="Stream the whole blob in one PATCH, hashing while sending; "
+         "works for input of unknown size such as a pipe.",
+)
 @click.option(
     "--chunk-size",
     type=int,
-    default=65536,
+    default=1048576,
     show_default=True,
     metavar="BYTES",
-    help="Chunk size in bytes (chunked mode only).",
+    help="Initial chunk size in bytes (chunked mode only). Raised to the "
+         "registry's OCI-Chunk-Min-Length if larger.",
+)
+@click.option(
+    "--max-chunk-size",
+    type=int,
+    default=32 * 1024 * 1024,
+    show_default=True,
+    metavar="BYTES",
+    help="Largest chunk adaptive sizing may grow to (chunked mode only). "
+         "Set equal to --chunk-size for fixed-size chunks.",
 )
 @click.pass_context
 @track_scenario("blob upload")
-def blob_upload(ctx, repo, source_file, digest, media_type, chunked, chunk_size):
+def blob_upload(ctx, repo, source_file, digest, media_type, chunked, compress, streamed,
+                chunk_size, max_chunk_size):
     """Upload a blob to a repository.
 
     By default uses the monolithic upload protocol (POST + PUT), which reads
     the file into memory.  With --chunked the streaming protocol is used
-    (POST + N×PATCH + PUT), which is suitable for large blobs.
+    (POST + N×PATCH + PUT), which is suitable for large blobs; chunks grow
+    with the measured throughput up to --max-chunk-size.  With --streamed
+    the whole blob is sent in a single PATCH while its digest is computed,
+    so FILE may be '-' (stdin) and --digest may be omitted.  --compress
+    gzips or zstd-compresses FILE on the fly and also reports its diff_id.
 
     Both modes verify the confirmed digest returned by the registry against
     DIGEST before reporting success.  Credentials are resolved automatically.
@@ -304,10 +422,38 @@ def blob_upload(ctx, repo, source_file, digest, media_type, chunked, chunk_size)
 
     if repo.rstrip("/") != f"{registry}/{repo_name}":
         emit_error(repo, "Repository must be a plain 'registry/repository' without a tag or digest")
+    streamed = streamed or compress is not None
+    if chunked and streamed:
+        emit_error(repo, "--chunked and --streamed are mutually exclusive")
+    if not streamed and (digest is None or source_file == "-"):
+        emit_error(repo, "--digest and a regular --file are required unless --streamed is used")
     client = RegistryClient(TransportConfig(registry=registry, insecure=insecure))
 
+    size = None
+    extra: dict = {}
     try:
-        if chunked:
+        if streamed:
+            with (nullcontext(sys.stdin.buffer) if source_file == "-"
+                  else open(source_file, "rb")) as fh:
+                reader = CompressingReader(fh, compress) if compress else _CountingReader(fh)
+                confirmed = upload_blob_streamed(
+                    client=client,
+                    repo=repo_name,
+                    source=reader,
+                    digest=digest,
+                    content_type=media_type,
+                    chunk_size=chunk_size,
+                )
+            if compress:
+                result = reader.result()
+                size = result.size
+                extra = {
+                    "diff_id": result.diff_id,
+                    "uncompressed_size": result.uncompressed_size,
+                }
+            else:
+                size = reader.count
+        elif chunked:
             with open(source_file, "rb") as fh:
                 confirmed = upload_blob_chunked(
                     client=client,
@@ -316,6 +462,7 @@ def blob_upload(ctx, repo, source_file, digest, media_type, chunked, chunk_size)
                     digest=digest,
                     content_type=media_type,
                     chunk_size=chunk_size,
+                    max_chunk_size=max_chunk_size,
                 )
         else:
             with open(source_file, "rb") as fh:
@@ -327,20 +474,21 @@ def blob_upload(ctx, repo, source_file, digest, media_type, chunked, chunk_size)
                 digest=digest,
                 content_type=media_type,
             )
-    except OSError as exc:
+    except (OSError, ImportError) as exc:
         emit_error(source_file, str(exc))
     except (AuthError, BlobError, requests.exceptions.RequestException) as exc:
         emit_error(f"{repo}@{digest}", str(exc))
 
     # Derive a canonical blob location from the confirmed digest.
     location = f"/v2/{repo_name}/blobs/{confirmed}"
-    try:
-        size = _file_size(source_file)
-    except OSError:
-        size = 0
+    if size is None:
+        try:
+            size = _file_size(source_file)
+        except OSError:
+            size = 0
 
     emit_json(
-        {"digest": confirmed, "size": size, "location": location}
+        {"digest": confirmed, "size": size, "location": location, **extra}
     )
 
 
@@ -418,3 +566,27 @@ def _file_size(path: str) -> int:
     """Return the byte size of *path*."""
     import os
     return os.path.getsize(path)
+
+
+def _expand_stdin_digests(digests: tuple[str, ...]) -> list[str]:
+    """Replace each ``-`` in *digests* with the digests read from stdin."""
+    expanded: list[str] = []
+    for digest in digests:
+        if digest == "-":
+            expanded.extend(line.strip() for line in sys.stdin if line.strip())
+        else:
+            expanded.append(digest)
+    return expanded
+
+
+class _CountingReader:
+    """Binary reader wrapper that counts the bytes read through it."""
+
+    def __init__(self, stream) -> None:
+        self._stream = stream
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self.count += len(data)
+        return data
@@ -12,9 +12,12 @@
 .. moduleauthor:: ToddySM <toddysm@gmail.com>
 """
 
+from contextlib import nullcontext
+
 import click
 
 from regshape.cli.formatting import emit_error, emit_json
+from regshape.libs.blobs.known import use_known_blobs
 from regshape.libs.docker import export_image, list_images, push_image
 from regshape.libs.errors import AuthError, BlobError, DockerError, LayoutError, ManifestError
 
@@ -140,12 +143,37 @@ def list_cmd(ctx, name_filter, as_json):
     metavar="OS/ARCH",
     help="Platform filter (e.g. linux/amd64). Omit to export all platforms.",
 )
+@click.option(
+    "--compress-level",
+    type=click.IntRange(min=0, max=9),
+    default=None,
+    metavar="N",
+    help="gzip level for uncompressed layers (default 9).",
+)
+@click.option(
+    "--compress-threads",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    metavar="N",
+    help="Threads used to gzip each uncompressed layer.",
+)
+@click.option(
+    "--estargz",
+    is_flag=True,
+    default=False,
+    help="Write seekable eStargz layers for lazy pulling.",
+)
 @click.option("--json", "as_json", is_flag=True, default=False, help="Output JSON.")
 @click.pass_context
-def export_cmd(ctx, image, output, platform, as_json):
+def export_cmd(ctx, image, output, platform, compress_level, compress_threads, estargz, as_json):
     """Export a Docker image as an OCI Image Layout on disk."""
     try:
-        export_image(image, output, platform=platform)
+        export_image(
+            image, output, platform=platform,
+            compress_level=compress_level, compress_threads=compress_threads,
+            estargz=estargz,
+        )
     except (DockerError, LayoutError) as exc:
         emit_error("docker export", str(exc))
 
@@ -203,26 +231,44 @@ def export_cmd(ctx, image, output, platform, as_json):
 @click.option(
     "--chunk-size",
     type=int,
-    default=65536,
+    default=1048576,
     metavar="BYTES",
     help="Chunk size in bytes for chunked uploads.",
 )
+@click.option(
+    "--mount-from",
+    "mount_from",
+    multiple=True,
+    metavar="REPO",
+    help="Repository on the destination registry to cross-mount missing "
+         "blobs from before uploading them. Repeatable.",
+)
+@click.option(
+    "--known-blobs/--no-known-blobs",
+    default=True,
+    show_default=True,
+    help="Skip existence checks for blobs the local known-blob index has "
+         "recently confirmed in the destination repository.",
+)
 @click.option("--json", "as_json", is_flag=True, default=False, help="Output JSON.")
 @click.pass_context
-def push_cmd(ctx, image, dest, platform, force, chunked, chunk_size, as_json):
+def push_cmd(ctx, image, dest, platform, force, chunked, chunk_size, mount_from, known_blobs,
+             as_json):
     """Push a Docker image to a remote OCI registry."""
     insecure = ctx.obj.get("insecure", False) if ctx.obj else False
 
     try:
-        result = push_image(
-            image,
-            dest,
-            platform=platform,
-            insecure=insecure,
-            force=force,
-            chunked=chunked,
-            chunk_size=chunk_size,
-        )
+        with use_known_blobs() if known_blobs else nullcontext():
+            result = push_image(
+                image,
+                dest,
+                platform=platform,
+                insecure=insecure,
+                force=force,
+                chunked=chunked,
+                chunk_size=chunk_size,
+                mount_from=list(mount_from),
+            )
     except (DockerError, LayoutError, AuthError, BlobError, ManifestError) as exc:
         emit_error("docker push", str(exc))
 
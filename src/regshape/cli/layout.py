@@ -16,24 +16,29 @@
 """
 
 import gzip
-import io
 import json
 import sys
 
+from contextlib import nullcontext
+
 import click
 
 from regshape.cli.formatting import emit_error, emit_json, progress_status
+from regshape.libs.blobs.known import use_known_blobs
 from regshape.libs.decorators import telemetry_options
 from regshape.libs.decorators.scenario import track_scenario
 from regshape.libs.errors import AuthError, BlobError, LayoutError, ManifestError
 from regshape.libs.layout import (
+    check_layout,
+    export_layout_archive,
     generate_config,
     generate_manifest,
+    import_layout_archive,
     init_layout,
     push_layout,
     read_index,
     read_stage,
-    stage_layer,
+    stage_session,
     update_config,
     update_layer_annotations,
     update_manifest_annotations,
@@ -82,24 +87,6 @@ def _detect_compression(data: bytes) -> str:
     return "none"
 
 
-def _compress_gzip(data: bytes) -> bytes:
-    buf = io.BytesIO()
-    with gzip.GzipFile(fileobj=buf, mode="wb", mtime=0) as fh:
-        fh.write(data)
-    return buf.getvalue()
-
-
-def _compress_zstd(data: bytes) -> bytes:
-    try:
-        import zstandard as zstd  # type: ignore[import]
-    except ImportError as exc:
-        raise click.ClickException(
-            "zstandard package required for zstd compression: pip install zstandard"
-        ) from exc
-    cctx = zstd.ZstdCompressor()
-    return cctx.compress(data)
-
-
 def _media_type_for_compression(compression: str) -> str:
     if compression == "zstd":
         return OCI_IMAGE_LAYER_TAR_ZSTD
@@ -195,18 +182,36 @@ def init_cmd(ctx, layout_path, as_json):
     help="Root directory of an initialised OCI Image Layout.",
 )
 @click.option(
-    "--file", "-f", "layer_file",
+    "--file", "-f", "layer_files",
     required=True,
+    multiple=True,
     type=click.Path(exists=True),
     metavar="FILE",
-    help="Path to the layer content file.",
+    help="Path to the layer content file. May be repeated to stage several "
+         "layers, in order, in one step.",
 )
 @click.option(
     "--compress-format",
-    type=click.Choice(["gzip", "zstd"], case_sensitive=False),
+    type=click.Choice(["gzip", "zstd", "estargz"], case_sensitive=False),
     default=None,
     metavar="FORMAT",
-    help="Force compression format. Auto-detected from file magic bytes when omitted.",
+    help="Force compression format. Auto-detected from file magic bytes when omitted. "
+         "estargz writes a seekable gzip layer for lazy pulling.",
+)
+@click.option(
+    "--compress-level",
+    type=click.IntRange(min=-7, max=22),
+    default=None,
+    metavar="N",
+    help="Compression level (gzip 0-9, default 9; zstd up to 22, default 3).",
+)
+@click.option(
+    "--compress-threads",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    metavar="N",
+    help="Threads used to compress each layer.",
 )
 @click.option(
     "--media-type",
@@ -223,51 +228,91 @@ def init_cmd(ctx, layout_path, as_json):
 @click.option("--json", "as_json", is_flag=True, default=False, help="Output JSON.")
 @click.pass_context
 @track_scenario("layout add layer")
-def add_layer(ctx, layout_path, layer_file, compress_format, media_type, raw_annotations, as_json):
-    """Stage a layer blob in the layout from FILE."""
+def add_layer(ctx, layout_path, layer_files, compress_format, compress_level,
+              compress_threads, media_type, raw_annotations, as_json):
+    """Stage layer blobs in the layout from one or more FILEs.
+
+    Uncompressed content is compressed while it is streamed into the blob
+    store, so each file is read once and never held in memory.  All layers
+    are recorded in the staging file in a single write; if any file fails,
+    none of them are staged.  With ``--compress-threads`` above one, gzip
+    blocks are compressed in parallel (pigz style) and zstd runs
+    multithreaded.  ``--compress-format estargz`` converts an uncompressed
+    or gzip tar into an eStargz layer and records its TOC digest in the
+    layer annotations.
+    """
+    if compress_level is not None and (compress_format or "gzip") in ("gzip", "estargz") \
+            and not 0 <= compress_level <= 9:
+        emit_error(layout_path, f"gzip compression level must be 0-9, got {compress_level}")
     try:
-        with open(layer_file, "rb") as fh:
-            data = fh.read()
-    except OSError as exc:
-        emit_error(layer_file, str(exc))
-
-    detected = _detect_compression(data)
-
-    if compress_format == "gzip" and detected != "gzip":
-        data = _compress_gzip(data)
-        detected = "gzip"
-    elif compress_format == "zstd" and detected != "zstd":
-        try:
-            data = _compress_zstd(data)
-        except click.ClickException as exc:
-            click.echo(str(exc), err=True)
-            sys.exit(1)
-        detected = "zstd"
-    elif compress_format is None and detected == "none":
-        # Default: auto-compress uncompressed content with gzip
-        data = _compress_gzip(data)
-        detected = "gzip"
-
-    if media_type is None:
-        media_type = _media_type_for_compression(detected)
+        annotations = _parse_annotations(raw_annotations) if raw_annotations else None
+    except click.BadParameter as exc:
+        emit_error(layout_path, str(exc))
 
+    descriptors = []
     try:
-        annotations = _parse_annotations(raw_annotations) if raw_annotations else None
-        descriptor = stage_layer(layout_path, data, media_type, annotations=annotations)
-    except (LayoutError, OSError, click.BadParameter) as exc:
+        with stage_session(layout_path) as session:
+            for layer_file in layer_files:
+                descriptors.append(_stage_layer_file(
+                    session, layer_file, compress_format, media_type, annotations,
+                    level=compress_level, threads=compress_threads,
+                ))
+    except ImportError as exc:
+        click.echo(str(exc), err=True)
+        sys.exit(1)
+    except (LayoutError, OSError, ValueError) as exc:
         emit_error(layout_path, str(exc))
 
     if as_json:
-        out: dict = {
-            "digest": descriptor.digest,
-            "size": descriptor.size,
-            "media_type": descriptor.media_type,
-        }
-        if descriptor.annotations:
-            out["annotations"] = descriptor.annotations
-        emit_json(out)
+        out = [_layer_json(descriptor) for descriptor in descriptors]
+        emit_json(out[0] if len(out) == 1 else out)
     else:
-        click.echo(f"Staged layer {descriptor.digest} ({descriptor.size} bytes)")
+        for descriptor in descriptors:
+            click.echo(f"Staged layer {descriptor.digest} ({descriptor.size} bytes)")
+
+
+def _stage_layer_file(session, layer_file, compress_format, media_type, annotations,
+                      level=None, threads=None):
+    """Stream *layer_file* into *session*, compressing it if needed."""
+    with open(layer_file, "rb") as fh:
+        detected = _detect_compression(fh.read(4))
+        fh.seek(0)
+
+        source, compression = fh, None
+        if compress_format == "estargz":
+            # eStargz is built from the tar entries, so gzip input is
+            # decompressed on the way in.
+            if detected == "zstd":
+                raise ValueError(
+                    f"{layer_file}: eStargz conversion needs an uncompressed or gzip tar"
+                )
+            if detected == "gzip":
+                source = gzip.GzipFile(fileobj=fh, mode="rb")
+            compression = compress_format
+        elif compress_format is not None and detected != compress_format:
+            compression = compress_format
+        elif compress_format is None and detected == "none":
+            # Default: auto-compress uncompressed content with gzip
+            compression = "gzip"
+
+        if media_type is None:
+            media_type = _media_type_for_compression(compression or detected)
+
+        return session.stage_layer_from_stream(
+            source, media_type, compression=compression, level=level,
+            annotations=annotations, threads=threads,
+        )
+
+
+def _layer_json(descriptor) -> dict:
+    out: dict = {
+        "digest": descriptor.digest,
+        "size": descriptor.size,
+        "media_type": descriptor.media_type,
+    }
+    if descriptor.annotations:
+        out["annotations"] = descriptor.annotations
+    return out
 
 
 # ===========================================================================
@@ -684,22 +729,179 @@ def show(ctx, layout_path):
     metavar="DIR",
     help="Root directory of an OCI Image Layout to validate.",
 )
+@click.option(
+    "--full", is_flag=True, default=False,
+    help="Re-hash every blob instead of trusting the layout's "
+         "verification cache.",
+)
+@click.option(
+    "--concurrency", type=click.IntRange(min=1), default=None,
+    help="Number of blobs hashed in parallel [default: sized to the machine].",
+)
 @click.pass_context
 @track_scenario("layout validate")
-def validate(ctx, layout_path):
+def validate(ctx, layout_path, full, concurrency):
     """Validate the structural and content integrity of an OCI Image Layout.
 
     Checks that all blobs referenced by ``index.json`` and all manifests
     within them are present and their digests match the declared values.
+    Blobs unchanged on disk since they were last verified are not re-hashed
+    unless ``--full`` is given.  Blobs are hashed in parallel and every
+    violation found is reported, one per line.
     """
+    bar = [None]  # mutable wrapper for closure
+
+    def progress_callback(event, **kwargs):
+        if event == "blobs_found" and kwargs["total"]:
+            bar[0] = click.progressbar(
+                length=kwargs["total"], label="  Verifying blobs",
+                file=sys.stderr, width=36, show_pos=True,
+            )
+            bar[0].__enter__()
+        elif event == "blob_checked" and bar[0] is not None:
+            bar[0].update(1)
+
     try:
-        validate_layout(layout_path)
-    except (LayoutError, OSError) as exc:
+        violations = check_layout(
+            layout_path, full=full, concurrency=concurrency,
+            progress_callback=progress_callback if sys.stderr.isatty() else None,
+        )
+    except OSError as exc:
         emit_error(layout_path, str(exc))
+    finally:
+        if bar[0] is not None:
+            bar[0].__exit__(None, None, None)
+
+    if violations:
+        for violation in violations[:-1]:
+            click.echo(f"Error [{layout_path}]: {violation}", err=True)
+        emit_error(layout_path, str(violations[-1]))
 
     click.echo(f"Layout at {layout_path} is valid.")
 
 
+# ===========================================================================
+# layout export / import
+# ===========================================================================
+
+
+@layout.command("export")
+@telemetry_options
+@click.option(
+    "--path",
+    "-p",
+    "layout_path",
+    required=True,
+    type=click.Path(exists=True),
+    metavar="DIR",
+    help="Root directory of the OCI Image Layout to export.",
+)
+@click.option(
+    "--output",
+    "-o",
+    required=True,
+    type=click.Path(dir_okay=False, allow_dash=True),
+    metavar="FILE",
+    help="Archive file to write; '-' writes to standard output.",
+)
+@click.option(
+    "--format", "archive_format",
+    type=click.Choice(["tar", "tar+gzip"]),
+    default="tar",
+    show_default=True,
+    help="Archive format.",
+)
+@click.option("--json", "as_json", is_flag=True, default=False, help="Output JSON.")
+@click.pass_context
+@track_scenario("layout export")
+def export_cmd(ctx, layout_path, output, archive_format, as_json):
+    """Stream the layout at DIR into a single tar archive.
+
+    ``oci-layout`` and ``index.json`` are written first, then each manifest
+    followed by its config and layers, so a consumer reading the archive
+    from a pipe can start before it ends.  Blobs are verified against their
+    digests while they are written.  When the archive goes to standard
+    output, the summary is printed to standard error.
+    """
+    to_stdout = output == "-"
+    if to_stdout and as_json:
+        emit_error(layout_path, "--json cannot be used with --output -")
+    compression = "gzip" if archive_format == "tar+gzip" else None
+    try:
+        with click.open_file(output, "wb") as fh:
+            result = export_layout_archive(layout_path, fh, compression=compression)
+    except (LayoutError, OSError) as exc:
+        emit_error(layout_path, str(exc))
+
+    if as_json:
+        emit_json({
+            "layout_path": str(layout_path),
+            "output": str(output),
+            "format": archive_format,
+            "manifests": len(result.manifests),
+            "blobs": result.blobs,
+            "blob_bytes": result.blob_bytes,
+        })
+    else:
+        click.echo(
+            f"Exported {len(result.manifests)} manifest(s), {result.blobs} blob(s) "
+            f"({_format_size(result.blob_bytes)}) to {'stdout' if to_stdout else output}",
+            err=to_stdout,
+        )
+
+
+@layout.command("import")
+@telemetry_options
+@click.option(
+    "--path",
+    "-p",
+    "layout_path",
+    required=True,
+    type=click.Path(file_okay=False),
+    metavar="DIR",
+    help="Layout to import into; created and initialised if it does not exist.",
+)
+@click.option(
+    "--input",
+    "-i",
+    "input_path",
+    default="-",
+    show_default=True,
+    type=click.Path(exists=True, dir_okay=False, allow_dash=True),
+    metavar="FILE",
+    help="Archive to read; '-' reads from standard input.",
+)
+@click.option("--json", "as_json", is_flag=True, default=False, help="Output JSON.")
+@click.pass_context
+@track_scenario("layout import")
+def import_cmd(ctx, layout_path, input_path, as_json):
+    """Import a layout tar archive (plain or gzip) into DIR.
+
+    Blobs are streamed straight into the blob store and verified against
+    their digests; nothing is extracted to a temporary directory.  The
+    archive's ``index.json`` entries are merged into the layout's index
+    once every blob is in place.
+    """
+    try:
+        with click.open_file(input_path, "rb") as fh:
+            result = import_layout_archive(fh, layout_path)
+    except (LayoutError, OSError) as exc:
+        emit_error(layout_path, str(exc))
+
+    if as_json:
+        emit_json({
+            "layout_path": str(layout_path),
+            "manifests": [entry.to_dict() for entry in result.manifests],
+            "blobs": result.blobs,
+            "blob_bytes": result.blob_bytes,
+        })
+    else:
+        click.echo(
+            f"Imported {len(result.manifests)} manifest(s), {result.blobs} blob(s) "
+            f"({_format_size(result.blob_bytes)}) into {layout_path}"
+        )
+
+
 # ===========================================================================
 # layout push
 # ===========================================================================
@@ -760,10 +962,25 @@ def _format_size(size: int) -> str:
     help="Use chunked (streaming) upload protocol for blobs.",
 )
 @click.option(
-    "--chunk-size", type=int, default=65536, show_default=True,
+    "--chunk-size", type=int, default=1048576, show_default=True,
     metavar="BYTES",
     help="Chunk size in bytes (chunked mode only).",
 )
+@click.option(
+    "--mount-from", "mount_from", multiple=True, metavar="REPO",
+    help="Repository on the destination registry to cross-mount missing "
+         "blobs from before uploading them. Repeatable.",
+)
+@click.option(
+    "--known-blobs/--no-known-blobs", default=True, show_default=True,
+    help="Skip existence checks for blobs the local known-blob index has "
+         "recently confirmed in the destination repository.",
+)
+@click.option(
+    "--full", is_flag=True, default=False,
+    help="Re-hash every blob instead of trusting the layout's "
+         "verification cache.",
+)
 @click.option(
     "--dry-run", is_flag=True, default=False,
     help="Print what would be pushed without making network calls.",
@@ -771,7 +988,8 @@ def _format_size(size: int) -> str:
 @click.option("--json", "as_json", is_flag=True, default=False, help="Output JSON.")
 @click.pass_context
 @track_scenario("layout push")
-def push_cmd(ctx, layout_path, dest, force, chunked, chunk_size, dry_run, as_json):
+def push_cmd(ctx, layout_path, dest, force, chunked, chunk_size, mount_from, known_blobs,
+             full, dry_run, as_json):
     """Push an OCI Image Layout to a remote registry.
 
     Reads the layout's index.json, uploads all blobs (layers and config),
@@ -787,7 +1005,7 @@ def push_cmd(ctx, layout_path, dest, force, chunked, chunk_size, dry_run, as_jso
 
     # --- Dry-run mode ---
     if dry_run:
-        _push_dry_run(layout_path, registry, repo, tag_override, as_json)
+        _push_dry_run(layout_path, registry, repo, tag_override, as_json, full)
         return
 
     # --- Build client ---
@@ -824,6 +1042,11 @@ def push_cmd(ctx, layout_path, dest, force, chunked, chunk_size, dry_run, as_jso
                 progress_status(f"  Uploaded  {_short_digest(digest)}")
         elif event == "blob_skip":
             progress_status(f"  {_short_digest(digest)} ({_format_size(size)}) exists, skipping")
+        elif event == "blob_mount":
+            progress_status(
+                f"  Mounted   {_short_digest(digest)} ({_format_size(size)}) "
+                f"from {kwargs.get('source', '')}"
+            )
         elif event == "manifest_done":
             ref = kwargs.get("reference", "")
             progress_status(f"  Manifest {_short_digest(digest)} -> {ref}  pushed")
@@ -837,16 +1060,19 @@ def push_cmd(ctx, layout_path, dest, force, chunked, chunk_size, dry_run, as_jso
         progress_status(f"Pushing layout {layout_path} -> {dest_display}\n")
 
     try:
-        result = push_layout(
-            layout_path=layout_path,
-            client=client,
-            repo=repo,
-            tag_override=tag_override,
-            force=force,
-            chunked=chunked,
-            chunk_size=chunk_size,
-            progress_callback=progress_callback,
-        )
+        with use_known_blobs() if known_blobs else nullcontext():
+            result = push_layout(
+                layout_path=layout_path,
+                client=client,
+                repo=repo,
+                tag_override=tag_override,
+                force=force,
+                chunked=chunked,
+                chunk_size=chunk_size,
+                progress_callback=progress_callback,
+                mount_from=list(mount_from),
+                full=full,
+            )
     except LayoutError as exc:
         emit_error(layout_path, str(exc))
     except (AuthError, BlobError, ManifestError) as exc:
@@ -882,6 +1108,7 @@ def push_cmd(ctx, layout_path, dest, force, chunked, chunk_size, dry_run, as_jso
             "summary": {
                 "manifests_pushed": result.manifests_pushed,
                 "blobs_uploaded": result.blobs_uploaded,
+                "blobs_mounted": result.blobs_mounted,
                 "blobs_skipped": result.blobs_skipped,
                 "bytes_uploaded": result.bytes_uploaded,
             },
@@ -891,17 +1118,18 @@ def push_cmd(ctx, layout_path, dest, force, chunked, chunk_size, dry_run, as_jso
         progress_status(
             f"\nPush complete: {result.manifests_pushed} manifest(s), "
             f"{result.blobs_uploaded} blob(s) uploaded, "
+            f"{result.blobs_mounted} blob(s) mounted, "
             f"{result.blobs_skipped} blob(s) skipped."
         )
 
 
-def _push_dry_run(layout_path, registry, repo, tag_override, as_json):
+def _push_dry_run(layout_path, registry, repo, tag_override, as_json, full=False):
     """Validate layout and print what would be pushed without network calls."""
     from regshape.libs.models.manifest import ImageManifest as _IM
     from regshape.libs.models.manifest import parse_manifest as _pm
 
     try:
-        validate_layout(layout_path)
+        validate_layout(layout_path, full=full)
         index = read_index(layout_path)
     except LayoutError as exc:
         emit_error(layout_path, str(exc))
@@ -9,23 +9,109 @@
     :synopsis: Top-level Click command group for regshape. Parses global options,
                resolves credentials, constructs context, and registers all
                subcommand groups.
+
+               Subcommand modules are imported only when the subcommand is
+               invoked, so ``regshape --help`` and single commands do not pay
+               for the Docker SDK, ``requests`` and every operations module.
     moduleauthor:: ToddySM <toddysm@gmail.com>
 """
 
+import importlib
+
 import click
 
-from regshape.cli.auth import auth
-from regshape.cli.blob import blob
-from regshape.cli.catalog import catalog
-from regshape.cli.docker import docker
-from regshape.cli.layout import layout
-from regshape.cli.manifest import manifest
-from regshape.cli.ping import ping
-from regshape.cli.referrer import referrer
-from regshape.cli.tag import tag
 
+class LazyGroup(click.Group):
+    """Click group whose subcommands are imported on first use.
+
+    *lazy_subcommands* maps a command name to ``(import_path, short_help)``
+    where *import_path* is ``"package.module:attribute"``.  The short help
+    is shown by ``--help`` without importing the module.
+
+    :param lazy_subcommands: Mapping of command name to import path and
+        short help.
+    """
+
+    def __init__(self, *args, lazy_subcommands: dict = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = dict(lazy_subcommands or {})
 
-@click.group()
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_subcommands:
+            import_path, _short_help = self.lazy_subcommands[cmd_name]
+            module_name, attr = import_path.split(":", 1)
+            command = getattr(importlib.import_module(module_name), attr)
+            self.add_command(command, cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        rows = []
+        for name in self.list_commands(ctx):
+            command = self.commands.get(name)
+            if command is not None:
+                if command.hidden:
+                    continue
+                short_help = command.get_short_help_str(formatter.width)
+            else:
+                short_help = self.lazy_subcommands[name][1]
+            rows.append((name, short_help))
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+
+# ---------------------------------------------------------------------------
+# Subcommand registry
+# ---------------------------------------------------------------------------
+
+_SUBCOMMANDS = {
+    "auth": (
+        "regshape.cli.auth:auth",
+        "Manage credentials for OCI registries.",
+    ),
+    "batch": (
+        "regshape.cli.batch:batch",
+        "Run many operations in one process, one NDJSON result per line.",
+    ),
+    "blob": (
+        "regshape.cli.blob:blob",
+        "Manage OCI blobs (head, get, delete, upload, mount).",
+    ),
+    "catalog": (
+        "regshape.cli.catalog:catalog",
+        "List repositories hosted on an OCI registry.",
+    ),
+    "docker": (
+        "regshape.cli.docker:docker",
+        "Interact with Docker Desktop local images.",
+    ),
+    "layout": (
+        "regshape.cli.layout:layout",
+        "Create and manage OCI Image Layouts on the local filesystem.",
+    ),
+    "manifest": (
+        "regshape.cli.manifest:manifest",
+        "Manage OCI image manifests (get, info, descriptor, put, delete).",
+    ),
+    "ping": (
+        "regshape.cli.ping:ping",
+        "Ping an OCI registry to verify connectivity and API support.",
+    ),
+    "referrer": (
+        "regshape.cli.referrer:referrer",
+        "Discover OCI referrers (SBOMs, signatures, attestations).",
+    ),
+    "tag": (
+        "regshape.cli.tag:tag",
+        "Manage OCI image tags (list, delete).",
+    ),
+}
+
+
+@click.group(cls=LazyGroup, lazy_subcommands=_SUBCOMMANDS)
 @click.option("--insecure", is_flag=True, default=False, help="Allow HTTP (no TLS).")
 @click.option("--verbose", "-v", is_flag=True, default=False, help="Verbose output.")
 @click.option("--break", "break_mode", is_flag=True, default=False, help="Enable break mode.")
@@ -63,20 +149,5 @@ def regshape(
     # once the transport layer (libs/transport/) is implemented.
 
 
-# ---------------------------------------------------------------------------
-# Register subcommand groups
-# ---------------------------------------------------------------------------
-
-regshape.add_command(auth)
-regshape.add_command(blob)
-regshape.add_command(catalog)
-regshape.add_command(docker)
-regshape.add_command(layout)
-regshape.add_command(manifest)
-regshape.add_command(ping)
-regshape.add_command(referrer)
-regshape.add_command(tag)
-
-
 if __name__ == "__main__":
     regshape()
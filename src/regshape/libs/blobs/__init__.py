@@ -11,20 +11,38 @@
 .. moduleauthor:: ToddySM <toddysm@gmail.com>
 """
 
+from regshape.libs.blobs.known import (
+    KnownBlobIndex,
+    KnownBlobStore,
+    get_known_blob_store,
+    use_known_blobs,
+)
 from regshape.libs.blobs.operations import (
+    BlobDownload,
     delete_blob,
     get_blob,
+    get_blobs,
     head_blob,
+    head_blobs,
     mount_blob,
     upload_blob,
     upload_blob_chunked,
+    upload_blob_streamed,
 )
 
 __all__ = [
+    "BlobDownload",
+    "KnownBlobIndex",
+    "KnownBlobStore",
     "delete_blob",
     "get_blob",
+    "get_blobs",
+    "get_known_blob_store",
     "head_blob",
+    "head_blobs",
     "mount_blob",
     "upload_blob",
     "upload_blob_chunked",
+    "upload_blob_streamed",
+    "use_known_blobs",
 ]
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+
+"""
+:mod:`regshape.libs.blobs.known` - Persistent index of confirmed blobs
+======================================================================
+
+.. module:: regshape.libs.blobs.known
+   :platform: Unix, Windows
+   :synopsis: Remembers, per registry and repository, which blob digests the
+              registry has confirmed (by a successful HEAD, upload or
+              mount) so that later pushes can skip the existence check and
+              find other repositories to cross-mount a blob from.
+
+.. moduleauthor:: ToddySM <toddysm@gmail.com>
+
+Each ``registry/repository`` pair has one index file under
+``<cache dir>/known-blobs/``.  The file is a small binary header naming the
+repository, a Bloom filter over every digest in the file, and fixed-size
+records of ``(algorithm, confirmed-at, raw digest)``.  Entries older than
+the TTL are treated as unknown and are dropped when the file is next
+rewritten.
+
+Lookups read only the header and Bloom filter until a digest might be
+present, so a repository with thousands of known blobs costs one small read
+for each digest that is definitely new.  Writes are batched in memory and
+merged into the on-disk file (atomic replace) by :meth:`KnownBlobIndex.save`
+under an exclusive lock on a ``.lock`` file next to it, so concurrent pushes
+from several processes do not lose each other's entries.
+
+The index is opt-in: library operations consult and update it only while a
+:class:`KnownBlobStore` is active via :func:`use_known_blobs`.
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Union
+
+# Confirmed blobs older than this are re-checked with a HEAD.
+DEFAULT_TTL = 2 * 24 * 3600
+
+_MAGIC = b"RSKB"
+# Version 2 added the repository name to the header; older files are discarded.
+_VERSION = 2
+_HEADER = struct.Struct(">4sBBIH")      # magic, version, hash count, filter bits, name length
+_RECORD_HEAD = struct.Struct(">BI")     # algorithm code, confirmed-at (epoch s)
+_ALGORITHMS = {"sha256": (1, 32), "sha512": (2, 64)}
+_ALGORITHM_NAMES = {code: (name, size) for name, (code, size) in _ALGORITHMS.items()}
+_BLOOM_HASHES = 7
+_BLOOM_BITS_PER_ENTRY = 10
+_BLOOM_MIN_BITS = 1024
+
+
+def default_cache_dir() -> Path:
+    """Return the directory regshape keeps local caches in.
+
+    ``$REGSHAPE_CACHE_DIR`` if set, otherwise ``$XDG_CACHE_HOME/regshape``,
+    otherwise ``~/.cache/regshape``.
+    """
+    explicit = os.environ.get("REGSHAPE_CACHE_DIR")
+    if explicit:
+        return Path(explicit)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "regshape"
+
+
+def _digest_key(digest: str) -> Optional[tuple[int, bytes]]:
+    """Return ``(algorithm code, raw bytes)`` for *digest*, or ``None`` if
+    the digest is not a well-formed sha256/sha512 digest."""
+    algorithm, sep, hex_value = digest.partition(":")
+    if not sep or algorithm not in _ALGORITHMS:
+        return None
+    code, size = _ALGORITHMS[algorithm]
+    try:
+        raw = bytes.fromhex(hex_value)
+    except ValueError:
+        return None
+    if len(raw) != size:
+        return None
+    return code, raw
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over raw digest bytes.
+
+    Digests are already uniformly distributed, so the bit positions are
+    taken directly from successive 32-bit words of the digest instead of
+    re-hashing it.
+
+    :param bits: Filter size in bits (rounded up to a multiple of 8).
+    :param hashes: Number of bit positions per entry (at most 8).
+    :param data: Existing filter bytes to load.
+    """
+
+    def __init__(self, bits: int, hashes: int = _BLOOM_HASHES, data: Optional[bytes] = None) -> None:
+        self.bits = max(8, (bits + 7) // 8 * 8)
+        self.hashes = hashes
+        self._data = bytearray(data) if data is not None else bytearray(self.bits // 8)
+
+    @classmethod
+    def for_capacity(cls, entries: int) -> "BloomFilter":
+        """Return an empty filter sized for *entries* at ~1% false positives."""
+        return cls(max(_BLOOM_MIN_BITS, entries * _BLOOM_BITS_PER_ENTRY))
+
+    def _positions(self, raw: bytes) -> Iterator[int]:
+        for i in range(self.hashes):
+            word = int.from_bytes(raw[4 * i:4 * i + 4], "big")
+            yield word % self.bits
+
+    def add(self, raw: bytes) -> None:
+        for pos in self._positions(raw):
+            self._data[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, raw: bytes) -> bool:
+        return all(self._data[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(raw))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._data)
+
+
+class KnownBlobIndex:
+    """Known-blob index for one registry repository.
+
+    Thread-safe.  Changes are held in memory until :meth:`save`.
+
+    :param path: Index file path.
+    :param ttl: Seconds a confirmation stays valid.
+    :param name: ``registry/repository`` the index describes; stored in the
+        file so other repositories can be searched for mount sources.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: float = DEFAULT_TTL, name: str = "") -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.name = name
+        self._lock = threading.Lock()
+        self._bloom: Optional[BloomFilter] = None
+        self._entries: Optional[dict[tuple[int, bytes], int]] = None
+        self._records_offset = 0
+        self._added: dict[tuple[int, bytes], int] = {}
+        self._removed: set[tuple[int, bytes]] = set()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _load_filter(self) -> None:
+        """Read the header and Bloom filter (not the records)."""
+        if self._bloom is not None:
+            return
+        try:
+            with open(self.path, "rb") as fh:
+                name, bloom, offset = _read_header(fh)
+        except (OSError, ValueError, struct.error):
+            # Missing or unreadable: start empty; save() rewrites it.
+            self._bloom = BloomFilter.for_capacity(0)
+            self._entries = {}
+            return
+        self.name = self.name or name
+        self._bloom = bloom
+        self._records_offset = offset
+
+    def _load_entries(self) -> dict[tuple[int, bytes], int]:
+        if self._entries is None:
+            self._entries = _read_records(self.path, self._records_offset)
+        return self._entries
+
+    # ------------------------------------------------------------------
+    # Queries and updates
+    # ------------------------------------------------------------------
+
+    def confirmed_at(self, digest: str, now: Optional[float] = None) -> Optional[int]:
+        """Return when *digest* was last confirmed, or ``None`` if it is
+        unknown or the confirmation is older than the TTL.
+
+        :param digest: Blob digest.
+        :param now: Current time (seconds since the epoch), for testing.
+        :returns: Confirmation time in seconds since the epoch, or ``None``.
+        """
+        key = _digest_key(digest)
+        if key is None:
+            return None
+        cutoff = (time.time() if now is None else now) - self.ttl
+        with self._lock:
+            if key in self._removed:
+                return None
+            confirmed = self._added.get(key)
+            if confirmed is None:
+                self._load_filter()
+                if key[1] not in self._bloom:
+                    return None
+                confirmed = self._load_entries().get(key)
+        if confirmed is None or confirmed < cutoff:
+            return None
+        return confirmed
+
+    def contains(self, digest: str, now: Optional[float] = None) -> bool:
+        """Return ``True`` if *digest* was confirmed within the TTL.
+
+        :param digest: Blob digest.
+        :param now: Current time (seconds since the epoch), for testing.
+        """
+        return self.confirmed_at(digest, now) is not None
+
+    def add(self, digest: str, when: Optional[float] = None) -> None:
+        """Record that the registry confirmed *digest*.
+
+        :param digest: Blob digest; malformed digests are ignored.
+        :param when: Confirmation time, defaults to now.
+        """
+        key = _digest_key(digest)
+        if key is None:
+            return
+        with self._lock:
+            self._removed.discard(key)
+            self._added[key] = int(time.time() if when is None else when)
+
+    def discard(self, digest: str) -> None:
+        """Forget *digest*, e.g. after the registry answered 404."""
+        key = _digest_key(digest)
+        if key is None:
+            return
+        with self._lock:
+            self._added.pop(key, None)
+            self._removed.add(key)
+
+    @property
+    def dirty(self) -> bool:
+        """``True`` when there are unsaved changes."""
+        return bool(self._added or self._removed)
+
+    def save(self, now: Optional[float] = None) -> None:
+        """Merge unsaved changes into the index file.
+
+        The file is re-read under an exclusive lock so entries written by
+        other processes since it was loaded are kept; expired entries are
+        dropped (compaction).  The new file replaces the old one atomically.
+
+        :param now: Current time (seconds since the epoch), for testing.
+        """
+        with self._lock:
+            if not self.dirty:
+                return
+            # Imported here: the layout package imports this module.
+            from regshape.libs.layout.lock import file_lock
+
+            cutoff = (time.time() if now is None else now) - self.ttl
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with file_lock(self.path.with_name(self.path.name + ".lock")):
+                merged = _read_records(self.path, None)
+                for key, confirmed in self._added.items():
+                    if confirmed > merged.get(key, -1):
+                        merged[key] = confirmed
+                for key in self._removed:
+                    merged.pop(key, None)
+                merged = {k: t for k, t in merged.items() if t >= cutoff}
+                _write_index(self.path, merged, self.name)
+            self._added.clear()
+            self._removed.clear()
+            self._entries = merged
+            self._bloom = None
+            self._load_filter()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load_filter()
+            keys = set(self._load_entries()) | set(self._added)
+            return len(keys - self._removed)
+
+
+def _read_header(fh: BinaryIO) -> tuple[str, BloomFilter, int]:
+    """Read an index header from *fh*.
+
+    :returns: ``(name, Bloom filter, offset of the first record)``.
+    :raises ValueError: If *fh* is not a known-blob index.
+    """
+    magic, version, hashes, bits, name_len = _HEADER.unpack(fh.read(_HEADER.size))
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("not a known-blob index")
+    name = fh.read(name_len).decode("utf-8")
+    data = fh.read(bits // 8)
+    if len(data) != bits // 8:
+        raise ValueError("truncated Bloom filter")
+    return name, BloomFilter(bits, hashes, data), _HEADER.size + name_len + len(data)
+
+
+def _read_records(path: Path, offset: Optional[int]) -> dict[tuple[int, bytes], int]:
+    """Read every record from *path*; ``offset`` skips a known header."""
+    try:
+        with open(path, "rb") as fh:
+            if offset is None:
+                _name, _bloom, offset = _read_header(fh)
+            fh.seek(offset)
+            content = fh.read()
+    except (OSError, ValueError, struct.error):
+        return {}
+
+    entries: dict[tuple[int, bytes], int] = {}
+    view = memoryview(content)
+    pos = 0
+    while pos + _RECORD_HEAD.size <= len(content):
+        code, confirmed = _RECORD_HEAD.unpack_from(view, pos)
+        if code not in _ALGORITHM_NAMES:
+            break
+        _algorithm, size = _ALGORITHM_NAMES[code]
+        start = pos + _RECORD_HEAD.size
+        if start + size > len(content):
+            break
+        entries[(code, bytes(view[start:start + size]))] = confirmed
+        pos = start + size
+    return entries
+
+
+def _write_index(path: Path, entries: dict[tuple[int, bytes], int], name: str) -> None:
+    bloom = BloomFilter.for_capacity(len(entries))
+    records = bytearray()
+    for (code, raw), confirmed in entries.items():
+        bloom.add(raw)
+        records += _RECORD_HEAD.pack(code, confirmed) + raw
+    encoded_name = name.encode("utf-8")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".regshape-known-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, _VERSION, bloom.hashes, bloom.bits, len(encoded_name)))
+            fh.write(encoded_name)
+            fh.write(bloom.to_bytes())
+            fh.write(records)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class KnownBlobStore:
+    """Known-blob indexes for every registry repository, kept in one
+    directory.
+
+    :param directory: Directory holding the index files; defaults to
+        ``<cache dir>/known-blobs``.
+    :param ttl: Seconds a confirmation stays valid.
+    """
+
+    def __init__(self, directory: Union[str, Path, None] = None, ttl: float = DEFAULT_TTL) -> None:
+        self.directory = Path(directory) if directory is not None else default_cache_dir() / "known-blobs"
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._indexes: dict[tuple[str, str], KnownBlobIndex] = {}
+        self._scanned = False
+
+    def index_for(self, registry: str, repo: str) -> KnownBlobIndex:
+        """Return the index for ``registry/repo``, creating it on first use."""
+        key = (registry, repo)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                name = f"{registry}/{repo}"
+                filename = hashlib.sha256(name.encode("utf-8")).hexdigest()[:32]
+                index = KnownBlobIndex(self.directory / f"{filename}.idx", ttl=self.ttl, name=name)
+                self._indexes[key] = index
+            return index
+
+    def _load_all(self) -> list[KnownBlobIndex]:
+        """Open every index file in the directory (once) and return all
+        indexes."""
+        with self._lock:
+            if not self._scanned:
+                self._scanned = True
+                open_paths = {index.path for index in self._indexes.values()}
+                try:
+                    paths = sorted(self.directory.glob("*.idx"))
+                except OSError:
+                    paths = []
+                for path in paths:
+                    if path in open_paths:
+                        continue
+                    index = KnownBlobIndex(path, ttl=self.ttl)
+                    index._load_filter()
+                    registry, sep, repo = index.name.partition("/")
+                    if sep:
+                        self._indexes.setdefault((registry, repo), index)
+            return list(self._indexes.values())
+
+    def mount_sources(self, registry: str, digest: str, exclude: Optional[str] = None) -> list[str]:
+        """Return repositories on *registry* recently confirmed to have
+        *digest*, most recently confirmed first.
+
+        Only each index's Bloom filter is consulted for repositories that
+        definitely lack the digest, so searching many repositories is cheap.
+
+        :param registry: Registry hostname.
+        :param digest: Blob digest.
+        :param exclude: Repository to leave out (usually the push target).
+        :returns: Repository names usable as ``from`` in a cross-repository
+            mount.
+        """
+        found: list[tuple[int, str]] = []
+        for index in self._load_all():
+            index_registry, _, repo = index.name.partition("/")
+            if index_registry != registry or repo == exclude:
+                continue
+            confirmed = index.confirmed_at(digest)
+            if confirmed is not None:
+                found.append((confirmed, repo))
+        found.sort(key=lambda item: item[0], reverse=True)
+        return [repo for _, repo in found]
+
+    def is_known(self, registry: str, repo: str, digest: str) -> bool:
+        """Return ``True`` if *digest* is confirmed in ``registry/repo``."""
+        return self.index_for(registry, repo).contains(digest)
+
+    def record(self, registry: str, repo: str, digest: str) -> None:
+        """Record that ``registry/repo`` has *digest*."""
+        self.index_for(registry, repo).add(digest)
+
+    def forget(self, registry: str, repo: str, digest: str) -> None:
+        """Record that ``registry/repo`` does not have *digest*."""
+        self.index_for(registry, repo).discard(digest)
+
+    def save(self) -> None:
+        """Write every index with unsaved changes."""
+        with self._lock:
+            indexes = list(self._indexes.values())
+        for index in indexes:
+            index.save()
+
+
+_known_blob_store: ContextVar[Optional[KnownBlobStore]] = ContextVar(
+    "known_blob_store", default=None
+)
+
+
+def get_known_blob_store() -> Optional[KnownBlobStore]:
+    """Return the active :class:`KnownBlobStore`, or ``None``."""
+    return _known_blob_store.get()
+
+
+@contextmanager
+def use_known_blobs(store: Optional[KnownBlobStore] = None) -> Iterator[KnownBlobStore]:
+    """Activate *store* (a default one if omitted) for the enclosed block.
+
+    Changes are saved when the block exits, including on error, so blobs
+    uploaded before a failure are remembered.
+
+    :param store: Store to activate.
+    :return: Context manager yielding the active store.
+    """
+    store = store or KnownBlobStore()
+    token = _known_blob_store.set(store)
+    try:
+        yield store
+    finally:
+        _known_blob_store.reset(token)
+        try:
+            store.save()
+        except OSError:
+            # The index is only an optimisation; never fail an operation
+            # because the cache directory is not writable.
+            pass
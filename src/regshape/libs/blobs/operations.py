@@ -6,9 +6,10 @@
 
 .. module:: regshape.libs.blobs.operations
    :platform: Unix, Windows
-   :synopsis: Library-level functions for HEAD, GET, DELETE, upload (monolithic
-              and chunked), and cross-repo mount of OCI blobs against
-              OCI Distribution-compliant registries.
+   :synopsis: Library-level functions for HEAD and GET (single and bulk),
+              DELETE, upload (monolithic, chunked and streamed), and
+              cross-repo mount of OCI blobs against OCI
+              Distribution-compliant registries.
 
 .. moduleauthor:: ToddySM <toddysm@gmail.com>
 
@@ -19,11 +20,20 @@ concerns — error reporting is the caller's responsibility.
 """
 
 import hashlib
-from typing import BinaryIO, Optional
+import os
+import re
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import BinaryIO, Iterable, Optional
 from urllib.parse import parse_qsl, urlparse
 
 import requests
+import urllib3
 
+from regshape.libs.blobs.known import get_known_blob_store
+from regshape.libs.blobs.pipeline import DEFAULT_DEPTH, ChunkPipeline
+from regshape.libs.concurrency import DEFAULT_CONCURRENCY, map_concurrently
 from regshape.libs.decorators.scenario import track_scenario
 from regshape.libs.decorators.timing import track_time
 from regshape.libs.errors import AuthError, BlobError
@@ -31,9 +41,15 @@ from regshape.libs.models.blob import BlobInfo, BlobUploadSession
 from regshape.libs.models.error import OciErrorResponse
 from regshape.libs.transport import RegistryClient
 
-_DEFAULT_CHUNK_SIZE = 65_536
+_DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Upper bound for adaptively grown PATCH chunks; one chunk is held in memory.
+_DEFAULT_MAX_CHUNK_SIZE = 32 * 1024 * 1024
+# Adaptive chunking aims for PATCH requests that take about this long, so the
+# fixed per-request latency is small compared to the transfer time.
+_TARGET_PATCH_SECONDS = 1.0
 _DEFAULT_CONTENT_TYPE = "application/octet-stream"
 _SUPPORTED_ALGORITHMS = {"sha256", "sha512"}
+_HEX_DIGEST_LENGTHS = {"sha256": 64, "sha512": 128}
 
 
 # ===========================================================================
@@ -64,10 +80,57 @@ def head_blob(
     """
     path = f"/v2/{repo}/blobs/{digest}"
     response = client.head(path)
-    _raise_for_blob_error(response, client.config.registry, repo, digest)
+    try:
+        _raise_for_blob_error(response, client.config.registry, repo, digest)
+    except BlobError as exc:
+        if exc.status_code == 404:
+            _forget_known(client, repo, digest)
+        raise
+    _remember_known(client, repo, digest)
     return _blob_info_from_response(response, digest)
 
 
+@track_time
+def head_blobs(
+    client: RegistryClient,
+    repo: str,
+    digests: Iterable[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> dict[str, Optional[BlobInfo]]:
+    """Check existence of many blobs with concurrent HEAD requests.
+
+    Duplicate digests are checked once.  The first HEAD runs on its own so
+    the token it negotiates is reused by the rest, which then run on up to
+    *concurrency* threads sharing one keep-alive connection pool.  A 404 is
+    reported as a missing blob rather than raised.
+
+    :param client: Authenticated transport client for the target registry.
+    :param repo: Repository name (e.g. ``"myrepo/myimage"``).
+    :param digests: Blob digests to check.
+    :param concurrency: Maximum number of HEAD requests in flight.
+    :returns: Mapping of each requested digest, in first-seen order, to its
+        :class:`~regshape.libs.models.blob.BlobInfo`, or ``None`` when the
+        registry does not have the blob.
+    :raises AuthError: On authentication failure.
+    :raises BlobError: On a non-2xx, non-404 registry response.
+    :raises requests.exceptions.RequestException: On transport errors.
+    """
+    unique = list(dict.fromkeys(digests))
+    if len(unique) > 1 and concurrency > 1:
+        client.enable_connection_pool(concurrency)
+
+    def _head_or_none(digest: str) -> Optional[BlobInfo]:
+        try:
+            return head_blob(client, repo, digest)
+        except BlobError as exc:
+            if exc.status_code == 404:
+                return None
+            raise
+
+    results = map_concurrently(_head_or_none, unique, concurrency, prime=True)
+    return dict(zip(unique, results))
+
+
 @track_time
 def get_blob(
     client: RegistryClient,
@@ -75,6 +138,7 @@ def get_blob(
     digest: str,
     output_path: Optional[str] = None,
     chunk_size: int = _DEFAULT_CHUNK_SIZE,
+    pipelined: bool = False,
 ) -> BlobInfo:
     """Download a blob and verify its digest.
 
@@ -96,7 +160,11 @@ def get_blob(
         ``"sha512:..."``).
     :param output_path: File path to write the blob to. When ``None`` the
         content is streamed only for digest verification and then discarded.
-    :param chunk_size: Streaming chunk size in bytes (default ``65536``).
+    :param chunk_size: Streaming chunk size in bytes (default 1 MiB).
+    :param pipelined: Hash (and write) chunks on worker threads so they
+        overlap with reading the next chunk from the socket.  Off by
+        default: on a single core the thread hand-off costs more than it
+        overlaps (see ``benchmarks/blob_download.py``).
     :returns: :class:`~regshape.libs.models.blob.BlobInfo` built from
         response headers after successful digest verification.
     :raises AuthError: On authentication failure.
@@ -120,21 +188,18 @@ def get_blob(
 
     if output_path is not None:
         try:
-            _stream_to_file(response, output_path, chunk_size, hasher)
+            _stream_to_file(response, output_path, chunk_size, hasher, pipelined)
         except OSError as exc:
             raise BlobError(
                 f"Cannot write to output path: {output_path}",
                 str(exc),
             ) from exc
     else:
-        for chunk in response.iter_content(chunk_size=chunk_size):
-            if chunk:
-                hasher.update(chunk)
+        _consume_body(response, chunk_size, pipelined, hasher.update)
 
     computed = f"{algorithm}:{hasher.hexdigest()}"
     if computed != digest:
         if output_path is not None:
-            import os
             try:
                 os.unlink(output_path)
             except OSError:
@@ -147,6 +212,108 @@ def get_blob(
     return _blob_info_from_response(response, digest)
 
 
+@dataclass
+class BlobDownload:
+    """Outcome for one digest of :func:`get_blobs`.
+
+    :param digest: Blob digest.
+    :param path: Destination file path.
+    :param status: ``"downloaded"``, ``"skipped"`` (already present with a
+        matching digest) or ``"failed"``.
+    :param size: Size of the file in bytes (``0`` when failed).
+    :param error: Error message when *status* is ``"failed"``.
+    """
+    digest: str
+    path: str
+    status: str
+    size: int = 0
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Serialize to a plain dict, omitting ``error`` when unset."""
+        result = {
+            "digest": self.digest,
+            "path": self.path,
+            "status": self.status,
+            "size": self.size,
+        }
+        if self.error is not None:
+            result["error"] = self.error
+        return result
+
+
+@track_time
+def get_blobs(
+    client: RegistryClient,
+    repo: str,
+    digests: Iterable[str],
+    output_dir: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    chunk_size: int = _DEFAULT_CHUNK_SIZE,
+) -> list[BlobDownload]:
+    """Download many blobs concurrently into *output_dir*.
+
+    Each blob is written to ``<output_dir>/<algorithm>/<hex>``, the same
+    layout as an OCI Image Layout ``blobs`` directory.  Duplicate digests
+    are fetched once.  A file that already exists and hashes to its digest
+    is skipped; anything else is downloaded to a ``.partial`` file, verified
+    by :func:`get_blob` and renamed into place, so an interrupted run never
+    leaves a complete-looking file with wrong content.
+
+    A failing blob does not stop the others: its error is reported in the
+    returned :class:`BlobDownload`.  A digest that is not ``sha256:`` or
+    ``sha512:`` followed by a hex value of the right length fails without
+    a request, so no digest can name a path outside *output_dir*.
+
+    :param client: Authenticated transport client for the target registry.
+    :param repo: Repository name.
+    :param digests: Blob digests to download.
+    :param output_dir: Destination directory (created if missing).
+    :param concurrency: Maximum number of downloads in flight.
+    :param chunk_size: Streaming chunk size in bytes for each download.
+    :returns: One :class:`BlobDownload` per unique digest, in first-seen
+        order.
+    """
+    unique = list(dict.fromkeys(digests))
+    valid = [digest for digest in unique if _is_valid_digest(digest)]
+    if len(valid) > 1 and concurrency > 1:
+        client.enable_connection_pool(concurrency)
+        # A HEAD negotiates the token the downloads then share, without
+        # holding every worker back for the whole first download.
+        try:
+            head_blob(client, repo, valid[0])
+        except (AuthError, BlobError, requests.exceptions.RequestException):
+            pass
+
+    def _fetch(digest: str) -> BlobDownload:
+        algorithm, _, hex_digest = digest.partition(":")
+        if not _is_valid_digest(digest):
+            # Never join an unchecked digest into a path under output_dir.
+            return BlobDownload(
+                digest, "", "failed",
+                error=f"Invalid digest {digest!r}: expected sha256 or sha512 "
+                      "followed by a lowercase hex value of the matching length",
+            )
+        path = os.path.join(output_dir, algorithm, hex_digest)
+        try:
+            if os.path.isfile(path) and _file_digest(path, algorithm, chunk_size) == digest:
+                return BlobDownload(digest, path, "skipped", os.path.getsize(path))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial_path = path + ".partial"
+            try:
+                get_blob(client, repo, digest, output_path=partial_path, chunk_size=chunk_size)
+            except BaseException:
+                if os.path.exists(partial_path):
+                    os.unlink(partial_path)
+                raise
+            os.replace(partial_path, path)
+            return BlobDownload(digest, path, "downloaded", os.path.getsize(path))
+        except (AuthError, BlobError, OSError, requests.exceptions.RequestException) as exc:
+            return BlobDownload(digest, path, "failed", error=str(exc))
+
+    return map_concurrently(_fetch, unique, concurrency)
+
+
 @track_time
 def delete_blob(
     client: RegistryClient,
@@ -169,6 +336,7 @@ def delete_blob(
     path = f"/v2/{repo}/blobs/{digest}"
     response = client.delete(path)
     _raise_for_blob_error(response, client.config.registry, repo, digest)
+    _forget_known(client, repo, digest)
 
 
 @track_scenario("blob upload")
@@ -191,7 +359,9 @@ def upload_blob(
 
     :param client: Authenticated transport client for the target registry.
     :param repo: Repository name.
-    :param data: Raw blob bytes to upload.
+    :param data: Raw blob bytes to upload, or any bytes-like object such as
+        the memory-mapped view from
+        :func:`~regshape.libs.layout.operations.read_blob_view`.
     :param digest: Expected content digest (``"sha256:..."``). Sent as a
         query parameter on the completing PUT.
     :param content_type: MIME type for the ``Content-Type`` header on the PUT
@@ -233,6 +403,7 @@ def upload_blob(
             f"Digest mismatch: expected {digest}, registry confirmed {confirmed}",
             f"registry={registry} repo={repo}",
         )
+    _remember_known(client, repo, digest)
     return confirmed or digest
 
 
@@ -244,19 +415,28 @@ def upload_blob_chunked(
     digest: str,
     content_type: str = _DEFAULT_CONTENT_TYPE,
     chunk_size: int = _DEFAULT_CHUNK_SIZE,
+    max_chunk_size: int = _DEFAULT_MAX_CHUNK_SIZE,
 ) -> str:
     """Upload a blob using the chunked (POST + N×PATCH + PUT) protocol.
 
     Three or more HTTP calls are made:
 
     1. ``POST /v2/{repo}/blobs/uploads/`` — initiates the upload session.
-    2. N × ``PATCH <upload-url>`` — streams content in *chunk_size*-byte
-       increments; each PATCH carries a ``Content-Range`` header. On
-       each ``202`` response the session offset is advanced and the
-       ``Location`` header (if present) is used for the next PATCH.
+    2. N × ``PATCH <upload-url>`` — streams content in chunks; each PATCH
+       carries a ``Content-Range`` header. On each ``202`` response the
+       session offset is advanced and the ``Location`` header (if present)
+       is used for the next PATCH.
     3. ``PUT <upload-url>?digest={digest}`` — commits the upload with an
        empty body.
 
+    The first chunk is *chunk_size* bytes, raised to the registry's
+    ``OCI-Chunk-Min-Length`` when the POST response carries one.  After
+    each PATCH the chunk size is re-derived from the measured throughput
+    so that a PATCH takes about one second, growing at most fourfold per
+    step and never exceeding *max_chunk_size* (which bounds memory use).
+    Every chunk except the last stays a multiple of the registry minimum.
+    Pass ``max_chunk_size=chunk_size`` to keep chunks fixed.
+
     If *source* is exhausted immediately (zero-byte blob), the PATCH loop
     is skipped and only the completing PUT is issued.
 
@@ -266,7 +446,9 @@ def upload_blob_chunked(
     :param digest: Expected content digest. Sent as a query parameter on the
         completing PUT and verified against the registry's confirmed digest.
     :param content_type: MIME type sent on the completing PUT.
-    :param chunk_size: Chunk size in bytes (default ``65536``).
+    :param chunk_size: Initial chunk size in bytes (default 1 MiB).
+    :param max_chunk_size: Largest chunk adaptive sizing may grow to
+        (default 32 MiB).  The registry minimum wins if it is larger.
     :returns: The confirmed digest from ``Docker-Content-Digest``.
     :raises AuthError: On authentication failure at any step.
     :raises BlobError: On a non-2xx response, an offset mismatch (416), or
@@ -282,14 +464,20 @@ def upload_blob_chunked(
 
     location = init_response.headers.get("Location", "")
     session = BlobUploadSession.from_location(location)
+    sizer = _ChunkSizer(
+        chunk_size,
+        minimum=_chunk_min_length(init_response),
+        maximum=max_chunk_size,
+    )
 
     # --- Step 2: PATCH loop ---
     while True:
-        chunk = source.read(chunk_size)
+        chunk = source.read(sizer.size)
         if not chunk:
             break
         start = session.offset
         end = start + len(chunk) - 1
+        patch_started = time.perf_counter()
         patch_response = client.patch(
             session.upload_path,
             data=chunk,
@@ -302,6 +490,7 @@ def upload_blob_chunked(
         _raise_for_upload_error(
             patch_response, registry, session_id=session.session_id
         )
+        sizer.record(len(chunk), time.perf_counter() - patch_started)
         session.offset += len(chunk)
         # Update upload path if the registry rotates the session URL.
         new_location = patch_response.headers.get("Location", "")
@@ -333,9 +522,129 @@ def upload_blob_chunked(
             f"Digest mismatch: expected {digest}, registry confirmed {confirmed}",
             f"registry={registry} repo={repo}",
         )
+    _remember_known(client, repo, digest)
     return confirmed or digest
 
 
+@track_scenario("blob upload streamed")
+def upload_blob_streamed(
+    client: RegistryClient,
+    repo: str,
+    source: BinaryIO,
+    digest: Optional[str] = None,
+    content_type: str = _DEFAULT_CONTENT_TYPE,
+    chunk_size: int = _DEFAULT_CHUNK_SIZE,
+    algorithm: str = "sha256",
+    pipelined: bool = False,
+) -> str:
+    """Upload a blob of unknown size in a single streaming PATCH.
+
+    Three HTTP calls are made:
+
+    1. ``POST /v2/{repo}/blobs/uploads/`` — initiates the upload session.
+    2. One ``PATCH <upload-url>`` whose body is a generator reading *source*
+       in *chunk_size*-byte pieces (sent with chunked transfer encoding, no
+       ``Content-Range``).  The digest is computed while the bytes are sent.
+    3. ``PUT <upload-url>?digest={digest}`` — commits the upload with an
+       empty body.
+
+    Memory use is one chunk regardless of blob size, and *source* may be a
+    pipe.  Because the body cannot be replayed, a request that needs an
+    authentication retry fails instead of re-sending; the POST normally
+    negotiates the token first so this does not happen in practice.
+
+    :param client: Authenticated transport client for the target registry.
+    :param repo: Repository name.
+    :param source: Open binary file-like object or pipe to read from.
+    :param digest: Expected digest.  When ``None`` the digest computed
+        while streaming is used; otherwise the two must match before the
+        upload is committed.
+    :param content_type: MIME type sent on the completing PUT.
+    :param chunk_size: Read size in bytes (default 1 MiB).
+    :param algorithm: Hash algorithm when *digest* is ``None``
+        (``sha256`` or ``sha512``); otherwise taken from *digest*.
+    :param pipelined: Hash on a worker thread while the chunk is on the
+        wire.  Off by default, as for :func:`get_blob`.
+    :returns: The confirmed digest from ``Docker-Content-Digest``.
+    :raises AuthError: On authentication failure at any step.
+    :raises BlobError: On a non-2xx response, an unsupported algorithm, or
+        a computed or confirmed digest mismatch.
+    :raises requests.exceptions.RequestException: On transport errors.
+    """
+    if digest is not None:
+        algorithm = digest.partition(":")[0]
+    if algorithm not in _SUPPORTED_ALGORITHMS:
+        raise BlobError(
+            f"Unsupported digest algorithm: {algorithm!r}",
+            f"supported algorithms: {', '.join(sorted(_SUPPORTED_ALGORITHMS))}",
+        )
+    registry = client.config.registry
+
+    # --- Step 1: initiate upload session ---
+    init_path = f"/v2/{repo}/blobs/uploads/"
+    init_response = client.post(init_path)
+    _raise_for_upload_error(init_response, registry, session_id=None)
+
+    location = init_response.headers.get("Location", "")
+    session = BlobUploadSession.from_location(location)
+
+    # --- Step 2: one PATCH streaming the whole source ---
+    hasher = hashlib.new(algorithm)
+
+    def _body(pipeline: ChunkPipeline):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            pipeline.feed(chunk)
+            session.offset += len(chunk)
+            yield chunk
+
+    with ChunkPipeline(hasher.update, threaded=pipelined) as pipeline:
+        patch_response = client.patch(
+            session.upload_path,
+            data=_body(pipeline),
+            headers={"Content-Type": "application/octet-stream"},
+        )
+    _raise_for_upload_error(patch_response, registry, session_id=session.session_id)
+    new_location = patch_response.headers.get("Location", "")
+    if new_location:
+        try:
+            session.upload_path = BlobUploadSession.from_location(new_location).upload_path
+        except BlobError:
+            pass  # keep existing path if the new Location is unparseable
+
+    computed = f"{algorithm}:{hasher.hexdigest()}"
+    if digest is not None and computed != digest:
+        raise BlobError(
+            f"Digest mismatch: expected {digest}, streamed content is {computed}",
+            f"registry={registry} repo={repo} bytes={session.offset}",
+        )
+
+    # --- Step 3: completing PUT ---
+    _put_base, _put_params = _split_upload_path(session.upload_path)
+    _put_params.append(("digest", computed))
+    put_response = client.put(
+        _put_base,
+        data=b"",
+        params=_put_params,
+        headers={
+            "Content-Type": content_type,
+            "Content-Length": "0",
+        },
+    )
+    _raise_for_upload_error(put_response, registry, session_id=session.session_id)
+
+    confirmed = put_response.headers.get("Docker-Content-Digest", "")
+    if confirmed and confirmed != computed:
+        raise BlobError(
+            f"Digest mismatch: expected {computed}, registry confirmed {confirmed}",
+            f"registry={registry} repo={repo}",
+        )
+    _remember_known(client, repo, computed)
+    return confirmed or computed
+
+
 @track_time
 def mount_blob(
     client: RegistryClient,
@@ -350,8 +659,10 @@ def mount_blob(
     * ``201 Created`` — mount succeeded; returns the confirmed digest from
       ``Docker-Content-Digest``.
     * ``202 Accepted`` — the registry cannot perform the mount (unsupported
-      feature or the source blob is inaccessible); raises :class:`BlobError`
-      directing the caller to fall back to :func:`upload_blob` or
+      feature or the source blob is inaccessible) and opened an upload
+      session instead.  The session is cancelled with a ``DELETE`` so it is
+      not left orphaned, and :class:`BlobError` is raised directing the
+      caller to fall back to :func:`upload_blob` or
       :func:`upload_blob_chunked`.
 
     :param client: Authenticated transport client for the target registry.
@@ -370,6 +681,7 @@ def mount_blob(
     response = client.post(path, params={"from": from_repo, "mount": digest})
 
     if response.status_code == 202:
+        _cancel_upload_session(client, response.headers.get("Location", ""))
         raise BlobError(
             f"Blob mount not accepted for {registry}/{repo}@{digest}"
             f": registry returned 202 — retry with upload_blob or upload_blob_chunked",
@@ -377,6 +689,7 @@ def mount_blob(
         )
 
     _raise_for_blob_error(response, registry, repo, digest)
+    _remember_known(client, repo, digest)
     return response.headers.get("Docker-Content-Digest", digest)
 
 
@@ -403,6 +716,70 @@ def _split_upload_path(upload_path: str) -> tuple[str, list[tuple[str, str]]]:
     return parsed.path, parse_qsl(parsed.query, keep_blank_values=True)
 
 
+def _cancel_upload_session(client: RegistryClient, location: str) -> None:
+    """Best-effort ``DELETE`` of the upload session at *location*; failures
+    are ignored, as the registry expires abandoned sessions eventually."""
+    try:
+        session = BlobUploadSession.from_location(location)
+        base, params = _split_upload_path(session.upload_path)
+        client.delete(base, params=params)
+    except (AuthError, BlobError, requests.exceptions.RequestException):
+        pass
+
+
+class _ChunkSizer:
+    """Chooses PATCH chunk sizes for :func:`upload_blob_chunked`.
+
+    :param initial: First chunk size in bytes.
+    :param minimum: Registry minimum (``OCI-Chunk-Min-Length``), or ``0``.
+    :param maximum: Upper bound for grown chunks.
+    """
+
+    def __init__(self, initial: int, minimum: int = 0, maximum: int = _DEFAULT_MAX_CHUNK_SIZE) -> None:
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self.size = self._align(max(initial, self.minimum))
+        self._grow = self.maximum > self.size
+
+    def _align(self, size: int) -> int:
+        """Round *size* down to a multiple of the registry minimum."""
+        return max(self.minimum, size - size % self.minimum)
+
+    def record(self, nbytes: int, elapsed: float) -> None:
+        """Adjust the next chunk size after a PATCH of *nbytes* took
+        *elapsed* seconds."""
+        if not self._grow:
+            return
+        if elapsed <= 0:
+            target = self.size * 4
+        else:
+            target = int(nbytes / elapsed * _TARGET_PATCH_SECONDS)
+        target = min(max(target, self.size // 2), self.size * 4, self.maximum)
+        self.size = self._align(target)
+
+
+def _chunk_min_length(response: requests.Response) -> int:
+    """Return the ``OCI-Chunk-Min-Length`` announced on *response*, or 0."""
+    try:
+        return max(int(response.headers.get("OCI-Chunk-Min-Length", 0)), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _remember_known(client: RegistryClient, repo: str, digest: str) -> None:
+    """Record *digest* in the active known-blob store, if any."""
+    store = get_known_blob_store()
+    if store is not None:
+        store.record(client.config.registry, repo, digest)
+
+
+def _forget_known(client: RegistryClient, repo: str, digest: str) -> None:
+    """Drop *digest* from the active known-blob store, if any."""
+    store = get_known_blob_store()
+    if store is not None:
+        store.forget(client.config.registry, repo, digest)
+
+
 def _blob_info_from_response(
     response: requests.Response,
     fallback_digest: str,
@@ -428,6 +805,7 @@ def _stream_to_file(
     output_path: str,
     chunk_size: int,
     hasher,
+    pipelined: bool = False,
 ) -> None:
     """Stream a response body to a file, updating *hasher* as bytes arrive.
 
@@ -436,12 +814,136 @@ def _stream_to_file(
     :param chunk_size: Read/write chunk size in bytes.
     :param hasher: A :mod:`hashlib` hasher whose ``update`` method is called
         for each chunk.
+    :param pipelined: Hash and write on worker threads while the next chunk
+        is read.
     """
     with open(output_path, "wb") as fh:
-        for chunk in response.iter_content(chunk_size=chunk_size):
-            if chunk:
-                hasher.update(chunk)
-                fh.write(chunk)
+        _consume_body(
+            response, chunk_size, pipelined, hasher.update, partial(_write_all, fh.fileno())
+        )
+
+
+def _is_valid_digest(digest: str) -> bool:
+    """Return ``True`` if *digest* is ``sha256:`` or ``sha512:`` followed by
+    a lowercase hex value of the right length."""
+    algorithm, _, hex_digest = digest.partition(":")
+    length = _HEX_DIGEST_LENGTHS.get(algorithm)
+    return length is not None and re.fullmatch(f"[0-9a-f]{{{length}}}", hex_digest) is not None
+
+
+def _file_digest(path: str, algorithm: str, chunk_size: int) -> str:
+    """Return ``"{algorithm}:{hex}"`` of the file at *path*."""
+    hasher = hashlib.new(algorithm)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(max(chunk_size, 1 << 20)), b""):
+            hasher.update(chunk)
+    return f"{algorithm}:{hasher.hexdigest()}"
+
+
+def _raw_body_reader(response: requests.Response):
+    """Return the :class:`http.client.HTTPResponse` behind *response* when
+    its body can be read with ``readinto()`` directly, else ``None``.
+
+    Only undecoded bodies qualify: with a ``Content-Encoding`` urllib3 has
+    to decompress, so the regular ``iter_content`` path is used.  urllib3's
+    own ``readinto()`` reads into a temporary ``bytes`` object and copies
+    it, so the underlying file object is used when it has a ``readinto``.
+    """
+    raw = getattr(response, "raw", None)
+    if not isinstance(raw, urllib3.response.HTTPResponse):
+        return None
+    if response.headers.get("Content-Encoding", "identity").lower() != "identity":
+        return None
+    fp = getattr(raw, "_fp", None)
+    return fp if hasattr(fp, "readinto") else None
+
+
+def _consume_body(
+    response: requests.Response,
+    chunk_size: int,
+    pipelined: bool,
+    *consumers,
+) -> None:
+    """Pass the body of a streaming *response* to *consumers* chunk by chunk.
+
+    When possible the body is read with ``readinto()`` into a small ring of
+    preallocated buffers and the consumers receive :class:`memoryview`
+    slices, so no ``bytes`` object is allocated per chunk and each byte is
+    copied once, from the socket buffer into the ring.  This bypasses
+    urllib3, so the body length is checked against ``Content-Length`` here.
+    Otherwise it falls back to ``iter_content``.  If reading or a consumer
+    fails partway, the response is closed so the half-read connection is
+    not reused.
+
+    :param response: A streaming GET response.
+    :param chunk_size: Read size in bytes.
+    :param pipelined: Run the consumers on worker threads.
+    :param consumers: Callables taking one chunk (``bytes`` or
+        ``memoryview``); they must not keep a reference to it.
+    :raises BlobError: If the body is shorter than its ``Content-Length``.
+    """
+    reader = _raw_body_reader(response)
+    complete = False
+    try:
+        if reader is None:
+            with ChunkPipeline(*consumers, threaded=pipelined) as pipeline:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if chunk:
+                        pipeline.feed(chunk)
+        else:
+            expected = response.headers.get("Content-Length")
+            # A buffer may be refilled once no consumer can still be reading
+            # it: each consumer holds at most DEFAULT_DEPTH queued chunks plus
+            # the one it is processing, and one more buffer is being filled.
+            count = DEFAULT_DEPTH + 2 if pipelined else 1
+            ring = [memoryview(bytearray(chunk_size)) for _ in range(count)]
+            received = 0
+            with ChunkPipeline(*consumers, threaded=pipelined, depth=DEFAULT_DEPTH) as pipeline:
+                index = 0
+                while True:
+                    view = ring[index % count]
+                    nbytes = _readinto_full(reader, view)
+                    if not nbytes:
+                        break
+                    pipeline.feed(view[:nbytes])
+                    received += nbytes
+                    index += 1
+            if expected is not None and expected.isdigit() and received != int(expected):
+                raise BlobError(
+                    "Incomplete blob body",
+                    f"received {received} of {expected} bytes",
+                )
+        complete = True
+    finally:
+        if not complete:
+            response.close()
+        elif reader is not None:
+            # The body was read past urllib3, so hand the connection back ourselves.
+            response.raw.release_conn()
+
+
+def _readinto_full(reader, view: memoryview) -> int:
+    """Fill *view* from *reader*, stopping early only at end of body.
+
+    A socket read returns whatever has arrived, often far less than the
+    buffer; filling it keeps chunks at *chunk_size* so the consumers are
+    called once per buffer rather than once per network read.
+    """
+    filled = 0
+    while filled < len(view):
+        nbytes = reader.readinto(view[filled:])
+        if not nbytes:
+            break
+        filled += nbytes
+    return filled
+
+
+def _write_all(fd: int, data) -> None:
+    """Write all of *data* to file descriptor *fd*."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
 
 
 def _raise_for_blob_error(
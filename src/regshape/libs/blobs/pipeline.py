@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""
+:mod:`regshape.libs.blobs.pipeline` - Overlap hashing and disk I/O with the network
+===================================================================================
+
+.. module:: regshape.libs.blobs.pipeline
+   :platform: Unix, Windows
+   :synopsis: :class:`ChunkPipeline` hands each chunk read from the network
+              to consumers (a hasher's ``update``, a file's ``write``) that
+              run on their own worker threads behind bounded queues.
+              :mod:`hashlib` and file writes release the GIL for large
+              buffers, so the socket read, the digest and the disk write of
+              consecutive chunks proceed in parallel instead of in turn.
+
+.. moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import queue
+import threading
+
+from typing import Callable, Optional
+
+# Chunks buffered per consumer before the producer blocks.
+DEFAULT_DEPTH = 4
+
+_STOP = object()
+
+
+class ChunkPipeline:
+    """Feed chunks to consumer callables, optionally on worker threads.
+
+    Every consumer receives every chunk, in order.  With *threaded* each
+    consumer runs on its own thread behind a queue of *depth* chunks, so a
+    slow consumer applies backpressure to :meth:`feed` instead of letting
+    memory grow.  Without *threaded* the consumers are called inline, which
+    lets callers use one code path for small and large chunk sizes.
+
+    Use as a context manager: a normal exit waits for the consumers to
+    finish and re-raises the first consumer error; an exception inside the
+    block discards any queued chunks.
+
+    :param consumers: Callables taking one ``bytes`` chunk.
+    :param threaded: Run consumers on worker threads.
+    :param depth: Queue length per consumer.
+    """
+
+    def __init__(
+        self,
+        *consumers: Callable[[bytes], object],
+        threaded: bool = True,
+        depth: int = DEFAULT_DEPTH,
+    ) -> None:
+        self._consumers = consumers
+        self._threaded = threaded
+        self._error: Optional[BaseException] = None
+        self._aborted = False
+        self._queues: list[queue.Queue] = []
+        self._threads: list[threading.Thread] = []
+        if threaded:
+            for consumer in consumers:
+                q: queue.Queue = queue.Queue(maxsize=depth)
+                thread = threading.Thread(
+                    target=self._run, args=(consumer, q),
+                    name="regshape-pipeline", daemon=True,
+                )
+                self._queues.append(q)
+                self._threads.append(thread)
+                thread.start()
+
+    def _run(self, consumer: Callable[[bytes], object], q: queue.Queue) -> None:
+        while True:
+            chunk = q.get()
+            if chunk is _STOP:
+                return
+            if self._error is not None or self._aborted:
+                continue  # keep draining so the producer never blocks forever
+            try:
+                consumer(chunk)
+            except BaseException as exc:  # noqa: BLE001 - re-raised in the producer
+                self._error = self._error or exc
+
+    def feed(self, chunk: bytes) -> None:
+        """Pass *chunk* to every consumer.
+
+        :raises BaseException: The first error raised by a consumer.
+        """
+        if not self._threaded:
+            for consumer in self._consumers:
+                consumer(chunk)
+            return
+        if self._error is not None:
+            raise self._error
+        for q in self._queues:
+            q.put(chunk)
+
+    def close(self) -> None:
+        """Wait for every queued chunk to be consumed.
+
+        :raises BaseException: The first error raised by a consumer.
+        """
+        self._shutdown()
+        if self._error is not None:
+            raise self._error
+
+    def abort(self) -> None:
+        """Discard queued chunks and stop the workers."""
+        self._aborted = True
+        self._shutdown()
+
+    def _shutdown(self) -> None:
+        for q in self._queues:
+            q.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._queues.clear()
+        self._threads.clear()
+
+    def __enter__(self) -> "ChunkPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+
+"""
+:mod:`regshape.libs.compression` - Single-pass layer compression
+================================================================
+
+.. module:: regshape.libs.compression
+   :platform: Unix, Windows
+   :synopsis: :class:`CompressingReader` wraps an uncompressed layer stream
+              and returns its gzip or zstd compressed form from ``read()``,
+              hashing the uncompressed bytes (the ``diff_id``) and the
+              compressed bytes (the blob digest) as they pass.  It can be
+              handed to a layout blob writer or to
+              :func:`~regshape.libs.blobs.operations.upload_blob_streamed`,
+              so a layer is read from disk once and never held in memory.
+              With ``threads`` above one, gzip blocks are deflated in
+              parallel (pigz style) and zstd uses its multithreaded mode.
+
+.. moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import gzip
+import hashlib
+import struct
+import zlib
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+# Supported compression formats.
+COMPRESSIONS = ("gzip", "zstd")
+
+# Uncompressed bytes pulled from the source per compressor step.
+_READ_SIZE = 1024 * 1024
+
+# gzip level used by the in-memory helpers; kept so both paths produce
+# byte-identical (and therefore digest-identical) output.
+_DEFAULT_GZIP_LEVEL = 9
+
+# Uncompressed bytes deflated per task by the parallel gzip compressor.
+_GZIP_BLOCK_SIZE = 1024 * 1024
+
+# Deflate window: the tail of each block primes the next block's compressor.
+_DEFLATE_WINDOW = 32 * 1024
+
+
+@dataclass
+class CompressionResult:
+    """Digests and sizes of a stream compressed by :class:`CompressingReader`.
+
+    :param digest: ``sha256:`` digest of the compressed bytes.
+    :param size: Compressed size in bytes.
+    :param diff_id: ``sha256:`` digest of the uncompressed bytes.
+    :param uncompressed_size: Uncompressed size in bytes.
+    :param compression: ``"gzip"`` or ``"zstd"``.
+    """
+    digest: str
+    size: int
+    diff_id: str
+    uncompressed_size: int
+    compression: str
+
+
+class _Buffer:
+    """Write target collecting compressor output until it is taken."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _deflate_block(block: bytes, dictionary: bytes, level: int) -> bytes:
+    if dictionary:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    # A sync flush ends on a byte boundary without a final block, so the
+    # raw deflate output of consecutive blocks can be concatenated.
+    return compressor.compress(block) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+class _ParallelGzip:
+    """gzip compressor deflating fixed-size blocks on a thread pool.
+
+    Works like pigz: each block is deflated independently, primed with the
+    last 32 KiB of the previous block so the ratio stays close to a
+    single-threaded run, and the pieces are joined into one gzip member.
+    :mod:`zlib` releases the GIL, so blocks compress on all cores.  The
+    output depends on *level* and *block_size* only, not on *threads*.
+
+    :param level: Compression level, 0-9.
+    :param threads: Worker threads.
+    :param block_size: Uncompressed bytes per block.
+    """
+
+    def __init__(self, level: int, threads: int, block_size: int = _GZIP_BLOCK_SIZE) -> None:
+        self._level = level
+        self._block_size = block_size
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+        # Blocks in flight; bounds memory to a few blocks per thread.
+        self._max_pending = 2 * threads
+        self._futures: deque[Future] = deque()
+        self._buffer = bytearray()
+        self._dictionary = b""
+        self._crc = 0
+        self._size = 0
+        xfl = 2 if level == 9 else 4 if level == 1 else 0
+        # Same header as gzip.GzipFile(mtime=0): no name, unknown OS.
+        self._header = b"\x1f\x8b\x08\x00" + struct.pack("<I", 0) + bytes((xfl, 255))
+
+    def _submit(self, block: bytes) -> None:
+        self._futures.append(
+            self._executor.submit(_deflate_block, block, self._dictionary, self._level)
+        )
+        self._dictionary = block[-_DEFLATE_WINDOW:]
+
+    def _collect(self, wait_all: bool) -> bytes:
+        out = []
+        while self._futures and (
+            wait_all or self._futures[0].done() or len(self._futures) > self._max_pending
+        ):
+            out.append(self._futures.popleft().result())
+        return b"".join(out)
+
+    def compress(self, data: bytes) -> bytes:
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        self._buffer += data
+        while len(self._buffer) >= self._block_size:
+            self._submit(bytes(self._buffer[:self._block_size]))
+            del self._buffer[:self._block_size]
+        header, self._header = self._header, b""
+        return header + self._collect(wait_all=False)
+
+    def finish(self) -> bytes:
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            body = self._collect(wait_all=True)
+        finally:
+            self._executor.shutdown(wait=True)
+        header, self._header = self._header, b""
+        # An empty final stored block, then CRC-32 and size modulo 2**32.
+        trailer = b"\x03\x00" + struct.pack("<II", self._crc & 0xFFFFFFFF, self._size & 0xFFFFFFFF)
+        return header + body + trailer
+
+
+class CompressingReader:
+    """Binary reader yielding the compressed form of *source*.
+
+    Both digests are available from :meth:`result` once ``read()`` has
+    returned ``b""``.  gzip output uses a zero mtime, so it is reproducible
+    and identical to compressing the whole content with
+    :class:`gzip.GzipFile` in one go.  Parallel gzip output is a different
+    (equally valid) stream, but the same for any thread count above one.
+
+    :param source: Binary file-like object with the uncompressed content.
+    :param compression: ``"gzip"`` or ``"zstd"``.
+    :param level: Compression level; ``None`` uses 9 for gzip and the
+        zstandard default for zstd.
+    :param read_size: Uncompressed bytes read from *source* per step.
+    :param threads: Compression threads; ``None`` or 1 compresses on the
+        calling thread.
+    :raises ValueError: If *compression* is not supported or *threads* is
+        below 1.
+    :raises ImportError: If zstd is requested and :mod:`zstandard` is not
+        installed.
+    """
+
+    def __init__(
+        self,
+        source: BinaryIO,
+        compression: str = "gzip",
+        level: Optional[int] = None,
+        read_size: int = _READ_SIZE,
+        threads: Optional[int] = None,
+    ) -> None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unsupported compression {compression!r}; expected one of "
+                f"{', '.join(COMPRESSIONS)}"
+            )
+        if threads is not None and threads < 1:
+            raise ValueError(f"Compression threads must be at least 1, got {threads}")
+        threads = threads or 1
+        self.compression = compression
+        self._source = source
+        self._read_size = read_size
+        self._diff_hasher = hashlib.sha256()
+        self._hasher = hashlib.sha256()
+        self._pending = bytearray()
+        self._eof = False
+        self.uncompressed_size = 0
+        self.size = 0
+
+        self._parallel = None
+        if compression == "gzip" and threads > 1:
+            self._parallel = _ParallelGzip(
+                _DEFAULT_GZIP_LEVEL if level is None else level, threads
+            )
+        elif compression == "gzip":
+            self._sink = _Buffer()
+            self._gzip = gzip.GzipFile(
+                fileobj=self._sink,
+                mode="wb",
+                mtime=0,
+                compresslevel=_DEFAULT_GZIP_LEVEL if level is None else level,
+            )
+        else:
+            try:
+                import zstandard as zstd  # type: ignore[import]
+            except ImportError as exc:
+                raise ImportError(
+                    "zstandard package required for zstd compression: pip install zstandard"
+                ) from exc
+            options = {} if level is None else {"level": level}
+            if threads > 1:
+                options["threads"] = threads
+            cctx = zstd.ZstdCompressor(**options)
+            self._zstd = cctx.compressobj()
+
+    def _compress(self, data: bytes) -> bytes:
+        if self._parallel is not None:
+            return self._parallel.compress(data)
+        if self.compression == "gzip":
+            self._gzip.write(data)
+            return self._sink.take()
+        return self._zstd.compress(data)
+
+    def _finish(self) -> bytes:
+        if self._parallel is not None:
+            return self._parallel.finish()
+        if self.compression == "gzip":
+            self._gzip.close()
+            return self._sink.take()
+        return self._zstd.flush()
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        """Return up to *size* compressed bytes (all remaining when negative).
+
+        :param size: Maximum number of bytes to return.
+        :returns: Compressed bytes; ``b""`` at the end of the stream.
+        """
+        while not self._eof and (size < 0 or len(self._pending) < size):
+            chunk = self._source.read(self._read_size)
+            if chunk:
+                self._diff_hasher.update(chunk)
+                self.uncompressed_size += len(chunk)
+                self._pending += self._compress(chunk)
+            else:
+                self._pending += self._finish()
+                self._eof = True
+
+        if size < 0 or size >= len(self._pending):
+            data = bytes(self._pending)
+            self._pending.clear()
+        else:
+            data = bytes(self._pending[:size])
+            del self._pending[:size]
+        self._hasher.update(data)
+        self.size += len(data)
+        return data
+
+    def result(self) -> CompressionResult:
+        """Return the digests and sizes of the fully read stream.
+
+        :raises ValueError: If the stream has not been read to the end.
+        """
+        if not self._eof or self._pending:
+            raise ValueError("Compressed stream has not been fully read")
+        return CompressionResult(
+            digest=f"sha256:{self._hasher.hexdigest()}",
+            size=self.size,
+            diff_id=f"sha256:{self._diff_hasher.hexdigest()}",
+            uncompressed_size=self.uncompressed_size,
+            compression=self.compression,
+        )
+
+
+def compress_stream(
+    source: BinaryIO,
+    sink: BinaryIO,
+    compression: str = "gzip",
+    level: Optional[int] = None,
+    chunk_size: int = _READ_SIZE,
+    threads: Optional[int] = None,
+) -> CompressionResult:
+    """Compress *source* into *sink* in one pass.
+
+    :param source: Binary file-like object with the uncompressed content.
+    :param sink: Binary file-like object receiving the compressed bytes.
+    :param compression: ``"gzip"`` or ``"zstd"``.
+    :param level: Compression level, as for :class:`CompressingReader`.
+    :param chunk_size: Bytes moved per step.
+    :param threads: Compression threads, as for :class:`CompressingReader`.
+    :returns: :class:`CompressionResult` for the written stream.
+    """
+    reader = CompressingReader(
+        source, compression, level=level, read_size=chunk_size, threads=threads
+    )
+    while True:
+        data = reader.read(chunk_size)
+        if not data:
+            return reader.result()
+        sink.write(data)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+"""
+:mod:`regshape.libs.concurrency` - Thread-pool helpers for bulk operations
+==========================================================================
+
+.. module:: regshape.libs.concurrency
+   :platform: Unix, Windows
+   :synopsis: Runs one blocking registry call per item on a bounded worker
+              pool.  Each task runs in a copy of the caller's
+              :mod:`contextvars` context so telemetry configuration and an
+              active client pool are visible from worker threads.
+
+.. moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import contextvars
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Default number of concurrent registry requests for bulk operations.
+DEFAULT_CONCURRENCY = 8
+
+
+def map_concurrently(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    prime: bool = False,
+) -> list[R]:
+    """Apply *func* to every item on up to *concurrency* threads.
+
+    Results are returned in input order.  The first exception raised by
+    *func* propagates to the caller once every started task has finished.
+
+    :param func: Callable applied to each item.
+    :param items: Items to process.
+    :param concurrency: Maximum number of concurrent calls; ``1`` runs
+        everything sequentially on the calling thread.
+    :param prime: Run the first item on its own before starting the pool,
+        so that a token negotiated by the first request is reused by the
+        rest rather than every worker hitting the 401 challenge at once.
+    :returns: List of results, one per item, in input order.
+    """
+    items = list(items)
+    if concurrency <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    results: list[R] = []
+    if prime:
+        results.append(func(items[0]))
+        items = items[1:]
+
+    workers = min(concurrency, len(items))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="regshape") as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, func, item) for item in items
+        ]
+        results.extend(future.result() for future in futures)
+    return results
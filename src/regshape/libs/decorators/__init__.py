@@ -17,13 +17,14 @@
 """
 
 import functools
+import itertools
 import sys
 
 import click
 
 from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Callable, IO, Optional
+from typing import Callable, IO, Iterator, Optional
 
 from regshape.libs.decorators.metrics import PerformanceMetrics
 
@@ -54,6 +55,33 @@ class TelemetryConfig:
         and cleared by ``@track_scenario`` (or by :func:`flush_telemetry` for
         commands that have no scenario wrapper).
     :param metrics: Aggregate performance metrics.
+    :param metrics_export_enabled: When True, every HTTP call is also recorded
+        into :attr:`export_metrics` with ``registry`` / ``operation`` labels
+        for the Prometheus exporter.
+    :param metrics_file_path: Optional node_exporter textfile path written
+        when the command finishes (``--metrics-file``).
+    :param export_metrics: Cumulative labelled metrics rendered by
+        :mod:`~regshape.libs.decorators.exporter`. Unlike :attr:`metrics` it is
+        never reset by the telemetry block renderers.
+    :param debug_sample_rate: Emit ``--debug-calls`` output for one call in
+        every *N* (``1`` logs every call).
+    :param debug_slow_threshold: When set, emit ``--debug-calls`` output for
+        calls that take at least this many seconds.
+    :param debug_errors_only: When True, emit ``--debug-calls`` output for
+        calls answered with a non-2xx status.
+    :param debug_sample_counter: Running call counter used for 1-in-N
+        sampling.
+    :param writer: Background :class:`~regshape.libs.decorators.output.TelemetryWriter`
+        used by :func:`~regshape.libs.decorators.output.telemetry_write`, or
+        ``None`` to write synchronously.
+    :param profile_path: Output file for ``--profile`` (pstats for
+        ``cprofile`` mode, collapsed stacks for ``sampling`` mode).
+    :param profile_mode: ``"cprofile"`` or ``"sampling"``.
+    :param profile_summary: Hottest ``(function, self_seconds)`` pairs of the
+        finished profile, rendered by :func:`flush_telemetry`.
+
+    When any of the three ``debug_*`` filters is active, a call is printed
+    if it matches at least one of them; otherwise every call is printed.
     """
     time_methods_enabled: bool = False
     time_scenarios_enabled: bool = False
@@ -66,6 +94,19 @@ class TelemetryConfig:
     log_file: Optional[IO] = field(default=None, repr=False)
     method_timings: list[tuple[str, float]] = field(default_factory=list)
     metrics: PerformanceMetrics = field(default_factory=PerformanceMetrics)
+    metrics_export_enabled: bool = False
+    metrics_file_path: Optional[str] = None
+    export_metrics: PerformanceMetrics = field(default_factory=PerformanceMetrics)
+    debug_sample_rate: int = 1
+    debug_slow_threshold: Optional[float] = None
+    debug_errors_only: bool = False
+    debug_sample_counter: Iterator[int] = field(
+        default_factory=itertools.count, repr=False, compare=False,
+    )
+    writer: Optional["TelemetryWriter"] = field(default=None, repr=False)
+    profile_path: Optional[str] = None
+    profile_mode: str = "cprofile"
+    profile_summary: list[tuple[str, float]] = field(default_factory=list)
 
 
 _telemetry_config: ContextVar[TelemetryConfig] = ContextVar(
@@ -97,6 +138,20 @@ def get_telemetry_config() -> TelemetryConfig:
     return _telemetry_config.get()
 
 
+def _run_cleanup_step(description: str, step) -> None:
+    """Run *step*, an export performed after the command, and report a
+    failure on stderr instead of raising, so that it never replaces the
+    command's own exception or exit code.
+
+    :param description: What *step* does, for the warning message.
+    :param step: Callable taking no arguments.
+    """
+    try:
+        step()
+    except Exception as exc:
+        click.echo(f"Warning: could not {description}: {exc}", err=True)
+
+
 def telemetry_options(func: Callable) -> Callable:
     """
     Click decorator that attaches ``--time-methods``, ``--time-scenarios``,
@@ -127,6 +182,53 @@ def telemetry_options(func: Callable) -> Callable:
         default="text",
         help="Telemetry output format: text or json.",
     )
+    @click.option(
+        "--profile-mode",
+        type=click.Choice(["cprofile", "sampling"], case_sensitive=False),
+        default="cprofile",
+        help="Profiler used by --profile: deterministic cProfile or a "
+             "low-overhead stack sampler.",
+    )
+    @click.option(
+        "--profile",
+        "profile_path",
+        type=click.Path(dir_okay=False, writable=True),
+        default=None,
+        help="Profile the command and write pstats (cprofile) or collapsed "
+             "stacks (sampling) to this file.",
+    )
+    @click.option(
+        "--telemetry-async",
+        is_flag=True,
+        default=False,
+        help="Write telemetry output from a background thread.",
+    )
+    @click.option(
+        "--debug-errors",
+        is_flag=True,
+        default=False,
+        help="With --debug-calls, print calls answered with a non-2xx status.",
+    )
+    @click.option(
+        "--debug-slow",
+        type=click.FloatRange(min=0),
+        default=None,
+        metavar="SECONDS",
+        help="With --debug-calls, print calls slower than SECONDS.",
+    )
+    @click.option(
+        "--debug-sample",
+        type=click.IntRange(min=1),
+        default=1,
+        metavar="N",
+        help="With --debug-calls, print one call in every N.",
+    )
+    @click.option(
+        "--metrics-file",
+        type=click.Path(dir_okay=False, writable=True),
+        default=None,
+        help="Write Prometheus metrics to this file (node_exporter textfile).",
+    )
     @click.option(
         "--metrics",
         is_flag=True,
@@ -179,6 +281,10 @@ def telemetry_options(func: Callable) -> Callable:
             kwargs.pop("debug_calls", None)
             kwargs.pop("metrics", None)
 
+        # The textfile export is independent of verbosity: it never writes
+        # to the terminal.
+        metrics_file_path = kwargs.pop("metrics_file", None)
+
         config = TelemetryConfig(
             time_methods_enabled=enabled_time_methods,
             time_scenarios_enabled=enabled_time_scenarios,
@@ -187,22 +293,65 @@ def telemetry_options(func: Callable) -> Callable:
             verbosity=verbosity,
             output_format=kwargs.pop("telemetry_format", "text"),
             log_file_path=log_file_path,
+            metrics_export_enabled=metrics_file_path is not None,
+            metrics_file_path=metrics_file_path,
+            debug_sample_rate=kwargs.pop("debug_sample", 1),
+            debug_slow_threshold=kwargs.pop("debug_slow", None),
+            debug_errors_only=kwargs.pop("debug_errors", False),
+            profile_path=kwargs.pop("profile_path", None),
+            profile_mode=kwargs.pop("profile_mode", "cprofile").lower(),
         )
+        if kwargs.pop("telemetry_async", False) and verbosity > 0:
+            from regshape.libs.decorators.output import TelemetryWriter
+            config.writer = TelemetryWriter()
 
         # Open log file in append mode if specified
         if config.log_file_path:
             config.log_file = open(config.log_file_path, "a")  # noqa: SIM115
 
+        profiler = None
+        if config.profile_path:
+            from regshape.libs.decorators.profiling import create_profiler
+            profiler = create_profiler(config.profile_mode)
+
         configure_telemetry(config)
         try:
-            result = func(*args, **kwargs)
+            if profiler is not None:
+                profiler.start()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                if profiler is not None:
+                    profiler.stop()
+                    _run_cleanup_step(
+                        f"write profile to {config.profile_path}",
+                        lambda: profiler.dump(config.profile_path),
+                    )
+                    if config.verbosity > 0:
+                        config.profile_summary = profiler.top_functions()
         finally:
             # flush any method timings not already consumed by a @track_scenario block;
-            # runs even when the command calls sys.exit() (raises SystemExit)
+            # runs even when the command calls sys.exit() (raises SystemExit).
+            # Each step runs even if the previous one failed, so the async
+            # writer is always drained and the log file always closed.
             from regshape.libs.decorators.output import flush_telemetry
-            flush_telemetry()
-            if config.log_file is not None:
-                config.log_file.close()
+            try:
+                flush_telemetry()
+            finally:
+                if config.metrics_file_path:
+                    from regshape.libs.decorators.exporter import write_metrics_textfile
+                    _run_cleanup_step(
+                        f"write metrics to {config.metrics_file_path}",
+                        lambda: write_metrics_textfile(
+                            config.export_metrics, config.metrics_file_path
+                        ),
+                    )
+                try:
+                    if config.writer is not None:
+                        config.writer.close()
+                finally:
+                    if config.log_file is not None:
+                        config.log_file.close()
         return result
     return wrapper
 
@@ -215,8 +364,21 @@ from regshape.libs.decorators.sanitization import SENSITIVE_HEADERS, redact_head
 from regshape.libs.decorators.timing import track_time                                          # noqa: E402
 from regshape.libs.decorators.scenario import track_scenario                                    # noqa: E402
 from regshape.libs.decorators.call_details import debug_call, format_curl_debug, format_curl_debug_json, http_request  # noqa: E402
-from regshape.libs.decorators.output import flush_telemetry, print_telemetry_block, telemetry_write  # noqa: E402
-from regshape.libs.decorators.metrics import PerformanceMetrics                                # noqa: E402
+from regshape.libs.decorators.output import TelemetryWriter, flush_telemetry, print_telemetry_block, telemetry_write  # noqa: E402
+from regshape.libs.decorators.metrics import PerformanceMetrics, classify_operation            # noqa: E402
+
+# The exporter pulls in http.server, so it is only imported when one of its
+# names is first used (--metrics-file or a metrics server), not at startup.
+_EXPORTER_NAMES = frozenset(
+    {'MetricsServer', 'format_prometheus', 'start_metrics_server', 'write_metrics_textfile'}
+)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTER_NAMES:
+        from regshape.libs.decorators import exporter
+        return getattr(exporter, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'TelemetryConfig',
@@ -236,4 +398,10 @@ __all__ = [
     'print_telemetry_block',
     'flush_telemetry',
     'telemetry_write',
+    'TelemetryWriter',
+    'classify_operation',
+    'format_prometheus',
+    'write_metrics_textfile',
+    'start_metrics_server',
+    'MetricsServer',
 ]
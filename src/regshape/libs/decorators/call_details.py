@@ -28,6 +28,7 @@ from datetime import datetime, timezone
 from typing import IO, Optional
 from urllib.parse import urlparse
 
+from regshape.libs.decorators.metrics import classify_operation
 from regshape.libs.decorators.sanitization import redact_headers
 
 
@@ -233,6 +234,26 @@ def format_curl_debug_json(
     telemetry_write(json.dumps(event, separators=(",", ":")), out, log_file)
 
 
+def _should_log_call(config, status_code: int, elapsed: float) -> bool:
+    """Apply the ``--debug-sample`` / ``--debug-slow`` / ``--debug-errors``
+    filters to one completed call.
+
+    :param config: Active telemetry configuration.
+    :param status_code: HTTP response status code.
+    :param elapsed: Call elapsed time in seconds.
+    :return: ``True`` if the call should be printed.
+    """
+    sample_rate = config.debug_sample_rate
+    slow = config.debug_slow_threshold
+    if sample_rate <= 1 and slow is None and not config.debug_errors_only:
+        return True
+    if config.debug_errors_only and not 200 <= status_code < 300:
+        return True
+    if slow is not None and elapsed >= slow:
+        return True
+    return sample_rate > 1 and next(config.debug_sample_counter) % sample_rate == 0
+
+
 def debug_call(func):
     """
     Decorator that prints each HTTP round-trip in ``curl -v`` style when
@@ -240,26 +261,40 @@ def debug_call(func):
     enabled.
 
     Enhanced with per-call elapsed time measurement, response body preview,
-    and automatic metrics recording.
+    and automatic metrics recording.  Output can be thinned with the
+    sampling filters on :class:`~regshape.libs.decorators.TelemetryConfig`
+    (1-in-N, slow calls, non-2xx calls); metrics are always recorded.
 
     :param func: The function to wrap.
     :type func: callable
     :return: The wrapped function.
     :rtype: callable
     """
+    # Resolve the signature once; binding per call is cheap, introspecting
+    # the function on every request is not.
+    try:
+        sig = inspect.signature(func)
+    except (ValueError, TypeError):
+        sig = None
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         # Import here to avoid circular import at module load time
         from regshape.libs.decorators import get_telemetry_config
         config = get_telemetry_config()
 
-        if not config.debug_calls_enabled and not config.metrics_enabled:
+        if (
+            not config.debug_calls_enabled
+            and not config.metrics_enabled
+            and not config.metrics_export_enabled
+        ):
             return func(*args, **kwargs)
 
         # Extract request details from the bound function arguments
         params = {}
         try:
-            sig = inspect.signature(func)
+            if sig is None:
+                raise TypeError("signature unavailable")
             bound = sig.bind(*args, **kwargs)
             bound.apply_defaults()
             params = bound.arguments
@@ -285,8 +320,10 @@ def debug_call(func):
         req_content_length = None
         data = kwargs.get('data') if 'data' in kwargs else params.get('data')
         if data is not None:
-            if isinstance(data, (bytes, str)):
-                req_content_length = len(data) if isinstance(data, bytes) else len(data.encode('utf-8'))
+            if isinstance(data, str):
+                req_content_length = len(data.encode('utf-8'))
+            elif isinstance(data, (bytes, bytearray, memoryview)):
+                req_content_length = memoryview(data).nbytes
 
         # Measure elapsed time
         start = time.perf_counter()
@@ -316,16 +353,34 @@ def debug_call(func):
                 resp_bytes_received = resp_content_length or len(resp_body or b"")
 
             # Record metrics if enabled
+            storage = bool(params.get('storage'))
             if config.metrics_enabled:
                 config.metrics.record_request(
                     status_code=result.status_code,
                     bytes_sent=req_content_length or 0,
                     bytes_received=resp_bytes_received,
                     elapsed=elapsed,
+                    storage=storage,
+                )
+            if config.metrics_export_enabled:
+                parsed = urlparse(url)
+                operation = (
+                    f"blob_storage_{method.lower()}" if storage
+                    else classify_operation(method, url)
+                )
+                config.export_metrics.record_request(
+                    status_code=result.status_code,
+                    bytes_sent=req_content_length or 0,
+                    bytes_received=resp_bytes_received,
+                    elapsed=elapsed,
+                    registry=parsed.netloc or "unknown",
+                    operation=operation,
                 )
 
-            # Emit debug output if enabled
-            if config.debug_calls_enabled:
+            # Emit debug output if enabled and the call passes the filters
+            if config.debug_calls_enabled and _should_log_call(
+                config, result.status_code, elapsed
+            ):
                 if config.output_format == "json":
                     format_curl_debug_json(
                         method, url, req_headers,
@@ -358,7 +413,14 @@ def debug_call(func):
 
 
 @debug_call
-def http_request(url: str, method: str = "GET", headers: dict = None, **kwargs):
+def http_request(
+    url: str,
+    method: str = "GET",
+    headers: dict = None,
+    session: Optional[requests.Session] = None,
+    storage: bool = False,
+    **kwargs,
+):
     """Thin wrapper around :func:`requests.request` decorated with
     ``@debug_call``.
 
@@ -368,8 +430,16 @@ def http_request(url: str, method: str = "GET", headers: dict = None, **kwargs):
     :param url: Full request URL.
     :param method: HTTP method (default ``"GET"``).
     :param headers: Optional request headers dict.
+    :param session: Optional :class:`requests.Session` whose pooled,
+        keep-alive connections are reused.  When ``None`` a one-shot
+        connection is used.
+    :param storage: The request goes to a storage backend a blob request
+        was redirected to rather than to the registry; ``--metrics``
+        attributes it separately.  Not forwarded to :mod:`requests`.
     :param kwargs: Additional keyword arguments forwarded to
         :func:`requests.request` (e.g. ``timeout``).
     :return: :class:`requests.Response`
     """
+    if session is not None:
+        return session.request(method, url, headers=headers or {}, **kwargs)
     return requests.request(method, url, headers=headers or {}, **kwargs)
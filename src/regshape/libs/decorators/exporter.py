@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+"""
+:mod: `exporter` - Prometheus / OpenMetrics exporter for telemetry metrics
+===========================================================================
+
+    module:: exporter
+    :platform: Unix, Windows
+    :synopsis: Renders :class:`~regshape.libs.decorators.metrics.PerformanceMetrics`
+               in the Prometheus text exposition format (or OpenMetrics), writes
+               it atomically to a node_exporter textfile, and serves it on
+               ``/metrics`` for long-running library use.
+
+               Every series carries ``registry`` and ``operation`` labels;
+               request counters additionally carry ``status``.
+    moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from regshape.libs.decorators.metrics import PerformanceMetrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = (
+    "application/openmetrics-text; version=1.0.0; charset=utf-8"
+)
+
+_PREFIX = "regshape"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value per the exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(
+        f'{key}="{_escape(str(value))}"' for key, value in labels.items()
+    ) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def format_prometheus(
+    metrics: PerformanceMetrics,
+    *,
+    openmetrics: bool = False,
+    timestamp: Optional[float] = None,
+) -> str:
+    """Render *metrics* in the Prometheus text format.
+
+    Emitted families::
+
+        regshape_http_requests_total{registry,operation,status}
+        regshape_http_request_errors_total{registry,operation}
+        regshape_http_sent_bytes_total{registry,operation}
+        regshape_http_received_bytes_total{registry,operation}
+        regshape_http_request_duration_seconds{registry,operation,le}
+        regshape_http_retries_total
+        regshape_last_export_timestamp_seconds
+
+    :param metrics: Metrics to render.
+    :param openmetrics: When True, emit OpenMetrics 1.0 (counter families
+        declared without the ``_total`` suffix and a trailing ``# EOF``).
+    :param timestamp: Unix time for ``regshape_last_export_timestamp_seconds``
+        (defaults to now).
+    :return: The rendered exposition text, newline terminated.
+    """
+    metrics = metrics.snapshot()
+    series = metrics.series
+    lines: list[str] = []
+
+    def family(name: str, kind: str, help_text: str) -> str:
+        family_name = name
+        if openmetrics and kind == "counter":
+            family_name = name[: -len("_total")]
+        lines.append(f"# HELP {family_name} {help_text}")
+        lines.append(f"# TYPE {family_name} {kind}")
+        return name
+
+    name = family(
+        f"{_PREFIX}_http_requests_total", "counter",
+        "HTTP requests issued by regshape.",
+    )
+    for (registry, operation, status), entry in sorted(series.items()):
+        lines.append(
+            f"{name}{_labels(registry=registry, operation=operation, status=status)} "
+            f"{entry.requests}"
+        )
+
+    # Per (registry, operation) aggregates across statuses.
+    per_pair: dict[tuple[str, str], list[int]] = {}
+    for (registry, operation, status), entry in series.items():
+        agg = per_pair.setdefault((registry, operation), [0, 0, 0])
+        if status >= 400:
+            agg[0] += entry.requests
+        agg[1] += entry.bytes_sent
+        agg[2] += entry.bytes_received
+
+    for index, (suffix, help_text) in enumerate((
+        ("http_request_errors_total", "HTTP requests answered with a 4xx/5xx status."),
+        ("http_sent_bytes_total", "Request body bytes sent."),
+        ("http_received_bytes_total", "Response body bytes received."),
+    )):
+        name = family(f"{_PREFIX}_{suffix}", "counter", help_text)
+        for (registry, operation), agg in sorted(per_pair.items()):
+            lines.append(
+                f"{name}{_labels(registry=registry, operation=operation)} {agg[index]}"
+            )
+
+    name = family(
+        f"{_PREFIX}_http_request_duration_seconds", "histogram",
+        "HTTP request latency.",
+    )
+    for (registry, operation), histogram in sorted(metrics.latencies.items()):
+        for bound, count in histogram.cumulative():
+            le = "+Inf" if bound == float("inf") else _number(bound)
+            lines.append(
+                f"{name}_bucket"
+                f"{_labels(registry=registry, operation=operation, le=le)} {count}"
+            )
+        pair = _labels(registry=registry, operation=operation)
+        lines.append(f"{name}_sum{pair} {_number(histogram.sum)}")
+        lines.append(f"{name}_count{pair} {histogram.count}")
+
+    name = family(
+        f"{_PREFIX}_http_retries_total", "counter", "Retried HTTP requests.",
+    )
+    lines.append(f"{name} {metrics.retries}")
+
+    name = family(
+        f"{_PREFIX}_last_export_timestamp_seconds", "gauge",
+        "Unix time at which these metrics were exported.",
+    )
+    lines.append(f"{name} {_number(timestamp if timestamp is not None else time.time())}")
+
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_textfile(metrics: PerformanceMetrics, path: str) -> None:
+    """Write *metrics* to *path* for the node_exporter textfile collector.
+
+    The file is written to a temporary sibling and renamed into place so
+    that a concurrent scrape never observes a partially written file.
+
+    :param metrics: Metrics to export.
+    :param path: Destination path (node_exporter expects a ``.prom``
+        extension).
+    :raises OSError: On I/O errors.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".regshape-metrics-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(format_prometheus(metrics))
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class MetricsServer:
+    """Background HTTP server exposing metrics on ``/metrics``.
+
+    Returned by :func:`start_metrics_server`; call :meth:`stop` to shut it
+    down.  The ``Accept`` header selects OpenMetrics when the scraper asks
+    for ``application/openmetrics-text``.
+
+    :param metrics: Metrics object rendered on every scrape.
+    :param host: Interface to bind.
+    :param port: TCP port to bind (``0`` picks a free port).
+    """
+
+    def __init__(self, metrics: PerformanceMetrics, host: str, port: int) -> None:
+        self.metrics = metrics
+        handler = self._make_handler(metrics)
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="regshape-metrics",
+            daemon=True,
+        )
+
+    @property
+    def port(self) -> int:
+        """The TCP port the server is bound to."""
+        return self._server.server_address[1]
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=5)
+
+    @staticmethod
+    def _make_handler(metrics: PerformanceMetrics):
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802 - http.server naming
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                openmetrics = "application/openmetrics-text" in self.headers.get(
+                    "Accept", ""
+                )
+                body = format_prometheus(metrics, openmetrics=openmetrics).encode("utf-8")
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type",
+                    OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # noqa: A002 - silence stderr
+                pass
+
+        return _Handler
+
+
+def start_metrics_server(
+    port: int,
+    host: str = "127.0.0.1",
+    config=None,
+) -> MetricsServer:
+    """Serve cumulative telemetry metrics on ``http://host:port/metrics``.
+
+    Enables metrics export on *config* (the active
+    :class:`~regshape.libs.decorators.TelemetryConfig` by default) so that
+    every subsequent HTTP call made through the transport layer is counted.
+
+    :param port: TCP port to listen on (``0`` picks a free port).
+    :param host: Interface to bind (default loopback only).
+    :param config: Telemetry configuration whose
+        :attr:`~regshape.libs.decorators.TelemetryConfig.export_metrics`
+        are served.
+    :return: The running :class:`MetricsServer`.
+    :raises OSError: If the port cannot be bound.
+    """
+    if config is None:
+        from regshape.libs.decorators import get_telemetry_config
+        config = get_telemetry_config()
+    config.metrics_export_enabled = True
+    return MetricsServer(config.export_metrics, host, port).start()
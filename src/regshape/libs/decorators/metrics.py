@@ -7,11 +7,117 @@
     module:: metrics
     :platform: Unix, Windows
     :synopsis: Provides :class:`PerformanceMetrics` for collecting aggregate
-               HTTP performance data during a command invocation.
+               HTTP performance data during a command invocation, and
+               :func:`classify_operation` for deriving the ``operation``
+               label used by the Prometheus exporter.
     moduleauthor:: ToddySM <toddysm@gmail.com>
 """
 
+import bisect
+import threading
+
 from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlparse
+
+
+# Upper bounds (seconds) of the request latency histogram buckets: the
+# Prometheus client defaults, extended for long blob transfers.
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def classify_operation(method: str, url: str) -> str:
+    """Map an HTTP method and registry URL to a coarse operation label.
+
+    The label is stable across repositories and digests so that it can be
+    used as a low-cardinality metrics dimension (e.g. ``blob_head``,
+    ``manifest_get``, ``blob_upload_chunk``).  Requests whose path is not
+    an OCI Distribution ``/v2/`` endpoint (token services, storage
+    redirects) are labelled ``auth_token`` or ``external``.
+
+    :param method: HTTP method (e.g. ``"GET"``).
+    :param url: Absolute request URL or ``/v2/...`` path.
+    :return: Operation label.
+    """
+    method = (method or "").upper()
+    path = urlparse(url).path if "://" in url else url.split("?", 1)[0]
+    if not path.startswith("/v2/"):
+        if "token" in path or "oauth" in path:
+            return "auth_token"
+        return "external"
+    if path.rstrip("/") == "/v2":
+        return "ping"
+    if path.startswith("/v2/_catalog"):
+        return "catalog"
+    if "/blobs/uploads" in path:
+        return {
+            "POST": "blob_upload_init",
+            "PATCH": "blob_upload_chunk",
+            "PUT": "blob_upload_complete",
+            "GET": "blob_upload_status",
+            "DELETE": "blob_upload_cancel",
+        }.get(method, "blob_upload")
+    for segment, kind in (
+        ("/blobs/", "blob"),
+        ("/manifests/", "manifest"),
+        ("/tags/list", "tag"),
+        ("/referrers/", "referrer"),
+    ):
+        if segment in path:
+            if kind == "tag":
+                return "tag_list"
+            if kind == "referrer":
+                return "referrer_list"
+            return f"{kind}_{method.lower() or 'unknown'}"
+    return "other"
+
+
+@dataclass
+class RequestSeries:
+    """Counters for one ``(registry, operation, status)`` label set.
+
+    :param requests: Number of requests recorded.
+    :param bytes_sent: Request body bytes sent.
+    :param bytes_received: Response body bytes received.
+    :param elapsed: Combined elapsed time in seconds.
+    """
+    requests: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass
+class LatencyHistogram:
+    """Request latencies of one ``(registry, operation)`` pair, counted into
+    the fixed :data:`LATENCY_BUCKETS`, so memory stays constant however
+    many requests are recorded.
+
+    :param buckets: Requests per bucket (not cumulative); the last element
+        counts requests slower than the largest bound.
+    :param count: Number of requests recorded.
+    :param sum: Combined latency in seconds.
+    """
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    count: int = 0
+    sum: float = 0.0
+
+    def observe(self, elapsed: float) -> None:
+        """Count one request that took *elapsed* seconds."""
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+        self.count += 1
+        self.sum += elapsed
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Return ``(upper bound, requests at or below it)`` pairs, ending
+        with ``(inf, count)``, as exposed in Prometheus ``_bucket`` series."""
+        result, total = [], 0
+        for bound, n in zip((*LATENCY_BUCKETS, float("inf")), self.buckets):
+            total += n
+            result.append((bound, total))
+        return result
 
 
 @dataclass
@@ -25,6 +131,13 @@ class PerformanceMetrics:
     :param errors: Number of requests that resulted in 4xx/5xx status codes.
     :param status_code_counts: Counter of status codes seen.
     :param total_elapsed: Wall-clock time for all HTTP calls combined.
+    :param storage_requests: Requests sent to a storage backend a blob
+        request was redirected to (included in *total_requests*).
+    :param storage_bytes_received: Response body bytes received from
+        storage backends (included in *total_bytes_received*).
+    :param series: Per ``(registry, operation, status)`` counters, populated
+        when :meth:`record_request` is given a *registry* or *operation*.
+    :param latencies: Per ``(registry, operation)`` latency histogram.
     """
     total_requests: int = 0
     total_bytes_sent: int = 0
@@ -33,6 +146,13 @@ class PerformanceMetrics:
     errors: int = 0
     status_code_counts: dict[int, int] = field(default_factory=dict)
     total_elapsed: float = 0.0
+    storage_requests: int = 0
+    storage_bytes_received: int = 0
+    series: dict[tuple[str, str, int], RequestSeries] = field(default_factory=dict)
+    latencies: dict[tuple[str, str], LatencyHistogram] = field(default_factory=dict)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
 
     def record_request(
         self,
@@ -41,23 +161,74 @@ class PerformanceMetrics:
         bytes_received: int = 0,
         elapsed: float = 0.0,
         is_retry: bool = False,
+        *,
+        storage: bool = False,
+        registry: Optional[str] = None,
+        operation: Optional[str] = None,
     ) -> None:
         """Record a single HTTP request into the aggregated metrics.
 
+        Safe to call from multiple threads.
+
         :param status_code: HTTP response status code.
         :param bytes_sent: Request body size in bytes.
         :param bytes_received: Response body size in bytes.
         :param elapsed: Elapsed time in seconds for this request.
         :param is_retry: Whether this request was a retry.
+        :param storage: Whether the request went to a blob storage backend
+            instead of the registry.
+        :param registry: Host the request was sent to, used as the
+            ``registry`` label of the per-series counters.
+        :param operation: Operation label (see :func:`classify_operation`).
+        """
+        with self._lock:
+            self.total_requests += 1
+            self.total_bytes_sent += bytes_sent
+            self.total_bytes_received += bytes_received
+            self.total_elapsed += elapsed
+            self.status_code_counts[status_code] = (
+                self.status_code_counts.get(status_code, 0) + 1
+            )
+            if is_retry:
+                self.retries += 1
+            if status_code >= 400:
+                self.errors += 1
+            if storage:
+                self.storage_requests += 1
+                self.storage_bytes_received += bytes_received
+            if registry is None and operation is None:
+                return
+            labels = (registry or "unknown", operation or "other")
+            entry = self.series.setdefault((*labels, status_code), RequestSeries())
+            entry.requests += 1
+            entry.bytes_sent += bytes_sent
+            entry.bytes_received += bytes_received
+            entry.elapsed += elapsed
+            self.latencies.setdefault(labels, LatencyHistogram()).observe(elapsed)
+
+    def snapshot(self) -> "PerformanceMetrics":
+        """Return a consistent copy of the metrics taken under the lock.
+
+        Used by exporters that render metrics while other threads keep
+        recording requests.
         """
-        self.total_requests += 1
-        self.total_bytes_sent += bytes_sent
-        self.total_bytes_received += bytes_received
-        self.total_elapsed += elapsed
-        self.status_code_counts[status_code] = (
-            self.status_code_counts.get(status_code, 0) + 1
-        )
-        if is_retry:
-            self.retries += 1
-        if status_code >= 400:
-            self.errors += 1
+        with self._lock:
+            return PerformanceMetrics(
+                total_requests=self.total_requests,
+                total_bytes_sent=self.total_bytes_sent,
+                total_bytes_received=self.total_bytes_received,
+                retries=self.retries,
+                errors=self.errors,
+                status_code_counts=dict(self.status_code_counts),
+                total_elapsed=self.total_elapsed,
+                storage_requests=self.storage_requests,
+                storage_bytes_received=self.storage_bytes_received,
+                series={
+                    key: RequestSeries(**vars(entry))
+                    for key, entry in self.series.items()
+                },
+                latencies={
+                    key: LatencyHistogram(list(h.buckets), h.count, h.sum)
+                    for key, h in self.latencies.items()
+                },
+            )
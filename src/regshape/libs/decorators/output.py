@@ -14,11 +14,17 @@
                and emitted as a single delimited block at the end, keeping
                stderr clean and easy to read.  When ``--telemetry-format json``
                is active, output is emitted as newline-delimited JSON (NDJSON).
+
+               :class:`TelemetryWriter` moves the actual stream writes onto a
+               background thread so that high-volume ``--debug-calls`` output
+               does not stall the calling thread.
     moduleauthor:: ToddySM <toddysm@gmail.com>
 """
 
 import json
+import queue
 import sys
+import threading
 
 from datetime import datetime, timezone
 from typing import IO, Optional
@@ -29,18 +35,83 @@ _ELAPSED_WIDTH = 7     # " 0.523s" — right-justified
 _NAME_WIDTH = _BLOCK_WIDTH - _LABEL_COL - _ELAPSED_WIDTH  # 47
 
 
+_WRITER_QUEUE_SIZE = 10000
+
+
+class TelemetryWriter:
+    """Background writer thread for telemetry lines.
+
+    Lines are queued by :func:`telemetry_write` and written in order by a
+    single daemon thread.  The queue is bounded, so a producer that
+    outpaces the output stream blocks instead of growing memory without
+    limit.
+
+    :param maxsize: Maximum number of queued lines.
+    """
+
+    _STOP = object()
+
+    def __init__(self, maxsize: int = _WRITER_QUEUE_SIZE) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(
+            target=self._run, name="regshape-telemetry-writer", daemon=True,
+        )
+        self._thread.start()
+
+    def write(self, line: str, out: IO, log_file: Optional[IO] = None) -> None:
+        """Queue *line* for writing to *out* and *log_file*."""
+        self._queue.put((line, out, log_file))
+
+    def flush(self) -> None:
+        """Block until every queued line has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write all queued lines and stop the writer thread."""
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is self._STOP:
+                    return
+                _write_line(*item)
+            except Exception:
+                # A broken stream must not kill the writer and deadlock
+                # producers blocked on a full queue.
+                pass
+            finally:
+                self._queue.task_done()
+
+
+def _write_line(line: str, out: IO, log_file: Optional[IO]) -> None:
+    print(line, file=out)
+    if log_file is not None:
+        print(line, file=log_file)
+
+
 def telemetry_write(line: str, out: IO = None, log_file: IO = None) -> None:
     """Write a telemetry line to *out* and optionally to the log file.
 
+    When the active :class:`~regshape.libs.decorators.TelemetryConfig` has a
+    :attr:`~regshape.libs.decorators.TelemetryConfig.writer`, the line is
+    queued on it instead of being written synchronously.
+
     :param line: Text to write (newline appended automatically).
     :param out: Primary output stream (defaults to stderr).
     :param log_file: Secondary output stream (log file), or ``None``.
     """
+    from regshape.libs.decorators import get_telemetry_config
+
     if out is None:
         out = sys.stderr
-    print(line, file=out)
-    if log_file is not None:
-        print(line, file=log_file)
+    writer = get_telemetry_config().writer
+    if writer is not None:
+        writer.write(line, out, log_file)
+    else:
+        _write_line(line, out, log_file)
 
 
 def _format_row(indent: str, label: str, name: str, elapsed: float) -> str:
@@ -86,6 +157,19 @@ def _format_bytes(n: int) -> str:
         return f"{n / (1024 * 1024):.1f} MB"
 
 
+def _throughput(metrics, scenario_elapsed: Optional[float]) -> Optional[float]:
+    """Return bytes moved per wall-clock second of the scenario.
+
+    Uses the scenario duration rather than the summed request time, so
+    concurrent transfers are reflected in the rate.  ``None`` without a
+    scenario or when no body bytes were transferred.
+    """
+    moved = metrics.total_bytes_sent + metrics.total_bytes_received
+    if not scenario_elapsed or not moved:
+        return None
+    return moved / scenario_elapsed
+
+
 def _render_text_block(
     scenario_name: Optional[str],
     scenario_elapsed: Optional[float],
@@ -94,6 +178,7 @@ def _render_text_block(
     out: IO,
     log_file: Optional[IO],
     verbosity: int,
+    profile: Optional[list[tuple[str, float]]] = None,
 ) -> None:
     """Render the telemetry summary block in human-readable text format.
 
@@ -104,6 +189,8 @@ def _render_text_block(
     :param out: Primary output stream.
     :param log_file: Secondary output stream or ``None``.
     :param verbosity: Telemetry verbosity level (1 or 2).
+    :param profile: ``(function, self_seconds)`` pairs from ``--profile``,
+        or ``None``.
     """
     prefix = "\u2500\u2500 telemetry "   # "── telemetry "
     header = prefix + "\u2500" * (_BLOCK_WIDTH - len(prefix))
@@ -125,13 +212,23 @@ def _render_text_block(
     if metrics is not None and metrics.total_requests > 0:
         sent = _format_bytes(metrics.total_bytes_sent)
         recv = _format_bytes(metrics.total_bytes_received)
+        summary = f"requests: {metrics.total_requests}  sent: {sent}  recv: {recv}"
+        rate = _throughput(metrics, scenario_elapsed)
+        if rate is not None:
+            summary += f"  rate: {_format_bytes(int(rate))}/s"
         telemetry_write(
-            _format_info_row(
-                "   ", "metrics",
-                f"requests: {metrics.total_requests}  sent: {sent}  recv: {recv}",
-            ),
+            _format_info_row("   ", "metrics", summary),
             out, log_file,
         )
+        if metrics.storage_requests:
+            storage_recv = _format_bytes(metrics.storage_bytes_received)
+            telemetry_write(
+                _format_info_row(
+                    "   ", "metrics",
+                    f"storage: {metrics.storage_requests} req  recv: {storage_recv}",
+                ),
+                out, log_file,
+            )
         status_parts = [
             f"{code}\u00d7{count}"
             for code, count in sorted(metrics.status_code_counts.items())
@@ -145,6 +242,12 @@ def _render_text_block(
             out, log_file,
         )
 
+    for name, elapsed in profile or ():
+        telemetry_write(
+            _format_row("   ", "profile", name, elapsed),
+            out, log_file,
+        )
+
     telemetry_write("\u2500" * _BLOCK_WIDTH, out, log_file)
 
 
@@ -155,6 +258,7 @@ def _render_json_block(
     metrics,
     out: IO,
     log_file: Optional[IO],
+    profile: Optional[list[tuple[str, float]]] = None,
 ) -> None:
     """Render the telemetry summary block as NDJSON events.
 
@@ -164,6 +268,8 @@ def _render_json_block(
     :param metrics: :class:`PerformanceMetrics` instance or ``None``.
     :param out: Primary output stream.
     :param log_file: Secondary output stream or ``None``.
+    :param profile: ``(function, self_seconds)`` pairs from ``--profile``,
+        or ``None``.
     """
     timestamp = datetime.now(timezone.utc).isoformat()
 
@@ -205,6 +311,23 @@ def _render_json_block(
             },
             "timestamp": timestamp,
         }
+        rate = _throughput(metrics, scenario_elapsed)
+        if rate is not None:
+            event["throughput_bytes_per_s"] = round(rate, 1)
+        if metrics.storage_requests:
+            event["storage_requests"] = metrics.storage_requests
+            event["storage_bytes_received"] = metrics.storage_bytes_received
+        telemetry_write(json.dumps(event, separators=(",", ":")), out, log_file)
+
+    if profile:
+        event = {
+            "type": "profile",
+            "functions": [
+                {"name": name, "self_s": round(elapsed, 6)}
+                for name, elapsed in profile
+            ],
+            "timestamp": timestamp,
+        }
         telemetry_write(json.dumps(event, separators=(",", ":")), out, log_file)
 
 
@@ -215,11 +338,13 @@ def print_telemetry_block(
     out: IO = None,
     *,
     metrics=None,
+    profile: Optional[list[tuple[str, float]]] = None,
 ) -> None:
     """Render one telemetry summary block to *out*.
 
     Emits nothing if there is no data (both *scenario_name* is ``None`` and
-    *method_timings* is empty and *metrics* has no requests).
+    *method_timings* is empty and *metrics* has no requests and there is no
+    *profile* summary).
 
     Block format (text)::
 
@@ -227,7 +352,7 @@ def print_telemetry_block(
           scenario  auth login                                    0.523s
             method  _verify_credentials                           0.231s
             method  store_credentials                             0.045s
-           metrics  requests: 3  sent: 1.2 KB  recv: 5.5 KB
+           metrics  requests: 3  sent: 1.2 KB  recv: 5.5 KB  rate: 12.8 KB/s
            metrics  status: 200×2  401×1  retries: 1  errors: 0
         ───────────────────────────────────────────────────────────────────
 
@@ -239,6 +364,8 @@ def print_telemetry_block(
         collected by ``@track_time`` during the invocation.
     :param out: Writable stream for output. Defaults to ``sys.stderr``.
     :param metrics: :class:`PerformanceMetrics` instance or ``None``.
+    :param profile: ``(function, self_seconds)`` pairs summarising a
+        ``--profile`` run, or ``None``.
     """
     from regshape.libs.decorators import get_telemetry_config
     config = get_telemetry_config()
@@ -247,18 +374,18 @@ def print_telemetry_block(
         out = config.output
 
     has_metrics = metrics is not None and metrics.total_requests > 0
-    if not scenario_name and not method_timings and not has_metrics:
+    if not scenario_name and not method_timings and not has_metrics and not profile:
         return
 
     if config.output_format == "json":
         _render_json_block(
             scenario_name, scenario_elapsed, method_timings,
-            metrics, out, config.log_file,
+            metrics, out, config.log_file, profile,
         )
     else:
         _render_text_block(
             scenario_name, scenario_elapsed, method_timings,
-            metrics, out, config.log_file, config.verbosity,
+            metrics, out, config.log_file, config.verbosity, profile,
         )
 
 
@@ -270,7 +397,8 @@ def flush_telemetry() -> None:
     leaf command returns. Handles the ``--time-methods``-only case where no
     ``@track_scenario`` decorator is present to trigger rendering.
 
-    Also emits aggregate metrics if ``--metrics`` is enabled.
+    Also emits aggregate metrics if ``--metrics`` is enabled, and the
+    ``--profile`` hot-function summary if one was collected.
 
     Is a no-op when no timings have accumulated and metrics are empty.
     """
@@ -280,13 +408,15 @@ def flush_telemetry() -> None:
     metrics = config.metrics if config.metrics_enabled else None
     has_timings = bool(config.method_timings)
     has_metrics = metrics is not None and metrics.total_requests > 0
+    profile = list(config.profile_summary)
 
-    if has_timings or has_metrics:
+    if has_timings or has_metrics or profile:
         print_telemetry_block(
             None, None, list(config.method_timings), config.output,
-            metrics=metrics,
+            metrics=metrics, profile=profile,
         )
         config.method_timings.clear()
+        config.profile_summary.clear()
         if config.metrics_enabled:
             from regshape.libs.decorators.metrics import PerformanceMetrics
             config.metrics = PerformanceMetrics()
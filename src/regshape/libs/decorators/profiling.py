@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+"""
+:mod: `profiling` - CPU profiling hook for RegShape commands
+=============================================================
+
+    module:: profiling
+    :platform: Unix, Windows
+    :synopsis: Provides the profilers behind the ``--profile`` telemetry
+               option.
+
+               ``cprofile`` -- deterministic :mod:`cProfile` profile of the
+               command thread, written as a :mod:`pstats` file.
+
+               ``sampling`` -- low-overhead wall-clock sampler that walks the
+               stacks of every thread at a fixed interval and writes
+               collapsed stacks (``frame;frame;frame count``) ready for
+               ``flamegraph.pl`` or speedscope.
+
+               Both report their hottest functions (by self time) for the
+               telemetry block.
+    moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+
+from collections import Counter
+from typing import Optional
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+# Default interval between stack samples, in seconds.
+_SAMPLE_INTERVAL = 0.005
+
+
+def _frame_label(filename: str, name: str) -> str:
+    return f"{os.path.basename(filename)}:{name}"
+
+
+class CProfileProfiler:
+    """Deterministic profiler backed by :class:`cProfile.Profile`.
+
+    Only the thread that calls :meth:`start` is profiled.
+    """
+
+    mode = "cprofile"
+
+    def __init__(self) -> None:
+        self._profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+
+    def dump(self, path: str) -> None:
+        """Write the profile to *path* in :mod:`pstats` format."""
+        self._profile.dump_stats(path)
+
+    def top_functions(self, limit: int = 10) -> list[tuple[str, float]]:
+        """Return up to *limit* ``(function, self_seconds)`` pairs, hottest first."""
+        stats = pstats.Stats(self._profile)
+        rows = [
+            (
+                func if filename == "~"   # built-ins carry no source location
+                else f"{os.path.basename(filename)}:{line}({func})",
+                tottime,
+            )
+            for (filename, line, func), (_cc, _nc, tottime, _ct, _callers)
+            in stats.stats.items()
+        ]
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows[:limit]
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler covering every thread.
+
+    A daemon thread snapshots :func:`sys._current_frames` every *interval*
+    seconds, so the profiled code runs unmodified and the overhead is
+    bounded by the sampling rate rather than by the number of calls.
+
+    :param interval: Seconds between samples.
+    """
+
+    mode = "sampling"
+
+    def __init__(self, interval: float = _SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="regshape-profiler", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    code = frame.f_code
+                    labels.append(_frame_label(code.co_filename, code.co_name))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def dump(self, path: str) -> None:
+        """Write collapsed stacks to *path*, one ``stack count`` per line."""
+        with open(path, "w", encoding="utf-8") as fh:
+            for stack, count in self.stacks.most_common():
+                fh.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit: int = 10) -> list[tuple[str, float]]:
+        """Return up to *limit* ``(function, self_seconds)`` pairs, hottest first.
+
+        Self time is estimated as the number of samples in which the
+        function was the innermost frame, times the sampling interval.
+        """
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return [
+            (name, count * self.interval)
+            for name, count in leaves.most_common(limit)
+        ]
+
+
+def create_profiler(mode: str = "cprofile"):
+    """Return a new profiler for *mode*.
+
+    :param mode: One of :data:`PROFILE_MODES`.
+    :return: A :class:`CProfileProfiler` or :class:`SamplingProfiler`.
+    :raises ValueError: If *mode* is unknown.
+    """
+    if mode == "cprofile":
+        return CProfileProfiler()
+    if mode == "sampling":
+        return SamplingProfiler()
+    raise ValueError(f"Unknown profile mode: {mode!r}")
@@ -16,6 +16,7 @@
 import gzip
 import hashlib
 import io
+import importlib
 import json
 import logging
 import os
@@ -23,15 +24,16 @@ import tarfile
 import tempfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Union
-
-import docker as docker_sdk
-from docker.errors import APIError, DockerException, ImageNotFound
+from typing import IO, Union
 
+from regshape.libs.blobs.operations import _DEFAULT_CHUNK_SIZE
+from regshape.libs.compression import CompressingReader
 from regshape.libs.errors import DockerError, LayoutError
+from regshape.libs.estargz import EStargzReader
 from regshape.libs.layout.operations import (
     PushResult,
     add_blob,
+    add_blob_from_stream,
     init_layout,
     push_layout,
 )
@@ -47,6 +49,24 @@ from regshape.libs.models.mediatype import (
 logger = logging.getLogger(__name__)
 
 
+class _LazyModule:
+    """Module proxy that imports *name* on first attribute access.
+
+    The Docker SDK pulls in ``requests``, ``urllib3`` and ``paramiko``
+    helpers at import time; deferring it keeps ``regshape`` commands that
+    never talk to Docker fast to start.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __getattr__(self, attr: str):
+        return getattr(importlib.import_module(self._name), attr)
+
+
+docker_sdk = _LazyModule("docker")
+
+
 # ===========================================================================
 # Data models
 # ===========================================================================
@@ -81,8 +101,10 @@ class DockerImageInfo:
 _GZIP_MAGIC = b"\x1f\x8b"
 
 
-def _get_docker_client() -> docker_sdk.DockerClient:
+def _get_docker_client() -> "docker.DockerClient":
     """Create a Docker client from environment; raise DockerError on failure."""
+    from docker.errors import DockerException
+
     try:
         return docker_sdk.from_env()
     except DockerException as exc:
@@ -126,12 +148,14 @@ def _parse_platform_string(platform_str: str) -> tuple[str, str]:
     return parts[0], parts[1]
 
 
-def _extract_docker_save_tar(image_ref: str, client: docker_sdk.DockerClient) -> tuple[list[dict], tarfile.TarFile, bytes]:
+def _extract_docker_save_tar(image_ref: str, client: "docker.DockerClient") -> tuple[list[dict], tarfile.TarFile, bytes]:
     """Save a Docker image and extract its tar contents.
 
     :returns: Tuple of (parsed ``manifest.json`` list of dicts, TarFile object, raw tar bytes).
     :raises DockerError: On image-not-found or API errors.
     """
+    from docker.errors import APIError, ImageNotFound
+
     try:
         image = client.images.get(image_ref)
     except ImageNotFound:
@@ -184,8 +208,8 @@ def _extract_docker_save_tar(image_ref: str, client: docker_sdk.DockerClient) ->
     return docker_manifests, tar, tar_bytes
 
 
-def _read_tar_member(tar: tarfile.TarFile, member_path: str) -> bytes:
-    """Read a member from a TarFile, raising DockerError on failure."""
+def _open_tar_member(tar: tarfile.TarFile, member_path: str) -> IO[bytes]:
+    """Open a member of a TarFile for reading, raising DockerError on failure."""
     try:
         member = tar.getmember(member_path)
         fh = tar.extractfile(member)
@@ -194,7 +218,7 @@ def _read_tar_member(tar: tarfile.TarFile, member_path: str) -> bytes:
                 f"Tar member {member_path!r} is not a regular file",
                 "cannot extract",
             )
-        return fh.read()
+        return fh
     except (KeyError, tarfile.TarError) as exc:
         raise DockerError(
             f"Failed to read {member_path!r} from docker save tar",
@@ -202,13 +226,20 @@ def _read_tar_member(tar: tarfile.TarFile, member_path: str) -> bytes:
         ) from exc
 
 
-def _docker_config_to_oci(config_data: bytes) -> bytes:
+def _read_tar_member(tar: tarfile.TarFile, member_path: str) -> bytes:
+    """Read a member from a TarFile, raising DockerError on failure."""
+    return _open_tar_member(tar, member_path).read()
+
+
+def _docker_config_to_oci(config_data: bytes, diff_ids: list[str] | None = None) -> bytes:
     """Convert a Docker config JSON to OCI Image Config format.
 
     Strips Docker-proprietary top-level fields while preserving OCI-relevant
     fields (architecture, os, rootfs, config, history, etc.).
 
     :param config_data: Raw Docker config JSON bytes.
+    :param diff_ids: Layer diff_ids replacing those in ``rootfs``, for
+        layers rewritten on export.
     :returns: OCI config JSON bytes.
     """
     config = json.loads(config_data)
@@ -221,6 +252,8 @@ def _docker_config_to_oci(config_data: bytes) -> bytes:
                 "variant", "config", "rootfs", "history", "created", "author"):
         if key in config:
             oci_config[key] = config[key]
+    if diff_ids is not None:
+        oci_config["rootfs"] = {"type": "layers", "diff_ids": diff_ids}
 
     return json.dumps(oci_config, sort_keys=True, separators=(",", ":")).encode("utf-8")
 
@@ -246,15 +279,21 @@ def _convert_single_image(
     layout_path: Path,
     tar: tarfile.TarFile,
     docker_manifest_entry: dict,
+    compress_level: int | None = None,
+    compress_threads: int | None = None,
+    estargz: bool = False,
 ) -> tuple[Descriptor, str, str]:
     """Convert one Docker save manifest entry to OCI blobs in the layout.
 
     :param layout_path: Root of the initialised OCI layout.
     :param tar: Open TarFile of the docker save output.
     :param docker_manifest_entry: One element from the docker save manifest.json.
+    :param compress_level: gzip level for uncompressed layers (default 9).
+    :param compress_threads: Threads used to gzip each uncompressed layer.
+    :param estargz: Write every layer as eStargz.
     :returns: Tuple of (manifest_descriptor, architecture, os_name).
     """
-    # 1. Read and convert config
+    # 1. Read config
     config_path = docker_manifest_entry["Config"]
     raw_config = _read_tar_member(tar, config_path)
     try:
@@ -266,29 +305,56 @@ def _convert_single_image(
     architecture = config_json.get("architecture", "unknown")
     os_name = config_json.get("os", "unknown")
 
-    oci_config_bytes = _docker_config_to_oci(raw_config)
-    config_digest, config_size = add_blob(layout_path, oci_config_bytes)
-    config_descriptor = Descriptor(
-        media_type=OCI_IMAGE_CONFIG,
-        digest=config_digest,
-        size=config_size,
-    )
-
     # 2. Process layers
     layer_descriptors: list[Descriptor] = []
+    diff_ids: list[str] = []
     for layer_path in docker_manifest_entry.get("Layers", []):
-        layer_data = _read_tar_member(tar, layer_path)
-        compressed = _ensure_gzip(layer_data)
-        layer_digest, layer_size = add_blob(layout_path, compressed)
+        # Layers are streamed into the blob store (gzipping on the way if
+        # needed) instead of being read into memory whole.
+        layer_fh = _open_tar_member(tar, layer_path)
+        magic = layer_fh.read(len(_GZIP_MAGIC))
+        layer_fh.seek(0)
+        annotations = None
+        if estargz:
+            if magic == _GZIP_MAGIC:
+                layer_fh = gzip.GzipFile(fileobj=layer_fh, mode="rb")
+            reader = EStargzReader(layer_fh, level=compress_level)
+            try:
+                layer_digest, layer_size = add_blob_from_stream(layout_path, reader)
+            except ValueError as exc:
+                raise DockerError(
+                    f"Cannot convert layer '{layer_path}' to eStargz", str(exc)
+                ) from exc
+            result = reader.result()
+            diff_ids.append(result.diff_id)
+            annotations = result.annotations()
+        else:
+            reader = layer_fh
+            if magic != _GZIP_MAGIC:
+                reader = CompressingReader(
+                    layer_fh, "gzip", level=compress_level, threads=compress_threads
+                )
+            layer_digest, layer_size = add_blob_from_stream(layout_path, reader)
         layer_descriptors.append(
             Descriptor(
                 media_type=OCI_IMAGE_LAYER_TAR_GZIP,
                 digest=layer_digest,
                 size=layer_size,
+                annotations=annotations,
             )
         )
 
-    # 3. Build and write OCI manifest
+    # 3. Convert config.  eStargz layers decompress to a different tar than
+    # Docker's, so their diff_ids replace the ones in the Docker config.
+    oci_config_bytes = _docker_config_to_oci(raw_config, diff_ids=diff_ids if estargz else None)
+    config_digest, config_size = add_blob(layout_path, oci_config_bytes)
+    config_descriptor = Descriptor(
+        media_type=OCI_IMAGE_CONFIG,
+        digest=config_digest,
+        size=config_size,
+    )
+
+    # 4. Build and write OCI manifest
     manifest_bytes = _build_oci_manifest(config_descriptor, layer_descriptors)
     manifest_digest, manifest_size = add_blob(layout_path, manifest_bytes)
     manifest_descriptor = Descriptor(
@@ -328,6 +394,8 @@ def list_images(name_filter: str | None = None) -> list[DockerImageInfo]:
     :raises DockerError: If the Docker daemon is unreachable or returns an
         error.
     """
+    from docker.errors import APIError
+
     client = _get_docker_client()
 
     try:
@@ -368,6 +436,9 @@ def export_image(
     output_path: Union[str, Path],
     *,
     platform: str | None = None,
+    compress_level: int | None = None,
+    compress_threads: int | None = None,
+    estargz: bool = False,
 ) -> None:
     """Export a Docker image as an OCI Image Layout directory.
 
@@ -383,6 +454,12 @@ def export_image(
     :param image_ref: Docker image reference (e.g. ``nginx:latest`` or image ID).
     :param output_path: Filesystem path for the OCI layout directory.
     :param platform: Optional platform filter in ``os/architecture`` format.
+    :param compress_level: gzip level for uncompressed layers, 0-9
+        (default 9).
+    :param compress_threads: Threads used to gzip each uncompressed layer;
+        above one, blocks are compressed in parallel.
+    :param estargz: Write every layer as seekable eStargz, annotated with
+        its TOC digest, so it can be lazily pulled.
     :raises DockerError: On daemon errors, image-not-found, or
         platform-not-found.
     :raises LayoutError: On filesystem / layout errors.
@@ -441,7 +518,9 @@ def export_image(
                 continue
 
         descriptor, architecture, os_name = _convert_single_image(
-            output, tar, entry
+            output, tar, entry,
+            compress_level=compress_level, compress_threads=compress_threads,
+            estargz=estargz,
         )
 
         # Add platform info to the descriptor for multi-platform layouts
@@ -489,7 +568,8 @@ def push_image(
     insecure: bool = False,
     force: bool = False,
     chunked: bool = False,
-    chunk_size: int = 65536,
+    chunk_size: int = _DEFAULT_CHUNK_SIZE,
+    mount_from: list[str] | None = None,
 ) -> PushResult:
     """Export a Docker image and push it to a remote OCI registry.
 
@@ -503,6 +583,8 @@ def push_image(
     :param force: Skip blob existence checks.
     :param chunked: Use chunked upload protocol for blobs.
     :param chunk_size: Chunk size in bytes for chunked uploads.
+    :param mount_from: Repositories on the destination registry to try as
+        cross-repository mount sources before uploading a blob.
     :returns: :class:`~regshape.libs.layout.operations.PushResult`.
     :raises DockerError: On daemon errors.
     :raises LayoutError: On layout errors.
@@ -532,6 +614,7 @@ def push_image(
             force=force,
             chunked=chunked,
             chunk_size=chunk_size,
+            mount_from=mount_from,
         )
         return result
     finally:
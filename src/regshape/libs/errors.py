@@ -82,8 +82,15 @@ class ReferrerError(RegShapeError):
 class LayoutError(RegShapeError):
     """
     Error caused by an invalid or inconsistent OCI Image Layout on disk.
+
+    When raised for several problems at once (layout validation), each one
+    is available in ``violations``.
     """
-    pass
+
+    def __init__(self, message: str = None, cause: str = None, *args: object,
+                 violations: list = None) -> None:
+        super().__init__(message, cause, *args)
+        self.violations = violations or []
 
 
 class DockerError(RegShapeError):
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+
+"""
+:mod:`regshape.libs.estargz` - Seekable (eStargz) layer writer
+==============================================================
+
+.. module:: regshape.libs.estargz
+   :platform: Unix, Windows
+   :synopsis: :class:`EStargzReader` converts an uncompressed layer tar
+              into an eStargz blob as it is read: every file's content is
+              gzip-compressed in its own members (chunks of at most 4 MiB),
+              a table of contents (``stargz.index.json``) records the blob
+              offset and digest of each chunk, and a footer points at the
+              TOC.  The blob is still a valid ``tar+gzip`` layer, but a
+              lazy-pulling snapshotter (e.g. stargz-snapshotter) can read
+              the TOC and fetch single files with HTTP range requests.  The
+              TOC digest and uncompressed size are returned as the layer
+              annotations those snapshotters expect.
+
+.. moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import base64
+import hashlib
+import io
+import json
+import struct
+import tarfile
+import zlib
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterator, Optional
+
+from regshape.libs.compression import CompressionResult
+
+# Value of ``compression`` selecting eStargz output in the staging APIs.
+ESTARGZ = "estargz"
+
+# Layer annotation holding the digest of the TOC JSON.
+TOC_DIGEST_ANNOTATION = "containerd.io/snapshot/stargz/toc.digest"
+
+# Layer annotation holding the uncompressed size of the blob.
+UNCOMPRESSED_SIZE_ANNOTATION = "io.containers.estargz.uncompressed-size"
+
+# Name of the tar entry holding the TOC, last in the blob.
+TOC_TAR_NAME = "stargz.index.json"
+
+# Size of the footer gzip member that records the TOC offset.
+FOOTER_SIZE = 51
+
+# First entry of the blob; tells snapshotters there is nothing to prefetch.
+_NO_PREFETCH_LANDMARK = ".no.prefetch.landmark"
+_LANDMARK_CONTENT = b"\x0f"
+
+# Largest piece of file content compressed as one gzip member.
+_DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Bytes of file content read from the tar per step.
+_READ_SIZE = 1024 * 1024
+
+_DEFAULT_GZIP_LEVEL = 9
+
+_ENTRY_TYPES = (
+    (tarfile.TarInfo.isdir, "dir"),
+    (tarfile.TarInfo.isreg, "reg"),
+    (tarfile.TarInfo.issym, "symlink"),
+    (tarfile.TarInfo.islnk, "hardlink"),
+    (tarfile.TarInfo.ischr, "char"),
+    (tarfile.TarInfo.isblk, "block"),
+    (tarfile.TarInfo.isfifo, "fifo"),
+)
+
+
+@dataclass
+class EStargzResult(CompressionResult):
+    """Digests and sizes of an eStargz blob written by :class:`EStargzReader`.
+
+    :param toc_digest: ``sha256:`` digest of the TOC JSON.
+    """
+    toc_digest: str = ""
+
+    def annotations(self) -> dict[str, str]:
+        """Return the layer annotations identifying the blob as eStargz."""
+        return {
+            TOC_DIGEST_ANNOTATION: self.toc_digest,
+            UNCOMPRESSED_SIZE_ANNOTATION: str(self.uncompressed_size),
+        }
+
+
+def _gzip_header(level: int) -> bytes:
+    xfl = 2 if level == 9 else 4 if level == 1 else 0
+    return b"\x1f\x8b\x08\x00" + struct.pack("<I", 0) + bytes((xfl, 255))
+
+
+def _footer(toc_offset: int) -> bytes:
+    # An empty gzip member whose extra field ("SG" subfield) records the
+    # TOC offset, so readers can find the TOC from the last 51 bytes.
+    subfield = b"%016xSTARGZ" % toc_offset
+    extra = b"SG" + struct.pack("<H", len(subfield)) + subfield
+    return (
+        b"\x1f\x8b\x08\x04" + struct.pack("<I", 0) + b"\x00\xff"
+        + struct.pack("<H", len(extra)) + extra
+        + b"\x01\x00\x00\xff\xff" + struct.pack("<II", 0, 0)
+    )
+
+
+def _modtime(mtime: float) -> Optional[str]:
+    if not mtime:
+        return None
+    return datetime.fromtimestamp(round(mtime), tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _toc_entry(member: tarfile.TarInfo) -> dict:
+    for test, entry_type in _ENTRY_TYPES:
+        if test(member):
+            break
+    else:
+        raise ValueError(f"Unsupported tar entry type {member.type!r} for {member.name!r}")
+    if member.issparse():
+        raise ValueError(f"Sparse tar entry {member.name!r} cannot be converted to eStargz")
+    entry: dict = {
+        "name": member.name + "/" if member.isdir() else member.name,
+        "type": entry_type,
+        "size": member.size if member.isreg() else None,
+        "modtime": _modtime(member.mtime),
+        "linkName": member.linkname or None,
+        "mode": member.mode,
+        "uid": member.uid,
+        "gid": member.gid,
+        "userName": member.uname,
+        "groupName": member.gname,
+    }
+    if member.ischr() or member.isblk():
+        entry["devMajor"] = member.devmajor
+        entry["devMinor"] = member.devminor
+    xattrs = {
+        key[len("SCHILY.xattr."):]: base64.b64encode(
+            value.encode("utf-8", "surrogateescape")
+        ).decode("ascii")
+        for key, value in member.pax_headers.items()
+        if key.startswith("SCHILY.xattr.")
+    }
+    entry["xattrs"] = xattrs
+    # Empty fields are left out, as in the reference implementation.
+    return {key: value for key, value in entry.items() if value}
+
+
+class EStargzReader:
+    """Binary reader yielding *source*, an uncompressed tar, as eStargz.
+
+    Used like :class:`~regshape.libs.compression.CompressingReader`: the
+    digests, sizes and TOC digest are available from :meth:`result` once
+    ``read()`` has returned ``b""``.  The blob decompresses to the entries
+    of *source*, preceded by a one-byte ``.no.prefetch.landmark`` file and
+    followed by the ``stargz.index.json`` TOC, so its ``diff_id`` differs
+    from that of *source*.  Output is reproducible for a given input,
+    level and chunk size.
+
+    :param source: Binary file-like object with the uncompressed tar.
+    :param level: gzip level; ``None`` uses 9.
+    :param chunk_size: Largest piece of file content per gzip member.
+    :raises ValueError: From ``read()``, if *source* is not a tar archive
+        or holds entries eStargz cannot represent (sparse files, or a
+        ``stargz.index.json`` of its own).
+    """
+
+    def __init__(
+        self,
+        source: BinaryIO,
+        level: Optional[int] = None,
+        chunk_size: int = _DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        self.compression = "gzip"
+        self._source = source
+        self._level = _DEFAULT_GZIP_LEVEL if level is None else level
+        self._chunk_size = chunk_size
+        self._diff_hasher = hashlib.sha256()
+        self._hasher = hashlib.sha256()
+        self._pending = bytearray()
+        self._steps = self._convert()
+        self._eof = False
+        self._member = None
+        self._crc = 0
+        self._member_size = 0
+        self._toc_digest = None
+        self.uncompressed_size = 0
+        self.size = 0
+        # Compressed bytes produced so far, i.e. the offset of the next member.
+        self._offset = 0
+
+    def _emit(self, data: bytes) -> None:
+        self._pending += data
+        self._offset += len(data)
+
+    def _write(self, data: bytes) -> None:
+        """Compress *data* into the open gzip member, opening one if needed."""
+        if self._member is None:
+            self._member = zlib.compressobj(self._level, zlib.DEFLATED, -zlib.MAX_WBITS)
+            self._crc = self._member_size = 0
+            self._emit(_gzip_header(self._level))
+        self._crc = zlib.crc32(data, self._crc)
+        self._member_size += len(data)
+        self._diff_hasher.update(data)
+        self.uncompressed_size += len(data)
+        self._emit(self._member.compress(data))
+
+    def _close_member(self) -> None:
+        if self._member is None:
+            return
+        self._emit(self._member.flush())
+        self._emit(struct.pack("<II", self._crc, self._member_size & 0xFFFFFFFF))
+        self._member = None
+
+    def _add_entry(self, member: tarfile.TarInfo, content: Optional[BinaryIO], toc: list) -> Iterator[None]:
+        entry = _toc_entry(member)
+        self._write(member.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape"))
+        if not member.isreg():
+            toc.append(entry)
+            return
+        file_hasher = hashlib.sha256()
+        file_entry, written = entry, 0
+        while written < member.size:
+            # Each chunk starts a gzip member, so it can be fetched and
+            # decompressed on its own from its offset.
+            self._close_member()
+            size = min(self._chunk_size, member.size - written)
+            entry["offset"] = self._offset
+            if written:
+                entry["chunkOffset"] = written
+            if size == self._chunk_size:
+                entry["chunkSize"] = size
+            chunk_hasher = hashlib.sha256()
+            left = size
+            while left:
+                data = content.read(min(_READ_SIZE, left))
+                if not data:
+                    raise ValueError(f"Tar entry {member.name!r} is truncated")
+                file_hasher.update(data)
+                chunk_hasher.update(data)
+                self._write(data)
+                left -= len(data)
+                yield
+            entry["chunkDigest"] = f"sha256:{chunk_hasher.hexdigest()}"
+            toc.append(entry)
+            written += size
+            entry = {"name": file_entry["name"], "type": "chunk"}
+        if not member.size:
+            toc.append(file_entry)
+        file_entry["digest"] = f"sha256:{file_hasher.hexdigest()}"
+        remainder = member.size % tarfile.BLOCKSIZE
+        if remainder:
+            self._write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+
+    def _convert(self) -> Iterator[None]:
+        toc: list[dict] = []
+        landmark = tarfile.TarInfo(_NO_PREFETCH_LANDMARK)
+        landmark.size = len(_LANDMARK_CONTENT)
+        yield from self._add_entry(landmark, io.BytesIO(_LANDMARK_CONTENT), toc)
+        try:
+            with tarfile.open(fileobj=self._source, mode="r|") as tar:
+                for member in tar:
+                    if member.name.lstrip("./") == TOC_TAR_NAME:
+                        raise ValueError(f"Layer tar already contains {TOC_TAR_NAME}")
+                    content = tar.extractfile(member) if member.isreg() else None
+                    yield from self._add_entry(member, content, toc)
+                    yield
+        except tarfile.TarError as exc:
+            raise ValueError(f"Layer is not a valid tar archive: {exc}") from exc
+
+        # The TOC gets a member of its own, which also ends the tar.
+        self._close_member()
+        toc_offset = self._offset
+        toc_json = json.dumps({"version": 1, "entries": toc}, indent="\t").encode("utf-8")
+        info = tarfile.TarInfo(TOC_TAR_NAME)
+        info.size = len(toc_json)
+        self._write(info.tobuf(tarfile.USTAR_FORMAT))
+        self._write(toc_json)
+        padding = -len(toc_json) % tarfile.BLOCKSIZE
+        self._write(tarfile.NUL * (padding + 2 * tarfile.BLOCKSIZE))
+        self._close_member()
+        self._emit(_footer(toc_offset))
+        self._toc_digest = f"sha256:{hashlib.sha256(toc_json).hexdigest()}"
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        """Return up to *size* bytes of the blob (all remaining when negative).
+
+        :param size: Maximum number of bytes to return.
+        :returns: Blob bytes; ``b""`` at the end of the stream.
+        :raises ValueError: If the source cannot be converted.
+        """
+        while not self._eof and (size < 0 or len(self._pending) < size):
+            try:
+                next(self._steps)
+            except StopIteration:
+                self._eof = True
+
+        if size < 0 or size >= len(self._pending):
+            data = bytes(self._pending)
+            self._pending.clear()
+        else:
+            data = bytes(self._pending[:size])
+            del self._pending[:size]
+        self._hasher.update(data)
+        self.size += len(data)
+        return data
+
+    def result(self) -> EStargzResult:
+        """Return the digests and sizes of the fully read blob.
+
+        :raises ValueError: If the stream has not been read to the end.
+        """
+        if not self._eof or self._pending:
+            raise ValueError("eStargz stream has not been fully read")
+        return EStargzResult(
+            digest=f"sha256:{self._hasher.hexdigest()}",
+            size=self.size,
+            diff_id=f"sha256:{self._diff_hasher.hexdigest()}",
+            uncompressed_size=self.uncompressed_size,
+            compression=self.compression,
+            toc_digest=self._toc_digest,
+        )
+
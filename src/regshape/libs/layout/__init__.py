@@ -12,29 +12,45 @@
 .. moduleauthor:: ToddySM <toddysm@gmail.com>
 """
 
+from regshape.libs.layout.index import LayoutIndex
 from regshape.libs.layout.operations import (
     add_blob,
+    add_blob_from_file,
+    add_blob_from_stream,
     add_manifest,
+    check_layout,
+    export_layout_archive,
+    find_manifest,
     generate_config,
     generate_manifest,
+    import_layout_archive,
+    index_batch,
     init_layout,
     push_layout,
     read_blob,
+    read_blob_view,
     read_index,
     read_stage,
     stage_layer,
+    stage_layer_from_stream,
+    stage_session,
     update_config,
     update_layer_annotations,
     update_manifest_annotations,
     validate_layout,
+    ArchiveResult,
     BlobPushReport,
     ManifestPushReport,
     PushResult,
+    StageSession,
 )
 
 __all__ = [
     # High-level staged workflow
     "stage_layer",
+    "stage_layer_from_stream",
+    "stage_session",
+    "StageSession",
     "generate_config",
     "generate_manifest",
     "read_stage",
@@ -46,11 +62,23 @@ __all__ = [
     "init_layout",
     # Low-level primitives
     "add_blob",
+    "add_blob_from_file",
+    "add_blob_from_stream",
     "add_manifest",
+    # index.json
+    "index_batch",
+    "find_manifest",
+    "LayoutIndex",
     # Readers / validators
     "read_blob",
+    "read_blob_view",
     "read_index",
+    "check_layout",
     "validate_layout",
+    # Archives
+    "export_layout_archive",
+    "import_layout_archive",
+    "ArchiveResult",
     # Push
     "push_layout",
     "BlobPushReport",
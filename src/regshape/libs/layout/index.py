@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+"""
+:mod:`regshape.libs.layout.index` - In-memory index of a layout's index.json
+============================================================================
+
+.. module:: regshape.libs.layout.index
+   :platform: Unix, Windows
+   :synopsis: :class:`LayoutIndex` wraps the
+              :class:`~regshape.libs.models.manifest.ImageIndex` parsed from
+              an OCI Image Layout's ``index.json`` with hash maps by digest
+              and by ``org.opencontainers.image.ref.name``, so entries can be
+              added, de-duplicated and looked up in constant time.  Used by
+              :func:`~regshape.libs.layout.operations.index_batch` to add
+              many manifests and write ``index.json`` once.  Changes are
+              journaled so they can be replayed with :meth:`LayoutIndex.rebase`
+              onto an ``index.json`` another process changed meanwhile.
+
+.. moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import json
+
+from typing import Iterator, Optional
+
+from regshape.libs.models.descriptor import Descriptor
+from regshape.libs.models.manifest import ImageIndex
+
+# Index-level annotation naming a manifest (its tag).
+REF_NAME_ANNOTATION = "org.opencontainers.image.ref.name"
+
+
+def _entry_key(descriptor: Descriptor) -> str:
+    return json.dumps(descriptor.to_dict(), sort_keys=True)
+
+
+def ref_name(descriptor: Descriptor) -> Optional[str]:
+    """Return the ``ref.name`` annotation of *descriptor*, if any."""
+    return (descriptor.annotations or {}).get(REF_NAME_ANNOTATION)
+
+
+class LayoutIndex:
+    """Entries of an ``index.json`` with lookups by digest and ref.name.
+
+    Changes are made to the wrapped :attr:`index` in memory; writing it
+    back is up to the caller.  :attr:`dirty` tells whether anything
+    changed, and :meth:`rebase` replays the changes onto a newer copy of
+    the index.
+
+    :param index: Index parsed from ``index.json``.  It is modified in place.
+    """
+
+    def __init__(self, index: ImageIndex) -> None:
+        self.index = index
+        self._changes: list[tuple] = []
+        self._keys: dict[str, Descriptor] = {}
+        self._by_digest: dict[str, list[Descriptor]] = {}
+        self._by_ref: dict[str, Descriptor] = {}
+        for descriptor in index.manifests:
+            self._register(descriptor)
+
+    def _register(self, descriptor: Descriptor) -> None:
+        self._keys.setdefault(_entry_key(descriptor), descriptor)
+        self._by_digest.setdefault(descriptor.digest, []).append(descriptor)
+        name = ref_name(descriptor)
+        if name is not None:
+            self._by_ref[name] = descriptor
+
+    @property
+    def dirty(self) -> bool:
+        """``True`` when there are changes not yet written."""
+        return bool(self._changes)
+
+    def rebase(self, index: ImageIndex) -> "LayoutIndex":
+        """Replay this index's changes onto *index*.
+
+        Used to merge with entries another writer added since this index
+        was read.  This index's changes are then considered written.
+
+        :param index: A freshly read copy of the index; modified in place.
+        :returns: A new :class:`LayoutIndex` wrapping *index*, with no
+            pending changes.
+        """
+        rebased = LayoutIndex(index)
+        for change in self._changes:
+            if change[0] == "add":
+                rebased.add(change[1])
+            else:
+                rebased.replace(change[1], change[2])
+        rebased._changes.clear()
+        self._changes.clear()
+        return rebased
+
+    def add(self, descriptor: Descriptor) -> Descriptor:
+        """Append *descriptor* unless an identical entry already exists.
+
+        :returns: The entry now in the index — *descriptor*, or the
+            existing identical one.
+        """
+        existing = self._keys.get(_entry_key(descriptor))
+        if existing is not None:
+            return existing
+        self.index.manifests.append(descriptor)
+        self._register(descriptor)
+        self._changes.append(("add", descriptor))
+        return descriptor
+
+    def replace(self, digest: str, new: Descriptor) -> Optional[Descriptor]:
+        """Point every entry for *digest* at the content described by *new*.
+
+        Each entry keeps its own annotations (and so its ref.name); media
+        type, digest and size come from *new*.
+
+        :returns: The last updated entry, or ``None`` if *digest* is not
+            in the index.
+        """
+        if digest not in self._by_digest:
+            return None
+        updated = None
+        manifests = []
+        for descriptor in self.index.manifests:
+            if descriptor.digest == digest:
+                descriptor = Descriptor(
+                    media_type=new.media_type,
+                    digest=new.digest,
+                    size=new.size,
+                    platform=descriptor.platform,
+                    annotations=descriptor.annotations,
+                )
+                updated = descriptor
+            manifests.append(descriptor)
+        self.index.manifests = manifests
+        self._keys, self._by_digest, self._by_ref = {}, {}, {}
+        for descriptor in manifests:
+            self._register(descriptor)
+        self._changes.append(("replace", digest, new))
+        return updated
+
+    def find(self, name: str) -> Optional[Descriptor]:
+        """Return the entry whose ref.name is *name*.
+
+        When several entries carry the same name, the last one wins.
+        """
+        return self._by_ref.get(name)
+
+    def get(self, digest: str) -> list[Descriptor]:
+        """Return the entries for *digest*, in index order."""
+        return list(self._by_digest.get(digest, ()))
+
+    def ref_names(self) -> list[str]:
+        """Return every ref.name in the index."""
+        return list(self._by_ref)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._by_digest
+
+    def __iter__(self) -> Iterator[Descriptor]:
+        return iter(self.index.manifests)
+
+    def __len__(self) -> int:
+        return len(self.index.manifests)
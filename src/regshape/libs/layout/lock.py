@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+:mod:`regshape.libs.layout.lock` - Advisory lock for OCI layout metadata
+========================================================================
+
+.. module:: regshape.libs.layout.lock
+   :platform: Unix, Windows
+   :synopsis: :func:`layout_lock` serialises changes to ``index.json`` and
+              ``.regshape-stage.json`` between processes (and threads)
+              writing to the same OCI Image Layout.  It is an exclusive
+              ``flock`` on ``<layout>/.regshape-lock`` (``msvcrt.locking``
+              on Windows), held only while those files are re-read, merged
+              and replaced.  Blob writes need no lock: blobs are
+              content-addressed and renamed into place atomically.
+              :func:`file_lock` is the same lock on any lock file, used
+              for other shared files such as the known-blob index.
+
+.. moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import os
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Lock file kept in the layout root.
+LOCK_FILE = ".regshape-lock"
+
+
+@contextmanager
+def layout_lock(layout: Path) -> Iterator[None]:
+    """Hold the exclusive metadata lock of *layout* for the block.
+
+    Blocks until the lock is free.  The lock is advisory: it only excludes
+    other callers of :func:`layout_lock`.  It is released when the block
+    exits or, should the process die, by the operating system.
+
+    :param layout: Layout root.
+    :raises OSError: If the lock file cannot be opened or locked.
+    """
+    with file_lock(Path(layout) / LOCK_FILE):
+        yield
+
+
+@contextmanager
+def file_lock(path: Union[str, Path]) -> Iterator[None]:
+    """Hold an exclusive advisory lock on the lock file *path* for the
+    block, creating the file if it is missing.
+
+    Blocks until the lock is free; see :func:`layout_lock`.
+
+    :param path: Lock file.  Its directory must exist.
+    :raises OSError: If the lock file cannot be opened or locked.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
@@ -13,16 +13,31 @@
 .. moduleauthor:: ToddySM <toddysm@gmail.com>
 """
 
+import copy
 import hashlib
+import io
 import json
 import os
+import re
+import tarfile
 import tempfile
+import threading
+from collections import deque
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Union
+from typing import BinaryIO, Iterator, Union
 
+from regshape.libs.blobs.known import get_known_blob_store
+from regshape.libs.blobs.operations import _DEFAULT_CHUNK_SIZE
+from regshape.libs.compression import CompressingReader
+from regshape.libs.concurrency import DEFAULT_CONCURRENCY, map_concurrently
 from regshape.libs.decorators.scenario import track_scenario
-from regshape.libs.errors import BlobError, LayoutError
+from regshape.libs.errors import AuthError, BlobError, LayoutError
+from regshape.libs.estargz import ESTARGZ, EStargzReader
+from regshape.libs.layout.index import LayoutIndex
+from regshape.libs.layout.lock import layout_lock
+from regshape.libs.layout.verify import VerificationCache, hash_file, map_file
 from regshape.libs.models.descriptor import Descriptor
 from regshape.libs.models.manifest import ImageIndex, ImageManifest, parse_manifest
 from regshape.libs.models.mediatype import OCI_IMAGE_INDEX
@@ -37,6 +52,15 @@ _OCI_LAYOUT_FILE = "oci-layout"
 _INDEX_FILE = "index.json"
 _BLOBS_DIR = "blobs"
 _STAGE_FILE = ".regshape-stage.json"
+_SUPPORTED_ALGORITHMS = {"sha256", "sha512"}
+# Hex digest length per algorithm, for recognising blob paths in archives.
+_HEX_DIGEST_LENGTHS = {"sha256": 64, "sha512": 128}
+# Bytes copied per read when streaming a blob into the store.
+_COPY_CHUNK_SIZE = 1024 * 1024
+# Cross-repository mount sources tried per blob before uploading.
+_MAX_MOUNT_ATTEMPTS = 3
+# Blobs hashed in parallel by validate_layout by default.
+_DEFAULT_VALIDATE_WORKERS = max(4, os.cpu_count() or 1)
 
 
 # ===========================================================================
@@ -90,6 +114,88 @@ def _write_atomically(target: Path, content: bytes) -> None:
         raise
 
 
+def _write_blob_from_reader(
+    layout: Path,
+    reader: BinaryIO,
+    chunk_size: int = _COPY_CHUNK_SIZE,
+    algorithm: str = "sha256",
+    expected_digest: Union[str, None] = None,
+) -> tuple[str, int]:
+    """Stream *reader* into the blob store, hashing as it is written.
+
+    The content goes to a temp file under ``blobs/<algorithm>`` which is
+    renamed to its content address once the digest is known, so a reader
+    never sees a partial blob.  Only one chunk is held in memory.  A
+    :class:`~regshape.libs.compression.CompressingReader` or
+    :class:`~regshape.libs.estargz.EStargzReader` already hashes its output
+    with SHA-256, so its digest is taken from ``reader.result()`` instead
+    of hashing the bytes a second time.
+
+    :param expected_digest: When given, the computed digest must match it.
+    :returns: ``(digest, size)``.
+    :raises LayoutError: If the content does not match *expected_digest*.
+    """
+    blobs_dir = layout / _BLOBS_DIR / algorithm
+    blobs_dir.mkdir(parents=True, exist_ok=True)
+    self_hashing = algorithm == "sha256" and isinstance(
+        reader, (CompressingReader, EStargzReader)
+    )
+    hasher = None if self_hashing else hashlib.new(algorithm)
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=blobs_dir, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            while True:
+                chunk = reader.read(chunk_size)
+                if not chunk:
+                    break
+                if hasher is not None:
+                    hasher.update(chunk)
+                size += len(chunk)
+                fh.write(chunk)
+        if hasher is None:
+            digest = reader.result().digest
+        else:
+            digest = f"{algorithm}:{hasher.hexdigest()}"
+        if expected_digest is not None and digest != expected_digest:
+            raise LayoutError(
+                f"Digest mismatch: expected {expected_digest}",
+                f"content hashes to {digest}",
+            )
+        blob = _blob_path(layout, digest)
+        if blob.exists() and blob.stat().st_size == size:
+            os.unlink(tmp_path)
+        else:
+            os.replace(tmp_path, blob)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return digest, size
+
+
+def _digest_algorithm(digest: str) -> str:
+    """Return the algorithm of *digest*, raising
+    :class:`~regshape.libs.errors.LayoutError` if it is not supported or
+    its hex part is not lowercase hex of the algorithm's length, so it can
+    never name a path outside the blob store."""
+    algorithm, sep, hex_digest = digest.partition(":")
+    if not sep or not hex_digest or algorithm not in _SUPPORTED_ALGORITHMS:
+        raise LayoutError(
+            f"Unsupported digest {digest!r}",
+            f"supported algorithms: {', '.join(sorted(_SUPPORTED_ALGORITHMS))}",
+        )
+    length = _HEX_DIGEST_LENGTHS[algorithm]
+    if not re.fullmatch(f"[0-9a-f]{{{length}}}", hex_digest):
+        raise LayoutError(
+            f"Malformed digest {digest!r}",
+            f"expected {length} lowercase hex characters after {algorithm + ':'!r}",
+        )
+    return algorithm
+
+
 def _read_index(layout: Path) -> ImageIndex:
     """Internal helper: read and parse *layout*/index.json."""
     index_file = _index_file(layout)
@@ -121,6 +227,18 @@ def _write_index(layout: Path, index: ImageIndex) -> None:
     _write_atomically(_index_file(layout), content)
 
 
+def _commit_index(layout: Path, batch: LayoutIndex) -> LayoutIndex:
+    """Merge *batch*'s changes into the current ``index.json`` and write it.
+
+    The caller must hold :func:`~regshape.libs.layout.lock.layout_lock`.
+
+    :returns: The merged index.
+    """
+    merged = batch.rebase(_read_index(layout))
+    _write_index(layout, merged.index)
+    return merged
+
+
 def _stage_file(layout: Path) -> Path:
     return layout / _STAGE_FILE
 
@@ -149,24 +267,140 @@ def _write_stage(layout: Path, stage: dict) -> None:
     _write_atomically(_stage_file(layout), content)
 
 
-def _check_blob_integrity(layout: Path, digest: str, context: str) -> None:
+def _check_blob_integrity(
+    layout: Path,
+    digest: str,
+    context: str,
+    cache: Union[VerificationCache, None] = None,
+) -> None:
     """Raise :class:`~regshape.libs.errors.LayoutError` if the blob for
-    *digest* is absent or its content does not match the declared digest."""
+    *digest* is absent or its content does not match the declared digest.
+
+    The blob is hashed in chunks; with a *cache*, blobs unchanged since they
+    were last verified are not hashed at all."""
     blob = _blob_path(layout, digest)
     if not blob.exists():
         raise LayoutError(
             f"blob {digest} referenced by {context} does not exist",
             f"expected at {blob}",
         )
-    content = blob.read_bytes()
     alg, _ = digest.split(":", 1)
-    if alg == "sha256":
-        actual = "sha256:" + hashlib.sha256(content).hexdigest()
+    if alg not in _SUPPORTED_ALGORITHMS:
+        return
+    if cache is not None:
+        actual = cache.verify(blob, digest)
+    else:
+        actual = hash_file(blob, alg)
+        actual = None if actual == digest else actual
+    if actual is not None:
+        raise LayoutError(
+            f"digest mismatch for blob {digest}",
+            f"computed {actual}",
+        )
+
+
+def _read_checked_blob(
+    layout: Path,
+    digest: str,
+    context: str,
+    cache: VerificationCache,
+) -> bytes:
+    """Return the content of a small blob (a manifest or index), checking it
+    as :func:`_check_blob_integrity` does but reading the file only once."""
+    blob = _blob_path(layout, digest)
+    try:
+        st = blob.stat()
+        content = blob.read_bytes()
+    except FileNotFoundError as exc:
+        raise LayoutError(
+            f"blob {digest} referenced by {context} does not exist",
+            f"expected at {blob}",
+        ) from exc
+    alg, _ = digest.split(":", 1)
+    if alg in _SUPPORTED_ALGORITHMS and not cache.is_verified(blob, st):
+        actual = f"{alg}:{hashlib.new(alg, content).hexdigest()}"
         if actual != digest:
             raise LayoutError(
                 f"digest mismatch for blob {digest}",
                 f"computed {actual}",
             )
+        cache.mark_verified(blob, st)
+    return content
+
+
+def _checked_blob_path(layout: Path, digest: str) -> Path:
+    """Return the path of the blob for *digest*, rejecting digests
+    :func:`read_blob` cannot verify."""
+    try:
+        alg, _ = digest.split(":", 1)
+    except ValueError as exc:
+        raise LayoutError(
+            f"Invalid digest format: {digest!r}",
+            str(exc),
+        ) from exc
+
+    if alg != "sha256":
+        raise LayoutError(
+            f"Unsupported digest algorithm: {alg!r}",
+            "only sha256 is supported",
+        )
+    return _blob_path(layout, digest)
+
+
+def _verify_content(
+    blob: Path,
+    st: os.stat_result,
+    content: Union[bytes, memoryview],
+    digest: str,
+    cache: VerificationCache,
+) -> None:
+    """Check *content*, read from *blob*, against *digest* unless *cache*
+    shows the file is unchanged since it was last verified."""
+    if cache.is_verified(blob, st):
+        return
+    actual = "sha256:" + hashlib.sha256(content).hexdigest()
+    if actual != digest:
+        raise LayoutError(
+            f"Digest mismatch for {digest}",
+            f"computed {actual}",
+        )
+    cache.mark_verified(blob, st)
+
+
+def _read_verified_blob(layout: Path, digest: str, cache: VerificationCache) -> bytes:
+    """Body of :func:`read_blob`, sharing the caller's verification cache."""
+    blob = _checked_blob_path(layout, digest)
+    try:
+        st = blob.stat()
+        content = blob.read_bytes()
+    except OSError as exc:
+        raise LayoutError(
+            f"Blob {digest} not found in {layout}",
+            str(exc),
+        ) from exc
+
+    _verify_content(blob, st, content, digest, cache)
+    return content
+
+
+@contextmanager
+def _view_verified_blob(
+    layout: Path, digest: str, cache: VerificationCache,
+) -> Iterator[memoryview]:
+    """Body of :func:`read_blob_view`, sharing the caller's verification
+    cache."""
+    blob = _checked_blob_path(layout, digest)
+    try:
+        fh = open(blob, "rb")
+    except OSError as exc:
+        raise LayoutError(
+            f"Blob {digest} not found in {layout}",
+            str(exc),
+        ) from exc
+
+    with fh, map_file(fh) as view:
+        _verify_content(blob, os.fstat(fh.fileno()), view, digest, cache)
+        yield view
 
 
 # ===========================================================================
@@ -249,18 +483,99 @@ def add_blob(layout_path: Union[str, Path], content: bytes) -> tuple[str, int]:
     return digest, size
 
 
+def add_blob_from_stream(
+    layout_path: Union[str, Path],
+    source: BinaryIO,
+    digest: Union[str, None] = None,
+    chunk_size: int = _COPY_CHUNK_SIZE,
+) -> tuple[str, int]:
+    """Copy *source* into the blob store in bounded chunks.
+
+    Unlike :func:`add_blob` the content is never held in memory: it is
+    copied *chunk_size* bytes at a time into a temp file inside ``blobs/``,
+    hashed on the way, and renamed to ``blobs/<alg>/<hex>`` once complete.
+
+    When *digest* is given and that blob already exists, *source* is not
+    read at all.  Blobs only ever appear through an atomic rename, so an
+    existing file is complete.
+
+    :param layout_path: Root of an initialised OCI Image Layout.
+    :param source: Binary file-like object positioned at the blob content.
+    :param digest: Expected digest (``sha256:`` or ``sha512:``).  The
+        content is verified against it; without it the content is hashed
+        with SHA-256.
+    :param chunk_size: Bytes read from *source* per step.
+    :returns: ``(digest, size)``.
+    :raises LayoutError: If *layout_path* is not an initialised layout, the
+        digest is unsupported, or the content does not match *digest*.
+    :raises OSError: On I/O errors.
+    """
+    layout = _lp(layout_path)
+    _validate_is_layout(layout)
+    algorithm = "sha256"
+    if digest is not None:
+        algorithm = _digest_algorithm(digest)
+        blob = _blob_path(layout, digest)
+        if blob.exists():
+            return digest, blob.stat().st_size
+    return _write_blob_from_reader(
+        layout, source, chunk_size, algorithm=algorithm, expected_digest=digest
+    )
+
+
+def add_blob_from_file(
+    layout_path: Union[str, Path],
+    path: Union[str, Path],
+    digest: Union[str, None] = None,
+    chunk_size: int = _COPY_CHUNK_SIZE,
+) -> tuple[str, int]:
+    """Copy the file at *path* into the blob store in bounded chunks.
+
+    See :func:`add_blob_from_stream`.  When *digest* is given and a blob
+    of the same size already exists, the file is not opened.
+
+    :param layout_path: Root of an initialised OCI Image Layout.
+    :param path: File to store.
+    :param digest: Expected digest of the file, or ``None``.
+    :param chunk_size: Bytes read per step.
+    :returns: ``(digest, size)``.
+    :raises LayoutError: If *layout_path* is not an initialised layout, the
+        digest is unsupported, or the file does not match *digest*.
+    :raises OSError: If *path* cannot be read, or on other I/O errors.
+    """
+    layout = _lp(layout_path)
+    _validate_is_layout(layout)
+    if digest is not None:
+        _digest_algorithm(digest)
+        blob = _blob_path(layout, digest)
+        size = os.path.getsize(path)
+        if blob.exists() and blob.stat().st_size == size:
+            return digest, size
+    with open(path, "rb") as fh:
+        return add_blob_from_stream(layout, fh, digest=digest, chunk_size=chunk_size)
+
+
 def add_manifest(
     layout_path: Union[str, Path],
     manifest_bytes: bytes,
     media_type: str,
     ref_name: Union[str, None] = None,
     annotations: Union[dict[str, str], None] = None,
+    index: Union[LayoutIndex, None] = None,
 ) -> Descriptor:
     """Write a manifest blob and register it in ``index.json``.
 
     The manifest is stored as a blob, then a
     :class:`~regshape.libs.models.descriptor.Descriptor` for it is appended
-    to the ``manifests`` array of ``index.json``.
+    to the ``manifests`` array of ``index.json``, unless an identical entry
+    is already there.
+
+    Each call rewrites ``index.json``.  To add many manifests, pass the
+    *index* yielded by :func:`index_batch` so it is written once::
+
+        with index_batch(layout) as index:
+            for tag, manifest in manifests.items():
+                add_manifest(layout, manifest, media_type, ref_name=tag, index=index)
 
     :param layout_path: Root of an initialised OCI Image Layout.
     :param manifest_bytes: Serialised manifest JSON bytes.
@@ -271,8 +586,10 @@ def add_manifest(
         descriptor.
     :param annotations: Additional annotations merged onto the index descriptor
         (merged after *ref_name*, so they can override it if needed).
-    :returns: The :class:`~regshape.libs.models.descriptor.Descriptor` appended
-        to ``index.json``.
+    :param index: Batch from :func:`index_batch` to add the entry to instead
+        of reading and writing ``index.json``.
+    :returns: The :class:`~regshape.libs.models.descriptor.Descriptor`
+        registered in ``index.json``.
     :raises LayoutError: If *layout_path* is not an initialised layout, or if
         ``index.json`` is malformed.
     :raises OSError: On I/O errors.
@@ -297,12 +614,56 @@ def add_manifest(
         annotations=desc_annotations,
     )
 
-    # Read → modify → write index.json
-    index = _read_index(layout)
-    index.manifests.append(descriptor)
-    _write_index(layout, index)
+    if index is not None:
+        return index.add(descriptor)
 
-    return descriptor
+    with index_batch(layout) as batch:
+        return batch.add(descriptor)
+
+
+@contextmanager
+def index_batch(layout_path: Union[str, Path]) -> Iterator[LayoutIndex]:
+    """Context manager for changing ``index.json`` in one atomic write.
+
+    ``index.json`` is parsed once into a
+    :class:`~regshape.libs.layout.index.LayoutIndex`, which adds and
+    de-duplicates entries and finds them by digest or ref.name in constant
+    time.  When the block exits normally and something changed, the changes
+    are merged into the current ``index.json`` under the layout lock (see
+    :mod:`regshape.libs.layout.lock`), so entries added meanwhile by other
+    writers are kept, and written back with a single atomic rename; if the
+    block raises, ``index.json`` is left as it was.  Blobs written inside
+    the block stay in the layout either way.
+
+    :param layout_path: Root of an initialised OCI Image Layout.
+    :returns: A context manager yielding the
+        :class:`~regshape.libs.layout.index.LayoutIndex`.
+    :raises LayoutError: If *layout_path* is not an initialised layout, or
+        ``index.json`` is missing or malformed.
+    """
+    layout = _lp(layout_path)
+    _validate_is_layout(layout)
+    batch = LayoutIndex(_read_index(layout))
+    yield batch
+    if batch.dirty:
+        with layout_lock(layout):
+            _commit_index(layout, batch)
+
+
+def find_manifest(layout_path: Union[str, Path], ref_name: str) -> Union[Descriptor, None]:
+    """Return the ``index.json`` entry whose
+    ``org.opencontainers.image.ref.name`` annotation is *ref_name*.
+
+    :param layout_path: Root of an initialised OCI Image Layout.
+    :param ref_name: Reference name (tag) to look up.
+    :returns: The matching descriptor (the last one, if several share the
+        name), or ``None``.
+    :raises LayoutError: If *layout_path* is not an initialised layout, or
+        ``index.json`` is missing or malformed.
+    """
+    layout = _lp(layout_path)
+    _validate_is_layout(layout)
+    return LayoutIndex(_read_index(layout)).find(ref_name)
 
 
 def read_index(layout_path: Union[str, Path]) -> ImageIndex:
@@ -322,7 +683,9 @@ def read_index(layout_path: Union[str, Path]) -> ImageIndex:
 def read_blob(layout_path: Union[str, Path], digest: str) -> bytes:
     """Read and return the raw bytes of a blob by digest.
 
-    The on-disk content is verified against *digest* before returning.
+    The on-disk content is verified against *digest* before returning,
+    unless the layout's verification cache shows the file is unchanged
+    since it was last verified.
 
     :param layout_path: Root of an initialised OCI Image Layout.
     :param digest: Content digest in ``"<alg>:<hex>"`` form (e.g.
@@ -334,104 +697,215 @@ def read_blob(layout_path: Union[str, Path], digest: str) -> bytes:
     """
     layout = _lp(layout_path)
     _validate_is_layout(layout)
-
+    cache = VerificationCache(layout)
     try:
-        alg, _ = digest.split(":", 1)
-    except ValueError as exc:
-        raise LayoutError(
-            f"Invalid digest format: {digest!r}",
-            str(exc),
-        ) from exc
+        return _read_verified_blob(layout, digest, cache)
+    finally:
+        cache.save()
 
-    if alg != "sha256":
-        raise LayoutError(
-            f"Unsupported digest algorithm: {alg!r}",
-            "only sha256 is supported",
-        )
 
-    blob = _blob_path(layout, digest)
-    try:
-        content = blob.read_bytes()
-    except OSError as exc:
-        raise LayoutError(
-            f"Blob {digest} not found in {layout}",
-            str(exc),
-        ) from exc
+@contextmanager
+def read_blob_view(layout_path: Union[str, Path], digest: str) -> Iterator[memoryview]:
+    """Context manager yielding a zero-copy, memory-mapped view of a blob.
 
-    actual = "sha256:" + hashlib.sha256(content).hexdigest()
-    if actual != digest:
-        raise LayoutError(
-            f"Digest mismatch for {digest}",
-            f"computed {actual}",
-        )
+    Unlike :func:`read_blob`, the blob is never copied into the process:
+    the view is backed by the page cache, which concurrent readers of the
+    same layout share, so memory use stays flat however large the blob.
+    It is verified the same way, hashing the mapped pages directly, and
+    can be passed wherever ``bytes`` are accepted — to :mod:`hashlib`, as
+    an upload body, or sliced.  Neither the view nor slices of it may be
+    used after the ``with`` block::
 
-    return content
+        with read_blob_view(layout, digest) as view:
+            upload_blob(client, repo, view, digest)
+
+    :param layout_path: Root of an initialised OCI Image Layout.
+    :param digest: Content digest in ``"<alg>:<hex>"`` form.
+    :returns: A context manager yielding a read-only :class:`memoryview`.
+    :raises LayoutError: As for :func:`read_blob`.
+    :raises OSError: On I/O errors.
+    """
+    layout = _lp(layout_path)
+    _validate_is_layout(layout)
+    cache = VerificationCache(layout)
+    try:
+        with _view_verified_blob(layout, digest, cache) as view:
+            yield view
+    finally:
+        cache.save()
 
 
-def validate_layout(layout_path: Union[str, Path]) -> None:
+def validate_layout(
+    layout_path: Union[str, Path],
+    full: bool = False,
+    concurrency: Union[int, None] = None,
+    progress_callback=None,
+) -> None:
     """Validate the structural and content integrity of an OCI Image Layout.
 
     Checks that the ``oci-layout`` marker is present and well-formed,
     ``index.json`` is a valid ``ImageIndex``, every manifest blob referenced
-    by ``index.json`` exists and its digest matches, and for each manifest
-    blob that is a parseable OCI manifest, all config/layer blobs it
-    references also exist and their digests match.
+    by ``index.json`` (or by a nested index) exists and its digest matches,
+    and for each manifest blob that is a parseable OCI manifest, all
+    config/layer blobs it references also exist and their digests match.
+
+    See :func:`check_layout`, which does the work and returns every
+    violation instead of raising.
 
     :param layout_path: Path to the layout root to validate.
-    :raises LayoutError: Describing the first structural or integrity violation
-        found.
+    :param full: Re-hash every blob, ignoring the verification cache.
+    :param concurrency: Number of blobs hashed in parallel; ``None`` sizes
+        the pool to the machine.
+    :param progress_callback: See :func:`check_layout`.
+    :raises LayoutError: The violation found, or — when there are several —
+        one error naming all of them, with each in ``violations``.
+    """
+    violations = check_layout(
+        layout_path, full=full, concurrency=concurrency,
+        progress_callback=progress_callback,
+    )
+    if len(violations) == 1:
+        raise violations[0]
+    if violations:
+        raise LayoutError(
+            f"{len(violations)} violations found in {layout_path}",
+            "; ".join(v.message for v in violations),
+            violations=violations,
+        )
+
+
+def check_layout(
+    layout_path: Union[str, Path],
+    full: bool = False,
+    concurrency: Union[int, None] = None,
+    progress_callback=None,
+) -> list[LayoutError]:
+    """Check an OCI Image Layout and return every violation found.
+
+    The manifests reachable from ``index.json`` are read first, recursing
+    into nested indexes, to collect the set of referenced config and layer
+    blobs.  Blobs shared between manifests are checked once.  Those blobs
+    are then hashed on a thread pool — :mod:`hashlib` and file reads
+    release the GIL, so the work spreads across cores and is bounded by
+    disk throughput.  Blobs unchanged since they were last verified are
+    not hashed (see :mod:`regshape.libs.layout.verify`).
+
+    :param layout_path: Path to the layout root to check.
+    :param full: Re-hash every blob, ignoring the verification cache.
+    :param concurrency: Number of blobs hashed in parallel; ``None`` sizes
+        the pool to the machine.
+    :param progress_callback: Optional callable invoked as
+        ``progress_callback(event, **kwargs)``.  Events: ``"blobs_found"``
+        (``total``) once the referenced blobs are known, then
+        ``"blob_checked"`` (``digest``, ``ok``, ``done``, ``total``) after
+        each blob.  Calls come from worker threads but never overlap.
+    :returns: One :class:`~regshape.libs.errors.LayoutError` per violation,
+        in a stable order; empty when the layout is valid.  A missing or
+        malformed ``oci-layout`` or ``index.json`` is reported alone, as
+        nothing further can be checked.
     """
     layout = _lp(layout_path)
+    cache = VerificationCache(layout, full=full)
+    try:
+        return _check_layout(
+            layout, cache, concurrency or _DEFAULT_VALIDATE_WORKERS, progress_callback,
+        )
+    finally:
+        cache.save()
+
 
+def _check_layout(
+    layout: Path,
+    cache: VerificationCache,
+    concurrency: int,
+    progress_callback,
+) -> list[LayoutError]:
+    """Body of :func:`check_layout`, sharing the caller's cache."""
     # 1. Verify oci-layout marker
     marker = _oci_layout_file(layout)
     if not marker.exists():
-        raise LayoutError(
+        return [LayoutError(
             f"{layout} is not an OCI Image Layout",
             "missing oci-layout file",
-        )
+        )]
     try:
         marker_data = json.loads(marker.read_text(encoding="utf-8"))
         version = marker_data.get("imageLayoutVersion")
-        if version != _OCI_LAYOUT_VERSION:
-            raise LayoutError(
-                f"Invalid imageLayoutVersion in oci-layout: {version!r}",
-                f"expected {_OCI_LAYOUT_VERSION!r}",
-            )
     except (json.JSONDecodeError, OSError) as exc:
-        raise LayoutError("oci-layout marker is malformed", str(exc)) from exc
+        return [LayoutError("oci-layout marker is malformed", str(exc))]
+    if version != _OCI_LAYOUT_VERSION:
+        return [LayoutError(
+            f"Invalid imageLayoutVersion in oci-layout: {version!r}",
+            f"expected {_OCI_LAYOUT_VERSION!r}",
+        )]
 
     # 2. Read and validate index.json
-    index = _read_index(layout)
-
-    # 3. Check each manifest entry and the blobs it references
-    for entry in index.manifests:
-        _check_blob_integrity(layout, entry.digest, context="index.json")
-
-        # 4. Deep-check referenced blobs inside parseable manifests
-        blob_bytes = _blob_path(layout, entry.digest).read_bytes()
+    try:
+        index = _read_index(layout)
+    except LayoutError as exc:
+        return [exc]
+
+    # 3. Walk the manifests (small, read once each) breadth-first and
+    #    collect the config and layer blobs they reference.
+    violations: list[LayoutError] = []
+    referenced: dict[str, str] = {}  # digest -> context of first reference
+    visited: set[str] = set()
+    pending = deque((entry.digest, "index.json") for entry in index.manifests)
+    while pending:
+        digest, context = pending.popleft()
+        if digest in visited:
+            continue
+        visited.add(digest)
+        try:
+            content = _read_checked_blob(layout, digest, context, cache)
+        except LayoutError as exc:
+            violations.append(exc)
+            continue
         try:
-            manifest = parse_manifest(blob_bytes.decode("utf-8"))
+            manifest = parse_manifest(content.decode("utf-8"))
         except Exception:
             # Binary or non-JSON artifact — skip deep inspection
             continue
 
         if isinstance(manifest, ImageManifest):
-            _check_blob_integrity(
-                layout, manifest.config.digest,
-                context=f"config in manifest {entry.digest}",
-            )
+            referenced.setdefault(manifest.config.digest, f"config in manifest {digest}")
             for i, layer in enumerate(manifest.layers):
-                _check_blob_integrity(
-                    layout, layer.digest,
-                    context=f"layer[{i}] in manifest {entry.digest}",
-                )
+                referenced.setdefault(layer.digest, f"layer[{i}] in manifest {digest}")
         elif isinstance(manifest, ImageIndex):
-            for sub in manifest.manifests:
-                _check_blob_integrity(
-                    layout, sub.digest,
-                    context=f"nested manifest entry in index {entry.digest}",
+            pending.extend(
+                (sub.digest, f"nested manifest entry in index {digest}")
+                for sub in manifest.manifests
+            )
+
+    # 4. Hash the referenced blobs in parallel.
+    blobs = [(d, c) for d, c in referenced.items() if d not in visited]
+    if progress_callback:
+        progress_callback("blobs_found", total=len(blobs))
+    progress_lock = threading.Lock()
+    done = 0
+
+    def check(item: tuple[str, str]) -> Union[LayoutError, None]:
+        nonlocal done
+        digest, context = item
+        error = None
+        try:
+            _check_blob_integrity(layout, digest, context, cache)
+        except LayoutError as exc:
+            error = exc
+        except OSError as exc:
+            error = LayoutError(f"blob {digest} referenced by {context} is unreadable", str(exc))
+        if progress_callback:
+            with progress_lock:
+                done += 1
+                progress_callback(
+                    "blob_checked", digest=digest, ok=error is None,
+                    done=done, total=len(blobs),
                 )
+        return error
+
+    results = map_concurrently(check, blobs, concurrency)
+    violations.extend(error for error in results if error is not None)
+    return violations
 
 
 # ===========================================================================
@@ -439,6 +913,383 @@ def validate_layout(layout_path: Union[str, Path]) -> None:
 # ===========================================================================
 
 
+class StageSession:
+    """Staging state of one layout, loaded once and committed once.
+
+    Obtained from :func:`stage_session`.  Its methods do what the
+    module-level staging functions of the same names do — which are
+    one-operation sessions — but change only the in-memory :attr:`stage`
+    (and, for manifest operations, an in-memory ``index.json``).  Both
+    files are written by :meth:`commit`, so staging *N* layers costs one
+    staging-file write instead of *N*.  Blobs are written to the store
+    immediately, without locking.
+
+    Each change is also journaled.  :meth:`commit` takes the layout lock,
+    re-reads both files and replays the journal onto them, so sessions in
+    other processes can stage layers into the same layout concurrently
+    without losing each other's changes.  Steps that derive content from
+    the staged state (:meth:`generate_config`, :meth:`generate_manifest`)
+    see the state as of the session, so run them once concurrent staging
+    has finished.
+
+    :param layout: Layout root.
+    :raises LayoutError: If the staging file is missing or malformed.
+    """
+
+    def __init__(self, layout: Path) -> None:
+        self.layout = layout
+        self.stage = _read_stage_raw(layout)
+        self._changes: list = []
+        self._index: Union[LayoutIndex, None] = None
+        # Config and manifest blobs replaced by this session, removed on commit.
+        self._obsolete: list[str] = []
+
+    @property
+    def dirty(self) -> bool:
+        """``True`` when there are staging changes not yet committed."""
+        return bool(self._changes)
+
+    def _change(self, change) -> None:
+        """Apply *change*, a callable mutating a stage dict, and journal it."""
+        change(self.stage)
+        self._changes.append(change)
+
+    def _set(self, key: str, value: dict) -> None:
+        self._change(lambda stage: stage.update({key: copy.deepcopy(value)}))
+
+    def _layout_index(self) -> LayoutIndex:
+        if self._index is None:
+            self._index = LayoutIndex(_read_index(self.layout))
+        return self._index
+
+    def _append_layer(self, layer_entry: dict) -> Descriptor:
+        self._change(lambda stage: stage["layers"].append(copy.deepcopy(layer_entry)))
+        annotations = layer_entry["annotations"]
+        return Descriptor(
+            media_type=layer_entry["media_type"],
+            digest=layer_entry["digest"],
+            size=layer_entry["size"],
+            annotations=annotations if annotations else None,
+        )
+
+    def stage_layer(
+        self,
+        content: bytes,
+        media_type: str,
+        annotations: Union[dict[str, str], None] = None,
+    ) -> Descriptor:
+        """See :func:`stage_layer`."""
+        digest, size = add_blob(self.layout, content)
+        return self._append_layer({
+            "digest": digest,
+            "size": size,
+            "media_type": media_type,
+            "annotations": annotations or {},
+        })
+
+    def stage_layer_from_stream(
+        self,
+        source: BinaryIO,
+        media_type: str,
+        compression: Union[str, None] = None,
+        level: Union[int, None] = None,
+        annotations: Union[dict[str, str], None] = None,
+        threads: Union[int, None] = None,
+    ) -> Descriptor:
+        """See :func:`stage_layer_from_stream`."""
+        reader = source
+        if compression == ESTARGZ:
+            reader = EStargzReader(source, level=level)
+        elif compression:
+            reader = CompressingReader(source, compression, level=level, threads=threads)
+        digest, size = _write_blob_from_reader(self.layout, reader)
+        layer_entry: dict = {
+            "digest": digest,
+            "size": size,
+            "media_type": media_type,
+            "annotations": annotations or {},
+        }
+        if compression:
+            result = reader.result()
+            layer_entry["diff_id"] = result.diff_id
+            if compression == ESTARGZ:
+                layer_entry["annotations"] = {**layer_entry["annotations"], **result.annotations()}
+        return self._append_layer(layer_entry)
+
+    def update_layer_annotations(
+        self,
+        layer_index: int,
+        annotations: dict[str, str],
+        replace: bool = False,
+    ) -> Descriptor:
+        """See :func:`update_layer_annotations`."""
+        def change(stage: dict) -> None:
+            layers = stage["layers"]
+            if layer_index < 0 or layer_index >= len(layers):
+                raise LayoutError(
+                    f"Layer index {layer_index} is out of range",
+                    f"staged layer count: {len(layers)}",
+                )
+            layer = layers[layer_index]
+            if replace:
+                layer["annotations"] = dict(annotations)
+            else:
+                existing: dict[str, str] = layer.get("annotations") or {}
+                existing.update(annotations)
+                layer["annotations"] = existing
+
+        self._change(change)
+        layer = self.stage["layers"][layer_index]
+        ann = layer["annotations"] or None
+        return Descriptor(
+            media_type=layer["media_type"],
+            digest=layer["digest"],
+            size=layer["size"],
+            annotations=ann if ann else None,
+        )
+
+    def generate_config(
+        self,
+        architecture: str = "amd64",
+        os_name: str = "linux",
+        media_type: str = "application/vnd.oci.image.config.v1+json",
+        annotations: Union[dict[str, str], None] = None,
+    ) -> Descriptor:
+        """See :func:`generate_config`."""
+        stage = self.stage
+        if not stage["layers"]:
+            raise LayoutError(
+                "No layers staged",
+                "run stage_layer first",
+            )
+        # Layers staged from an uncompressed stream carry their real diff_id.
+        diff_ids = [layer.get("diff_id", layer["digest"]) for layer in stage["layers"]]
+        config_obj: dict = {
+            "architecture": architecture,
+            "os": os_name,
+            "rootfs": {
+                "type": "layers",
+                "diff_ids": diff_ids,
+            },
+        }
+        if annotations:
+            config_obj["config"] = {"Labels": annotations}
+        config_bytes = json.dumps(
+            config_obj, separators=(",", ":"), sort_keys=True
+        ).encode("utf-8")
+        digest, size = add_blob(self.layout, config_bytes)
+        self._set("config", {"digest": digest, "size": size, "media_type": media_type})
+        return Descriptor(media_type=media_type, digest=digest, size=size, annotations=annotations or None)
+
+    def generate_manifest(
+        self,
+        ref_name: Union[str, None] = None,
+        media_type: str = "application/vnd.oci.image.manifest.v1+json",
+        annotations: Union[dict[str, str], None] = None,
+    ) -> Descriptor:
+        """See :func:`generate_manifest`."""
+        stage = self.stage
+        if not stage["layers"]:
+            raise LayoutError(
+                "No layers staged",
+                "run stage_layer first",
+            )
+        if stage["config"] is None:
+            raise LayoutError(
+                "Config not yet generated",
+                "run generate_config first",
+            )
+        cfg = stage["config"]
+        layers_json = []
+        for layer in stage["layers"]:
+            layer_dict: dict = {
+                "mediaType": layer["media_type"],
+                "digest": layer["digest"],
+                "size": layer["size"],
+            }
+            if layer.get("annotations"):
+                layer_dict["annotations"] = layer["annotations"]
+            layers_json.append(layer_dict)
+        manifest_obj: dict = {
+            "schemaVersion": 2,
+            "mediaType": media_type,
+            "config": {
+                "mediaType": cfg["media_type"],
+                "digest": cfg["digest"],
+                "size": cfg["size"],
+            },
+            "layers": layers_json,
+        }
+        if annotations:
+            manifest_obj["annotations"] = annotations
+        manifest_bytes = json.dumps(
+            manifest_obj, separators=(",", ":"), sort_keys=True
+        ).encode("utf-8")
+        descriptor = add_manifest(
+            self.layout, manifest_bytes, media_type, ref_name=ref_name,
+            index=self._layout_index(),
+        )
+        self._set("manifest", {
+            "digest": descriptor.digest,
+            "size": descriptor.size,
+            "media_type": descriptor.media_type,
+            "annotations": annotations or {},
+        })
+        return descriptor
+
+    def update_config(
+        self,
+        architecture: Union[str, None] = None,
+        os_name: Union[str, None] = None,
+        annotations: Union[dict[str, str], None] = None,
+        replace_annotations: bool = False,
+    ) -> Descriptor:
+        """See :func:`update_config`."""
+        stage = self.stage
+        if stage["config"] is None:
+            raise LayoutError(
+                "Config not yet generated",
+                "run generate_config first",
+            )
+        old_digest = stage["config"]["digest"]
+        config_bytes = read_blob(self.layout, old_digest)
+        config_obj = json.loads(config_bytes)
+        if architecture is not None:
+            config_obj["architecture"] = architecture
+        if os_name is not None:
+            config_obj["os"] = os_name
+        if annotations is not None:
+            existing_labels: dict[str, str] = config_obj.get("config", {}).get("Labels") or {}
+            new_labels = dict(annotations) if replace_annotations else {**existing_labels, **annotations}
+            if new_labels:
+                config_obj.setdefault("config", {})["Labels"] = new_labels
+            elif "config" in config_obj and "Labels" in config_obj["config"]:
+                del config_obj["config"]["Labels"]
+        new_bytes = json.dumps(
+            config_obj, separators=(",", ":"), sort_keys=True
+        ).encode("utf-8")
+        if new_bytes == config_bytes:
+            cfg = stage["config"]
+            return Descriptor(
+                media_type=cfg["media_type"],
+                digest=cfg["digest"],
+                size=cfg["size"],
+            )
+        new_digest, new_size = add_blob(self.layout, new_bytes)
+        self._obsolete.append(old_digest)
+        cfg_media_type = stage["config"]["media_type"]
+        self._set("config", {"digest": new_digest, "size": new_size, "media_type": cfg_media_type})
+        return Descriptor(media_type=cfg_media_type, digest=new_digest, size=new_size)
+
+    def update_manifest_annotations(
+        self,
+        annotations: dict[str, str],
+        replace: bool = False,
+    ) -> Descriptor:
+        """See :func:`update_manifest_annotations`."""
+        stage = self.stage
+        if stage["manifest"] is None:
+            raise LayoutError(
+                "Manifest not yet generated",
+                "run generate_manifest first",
+            )
+        old_digest = stage["manifest"]["digest"]
+        manifest_bytes = read_blob(self.layout, old_digest)
+        manifest_obj = json.loads(manifest_bytes)
+        existing_ann: dict[str, str] = manifest_obj.get("annotations") or {}
+        if replace:
+            manifest_obj["annotations"] = dict(annotations)
+        else:
+            existing_ann.update(annotations)
+            manifest_obj["annotations"] = existing_ann
+        new_bytes = json.dumps(
+            manifest_obj, separators=(",", ":"), sort_keys=True
+        ).encode("utf-8")
+        new_digest, new_size = add_blob(self.layout, new_bytes)
+        self._obsolete.append(old_digest)
+        # Update index.json: replace old descriptor, preserve ref_name annotation
+        updated_desc = self._layout_index().replace(old_digest, Descriptor(
+            media_type=stage["manifest"]["media_type"],
+            digest=new_digest,
+            size=new_size,
+        ))
+        self._set("manifest", {
+            **stage["manifest"],
+            "digest": new_digest,
+            "size": new_size,
+            "annotations": manifest_obj.get("annotations") or {},
+        })
+        return updated_desc or Descriptor(
+            media_type=stage["manifest"]["media_type"],
+            digest=new_digest,
+            size=new_size,
+        )
+
+    def commit(self) -> None:
+        """Merge the changes into ``index.json`` and the staging file.
+
+        Under the layout lock, each file that has changes is re-read, the
+        journaled changes are replayed onto it and it is replaced by an
+        atomic rename.  ``index.json`` is written first, so the staging
+        file never refers to a manifest missing from the index.  Config
+        and manifest blobs replaced during the session are deleted last,
+        once neither file refers to them.
+
+        :raises LayoutError: If a change no longer applies, e.g. a layer
+            index beyond the staged layers.
+        """
+        index_dirty = self._index is not None and self._index.dirty
+        if not (index_dirty or self._changes):
+            return
+        with layout_lock(self.layout):
+            if index_dirty:
+                self._index = _commit_index(self.layout, self._index)
+            if self._changes:
+                stage = _read_stage_raw(self.layout)
+                for change in self._changes:
+                    change(stage)
+                _write_stage(self.layout, stage)
+                self.stage = stage
+                self._changes.clear()
+            current = {
+                entry["digest"]
+                for entry in (self.stage["config"], self.stage["manifest"])
+                if entry is not None
+            }
+            for digest in self._obsolete:
+                if digest not in current:
+                    _blob_path(self.layout, digest).unlink(missing_ok=True)
+            self._obsolete.clear()
+
+
+@contextmanager
+def stage_session(layout_path: Union[str, Path]) -> Iterator[StageSession]:
+    """Context manager for many staging operations with a single commit.
+
+    Loads ``.regshape-stage.json`` once into a :class:`StageSession` and
+    commits it when the block exits normally.  If the block raises,
+    neither the staging file nor ``index.json`` is changed; blobs already
+    written stay in the store and are harmless::
+
+        with stage_session(layout) as session:
+            for path in layer_files:
+                with open(path, "rb") as fh:
+                    session.stage_layer_from_stream(fh, media_type, compression="gzip")
+            session.generate_config()
+            session.generate_manifest(ref_name="latest")
+
+    :param layout_path: Root of an initialised OCI Image Layout.
+    :returns: A context manager yielding the :class:`StageSession`.
+    :raises LayoutError: If *layout_path* is not initialised or the staging
+        file is missing/malformed.
+    """
+    layout = _lp(layout_path)
+    _validate_is_layout(layout)
+    session = StageSession(layout)
+    yield session
+    session.commit()
+
+
 def stage_layer(
     layout_path: Union[str, Path],
     content: bytes,
@@ -448,7 +1299,8 @@ def stage_layer(
     """Write *content* as a layer blob and append its descriptor to the staging file.
 
     Compression is the caller's responsibility — *content* must already be in
-    the form declared by *media_type*.
+    the form declared by *media_type*.  To stage many layers, use
+    :func:`stage_session` so the staging file is written once.
 
     :param layout_path: Root of an initialised OCI Image Layout.
     :param content: Raw layer bytes (compressed or uncompressed, as needed).
@@ -460,24 +1312,56 @@ def stage_layer(
         file is missing/malformed.
     :raises OSError: On I/O errors.
     """
-    layout = _lp(layout_path)
-    _validate_is_layout(layout)
-    digest, size = add_blob(layout, content)
-    layer_entry: dict = {
-        "digest": digest,
-        "size": size,
-        "media_type": media_type,
-        "annotations": annotations or {},
-    }
-    stage = _read_stage_raw(layout)
-    stage["layers"].append(layer_entry)
-    _write_stage(layout, stage)
-    return Descriptor(
-        media_type=media_type,
-        digest=digest,
-        size=size,
-        annotations=annotations if annotations else None,
-    )
+    with stage_session(layout_path) as session:
+        return session.stage_layer(content, media_type, annotations)
+
+
+def stage_layer_from_stream(
+    layout_path: Union[str, Path],
+    source: BinaryIO,
+    media_type: str,
+    compression: Union[str, None] = None,
+    level: Union[int, None] = None,
+    annotations: Union[dict[str, str], None] = None,
+    threads: Union[int, None] = None,
+) -> Descriptor:
+    """Stream a layer from *source* into the blob store and stage it.
+
+    Unlike :func:`stage_layer` the content is never held in memory.  When
+    *compression* is given, *source* is uncompressed and is compressed on
+    the way to disk; its uncompressed digest is recorded as the layer's
+    ``diff_id`` so :func:`generate_config` does not have to read the blob
+    back.  Without *compression* the bytes are stored as-is.
+
+    ``"estargz"`` writes a seekable gzip blob (see
+    :class:`~regshape.libs.estargz.EStargzReader`) from an uncompressed
+    tar and adds the TOC digest and uncompressed size annotations that
+    lazy-pulling snapshotters look for.
+
+    :param layout_path: Root of an initialised OCI Image Layout.
+    :param source: Binary file-like object with the layer content.
+    :param media_type: Layer media type of the stored blob.
+    :param compression: ``"gzip"``, ``"zstd"``, ``"estargz"`` or ``None``
+        to store as-is.
+    :param level: Compression level (see
+        :class:`~regshape.libs.compression.CompressingReader`).
+    :param annotations: Optional annotations stored on the layer descriptor.
+    :param threads: Compression threads for gzip and zstd; ``None`` or 1
+        compresses on the calling thread.
+    :returns: :class:`~regshape.libs.models.descriptor.Descriptor` appended to
+        the staging file.
+    :raises LayoutError: If *layout_path* is not initialised or the staging
+        file is missing/malformed.
+    :raises ValueError: If eStargz is requested and *source* is not a tar
+        archive eStargz can represent.
+    :raises ImportError: If zstd is requested without :mod:`zstandard`.
+    :raises OSError: On I/O errors.
+    """
+    with stage_session(layout_path) as session:
+        return session.stage_layer_from_stream(
+            source, media_type, compression=compression, level=level,
+            annotations=annotations, threads=threads,
+        )
 
 
 def generate_config(
@@ -503,32 +1387,8 @@ def generate_config(
         initialised.
     :raises OSError: On I/O errors.
     """
-    layout = _lp(layout_path)
-    _validate_is_layout(layout)
-    stage = _read_stage_raw(layout)
-    if not stage["layers"]:
-        raise LayoutError(
-            "No layers staged",
-            "run stage_layer first",
-        )
-    diff_ids = [layer["digest"] for layer in stage["layers"]]
-    config_obj: dict = {
-        "architecture": architecture,
-        "os": os_name,
-        "rootfs": {
-            "type": "layers",
-            "diff_ids": diff_ids,
-        },
-    }
-    if annotations:
-        config_obj["config"] = {"Labels": annotations}
-    config_bytes = json.dumps(
-        config_obj, separators=(",", ":"), sort_keys=True
-    ).encode("utf-8")
-    digest, size = add_blob(layout, config_bytes)
-    stage["config"] = {"digest": digest, "size": size, "media_type": media_type}
-    _write_stage(layout, stage)
-    return Descriptor(media_type=media_type, digest=digest, size=size, annotations=annotations or None)
+    with stage_session(layout_path) as session:
+        return session.generate_config(architecture, os_name, media_type, annotations)
 
 
 def generate_manifest(
@@ -553,54 +1413,8 @@ def generate_manifest(
     :raises LayoutError: If the config or layers have not been staged.
     :raises OSError: On I/O errors.
     """
-    layout = _lp(layout_path)
-    _validate_is_layout(layout)
-    stage = _read_stage_raw(layout)
-    if not stage["layers"]:
-        raise LayoutError(
-            "No layers staged",
-            "run stage_layer first",
-        )
-    if stage["config"] is None:
-        raise LayoutError(
-            "Config not yet generated",
-            "run generate_config first",
-        )
-    cfg = stage["config"]
-    layers_json = []
-    for layer in stage["layers"]:
-        layer_dict: dict = {
-            "mediaType": layer["media_type"],
-            "digest": layer["digest"],
-            "size": layer["size"],
-        }
-        if layer.get("annotations"):
-            layer_dict["annotations"] = layer["annotations"]
-        layers_json.append(layer_dict)
-    manifest_obj: dict = {
-        "schemaVersion": 2,
-        "mediaType": media_type,
-        "config": {
-            "mediaType": cfg["media_type"],
-            "digest": cfg["digest"],
-            "size": cfg["size"],
-        },
-        "layers": layers_json,
-    }
-    if annotations:
-        manifest_obj["annotations"] = annotations
-    manifest_bytes = json.dumps(
-        manifest_obj, separators=(",", ":"), sort_keys=True
-    ).encode("utf-8")
-    descriptor = add_manifest(layout, manifest_bytes, media_type, ref_name=ref_name)
-    stage["manifest"] = {
-        "digest": descriptor.digest,
-        "size": descriptor.size,
-        "media_type": descriptor.media_type,
-        "annotations": annotations or {},
-    }
-    _write_stage(layout, stage)
-    return descriptor
+    with stage_session(layout_path) as session:
+        return session.generate_manifest(ref_name, media_type, annotations)
 
 
 def read_stage(layout_path: Union[str, Path]) -> dict:
@@ -636,29 +1450,10 @@ def update_layer_annotations(
     :raises LayoutError: If the staging file is missing or *layer_index* is
         out of range.
     """
-    layout = _lp(layout_path)
-    stage = _read_stage_raw(layout)
-    layers = stage["layers"]
-    if layer_index < 0 or layer_index >= len(layers):
-        raise LayoutError(
-            f"Layer index {layer_index} is out of range",
-            f"staged layer count: {len(layers)}",
-        )
-    layer = layers[layer_index]
-    if replace:
-        layer["annotations"] = dict(annotations)
-    else:
-        existing: dict[str, str] = layer.get("annotations") or {}
-        existing.update(annotations)
-        layer["annotations"] = existing
-    _write_stage(layout, stage)
-    ann = layer["annotations"] or None
-    return Descriptor(
-        media_type=layer["media_type"],
-        digest=layer["digest"],
-        size=layer["size"],
-        annotations=ann if ann else None,
-    )
+    session = StageSession(_lp(layout_path))
+    descriptor = session.update_layer_annotations(layer_index, annotations, replace)
+    session.commit()
+    return descriptor
 
 
 def update_config(
@@ -686,43 +1481,10 @@ def update_config(
     :raises LayoutError: If the config has not yet been generated.
     :raises OSError: On I/O errors.
     """
-    layout = _lp(layout_path)
-    stage = _read_stage_raw(layout)
-    if stage["config"] is None:
-        raise LayoutError(
-            "Config not yet generated",
-            "run generate_config first",
-        )
-    old_digest = stage["config"]["digest"]
-    config_bytes = read_blob(layout, old_digest)
-    config_obj = json.loads(config_bytes)
-    if architecture is not None:
-        config_obj["architecture"] = architecture
-    if os_name is not None:
-        config_obj["os"] = os_name
-    if annotations is not None:
-        existing_labels: dict[str, str] = config_obj.get("config", {}).get("Labels") or {}
-        new_labels = dict(annotations) if replace_annotations else {**existing_labels, **annotations}
-        if new_labels:
-            config_obj.setdefault("config", {})["Labels"] = new_labels
-        elif "config" in config_obj and "Labels" in config_obj["config"]:
-            del config_obj["config"]["Labels"]
-    new_bytes = json.dumps(
-        config_obj, separators=(",", ":"), sort_keys=True
-    ).encode("utf-8")
-    if new_bytes == config_bytes:
-        cfg = stage["config"]
-        return Descriptor(
-            media_type=cfg["media_type"],
-            digest=cfg["digest"],
-            size=cfg["size"],
-        )
-    new_digest, new_size = add_blob(layout, new_bytes)
-    _blob_path(layout, old_digest).unlink(missing_ok=True)
-    cfg_media_type = stage["config"]["media_type"]
-    stage["config"] = {"digest": new_digest, "size": new_size, "media_type": cfg_media_type}
-    _write_stage(layout, stage)
-    return Descriptor(media_type=cfg_media_type, digest=new_digest, size=new_size)
+    session = StageSession(_lp(layout_path))
+    descriptor = session.update_config(architecture, os_name, annotations, replace_annotations)
+    session.commit()
+    return descriptor
 
 
 def update_manifest_annotations(
@@ -745,54 +1507,10 @@ def update_manifest_annotations(
     :raises LayoutError: If the manifest has not yet been generated.
     :raises OSError: On I/O errors.
     """
-    layout = _lp(layout_path)
-    stage = _read_stage_raw(layout)
-    if stage["manifest"] is None:
-        raise LayoutError(
-            "Manifest not yet generated",
-            "run generate_manifest first",
-        )
-    old_digest = stage["manifest"]["digest"]
-    manifest_bytes = read_blob(layout, old_digest)
-    manifest_obj = json.loads(manifest_bytes)
-    existing_ann: dict[str, str] = manifest_obj.get("annotations") or {}
-    if replace:
-        manifest_obj["annotations"] = dict(annotations)
-    else:
-        existing_ann.update(annotations)
-        manifest_obj["annotations"] = existing_ann
-    new_bytes = json.dumps(
-        manifest_obj, separators=(",", ":"), sort_keys=True
-    ).encode("utf-8")
-    new_digest, new_size = add_blob(layout, new_bytes)
-    _blob_path(layout, old_digest).unlink(missing_ok=True)
-    # Update index.json: replace old descriptor, preserve ref_name annotation
-    index = _read_index(layout)
-    new_manifests: list[Descriptor] = []
-    updated_desc: Union[Descriptor, None] = None
-    for desc in index.manifests:
-        if desc.digest == old_digest:
-            updated = Descriptor(
-                media_type=desc.media_type,
-                digest=new_digest,
-                size=new_size,
-                annotations=desc.annotations,  # keep index-level annotations (ref.name)
-            )
-            new_manifests.append(updated)
-            updated_desc = updated
-        else:
-            new_manifests.append(desc)
-    index.manifests = new_manifests
-    _write_index(layout, index)
-    stage["manifest"]["digest"] = new_digest
-    stage["manifest"]["size"] = new_size
-    stage["manifest"]["annotations"] = manifest_obj.get("annotations") or {}
-    _write_stage(layout, stage)
-    return updated_desc or Descriptor(
-        media_type=stage["manifest"]["media_type"],
-        digest=new_digest,
-        size=new_size,
-    )
+    session = StageSession(_lp(layout_path))
+    descriptor = session.update_manifest_annotations(annotations, replace)
+    session.commit()
+    return descriptor
 
 
 # ===========================================================================
@@ -807,7 +1525,7 @@ class BlobPushReport:
     digest: str
     size: int
     media_type: str
-    action: str  # "uploaded", "skipped"
+    action: str  # "uploaded", "mounted", "skipped"
 
 
 @dataclass
@@ -830,6 +1548,7 @@ class PushResult:
     manifests: list[ManifestPushReport] = field(default_factory=list)
     manifests_pushed: int = 0
     blobs_uploaded: int = 0
+    blobs_mounted: int = 0
     blobs_skipped: int = 0
     bytes_uploaded: int = 0
 
@@ -842,6 +1561,40 @@ def _collect_blob_descriptors(manifest: ImageManifest) -> list[Descriptor]:
     return blobs
 
 
+def _try_mount(
+    mount_blob,
+    client,
+    repo: str,
+    digest: str,
+    hints,
+    known_blobs,
+) -> Union[str, None]:
+    """Try to cross-repository mount *digest* into *repo*.
+
+    Candidates are the caller's *hints* followed by repositories the
+    known-blob store has recently seen the digest in, at most
+    :data:`_MAX_MOUNT_ATTEMPTS` of them.  A ``202`` (mount not performed)
+    or an error for one source moves on to the next; :func:`mount_blob`
+    cancels the upload session a ``202`` opens, so none is left behind.
+
+    :returns: The source repository the blob was mounted from, or ``None``
+        if the blob still has to be uploaded.
+    """
+    registry = client.config.registry
+    candidates = [hint.removeprefix(f"{registry}/") for hint in hints]
+    if known_blobs is not None:
+        candidates += known_blobs.mount_sources(registry, digest, exclude=repo)
+    candidates = [c for c in dict.fromkeys(candidates) if c != repo]
+
+    for source in candidates[:_MAX_MOUNT_ATTEMPTS]:
+        try:
+            mount_blob(client, repo, digest, source)
+        except (AuthError, BlobError):
+            continue
+        return source
+    return None
+
+
 @track_scenario("layout push")
 def push_layout(
     layout_path: Union[str, Path],
@@ -850,8 +1603,11 @@ def push_layout(
     tag_override: Union[str, None] = None,
     force: bool = False,
     chunked: bool = False,
-    chunk_size: int = 65536,
+    chunk_size: int = _DEFAULT_CHUNK_SIZE,
     progress_callback=None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    mount_from: Union[list[str], None] = None,
+    full: bool = False,
 ) -> PushResult:
     """Push an OCI Image Layout to a remote registry.
 
@@ -859,6 +1615,10 @@ def push_layout(
     referenced blobs (layers and configs), uploads every blob, then pushes
     each manifest.
 
+    A blob the registry does not have yet is first cross-repository
+    mounted when a source is available — from *mount_from* or from the
+    active known-blob store — and uploaded only if no mount succeeds.
+
     :param layout_path: Root of a valid, completed OCI Image Layout.
     :param client: An authenticated
         :class:`~regshape.libs.transport.RegistryClient`.
@@ -867,13 +1627,27 @@ def push_layout(
         for single-manifest layouts. Must be ``None`` when the layout
         contains multiple manifests.
     :param force: If ``True``, skip ``HEAD`` existence checks and upload
-        all blobs unconditionally.
+        all blobs unconditionally.  Otherwise, while a known-blob store is
+        active (:func:`~regshape.libs.blobs.known.use_known_blobs`), blobs
+        it has confirmed for *repo* are skipped without a ``HEAD``.
     :param chunked: If ``True``, use the chunked upload protocol.
-    :param chunk_size: Chunk size in bytes (used when *chunked* is ``True``).
+        Otherwise each blob is uploaded in one request straight from a
+        memory-mapped view (see :func:`read_blob_view`), so it is not
+        copied into memory either way.
+    :param chunk_size: Initial chunk size in bytes (used when *chunked* is
+        ``True``; default 1 MiB, as for
+        :func:`~regshape.libs.blobs.operations.upload_blob_chunked`).
     :param progress_callback: Optional callable invoked as
         ``progress_callback(event, **kwargs)`` for UI feedback.  Events:
-        ``"blob_start"``, ``"blob_skip"``, ``"blob_done"``,
-        ``"manifest_done"``.
+        ``"blob_start"``, ``"blob_skip"``, ``"blob_mount"``,
+        ``"blob_done"``, ``"manifest_done"``.
+    :param concurrency: Maximum number of concurrent ``HEAD`` existence
+        checks per manifest.
+    :param mount_from: Repositories on the same registry (``name`` or
+        ``registry/name``) to try as cross-repository mount sources before
+        uploading, in order.
+    :param full: Re-hash every blob during the up-front validation instead
+        of trusting the layout's verification cache.
     :returns: A :class:`PushResult` with per-manifest reports and summary
         statistics.
     :raises LayoutError: If the layout is invalid or incomplete.
@@ -881,11 +1655,13 @@ def push_layout(
     :raises regshape.libs.errors.BlobError: On blob upload failure.
     :raises regshape.libs.errors.ManifestError: On manifest push failure.
     """
-    from regshape.libs.blobs import head_blob, upload_blob, upload_blob_chunked
+    from regshape.libs.blobs import head_blobs, mount_blob, upload_blob, upload_blob_chunked
     from regshape.libs.manifests import push_manifest
 
     layout = _lp(layout_path)
-    validate_layout(layout)
+    validate_layout(layout, full=full)
+    # Every blob was verified just now; reads below reuse those results.
+    verified = VerificationCache(layout)
 
     index = _read_index(layout)
     if not index.manifests:
@@ -907,9 +1683,10 @@ def push_layout(
 
     # Track blobs already uploaded in this session to avoid duplicate work
     uploaded_digests: set[str] = set()
+    known_blobs = get_known_blob_store()
 
     for entry_idx, entry in enumerate(index.manifests):
-        manifest_bytes = read_blob(layout, entry.digest)
+        manifest_bytes = _read_verified_blob(layout, entry.digest, verified)
         manifest_obj = parse_manifest(manifest_bytes.decode("utf-8"))
         if not isinstance(manifest_obj, ImageManifest):
             raise LayoutError(
@@ -924,6 +1701,23 @@ def push_layout(
             media_type=entry.media_type,
         )
 
+        # Check existence of this manifest's new blobs concurrently unless
+        # --force; blobs the known-blob index already vouches for skip the HEAD.
+        existing: set[str] = set()
+        if not force:
+            to_check = list(dict.fromkeys(
+                d.digest for d in blob_descs if d.digest not in uploaded_digests
+            ))
+            if known_blobs is not None:
+                existing = {
+                    d for d in to_check
+                    if known_blobs.is_known(client.config.registry, repo, d)
+                }
+                to_check = [d for d in to_check if d not in existing]
+            if to_check:
+                found = head_blobs(client, repo, to_check, concurrency)
+                existing.update(d for d, info in found.items() if info is not None)
+
         # -- Upload blobs --
         for blob_desc in blob_descs:
             if blob_desc.digest in uploaded_digests:
@@ -940,18 +1734,7 @@ def push_layout(
                                       size=blob_desc.size)
                 continue
 
-            # Check existence unless --force
-            exists = False
-            if not force:
-                try:
-                    head_blob(client, repo, blob_desc.digest)
-                    exists = True
-                except BlobError as exc:
-                    if exc.status_code is not None and exc.status_code != 404:
-                        raise
-                    exists = False
-
-            if exists:
+            if blob_desc.digest in existing:
                 uploaded_digests.add(blob_desc.digest)
                 blob_report = BlobPushReport(
                     digest=blob_desc.digest,
@@ -966,6 +1749,26 @@ def push_layout(
                                       size=blob_desc.size)
                 continue
 
+            # Cross-repository mount from a repo known to hold the blob
+            if not force:
+                source = _try_mount(
+                    mount_blob, client, repo, blob_desc.digest,
+                    mount_from or (), known_blobs,
+                )
+                if source is not None:
+                    uploaded_digests.add(blob_desc.digest)
+                    manifest_report.blobs.append(BlobPushReport(
+                        digest=blob_desc.digest,
+                        size=blob_desc.size,
+                        media_type=blob_desc.media_type,
+                        action="mounted",
+                    ))
+                    result.blobs_mounted += 1
+                    if progress_callback:
+                        progress_callback("blob_mount", digest=blob_desc.digest,
+                                          size=blob_desc.size, source=source)
+                    continue
+
             # Upload
             if progress_callback:
                 progress_callback("blob_start", digest=blob_desc.digest,
@@ -981,8 +1784,8 @@ def push_layout(
                         chunk_size=chunk_size,
                     )
             else:
-                blob_data = read_blob(layout, blob_desc.digest)
-                upload_blob(client, repo, blob_data, blob_desc.digest)
+                with _view_verified_blob(layout, blob_desc.digest, verified) as blob_view:
+                    upload_blob(client, repo, blob_view, blob_desc.digest)
 
             uploaded_digests.add(blob_desc.digest)
             blob_report = BlobPushReport(
@@ -1018,3 +1821,302 @@ def push_layout(
                               reference=reference)
 
     return result
+
+
+# ===========================================================================
+# Archive (tar) operations
+# ===========================================================================
+
+
+@dataclass
+class ArchiveResult:
+    """Summary of a layout streamed to or from a tar archive.
+
+    :param manifests: ``index.json`` entries carried by the archive.
+    :param blobs: Number of blobs in the archive.
+    :param blob_bytes: Total size of those blobs.
+    """
+    manifests: list[Descriptor] = field(default_factory=list)
+    blobs: int = 0
+    blob_bytes: int = 0
+
+
+class _HashingReader:
+    """Reader passing *source* through while hashing what is read."""
+
+    def __init__(self, source: BinaryIO, algorithm: str) -> None:
+        self._source = source
+        self.hasher = hashlib.new(algorithm)
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._source.read(size)
+        self.hasher.update(data)
+        return data
+
+
+def _archive_member(name: str, size: int = 0, directory: bool = False) -> tarfile.TarInfo:
+    # Zero mtime and fixed ownership keep archives of a layout reproducible.
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = 0
+    if directory:
+        info.type = tarfile.DIRTYPE
+        info.mode = 0o755
+    else:
+        info.mode = 0o644
+    return info
+
+
+def _archive_blob_digest(name: str) -> Union[str, None]:
+    """Return the digest of the archive entry *name* if it is a blob path."""
+    parts = name.split("/")
+    if len(parts) != 3 or parts[0] != _BLOBS_DIR:
+        return None
+    algorithm, hex_digest = parts[1], parts[2]
+    if algorithm not in _HEX_DIGEST_LENGTHS:
+        return None
+    if not re.fullmatch(f"[0-9a-f]{{{_HEX_DIGEST_LENGTHS[algorithm]}}}", hex_digest):
+        return None
+    return f"{algorithm}:{hex_digest}"
+
+
+def _check_archive_digest(digest: str, hasher) -> None:
+    """Raise :class:`LayoutError` unless *hasher* holds the content of *digest*."""
+    actual = f"{hasher.name}:{hasher.hexdigest()}"
+    if actual != digest:
+        raise LayoutError(
+            f"Blob {digest} does not match its digest",
+            f"content hashes to {actual}",
+        )
+
+
+def export_layout_archive(
+    layout_path: Union[str, Path],
+    fileobj: BinaryIO,
+    compression: Union[str, None] = None,
+) -> ArchiveResult:
+    """Stream the layout at *layout_path* into *fileobj* as a tar archive.
+
+    The archive has the layout's own structure (``oci-layout``,
+    ``index.json``, ``blobs/<alg>/<hex>``), so extracting it gives back the
+    layout.  It is written sequentially and never seeks, so *fileobj* may
+    be a pipe or standard output.  ``oci-layout`` and ``index.json`` come
+    first, then each manifest followed by its config and layers (nested
+    indexes depth-first), then any other blob in the store.  A consumer
+    can therefore start on an image before the rest of the archive has
+    arrived.  Every blob is hashed while it is copied.  Staging and cache
+    files are not included.
+
+    :param layout_path: Root of an initialised OCI Image Layout.
+    :param fileobj: Writable binary file-like object.
+    :param compression: ``"gzip"`` to gzip the archive, or ``None``.
+    :returns: :class:`ArchiveResult` for the written archive.
+    :raises LayoutError: If *layout_path* is not an initialised layout, or a
+        blob is missing or does not match its digest.  The archive is
+        incomplete in that case.
+    :raises OSError: On I/O errors.
+    """
+    layout = _lp(layout_path)
+    _validate_is_layout(layout)
+    # Both files are read under the lock so they match each other.
+    with layout_lock(layout):
+        marker = _oci_layout_file(layout).read_bytes()
+        index_bytes = _index_file(layout).read_bytes()
+        index = _read_index(layout)
+
+    result = ArchiveResult(manifests=list(index.manifests))
+    written: set[str] = set()
+    algorithm_dirs: set[str] = set()
+    mode = "w|gz" if compression == "gzip" else "w|"
+    with tarfile.open(fileobj=fileobj, mode=mode) as tar:
+        tar.addfile(_archive_member(_OCI_LAYOUT_FILE, len(marker)), io.BytesIO(marker))
+        tar.addfile(_archive_member(_INDEX_FILE, len(index_bytes)), io.BytesIO(index_bytes))
+        tar.addfile(_archive_member(_BLOBS_DIR, directory=True))
+
+        def add(digest: str, content: Union[bytes, None] = None) -> None:
+            if digest in written:
+                return
+            algorithm = _digest_algorithm(digest)
+            if algorithm not in algorithm_dirs:
+                tar.addfile(_archive_member(f"{_BLOBS_DIR}/{algorithm}", directory=True))
+                algorithm_dirs.add(algorithm)
+            written.add(digest)
+            blob = _blob_path(layout, digest)
+            name = f"{_BLOBS_DIR}/{algorithm}/{digest.split(':', 1)[1]}"
+            if content is not None:
+                # In-memory content is checked before it reaches the archive.
+                size = len(content)
+                _check_archive_digest(digest, hashlib.new(algorithm, content))
+                tar.addfile(_archive_member(name, size), io.BytesIO(content))
+            else:
+                try:
+                    fh = open(blob, "rb")
+                except FileNotFoundError as exc:
+                    raise LayoutError(f"Blob {digest} not found in layout", str(exc)) from exc
+                with fh:
+                    size = os.fstat(fh.fileno()).st_size
+                    reader = _HashingReader(fh, algorithm)
+                    tar.addfile(_archive_member(name, size), reader)
+                _check_archive_digest(digest, reader.hasher)
+            result.blobs += 1
+            result.blob_bytes += size
+
+        pending = [entry.digest for entry in reversed(index.manifests)]
+        while pending:
+            digest = pending.pop()
+            if digest in written:
+                continue
+            _digest_algorithm(digest)
+            try:
+                content = _blob_path(layout, digest).read_bytes()
+            except FileNotFoundError as exc:
+                raise LayoutError(f"Blob {digest} not found in layout", str(exc)) from exc
+            add(digest, content)
+            try:
+                manifest = parse_manifest(content.decode("utf-8"))
+            except Exception:
+                continue
+            if isinstance(manifest, ImageManifest):
+                for descriptor in [manifest.config, *manifest.layers]:
+                    add(descriptor.digest)
+            elif isinstance(manifest, ImageIndex):
+                pending.extend(entry.digest for entry in reversed(manifest.manifests))
+
+        for algorithm in sorted(_HEX_DIGEST_LENGTHS):
+            blobs_dir = layout / _BLOBS_DIR / algorithm
+            if not blobs_dir.is_dir():
+                continue
+            for blob in sorted(blobs_dir.iterdir()):
+                digest = _archive_blob_digest(f"{_BLOBS_DIR}/{algorithm}/{blob.name}")
+                if digest is not None:
+                    add(digest)
+    return result
+
+
+def import_layout_archive(
+    fileobj: BinaryIO,
+    layout_path: Union[str, Path],
+) -> ArchiveResult:
+    """Unpack a layout tar archive read from *fileobj* into *layout_path*.
+
+    The archive is read sequentially, so *fileobj* may be a pipe or
+    standard input; gzip-compressed archives are detected.  Nothing is
+    extracted to a temporary directory: each blob is streamed straight into
+    the blob store, verified against the digest in its name, and renamed
+    into place.  Blobs the layout already has are skipped.  ``index.json``
+    is merged into the layout's index last, once every blob is in, so an
+    interrupted import adds no entries.
+
+    *layout_path* may be an existing layout, which gains the archive's
+    images, or a new or empty directory, which is initialised first.
+    Entries other than ``oci-layout``, ``index.json`` and
+    ``blobs/<alg>/<hex>`` are ignored.
+
+    :param fileobj: Readable binary file-like object with the archive.
+    :param layout_path: Destination layout root.
+    :returns: :class:`ArchiveResult` for the imported archive.
+    :raises LayoutError: If *layout_path* is a non-empty directory that is
+        not a layout, the archive is not a valid tar or not an OCI Image
+        Layout, a blob does not match its digest, or a manifest, config or
+        layer reachable from the archive's ``index.json`` is in neither the
+        archive nor the layout.
+    :raises OSError: On I/O errors.
+    """
+    layout = _lp(layout_path)
+    if not _oci_layout_file(layout).exists():
+        if layout.exists() and any(layout.iterdir()):
+            raise LayoutError(
+                f"{layout} is not empty and is not an OCI Image Layout",
+                "import into a new directory or an existing layout",
+            )
+        init_layout(layout)
+
+    result = ArchiveResult()
+    index = None
+    version = None
+    try:
+        with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+            for member in tar:
+                name = member.name[2:] if member.name.startswith("./") else member.name
+                if member.isdir():
+                    continue
+                if name == _OCI_LAYOUT_FILE:
+                    try:
+                        version = json.loads(tar.extractfile(member).read()).get(
+                            "imageLayoutVersion"
+                        )
+                    except (ValueError, AttributeError) as exc:
+                        raise LayoutError("oci-layout marker in archive is malformed", str(exc)) from exc
+                    continue
+                if name == _INDEX_FILE:
+                    try:
+                        index = parse_manifest(tar.extractfile(member).read().decode("utf-8"))
+                    except Exception as exc:
+                        raise LayoutError(
+                            "index.json in archive is not a valid OCI Image Index", str(exc)
+                        ) from exc
+                    continue
+                digest = _archive_blob_digest(name)
+                if digest is None:
+                    continue
+                if not member.isreg():
+                    raise LayoutError(
+                        f"Archive entry {name} is not a regular file",
+                        "blobs must be stored as regular files",
+                    )
+                result.blobs += 1
+                result.blob_bytes += member.size
+                if not _blob_path(layout, digest).exists():
+                    _write_blob_from_reader(
+                        layout, tar.extractfile(member),
+                        algorithm=_digest_algorithm(digest), expected_digest=digest,
+                    )
+    except tarfile.TarError as exc:
+        raise LayoutError("Archive is not a valid tar file", str(exc)) from exc
+
+    if version is None or not isinstance(index, ImageIndex):
+        raise LayoutError(
+            "Archive is not an OCI Image Layout",
+            "oci-layout and index.json are required",
+        )
+    if version != _OCI_LAYOUT_VERSION:
+        raise LayoutError(
+            f"Invalid imageLayoutVersion in archive: {version!r}",
+            f"expected {_OCI_LAYOUT_VERSION!r}",
+        )
+    # Every blob reachable from the archive's index.json must now be in the
+    # layout; merging the index otherwise leaves the layout invalid.
+    pending = [(entry.digest, "index.json in archive", True) for entry in index.manifests]
+    seen: set[str] = set()
+    while pending:
+        digest, referrer, is_manifest = pending.pop()
+        if digest in seen:
+            continue
+        seen.add(digest)
+        _digest_algorithm(digest)
+        blob = _blob_path(layout, digest)
+        if not blob.exists():
+            raise LayoutError(
+                f"{referrer} references missing blob {digest}",
+                "the archive is incomplete",
+            )
+        if not is_manifest:
+            continue
+        try:
+            manifest = parse_manifest(blob.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        if isinstance(manifest, ImageManifest):
+            pending.extend(
+                (descriptor.digest, f"manifest {digest}", False)
+                for descriptor in [manifest.config, *manifest.layers]
+            )
+        elif isinstance(manifest, ImageIndex):
+            pending.extend(
+                (entry.digest, f"index {digest}", True) for entry in manifest.manifests
+            )
+    with index_batch(layout) as batch:
+        for descriptor in index.manifests:
+            batch.add(descriptor)
+    result.manifests = list(index.manifests)
+    return result
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+"""
+:mod:`regshape.libs.layout.verify` - Verified-digest cache for layout blobs
+===========================================================================
+
+.. module:: regshape.libs.layout.verify
+   :platform: Unix, Windows
+   :synopsis: :class:`VerificationCache` records which blobs of an OCI Image
+              Layout have already been hashed and found to match their
+              digest, keyed by the blob's path, size, ``st_mtime_ns`` and
+              inode.  ``validate_layout``, ``read_blob`` and ``push_layout``
+              consult it so a blob that has not changed on disk since it was
+              last verified is not re-hashed.  A rewritten, truncated or
+              replaced file changes at least one of the keyed fields and is
+              hashed again; ``full=True`` (``--full`` on the CLI) ignores the
+              cache for tampering that preserves all of them.
+              :func:`map_file` gives a zero-copy, memory-mapped view of a
+              blob for hashing and uploading.
+
+.. moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+# Cache file kept in the layout root, next to the staging file.
+VERIFY_CACHE_FILE = ".regshape-verified.json"
+
+_CACHE_VERSION = 1
+
+# Bytes read per step when hashing a blob.
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Files modified this recently are not recorded.  File timestamps come from
+# a coarse kernel clock, so a same-size rewrite right after verification
+# can leave size, mtime and inode all unchanged ("racy git").
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def _stat_key(st: os.stat_result) -> list[int]:
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def hash_file(path: Path, algorithm: str = "sha256", chunk_size: int = _HASH_CHUNK_SIZE) -> str:
+    """Return the ``<algorithm>:<hex>`` digest of the file at *path*.
+
+    The file is read in *chunk_size* pieces, never whole.
+    """
+    hasher = hashlib.new(algorithm)
+    with open(path, "rb") as fh:
+        while True:
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return f"{algorithm}:{hasher.hexdigest()}"
+
+
+@contextmanager
+def map_file(fh: BinaryIO) -> Iterator[memoryview]:
+    """Map the open file *fh* read-only and yield a view of its content.
+
+    The view is backed by the kernel page cache: nothing is copied into the
+    process, pages are loaded on demand and shared with every other process
+    or thread mapping or reading the same file.  It can be hashed, sliced
+    and sent as a request body like ``bytes``.  Neither the view nor any
+    slice of it may be used after the block exits.
+
+    :param fh: File opened in binary read mode.
+    :raises OSError: If the file cannot be mapped.
+    """
+    if os.fstat(fh.fileno()).st_size == 0:
+        # Empty files cannot be mapped.
+        yield memoryview(b"")
+        return
+    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            yield view
+        finally:
+            view.release()
+
+
+class VerificationCache:
+    """Blobs of one layout known to match their digest.
+
+    Entries map a blob path relative to the layout root to the
+    ``[size, mtime_ns, inode]`` it had when it was verified.  The cache is
+    advisory: a missing, corrupt or stale file only means blobs are hashed
+    again.  Safe to use from several threads.
+
+    :param layout: Layout root.
+    :param full: Ignore existing entries (every blob is re-hashed); blobs
+        verified now are still recorded.
+    """
+
+    def __init__(self, layout: Path, full: bool = False) -> None:
+        self.layout = Path(layout)
+        self.path = self.layout / VERIFY_CACHE_FILE
+        self._entries: dict[str, list[int]] = {} if full else self._load()
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, list[int]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != _CACHE_VERSION:
+            return {}
+        entries = data.get("entries")
+        return entries if isinstance(entries, dict) else {}
+
+    def _key(self, blob: Path) -> str:
+        return blob.relative_to(self.layout).as_posix()
+
+    def is_verified(self, blob: Path, st: os.stat_result) -> bool:
+        """Return whether *blob*, with stat result *st*, was verified before."""
+        return self._entries.get(self._key(blob)) == _stat_key(st)
+
+    def mark_verified(self, blob: Path, st: os.stat_result) -> None:
+        """Record that *blob* matched its digest when it had stat result *st*.
+
+        Pass the stat taken *before* hashing, so a file modified while it
+        was being read is not recorded with its new metadata.  Files
+        modified within the last two seconds are not recorded.
+        """
+        if time.time_ns() - st.st_mtime_ns < _RACY_WINDOW_NS:
+            return
+        key, value = self._key(blob), _stat_key(st)
+        with self._lock:
+            if self._entries.get(key) != value:
+                self._entries[key] = value
+                self.dirty = True
+
+    def verify(self, blob: Path, digest: str) -> Optional[str]:
+        """Check *blob* against *digest*, hashing only when necessary.
+
+        :param blob: Blob file path inside the layout.
+        :param digest: Expected ``<algorithm>:<hex>`` digest.
+        :returns: ``None`` when the blob matches, else the computed digest.
+        :raises OSError: If the blob cannot be read.
+        """
+        st = blob.stat()
+        if self.is_verified(blob, st):
+            return None
+        actual = hash_file(blob, digest.split(":", 1)[0])
+        if actual != digest:
+            return actual
+        self.mark_verified(blob, st)
+        return None
+
+    def save(self) -> None:
+        """Write the cache back to the layout if anything was recorded.
+
+        Entries for blobs that no longer exist are dropped.  Failures are
+        ignored: the cache only saves work.
+        """
+        with self._lock:
+            if not self.dirty:
+                return
+            entries = {
+                key: value for key, value in self._entries.items()
+                if (self.layout / key).exists()
+            }
+        content = json.dumps({"version": _CACHE_VERSION, "entries": entries})
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.layout, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    fh.write(content)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            return
+        self.dirty = False
@@ -17,6 +17,11 @@
 
 from regshape.libs.transport.client import RegistryClient, TransportConfig
 from regshape.libs.transport.models import RegistryRequest, RegistryResponse
+from regshape.libs.transport.pool import (
+    RegistryClientPool,
+    get_client_pool,
+    use_client_pool,
+)
 from regshape.libs.transport.middleware import (
     Middleware,
     BaseMiddleware, 
@@ -33,6 +38,9 @@ from regshape.libs.transport.middleware import (
 __all__ = [
     "RegistryClient",
     "TransportConfig",
+    "RegistryClientPool",
+    "get_client_pool",
+    "use_client_pool",
     "RegistryRequest", 
     "RegistryResponse",
     "Middleware",
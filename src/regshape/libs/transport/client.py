@@ -13,6 +13,10 @@
               HTTP call to http_request so that --debug-calls telemetry
               is available for free.
 
+              Blob GET/HEAD redirects to storage backends are followed by
+              the client itself: credentials stay on the registry host and
+              the signed storage URL is reused until it expires.
+
               TransportConfig is a plain dataclass that carries the
               per-registry connection settings.
 
@@ -34,6 +38,11 @@ from regshape.libs.transport.middleware import (
     _normalize_www_authenticate,
 )
 from regshape.libs.transport.models import RegistryRequest, RegistryResponse
+from regshape.libs.transport.pool import create_session, get_client_pool
+from regshape.libs.transport.redirects import (
+    MAX_REDIRECTS, REDIRECT_STATUSES, STALE_STATUSES, RedirectCache,
+    is_blob_fetch, redirect_headers, redirect_target, same_origin,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -121,11 +130,25 @@ class RegistryClient:
 
     def __init__(self, config: TransportConfig) -> None:
         self.config = config
-        # Resolve credentials once - domain modules and CLI commands never
-        # call resolve_credentials() directly.
-        self._username, self._password = resolve_credentials(
-            config.registry, config.username, config.password
-        )
+        # Inside a RegistryClientPool (e.g. ``regshape batch``) credentials,
+        # negotiated auth headers and the keep-alive session are shared by
+        # every client of the same registry.
+        self._session: Optional[requests.Session] = None
+        self._auth_cache: dict = {}
+        self._redirects = RedirectCache()
+        pool = get_client_pool()
+        if pool is not None:
+            state = pool.state_for(config.registry, config.username, config.password)
+            self._username, self._password = state.username, state.password
+            self._session = state.session
+            self._auth_cache = state.auth_cache
+            self._redirects = state.redirect_cache
+        else:
+            # Resolve credentials once - domain modules and CLI commands never
+            # call resolve_credentials() directly.
+            self._username, self._password = resolve_credentials(
+                config.registry, config.username, config.password
+            )
         # Store the last response for access to headers (e.g., pagination)
         self.last_response: Optional[requests.Response] = None
         
@@ -169,6 +192,7 @@ class RegistryClient:
                 username=self._username,
                 password=self._password,
                 registry=self.config.registry,
+                auth_cache=self._auth_cache,
             )
         )
         
@@ -203,15 +227,19 @@ class RegistryClient:
         url = f"{self.base_url}{request.url}" if request.url.startswith('/') else request.url
         
         # Use http_request for telemetry (--debug-calls)
-        response = http_request(
-            url=url,
-            method=request.method,
-            headers=request.headers,
-            data=request.body,
-            stream=request.stream,
-            params=request.params,
-            timeout=request.timeout or self.config.timeout
-        )
+        if is_blob_fetch(request.method, request.url) and request.url.startswith('/'):
+            response = self._fetch_blob(request, url)
+        else:
+            response = http_request(
+                url=url,
+                method=request.method,
+                headers=request.headers,
+                data=request.body,
+                stream=request.stream,
+                params=request.params,
+                timeout=request.timeout or self.config.timeout,
+                **self._session_kwargs(),
+            )
         
         # Store for backward compatibility
         self.last_response = response
@@ -222,6 +250,86 @@ class RegistryClient:
         # for callers (e.g. blob downloads).
         return RegistryResponse.from_requests_response(response, stream=request.stream)
 
+    def _fetch_blob(self, request: RegistryRequest, url: str) -> requests.Response:
+        """Issue a blob GET/HEAD, following storage redirects explicitly.
+
+        A storage URL cached for *url* is tried first; if the storage host
+        rejects it (expired or revoked signature) the entry is dropped and
+        the registry is asked again.  Redirects are followed hop by hop,
+        with credential headers removed for any host other than the
+        registry, and the final target of a successful fetch is cached
+        until its signature expires.  Requests to a storage host are
+        flagged so telemetry attributes them separately.
+
+        :param request: Blob request from the middleware pipeline.
+        :param url: Absolute registry URL of the blob.
+        :returns: The final response.
+        """
+        kwargs = dict(
+            data=request.body,
+            stream=request.stream,
+            params=request.params,
+            timeout=request.timeout or self.config.timeout,
+            allow_redirects=False,
+            **self._session_kwargs(),
+        )
+        # Query parameters are not part of the cache key, so such requests
+        # neither use nor populate the cache.
+        cacheable = not request.params
+
+        cached = self._redirects.get(url) if cacheable else None
+        if cached is not None:
+            response = http_request(
+                url=cached,
+                method=request.method,
+                headers=redirect_headers(request.headers, url, cached),
+                storage=not same_origin(url, cached),
+                **kwargs,
+            )
+            if response.status_code not in STALE_STATUSES:
+                return response
+            response.close()
+            self._redirects.discard(url)
+
+        response = http_request(
+            url=url, method=request.method, headers=request.headers, **kwargs
+        )
+        current = url
+        for _ in range(MAX_REDIRECTS):
+            location = response.headers.get("Location")
+            if response.status_code not in REDIRECT_STATUSES or not location:
+                break
+            current = redirect_target(current, location)
+            response.close()
+            response = http_request(
+                url=current,
+                method=request.method,
+                headers=redirect_headers(request.headers, url, current),
+                storage=not same_origin(url, current),
+                **kwargs,
+            )
+        if cacheable and current != url and 200 <= response.status_code < 300:
+            self._redirects.put(url, current)
+        return response
+
+    def enable_connection_pool(self, max_connections: int) -> None:
+        """Route requests through a keep-alive session holding up to
+        *max_connections* connections.
+
+        Bulk operations call this before issuing concurrent requests so that
+        worker threads reuse connections instead of opening one per request.
+        A client that already has a session (e.g. inside a
+        :class:`~regshape.libs.transport.pool.RegistryClientPool`) keeps it.
+
+        :param max_connections: Connection pool size per host.
+        """
+        if self._session is None:
+            self._session = create_session(max_connections)
+
+    def _session_kwargs(self) -> dict:
+        """Keyword arguments routing http_request through the shared session."""
+        return {"session": self._session} if self._session is not None else {}
+
     def _legacy_authenticate_and_retry(
         self, 
         method: str, 
@@ -231,6 +339,7 @@ class RegistryClient:
         **kwargs
     ) -> requests.Response:
         """Legacy authentication handling for when middleware is disabled."""
+        kwargs.update(self._session_kwargs())
         response = http_request(url, method, headers=req_headers, timeout=timeout, **kwargs)
         self.last_response = response
 
@@ -243,7 +352,9 @@ class RegistryClient:
             # Some registries (e.g. ACR) only return WWW-Authenticate on
             # the /v2/ endpoint.  Fall back to a /v2/ probe.
             v2_url = f"{self.base_url}/v2/"
-            v2_resp = http_request(v2_url, "GET", headers={}, timeout=timeout)
+            v2_resp = http_request(
+                v2_url, "GET", headers={}, timeout=timeout, **self._session_kwargs()
+            )
             if v2_resp.status_code == 401:
                 www_auth = v2_resp.headers.get("WWW-Authenticate", "")
             if not www_auth:
@@ -14,7 +14,7 @@
 """
 
 from abc import ABC
-from typing import Protocol, Callable
+from typing import Callable, Optional, Protocol
 
 from regshape.libs.auth import registryauth
 from regshape.libs.errors import AuthError
@@ -345,20 +345,49 @@ class AuthMiddleware(BaseMiddleware):
     This supports Basic, Bearer (authenticated), and Bearer (anonymous)
     registry flows.
 
+    The negotiated ``Authorization`` header is remembered in *auth_cache*
+    (per repository and pull/push scope for Bearer tokens, registry-wide for
+    Basic) and sent preemptively on later requests, so only the first request
+    per scope pays for the 401 round-trip.  A 401 on a preemptively
+    authorised request drops the cached entry and renegotiates.
+
     :param username: Username for authentication, or ``None``.
     :param password: Password for authentication, or ``None``.
     :param registry: Registry hostname, used only in error messages.
+    :param auth_cache: Dict used to remember negotiated headers.  Pass the
+        same dict to several middlewares to share tokens between clients.
     """
 
+    # Cache key for registry-wide (Basic) credentials.
+    _BASIC_KEY = ("*", "*")
+
     def __init__(
         self,
         username: Optional[str] = None,
         password: Optional[str] = None,
         registry: str = "<unknown>",
+        auth_cache: Optional[dict] = None,
     ):
         self._username = username
         self._password = password
         self._registry = registry
+        self._auth_cache = auth_cache if auth_cache is not None else {}
+
+    @staticmethod
+    def _scope_key(request: RegistryRequest) -> tuple:
+        """Return the cache key approximating the token scope of *request*."""
+        path = request.url
+        if "://" in path:
+            path = "/" + path.split("://", 1)[1].partition("/")[2]
+        path = path.split("?", 1)[0]
+        repository = ""
+        for marker in ("/blobs/", "/manifests/", "/tags/", "/referrers/"):
+            if marker in path:
+                repository = path[len("/v2/"):path.index(marker)]
+                break
+        action = "pull" if request.method.upper() in ("GET", "HEAD") else "push"
+        mount_from = (request.params or {}).get("from", "")
+        return (repository, action, mount_from)
 
     # -- Override __call__ to get access to next_handler for the retry ------
 
@@ -369,6 +398,20 @@ class AuthMiddleware(BaseMiddleware):
     ) -> RegistryResponse:
         """Execute the request and handle 401 challenges."""
         processed_request = request
+        scope_key = self._scope_key(request)
+        cached = None
+        if not any(k.lower() == "authorization" for k in request.headers):
+            cached = self._auth_cache.get(self._BASIC_KEY) or self._auth_cache.get(scope_key)
+            if cached is not None:
+                request = RegistryRequest(
+                    method=request.method,
+                    url=request.url,
+                    headers={**request.headers, "Authorization": cached},
+                    body=request.body,
+                    stream=request.stream,
+                    params=request.params,
+                    timeout=request.timeout,
+                )
         try:
             processed_request = self.process_request(request)
             response = next_handler(processed_request)
@@ -378,6 +421,11 @@ class AuthMiddleware(BaseMiddleware):
         if response.status_code != 401:
             return response
 
+        if cached is not None:
+            # The remembered header expired or lacks scope — renegotiate.
+            self._auth_cache.pop(self._BASIC_KEY, None)
+            self._auth_cache.pop(scope_key, None)
+
         # ---- 401 handling ------------------------------------------------
         www_auth = _get_header_ci(response.headers, "WWW-Authenticate")
         if not www_auth:
@@ -411,8 +459,9 @@ class AuthMiddleware(BaseMiddleware):
         )
 
         # Build the retry request with the negotiated Authorization header.
+        authorization = f"{normalized_scheme} {auth_value}"
         retry_headers = dict(processed_request.headers)
-        retry_headers["Authorization"] = f"{normalized_scheme} {auth_value}"
+        retry_headers["Authorization"] = authorization
         retry_request = RegistryRequest(
             method=processed_request.method,
             url=processed_request.url,
@@ -423,7 +472,11 @@ class AuthMiddleware(BaseMiddleware):
             timeout=processed_request.timeout,
         )
 
-        return next_handler(retry_request)
+        retry_response = next_handler(retry_request)
+        if retry_response.status_code != 401:
+            key = self._BASIC_KEY if normalized_scheme.lower() == "basic" else scope_key
+            self._auth_cache[key] = authorization
+        return retry_response
 
     # -- Private helpers ---------------------------------------------------
 
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+"""
+:mod:`regshape.libs.transport.pool` - Shared registry client state
+===================================================================
+
+.. module:: regshape.libs.transport.pool
+   :platform: Unix, Windows
+   :synopsis: :class:`RegistryClientPool` lets many operations in one
+              process share what is expensive about a
+              :class:`~regshape.libs.transport.client.RegistryClient`:
+              resolved credentials (a credential helper may spawn a
+              process), negotiated ``Authorization`` headers, and a
+              keep-alive :class:`requests.Session` with a sized connection
+              pool, and cached blob storage redirects.
+
+              Activate a pool with :func:`use_client_pool`; every
+              ``RegistryClient`` constructed inside the block — including
+              the ones CLI commands build themselves — picks up the shared
+              state for its registry.
+
+.. moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import threading
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from regshape.libs.transport.redirects import RedirectCache
+
+# Connections kept per host by a pooled session.
+DEFAULT_MAX_CONNECTIONS = 10
+
+
+@dataclass
+class SharedRegistryState:
+    """State shared by every client of one registry inside a pool.
+
+    :param username: Resolved username, or ``None``.
+    :param password: Resolved password, or ``None``.
+    :param auth_cache: Negotiated ``Authorization`` headers shared by the
+        clients' :class:`~regshape.libs.transport.middleware.AuthMiddleware`.
+    :param session: Keep-alive session used for every request.
+    :param redirect_cache: Blob storage redirect targets shared by the
+        clients, so one client's redirect serves another's fetch.
+    """
+    username: Optional[str]
+    password: Optional[str]
+    session: requests.Session
+    auth_cache: dict = field(default_factory=dict)
+    redirect_cache: RedirectCache = field(default_factory=RedirectCache)
+
+
+def create_session(max_connections: int = DEFAULT_MAX_CONNECTIONS) -> requests.Session:
+    """Return a :class:`requests.Session` keeping up to *max_connections*
+    connections alive per host.
+
+    :param max_connections: Connection pool size per host.
+    :return: A configured session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class RegistryClientPool:
+    """Process-wide cache of registry clients and their shared state.
+
+    Thread-safe: worker threads may construct clients or call :meth:`get`
+    concurrently.  Credentials are resolved once per
+    ``(registry, username, password)``.
+
+    :param max_connections: Connection pool size per registry host; size it
+        to the number of concurrent workers.
+    """
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS) -> None:
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self._states: dict[tuple, SharedRegistryState] = {}
+        self._clients: dict[tuple, object] = {}
+
+    def state_for(self, registry: str, username: Optional[str], password: Optional[str]) -> SharedRegistryState:
+        """Return the shared state for *registry*, resolving credentials on
+        first use.
+
+        :param registry: Registry hostname.
+        :param username: Explicit username, or ``None`` to use the
+            credential store.
+        :param password: Explicit password, or ``None``.
+        :return: The :class:`SharedRegistryState` for the registry.
+        """
+        key = (registry, username, password)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                from regshape.libs.auth.credentials import resolve_credentials
+
+                resolved_user, resolved_password = resolve_credentials(
+                    registry, username, password
+                )
+                state = SharedRegistryState(
+                    username=resolved_user,
+                    password=resolved_password,
+                    session=create_session(self.max_connections),
+                )
+                self._states[key] = state
+            return state
+
+    def get(self, registry: str, insecure: bool = False):
+        """Return a cached :class:`~regshape.libs.transport.client.RegistryClient`
+        for *registry*, creating it on first use.
+
+        :param registry: Registry hostname.
+        :param insecure: Use plain HTTP.
+        :return: A ``RegistryClient`` bound to this pool.
+        """
+        from regshape.libs.transport.client import RegistryClient, TransportConfig
+
+        key = (registry, insecure)
+        with self._lock:
+            client = self._clients.get(key)
+        if client is None:
+            token = _client_pool.set(self)
+            try:
+                client = RegistryClient(TransportConfig(registry=registry, insecure=insecure))
+            finally:
+                _client_pool.reset(token)
+            with self._lock:
+                client = self._clients.setdefault(key, client)
+        return client
+
+    def close(self) -> None:
+        """Close every pooled session."""
+        with self._lock:
+            for state in self._states.values():
+                state.session.close()
+            self._states.clear()
+            self._clients.clear()
+
+
+_client_pool: ContextVar[Optional[RegistryClientPool]] = ContextVar(
+    "registry_client_pool", default=None
+)
+
+
+def get_client_pool() -> Optional[RegistryClientPool]:
+    """Return the active :class:`RegistryClientPool`, or ``None``."""
+    return _client_pool.get()
+
+
+@contextmanager
+def use_client_pool(pool: Optional[RegistryClientPool] = None) -> Iterator[RegistryClientPool]:
+    """Activate *pool* (a new one by default) for the enclosed block.
+
+    The pool is closed when the block exits.
+
+    :param pool: Pool to activate.
+    :return: Context manager yielding the active pool.
+    """
+    pool = pool or RegistryClientPool()
+    token = _client_pool.set(pool)
+    try:
+        yield pool
+    finally:
+        _client_pool.reset(token)
+        pool.close()
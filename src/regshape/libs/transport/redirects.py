@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+"""
+:mod:`regshape.libs.transport.redirects` - Blob redirects to storage backends
+=============================================================================
+
+.. module:: regshape.libs.transport.redirects
+   :platform: Unix, Windows
+   :synopsis: Helpers used by
+              :class:`~regshape.libs.transport.client.RegistryClient` to
+              follow blob ``GET``/``HEAD`` redirects itself instead of
+              leaving them to :mod:`requests`.  Registries usually answer a
+              blob fetch with a ``307`` to a pre-signed S3, GCS, Azure or
+              CDN URL; :class:`RedirectCache` remembers that URL until its
+              signature expires so later fetches of the same blob (retries,
+              resumed or ranged reads) skip the registry round trip, and
+              :func:`redirect_headers` keeps registry credentials from
+              being sent to the storage host.
+
+.. moduleauthor:: ToddySM <toddysm@gmail.com>
+"""
+
+import threading
+import time
+
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import parse_qs, urljoin, urlparse
+
+# Status codes followed for blob requests.
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+# Hops followed before the last redirect response is returned as is.
+MAX_REDIRECTS = 5
+
+# Lifetime of a cached URL whose expiry cannot be read from its query.
+DEFAULT_REDIRECT_TTL = 60.0
+
+# Seconds before the signed expiry at which a cached URL is dropped, so a
+# request is never started with a URL that expires while it is in flight.
+_EXPIRY_MARGIN = 10.0
+
+# Headers never forwarded to a different host.
+_CREDENTIAL_HEADERS = ("authorization", "cookie", "proxy-authorization")
+
+# Storage responses meaning the cached URL is no longer usable.
+STALE_STATUSES = frozenset({401, 403, 404, 410})
+
+
+def is_blob_fetch(method: str, path: str) -> bool:
+    """Return whether *method* on *path* is a blob ``GET`` or ``HEAD``.
+
+    :param method: HTTP method.
+    :param path: Request path, e.g. ``/v2/repo/blobs/sha256:...``.
+    """
+    return (
+        method.upper() in ("GET", "HEAD")
+        and "/blobs/" in path
+        and "/blobs/uploads" not in path
+    )
+
+
+def redirect_target(current_url: str, location: str) -> str:
+    """Resolve a ``Location`` header against the URL that returned it."""
+    return urljoin(current_url, location)
+
+
+def same_origin(first: str, second: str) -> bool:
+    """Return whether two absolute URLs share scheme, host and port."""
+    a, b = urlparse(first), urlparse(second)
+    return (a.scheme, a.netloc.lower()) == (b.scheme, b.netloc.lower())
+
+
+def redirect_headers(headers: Optional[dict], origin_url: str, target_url: str) -> dict:
+    """Return the headers to send to *target_url*.
+
+    Credential headers are dropped when the target is not on the same
+    origin as *origin_url*; every other header (``Range``, ``Accept``, ...)
+    is kept.
+
+    :param headers: Headers of the original request.
+    :param origin_url: URL of the registry request.
+    :param target_url: Redirect target.
+    :returns: A new header dict.
+    """
+    headers = dict(headers or {})
+    if same_origin(origin_url, target_url):
+        return headers
+    return {
+        name: value for name, value in headers.items()
+        if name.lower() not in _CREDENTIAL_HEADERS
+    }
+
+
+def _parse_time(value: str) -> Optional[float]:
+    for fmt in ("%Y%m%dT%H%M%SZ", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S.%fZ"):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        return parsed.replace(tzinfo=timezone.utc).timestamp()
+    return None
+
+
+def signed_url_expiry(url: str) -> Optional[float]:
+    """Return the expiry of a pre-signed URL as a Unix timestamp.
+
+    Understands AWS SigV4 (``X-Amz-Date`` + ``X-Amz-Expires``), Google
+    V4 signing (``X-Goog-Date`` + ``X-Goog-Expires``), Azure SAS (``se``)
+    and CloudFront / Google V2 (``Expires`` as epoch seconds).
+
+    :param url: Redirect target.
+    :returns: Expiry timestamp, or ``None`` when the URL carries none.
+    """
+    query = {k.lower(): v[0] for k, v in parse_qs(urlparse(url).query).items()}
+    for prefix in ("x-amz-", "x-goog-"):
+        date, expires = query.get(prefix + "date"), query.get(prefix + "expires")
+        if date and expires:
+            start = _parse_time(date)
+            try:
+                return start + int(expires) if start is not None else None
+            except ValueError:
+                return None
+    if "se" in query:
+        return _parse_time(query["se"])
+    if "expires" in query:
+        try:
+            return float(query["expires"])
+        except ValueError:
+            return None
+    return None
+
+
+class RedirectCache:
+    """Thread-safe map of blob request URL to its storage redirect target.
+
+    Entries expire :data:`_EXPIRY_MARGIN` seconds before the signature in
+    the target URL does, or :data:`DEFAULT_REDIRECT_TTL` seconds after
+    being stored when the URL carries no expiry.
+
+    :param default_ttl: Lifetime of targets without a readable expiry.
+    """
+
+    def __init__(self, default_ttl: float = DEFAULT_REDIRECT_TTL) -> None:
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[str, float]] = {}
+
+    def get(self, url: str, now: Optional[float] = None) -> Optional[str]:
+        """Return the cached target for *url*, or ``None``.
+
+        :param url: Absolute registry URL of the blob.
+        :param now: Current time, for tests.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[url]
+                return None
+            return entry[0]
+
+    def put(self, url: str, target: str, now: Optional[float] = None) -> None:
+        """Remember *target* for *url* until it expires.
+
+        Targets that are already (nearly) expired are not stored.
+
+        :param url: Absolute registry URL of the blob.
+        :param target: Storage URL the registry redirected to.
+        :param now: Current time, for tests.
+        """
+        now = time.time() if now is None else now
+        expiry = signed_url_expiry(target)
+        expires_at = now + self.default_ttl if expiry is None else expiry - _EXPIRY_MARGIN
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._entries[url] = (target, expires_at)
+
+    def discard(self, url: str) -> None:
+        """Forget the target cached for *url*."""
+        with self._lock:
+            self._entries.pop(url, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
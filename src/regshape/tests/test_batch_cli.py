@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+"""Tests for :mod:`regshape.cli.batch`."""
+
+import json
+import threading
+import time
+
+from click.testing import CliRunner
+from unittest.mock import patch
+
+from regshape.cli.batch import iter_batch_results, parse_batch_line
+from regshape.cli.main import regshape
+from regshape.libs.models.tags import TagList
+
+REGISTRY = "acr.example.io"
+
+
+def _results(output: str) -> list[dict]:
+    return [json.loads(line) for line in output.splitlines() if line.startswith("{")]
+
+
+class TestParseBatchLine:
+
+    def test_blank_and_comment_lines_skipped(self):
+        assert parse_batch_line("   ", 1) is None
+        assert parse_batch_line("# comment", 2) is None
+
+    def test_cli_style_line(self):
+        op = parse_batch_line("regshape tag list -i 'acr.io/a b'", 3)
+        assert op.id == "3"
+        assert op.argv == ["tag", "list", "-i", "acr.io/a b"]
+
+    def test_json_argv(self):
+        op = parse_batch_line('{"id": "x", "argv": ["ping", "-r", "acr.io"]}', 1)
+        assert op.id == "x"
+        assert op.argv == ["ping", "-r", "acr.io"]
+
+    def test_json_command_with_options(self):
+        op = parse_batch_line(
+            '{"command": "tag list", "options": {"image-ref": "acr.io/r", "json": true, "n": 5, "last": null}}',
+            1,
+        )
+        assert op.argv == ["tag", "list", "--image-ref", "acr.io/r", "--json", "--n", "5"]
+
+    def test_invalid_json_is_reported(self):
+        op = parse_batch_line('{"argv": ', 4)
+        assert op.error
+
+    def test_nested_batch_rejected(self):
+        assert parse_batch_line("batch -f x", 1).error == "batch cannot be nested"
+
+
+class TestBatchCommand:
+
+    @patch("regshape.cli.tag.list_tags")
+    @patch("regshape.cli.tag.RegistryClient")
+    def test_runs_operations_and_streams_results(self, mock_client_cls, mock_list):
+        mock_list.return_value = TagList.from_json('{"name": "repo", "tags": ["v1"]}')
+        lines = "\n".join([
+            f"tag list -i {REGISTRY}/repo",
+            f'{{"id": "j", "argv": ["tag", "list", "-i", "{REGISTRY}/repo", "--json"]}}',
+            "# skipped",
+            "nosuchcommand",
+        ]) + "\n"
+
+        result = CliRunner().invoke(regshape, ["batch", "-w", "2"], input=lines)
+
+        assert result.exit_code == 1
+        by_id = {r["id"]: r for r in _results(result.output)}
+        assert set(by_id) == {"1", "j", "4"}
+        assert by_id["1"]["ok"] and by_id["1"]["stdout"] == "v1\n"
+        assert by_id["j"]["result"]["tags"] == ["v1"]
+        assert by_id["4"]["exit_code"] == 2
+        assert "No such command" in by_id["4"]["stderr"]
+
+    @patch("regshape.cli.tag.list_tags")
+    def test_operations_share_registry_credentials(self, mock_list):
+        mock_list.return_value = TagList.from_json('{"name": "repo", "tags": []}')
+        with patch("regshape.libs.auth.credentials.resolve_credentials") as mock_resolve:
+            mock_resolve.return_value = (None, None)
+            lines = "".join(f"tag list -i {REGISTRY}/repo{i}\n" for i in range(6))
+            result = CliRunner().invoke(regshape, ["batch", "-w", "3"], input=lines)
+
+        assert result.exit_code == 0, result.output
+        assert len(_results(result.output)) == 6
+        assert mock_resolve.call_count == 1
+
+    @patch("regshape.cli.tag.list_tags")
+    @patch("regshape.cli.tag.RegistryClient")
+    def test_global_insecure_forwarded(self, mock_client_cls, mock_list):
+        mock_list.return_value = TagList.from_json('{"name": "repo", "tags": []}')
+        result = CliRunner().invoke(
+            regshape, ["--insecure", "batch"], input=f"tag list -i {REGISTRY}/repo\n",
+        )
+        assert result.exit_code == 0, result.output
+        assert _results(result.output)[0]["argv"] == ["tag", "list", "-i", f"{REGISTRY}/repo"]
+        assert mock_client_cls.call_args[0][0].insecure is True
+
+    @patch("regshape.cli.tag.list_tags")
+    @patch("regshape.cli.tag.RegistryClient")
+    def test_all_global_options_forwarded(self, mock_client_cls, mock_list, tmp_path):
+        mock_list.return_value = TagList.from_json('{"name": "repo", "tags": []}')
+        rules = tmp_path / "rules.yaml"
+        rules.write_text("{}\n")
+        seen = []
+        with patch("regshape.cli.batch.run_batch_operation",
+                   side_effect=lambda op, global_args, *_: seen.append(global_args) or
+                   {"id": op.id, "ok": True}):
+            result = CliRunner().invoke(
+                regshape, ["--insecure", "--break-rules", str(rules), "batch"],
+                input=f"tag list -i {REGISTRY}/repo\n",
+            )
+        assert result.exit_code == 0, result.output
+        assert seen == [["--insecure", "--break-rules", str(rules)]]
+
+
+class TestIterBatchResults:
+
+    def test_fail_fast_stops_with_few_operations(self):
+        first_done = threading.Event()
+
+        def run(op, *_):
+            if op.line == 1:
+                first_done.set()
+                return {"id": op.id, "ok": False}
+            return {"id": op.id, "ok": True}
+
+        def lines():
+            yield "first\n"
+            # Let the first operation finish before the next line is read.
+            first_done.wait(5)
+            time.sleep(0.1)
+            yield "second\n"
+            yield "third\n"
+
+        with patch("regshape.cli.batch.run_batch_operation", side_effect=run):
+            results = list(iter_batch_results(lines(), [], workers=4, fail_fast=True))
+        assert [r["id"] for r in results] == ["1"]
+
+    def test_without_fail_fast_everything_runs(self):
+        with patch("regshape.cli.batch.run_batch_operation",
+                   side_effect=lambda op, *_: {"id": op.id, "ok": op.line != 1}):
+            results = list(iter_batch_results(["a\n", "b\n", "c\n"], [], workers=4))
+        assert sorted(r["id"] for r in results) == ["1", "2", "3"]
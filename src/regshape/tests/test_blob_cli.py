@@ -16,6 +16,7 @@ from unittest.mock import patch
 
 from regshape.cli.main import regshape
 from regshape.libs.errors import AuthError, BlobError
+from regshape.libs.blobs import BlobDownload
 from regshape.libs.models.blob import BlobInfo
 
 
@@ -138,6 +139,47 @@ class TestBlobHead:
         mock_head.assert_not_called()
 
 
+    def test_head_multiple_digests_emits_map(self):
+        other = "sha256:" + "b" * 64
+        found = {DIGEST: _BLOB_INFO, other: None}
+        with patch("regshape.cli.blob.head_blobs", return_value=found) as mock_heads:
+            result = _runner().invoke(
+                regshape,
+                ["blob", "head", "-r", REPO, "-d", DIGEST, "-d", other,
+                 "--concurrency", "4"],
+            )
+        assert result.exit_code == 0, result.output
+        data = json.loads(result.output)
+        assert data[DIGEST]["size"] == SIZE
+        assert data[other] is None
+        kwargs = mock_heads.call_args.kwargs
+        assert kwargs["digests"] == [DIGEST, other]
+        assert kwargs["concurrency"] == 4
+
+    def test_head_digests_from_stdin(self):
+        other = "sha256:" + "b" * 64
+        with patch("regshape.cli.blob.head_blobs", return_value={}) as mock_heads:
+            result = _runner().invoke(
+                regshape,
+                ["blob", "head", "-r", REPO, "-d", "-"],
+                input=f"{DIGEST}\n\n{other}\n",
+            )
+        assert result.exit_code == 0, result.output
+        assert mock_heads.call_args.kwargs["digests"] == [DIGEST, other]
+
+    def test_head_multiple_digests_error_exits_1(self):
+        with patch(
+            "regshape.cli.blob.head_blobs",
+            side_effect=AuthError("Authentication failed", "HTTP 401"),
+        ):
+            result = _runner().invoke(
+                regshape,
+                ["blob", "head", "-r", REPO, "-d", DIGEST, "-d", DIGEST],
+            )
+        assert result.exit_code == 1
+        assert "Authentication failed" in result.output
+
+
 # ---------------------------------------------------------------------------
 # TestBlobGet
 # ---------------------------------------------------------------------------
@@ -210,6 +252,45 @@ class TestBlobGet:
             )
         assert mock_get.call_args.kwargs["chunk_size"] == 131072
 
+    def test_get_bulk_writes_summary(self, tmp_path):
+        other = "sha256:" + "b" * 64
+        downloads = [
+            BlobDownload(DIGEST, str(tmp_path / "a"), "downloaded", size=SIZE),
+            BlobDownload(other, str(tmp_path / "b"), "skipped", size=10),
+        ]
+        with patch("regshape.cli.blob.get_blobs", return_value=downloads) as mock_get:
+            result = _runner().invoke(
+                regshape,
+                ["blob", "get", "--repo", REPO, "--digest", DIGEST, "--digest", other,
+                 "--output-dir", str(tmp_path), "--concurrency", "4"],
+            )
+        assert result.exit_code == 0, result.output
+        data = json.loads(result.output)
+        assert (data["downloaded"], data["skipped"], data["failed"]) == (1, 1, 0)
+        assert data["bytes_downloaded"] == SIZE
+        assert list(mock_get.call_args.kwargs["digests"]) == [DIGEST, other]
+        assert mock_get.call_args.kwargs["concurrency"] == 4
+
+    def test_get_bulk_failure_exits_1(self, tmp_path):
+        downloads = [BlobDownload(DIGEST, str(tmp_path / "a"), "failed", error="404")]
+        with patch("regshape.cli.blob.get_blobs", return_value=downloads):
+            result = _runner().invoke(
+                regshape,
+                ["blob", "get", "--repo", REPO, "--digest", DIGEST,
+                 "--output-dir", str(tmp_path)],
+            )
+        assert result.exit_code == 1
+        assert json.loads(result.output)["failed"] == 1
+
+    def test_get_several_digests_require_output_dir(self):
+        result = _runner().invoke(
+            regshape,
+            ["blob", "get", "--repo", REPO, "--digest", DIGEST,
+             "--digest", "sha256:" + "b" * 64],
+        )
+        assert result.exit_code == 1
+        assert "--output-dir" in result.output
+
 
 # ---------------------------------------------------------------------------
 # TestBlobDelete
@@ -440,6 +521,73 @@ class TestBlobUpload:
         args, kwargs = mock_upload.call_args
         assert kwargs.get("content_type") == custom_type
 
+    def test_upload_streamed_from_stdin_without_digest(self):
+        def _fake(client, repo, source, **kwargs):
+            assert source.read(4) == b"pipe"
+            source.read()
+            return DIGEST
+
+        with patch("regshape.cli.blob.upload_blob_streamed", side_effect=_fake) as mock_stream:
+            result = _runner().invoke(
+                regshape,
+                ["blob", "upload", "--repo", REPO, "--file", "-", "--streamed"],
+                input=b"piped",
+            )
+        assert result.exit_code == 0, result.output
+        data = json.loads(result.output)
+        assert data == {
+            "digest": DIGEST, "size": 5, "location": f"/v2/{NAMESPACE}/blobs/{DIGEST}",
+        }
+        assert mock_stream.call_args.kwargs["digest"] is None
+
+    def test_upload_compress_reports_diff_id(self, tmp_path):
+        import gzip
+        import hashlib
+        test_file = tmp_path / "layer.tar"
+        test_file.write_bytes(b"uncompressed tar")
+        uploaded = []
+
+        def _fake(client, repo, source, **kwargs):
+            uploaded.append(source.read())
+            source.read()
+            return DIGEST
+
+        with patch("regshape.cli.blob.upload_blob_streamed", side_effect=_fake):
+            result = _runner().invoke(
+                regshape,
+                ["blob", "upload", "--repo", REPO, "--file", str(test_file),
+                 "--compress", "gzip"],
+            )
+        assert result.exit_code == 0, result.output
+        data = json.loads(result.output)
+        assert gzip.decompress(uploaded[0]) == b"uncompressed tar"
+        assert data["size"] == len(uploaded[0])
+        assert data["uncompressed_size"] == len(b"uncompressed tar")
+        assert data["diff_id"] == "sha256:" + hashlib.sha256(b"uncompressed tar").hexdigest()
+
+    def test_upload_without_digest_requires_streamed(self, tmp_path):
+        test_file = tmp_path / "layer.tar.gz"
+        test_file.write_bytes(b"content")
+
+        with patch("regshape.cli.blob.upload_blob") as mock_upload:
+            result = _runner().invoke(
+                regshape, ["blob", "upload", "--repo", REPO, "--file", str(test_file)],
+            )
+        assert result.exit_code == 1
+        mock_upload.assert_not_called()
+
+    def test_upload_chunked_and_streamed_rejected(self, tmp_path):
+        test_file = tmp_path / "layer.tar.gz"
+        test_file.write_bytes(b"content")
+
+        result = _runner().invoke(
+            regshape,
+            ["blob", "upload", "--repo", REPO, "--file", str(test_file),
+             "--digest", DIGEST, "--chunked", "--streamed"],
+        )
+        assert result.exit_code == 1
+        assert "mutually exclusive" in result.output
+
 
 # ---------------------------------------------------------------------------
 # TestBlobMount
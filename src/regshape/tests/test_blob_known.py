@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+
+"""Tests for :mod:`regshape.libs.blobs.known` and its use by blob operations
+and ``push_layout``."""
+
+import gzip
+import hashlib
+import io
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from regshape.libs.blobs.known import (
+    BloomFilter,
+    KnownBlobIndex,
+    KnownBlobStore,
+    get_known_blob_store,
+    use_known_blobs,
+)
+from regshape.libs.blobs.operations import head_blob, mount_blob, upload_blob
+from regshape.libs.errors import BlobError
+from regshape.libs.layout.operations import (
+    generate_config,
+    generate_manifest,
+    init_layout,
+    push_layout,
+    stage_layer,
+)
+from regshape.libs.models.mediatype import OCI_IMAGE_LAYER_TAR_GZIP
+
+REGISTRY = "registry.io"
+REPO = "myrepo/myimage"
+
+
+def _digest(n: int) -> str:
+    return "sha256:" + hashlib.sha256(str(n).encode()).hexdigest()
+
+
+def _save_digests(path: str, worker: int) -> None:
+    for n in range(worker * 100, (worker + 1) * 100):
+        index = KnownBlobIndex(path)
+        index.add(_digest(n))
+        index.save()
+
+
+def _client() -> MagicMock:
+    client = MagicMock()
+    client.config.registry = REGISTRY
+    return client
+
+
+def _response(status_code: int, headers: dict | None = None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.text = ""
+    response.content = b""
+    return response
+
+
+class TestBloomFilter:
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter.for_capacity(500)
+        raws = [bytes.fromhex(_digest(i).split(":")[1]) for i in range(500)]
+        for raw in raws:
+            bloom.add(raw)
+        assert all(raw in bloom for raw in raws)
+
+    def test_false_positive_rate_is_low(self):
+        bloom = BloomFilter.for_capacity(1000)
+        for i in range(1000):
+            bloom.add(bytes.fromhex(_digest(i).split(":")[1]))
+        false_positives = sum(
+            bytes.fromhex(_digest(i).split(":")[1]) in bloom for i in range(1000, 11000)
+        )
+        assert false_positives < 300  # ~1% expected
+
+
+class TestKnownBlobIndex:
+
+    def test_add_save_and_reload(self, tmp_path):
+        path = tmp_path / "repo.idx"
+        index = KnownBlobIndex(path)
+        index.add(_digest(1))
+        assert index.contains(_digest(1))
+        index.save()
+
+        reloaded = KnownBlobIndex(path)
+        assert reloaded.contains(_digest(1))
+        assert not reloaded.contains(_digest(2))
+        assert len(reloaded) == 1
+
+    def test_entries_expire_after_ttl(self, tmp_path):
+        index = KnownBlobIndex(tmp_path / "repo.idx", ttl=60)
+        index.add(_digest(1), when=1000)
+        assert index.contains(_digest(1), now=1050)
+        assert not index.contains(_digest(1), now=1061)
+
+    def test_save_compacts_expired_entries(self, tmp_path):
+        path = tmp_path / "repo.idx"
+        index = KnownBlobIndex(path, ttl=60)
+        index.add(_digest(1), when=1000)
+        index.add(_digest(2), when=2000)
+        index.save(now=2010)
+        assert len(KnownBlobIndex(path, ttl=60)) == 1
+        # 12-byte header (no name) + 128-byte minimum filter + one 37-byte record
+        assert path.stat().st_size == 12 + 1024 // 8 + 37
+
+    def test_save_merges_with_other_writers(self, tmp_path):
+        path = tmp_path / "repo.idx"
+        first, second = KnownBlobIndex(path), KnownBlobIndex(path)
+        first.add(_digest(1))
+        second.add(_digest(2))
+        first.save()
+        second.save()
+        reloaded = KnownBlobIndex(path)
+        assert reloaded.contains(_digest(1))
+        assert reloaded.contains(_digest(2))
+
+    def test_concurrent_saves_keep_all_entries(self, tmp_path):
+        path = tmp_path / "repo.idx"
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(_save_digests, [str(path)] * 4, range(4)))
+        reloaded = KnownBlobIndex(path)
+        assert all(reloaded.contains(_digest(n)) for n in range(400))
+
+    def test_discard_removes_entry(self, tmp_path):
+        path = tmp_path / "repo.idx"
+        index = KnownBlobIndex(path)
+        index.add(_digest(1))
+        index.save()
+        index.discard(_digest(1))
+        assert not index.contains(_digest(1))
+        index.save()
+        assert not KnownBlobIndex(path).contains(_digest(1))
+
+    def test_malformed_digests_are_ignored(self, tmp_path):
+        index = KnownBlobIndex(tmp_path / "repo.idx")
+        index.add("md5:abcd")
+        index.add("sha256:not-hex")
+        assert not index.dirty
+        assert not index.contains("sha256:not-hex")
+
+    def test_corrupt_file_is_treated_as_empty(self, tmp_path):
+        path = tmp_path / "repo.idx"
+        path.write_bytes(b"garbage")
+        index = KnownBlobIndex(path)
+        assert not index.contains(_digest(1))
+        index.add(_digest(1))
+        index.save()
+        assert KnownBlobIndex(path).contains(_digest(1))
+
+    def test_version_1_file_is_discarded(self, tmp_path):
+        # Version 1 had no name length field in the header.
+        path = tmp_path / "repo.idx"
+        bloom = BloomFilter.for_capacity(0)
+        raw = bytes.fromhex(_digest(1).split(":")[1])
+        bloom.add(raw)
+        path.write_bytes(
+            struct.pack(">4sBBI", b"RSKB", 1, bloom.hashes, bloom.bits)
+            + bloom.to_bytes() + struct.pack(">BI", 1, int(time.time())) + raw
+        )
+        index = KnownBlobIndex(path)
+        assert not index.contains(_digest(1))
+        assert len(index) == 0
+
+
+class TestKnownBlobStore:
+
+    def test_indexes_are_per_repository(self, tmp_path):
+        store = KnownBlobStore(tmp_path)
+        store.record(REGISTRY, REPO, _digest(1))
+        assert store.is_known(REGISTRY, REPO, _digest(1))
+        assert not store.is_known(REGISTRY, "other/repo", _digest(1))
+        assert not store.is_known("other.io", REPO, _digest(1))
+
+    def test_mount_sources_most_recent_first(self, tmp_path):
+        writer = KnownBlobStore(tmp_path)
+        writer.index_for(REGISTRY, "team-a/app").add(_digest(1), when=time.time() - 100)
+        writer.index_for(REGISTRY, "team-b/app").add(_digest(1))
+        writer.index_for("other.io", "team-c/app").add(_digest(1))
+        writer.record(REGISTRY, REPO, _digest(1))
+        writer.save()
+
+        reader = KnownBlobStore(tmp_path)
+        assert reader.mount_sources(REGISTRY, _digest(1), exclude=REPO) == [
+            "team-b/app", "team-a/app",
+        ]
+        assert reader.mount_sources(REGISTRY, _digest(2)) == []
+
+    def test_use_known_blobs_saves_on_exit(self, tmp_path):
+        with use_known_blobs(KnownBlobStore(tmp_path)) as store:
+            assert get_known_blob_store() is store
+            store.record(REGISTRY, REPO, _digest(1))
+        assert get_known_blob_store() is None
+        assert KnownBlobStore(tmp_path).is_known(REGISTRY, REPO, _digest(1))
+
+    def test_nothing_written_without_changes(self, tmp_path):
+        with use_known_blobs(KnownBlobStore(tmp_path / "cache")) as store:
+            store.is_known(REGISTRY, REPO, _digest(1))
+        assert not (tmp_path / "cache").exists()
+
+
+class TestOperationsUpdateIndex:
+
+    def test_head_records_and_404_forgets(self, tmp_path):
+        client = _client()
+        with use_known_blobs(KnownBlobStore(tmp_path)) as store:
+            client.head.return_value = _response(200, {"Content-Length": "3"})
+            head_blob(client, REPO, _digest(1))
+            assert store.is_known(REGISTRY, REPO, _digest(1))
+
+            client.head.return_value = _response(404)
+            with pytest.raises(BlobError):
+                head_blob(client, REPO, _digest(1))
+            assert not store.is_known(REGISTRY, REPO, _digest(1))
+
+    def test_upload_and_mount_record(self, tmp_path):
+        client = _client()
+        client.post.side_effect = [
+            _response(202, {"Location": f"/v2/{REPO}/blobs/uploads/abc"}),
+            _response(201, {"Docker-Content-Digest": _digest(2)}),
+        ]
+        client.put.return_value = _response(201, {"Docker-Content-Digest": _digest(1)})
+        with use_known_blobs(KnownBlobStore(tmp_path)) as store:
+            upload_blob(client, REPO, b"data", _digest(1))
+            mount_blob(client, REPO, _digest(2), "other/repo")
+            assert store.is_known(REGISTRY, REPO, _digest(1))
+            assert store.is_known(REGISTRY, REPO, _digest(2))
+
+    def test_refused_mount_cancels_upload_session(self, tmp_path):
+        client = _client()
+        client.post.return_value = _response(
+            202, {"Location": f"https://{REGISTRY}/v2/{REPO}/blobs/uploads/abc?_state=s"},
+        )
+        with use_known_blobs(KnownBlobStore(tmp_path)) as store:
+            with pytest.raises(BlobError, match="mount not accepted"):
+                mount_blob(client, REPO, _digest(2), "other/repo")
+            assert not store.is_known(REGISTRY, REPO, _digest(2))
+        client.delete.assert_called_once_with(
+            f"/v2/{REPO}/blobs/uploads/abc", params=[("_state", "s")],
+        )
+
+    def test_no_store_no_side_effects(self):
+        client = _client()
+        client.head.return_value = _response(200)
+        head_blob(client, REPO, _digest(1))
+        assert get_known_blob_store() is None
+
+
+class TestPushLayoutUsesIndex:
+
+    def _layout(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        buf = io.BytesIO()
+        with gzip.GzipFile(fileobj=buf, mode="wb", mtime=0) as f:
+            f.write(b"layer")
+        stage_layer(layout_dir, buf.getvalue(), OCI_IMAGE_LAYER_TAR_GZIP)
+        generate_config(layout_dir)
+        generate_manifest(layout_dir, ref_name="latest")
+        return layout_dir
+
+    @patch("regshape.libs.manifests.push_manifest", return_value="sha256:m")
+    @patch("regshape.libs.blobs.upload_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
+    def test_known_blobs_skip_head(self, mock_head, mock_upload, _push, tmp_path):
+        layout_dir = self._layout(tmp_path)
+        client = _client()
+        store = KnownBlobStore(tmp_path / "known")
+        with use_known_blobs(store):
+            # First push: nothing known, blobs are HEADed and uploaded.
+            mock_head.side_effect = BlobError("not found", "404", status_code=404)
+            mock_upload.side_effect = lambda c, repo, data, digest: (
+                store.record(REGISTRY, repo, digest) or digest
+            )
+            first = push_layout(layout_dir, client, REPO)
+            assert first.blobs_uploaded == 2
+            assert mock_head.call_count == 2
+
+            mock_head.reset_mock()
+            mock_upload.reset_mock()
+            second = push_layout(layout_dir, client, REPO)
+
+        mock_head.assert_not_called()
+        mock_upload.assert_not_called()
+        assert second.blobs_skipped == 2
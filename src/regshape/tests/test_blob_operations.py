@@ -13,8 +13,15 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from regshape.libs.blobs.operations import get_blob, upload_blob, upload_blob_chunked
-from regshape.libs.errors import BlobError
+from regshape.libs.blobs.operations import (
+    get_blob,
+    get_blobs,
+    head_blobs,
+    upload_blob,
+    upload_blob_chunked,
+    upload_blob_streamed,
+)
+from regshape.libs.errors import AuthError, BlobError
 from regshape.libs.models.blob import BlobInfo
 
 
@@ -62,6 +69,65 @@ def _make_response(
     return response
 
 
+# ===========================================================================
+# head_blobs — bulk existence checks
+# ===========================================================================
+
+
+class TestHeadBlobs:
+
+    def _head_response(self, path, **kwargs):
+        digest = path.rsplit("/", 1)[1]
+        if digest.endswith("0"):
+            return _make_response(b"", status_code=404)
+        return _make_response(CONTENT, digest=digest)
+
+    def test_maps_found_and_missing(self):
+        present, missing = "sha256:" + "a" * 64, "sha256:" + "b" * 63 + "0"
+        client = _make_client()
+        client.head.side_effect = self._head_response
+
+        result = head_blobs(client, REPO, [present, missing], concurrency=4)
+
+        assert list(result) == [present, missing]
+        assert isinstance(result[present], BlobInfo)
+        assert result[present].size == len(CONTENT)
+        assert result[missing] is None
+
+    def test_duplicates_checked_once(self):
+        digest = "sha256:" + "a" * 64
+        client = _make_client()
+        client.head.side_effect = self._head_response
+
+        result = head_blobs(client, REPO, [digest, digest, digest])
+
+        assert list(result) == [digest]
+        assert client.head.call_count == 1
+
+    def test_many_digests_use_connection_pool(self):
+        digests = [f"sha256:{i:064x}" for i in range(1, 21)]
+        client = _make_client()
+        client.head.side_effect = self._head_response
+
+        result = head_blobs(client, REPO, digests, concurrency=8)
+
+        assert set(result) == set(digests)
+        assert client.head.call_count == 20
+        client.enable_connection_pool.assert_called_once_with(8)
+
+    def test_non_404_errors_propagate(self):
+        client = _make_client()
+        client.head.return_value = _make_response(b"", status_code=401)
+
+        with pytest.raises(AuthError):
+            head_blobs(client, REPO, ["sha256:" + "a" * 64, "sha256:" + "c" * 64])
+
+    def test_empty_input(self):
+        client = _make_client()
+        assert head_blobs(client, REPO, []) == {}
+        client.head.assert_not_called()
+
+
 # ===========================================================================
 # get_blob — algorithm detection
 # ===========================================================================
@@ -205,6 +271,151 @@ class TestGetBlobDigestVerification:
         assert output.read_bytes() == CONTENT
 
 
+class TestGetBlobPipelined:
+
+    @pytest.mark.parametrize("pipelined", [True, False])
+    def test_output_and_digest_match(self, tmp_path, pipelined):
+        chunks = [bytes([i]) * 1000 for i in range(50)]
+        content = b"".join(chunks)
+        digest = _sha512_of(content)
+        output = tmp_path / "blob.bin"
+        client = _make_client()
+        response = _make_response(content, digest=digest)
+        response.iter_content.return_value = iter(chunks)
+        client.get.return_value = response
+
+        get_blob(client, REPO, digest, output_path=str(output), pipelined=pipelined)
+
+        assert output.read_bytes() == content
+
+    def test_pipelined_mismatch_raises(self):
+        client = _make_client()
+        client.get.return_value = _make_response(CONTENT)
+
+        with pytest.raises(BlobError, match="Digest mismatch"):
+            get_blob(client, REPO, "sha256:" + "b" * 64, pipelined=True)
+
+    def test_default_chunk_size_does_not_pipeline(self, tmp_path):
+        from regshape.libs.blobs import operations
+        from regshape.libs.blobs.pipeline import ChunkPipeline
+
+        client = _make_client()
+        client.get.return_value = _make_response(CONTENT, digest=DIGEST)
+        with patch.object(operations, "ChunkPipeline", wraps=ChunkPipeline) as pipeline:
+            get_blob(client, REPO, DIGEST, output_path=str(tmp_path / "blob"))
+
+        assert pipeline.call_args.kwargs["threaded"] is False
+        assert (tmp_path / "blob").read_bytes() == CONTENT
+
+    def test_write_error_becomes_blob_error(self, tmp_path):
+        client = _make_client()
+        client.get.return_value = _make_response(CONTENT, digest=DIGEST)
+
+        with pytest.raises(BlobError, match="Cannot write"):
+            get_blob(
+                client, REPO, DIGEST, output_path=str(tmp_path / "missing" / "blob"),
+                pipelined=True,
+            )
+
+
+def _make_raw_response(content: bytes, headers: dict | None = None):
+    """Real requests.Response backed by a urllib3 response over *content*."""
+    import io
+    import requests
+    import urllib3
+
+    response = requests.Response()
+    response.status_code = 200
+    response.headers.update(headers or {})
+    response.raw = urllib3.response.HTTPResponse(
+        body=io.BytesIO(content), headers=headers or {}, preload_content=False,
+    )
+    return response
+
+
+class TestGetBlobReadinto:
+
+    @pytest.mark.parametrize("pipelined", [True, False])
+    def test_readinto_path_writes_content(self, tmp_path, pipelined):
+        content = bytes(range(256)) * 4000
+        digest = _sha256_of(content)
+        output = tmp_path / "blob.bin"
+        client = _make_client()
+        client.get.return_value = _make_raw_response(content)
+
+        get_blob(client, REPO, digest, output_path=str(output), chunk_size=4096,
+                 pipelined=pipelined)
+
+        assert output.read_bytes() == content
+
+    def test_readinto_feeds_memoryviews_of_one_buffer(self):
+        from regshape.libs.blobs.operations import _consume_body
+
+        content = b"abcdefgh" * 100
+        seen = []
+        _consume_body(
+            _make_raw_response(content), 64, False,
+            lambda chunk: seen.append((type(chunk), bytes(chunk))),
+        )
+        assert all(kind is memoryview for kind, _ in seen)
+        assert b"".join(data for _, data in seen) == content
+
+    @pytest.mark.parametrize("pipelined", [True, False])
+    def test_failure_partway_closes_response(self, pipelined):
+        from regshape.libs.blobs.operations import _consume_body
+
+        def fail(chunk):
+            raise OSError("disk full")
+
+        response = _make_raw_response(b"x" * 1000)
+        with pytest.raises(OSError, match="disk full"):
+            _consume_body(response, 64, pipelined, fail)
+        assert response.raw.closed
+
+    def test_success_reads_underlying_file_and_releases_connection(self):
+        from regshape.libs.blobs.operations import _consume_body, _raw_body_reader
+
+        response = _make_raw_response(b"x" * 1000, headers={"Content-Length": "1000"})
+        assert _raw_body_reader(response) is response.raw._fp
+        with patch.object(response.raw, "read") as urllib3_read, \
+                patch.object(response.raw, "release_conn") as release_conn:
+            _consume_body(response, 64, False, lambda chunk: None)
+        urllib3_read.assert_not_called()
+        release_conn.assert_called_once_with()
+
+    def test_short_body_rejected_and_response_closed(self):
+        from regshape.libs.blobs.operations import _consume_body
+
+        response = _make_raw_response(b"x" * 1000, headers={"Content-Length": "2000"})
+        with pytest.raises(BlobError, match="Incomplete blob body"):
+            _consume_body(response, 64, False, lambda chunk: None)
+        assert response.raw.closed
+
+    def test_short_reads_fill_whole_buffers(self):
+        import io
+        from regshape.libs.blobs.operations import _consume_body
+
+        class Trickle(io.BytesIO):
+            def readinto(self, b):
+                return super().readinto(memoryview(b)[:10])
+
+        sizes = []
+        with patch(
+            "regshape.libs.blobs.operations._raw_body_reader",
+            return_value=Trickle(b"x" * 1000),
+        ):
+            _consume_body(_make_raw_response(b""), 64, False, lambda chunk: sizes.append(len(chunk)))
+        assert sizes == [64] * 15 + [40]
+
+    def test_content_encoded_body_uses_iter_content(self):
+        from regshape.libs.blobs.operations import _raw_body_reader
+
+        response = _make_raw_response(b"x", headers={"Content-Encoding": "gzip"})
+        assert _raw_body_reader(response) is None
+        assert _raw_body_reader(_make_raw_response(b"x")) is not None
+        assert _raw_body_reader(_make_response(b"x")) is None
+
+
 # ===========================================================================
 # get_blob — returned BlobInfo
 # ===========================================================================
@@ -229,6 +440,109 @@ class TestGetBlobReturnValue:
         assert info.content_type == "application/vnd.oci.image.layer.v1.tar+gzip"
 
 
+# ===========================================================================
+# get_blobs — bulk download
+# ===========================================================================
+
+
+class TestGetBlobs:
+
+    def _client_for(self, blobs: dict) -> MagicMock:
+        client = _make_client()
+
+        def get(path, **kwargs):
+            digest = path.rsplit("/", 1)[1]
+            if digest not in blobs:
+                return _make_response(b"", status_code=404)
+            return _make_response(blobs[digest], digest=digest)
+
+        client.get.side_effect = get
+        client.head.side_effect = lambda path, **kwargs: get(path)
+        return client
+
+    def test_downloads_into_algorithm_directories(self, tmp_path):
+        other = b"other blob"
+        blobs = {_sha256_of(CONTENT): CONTENT, _sha256_of(other): other}
+        client = self._client_for(blobs)
+
+        results = get_blobs(client, REPO, list(blobs), str(tmp_path))
+
+        assert [r.status for r in results] == ["downloaded", "downloaded"]
+        for digest, content in blobs.items():
+            path = tmp_path / "sha256" / digest.split(":")[1]
+            assert path.read_bytes() == content
+        assert not list((tmp_path / "sha256").glob("*.partial"))
+
+    def test_duplicates_fetched_once(self, tmp_path):
+        digest = _sha256_of(CONTENT)
+        client = self._client_for({digest: CONTENT})
+
+        results = get_blobs(client, REPO, [digest, digest], str(tmp_path))
+
+        assert len(results) == 1
+        assert client.get.call_count == 1
+
+    def test_existing_file_with_matching_digest_skipped(self, tmp_path):
+        digest = _sha256_of(CONTENT)
+        (tmp_path / "sha256").mkdir()
+        (tmp_path / "sha256" / digest.split(":")[1]).write_bytes(CONTENT)
+        client = self._client_for({digest: CONTENT})
+
+        results = get_blobs(client, REPO, [digest], str(tmp_path))
+
+        assert results[0].status == "skipped"
+        assert results[0].size == len(CONTENT)
+        client.get.assert_not_called()
+
+    def test_corrupt_existing_file_redownloaded(self, tmp_path):
+        digest = _sha256_of(CONTENT)
+        (tmp_path / "sha256").mkdir()
+        path = tmp_path / "sha256" / digest.split(":")[1]
+        path.write_bytes(b"corrupt")
+        client = self._client_for({digest: CONTENT})
+
+        results = get_blobs(client, REPO, [digest], str(tmp_path))
+
+        assert results[0].status == "downloaded"
+        assert path.read_bytes() == CONTENT
+
+    def test_failures_recorded_without_aborting(self, tmp_path):
+        good = _sha256_of(CONTENT)
+        missing = _sha256_of(b"missing")
+        client = self._client_for({good: CONTENT})
+
+        results = get_blobs(client, REPO, [missing, good], str(tmp_path))
+
+        by_digest = {r.digest: r for r in results}
+        assert by_digest[missing].status == "failed"
+        assert by_digest[missing].error
+        assert by_digest[good].status == "downloaded"
+        assert not (tmp_path / "sha256" / missing.split(":")[1]).exists()
+        assert "error" not in by_digest[good].to_dict()
+
+    def test_malformed_digest_rejected_without_request(self, tmp_path):
+        output_dir = tmp_path / "out"
+        client = self._client_for({})
+
+        results = get_blobs(client, REPO, ["sha256:../../escape", "sha256:ABC"], str(output_dir))
+
+        assert [r.status for r in results] == ["failed", "failed"]
+        assert all("Invalid digest" in r.error for r in results)
+        client.get.assert_not_called()
+        client.head.assert_not_called()
+        assert not output_dir.exists()
+
+    def test_primes_token_with_head_not_download(self, tmp_path):
+        other = b"other blob"
+        blobs = {_sha256_of(CONTENT): CONTENT, _sha256_of(other): other}
+        client = self._client_for(blobs)
+
+        get_blobs(client, REPO, list(blobs), str(tmp_path), concurrency=4)
+
+        client.head.assert_called_once_with(f"/v2/{REPO}/blobs/{_sha256_of(CONTENT)}")
+        assert client.get.call_count == 2
+
+
 # ===========================================================================
 # upload_blob — completing PUT uses params= for digest
 # ===========================================================================
@@ -373,3 +687,132 @@ class TestUploadBlobChunkedPutParams:
         params = put_kwargs.get("params", [])
         assert ("_state", "rotated99") in params
         assert any(k == "digest" for k, v in params)
+
+
+class TestUploadBlobChunkedSizing:
+
+    def _upload(self, data: bytes, min_length: str | None = None, **kwargs) -> list[int]:
+        import io
+        client = _make_client()
+        post = _make_post_response(f"/v2/{REPO}/blobs/uploads/abc-123")
+        if min_length is not None:
+            post.headers["OCI-Chunk-Min-Length"] = min_length
+        client.post.return_value = post
+        client.patch.return_value = _make_patch_response()
+        client.put.return_value = _make_put_response(DIGEST)
+
+        upload_blob_chunked(
+            client=client, repo=REPO, source=io.BytesIO(data), digest=DIGEST, **kwargs
+        )
+        return [len(c.kwargs["data"]) for c in client.patch.call_args_list]
+
+    def test_registry_minimum_raises_first_chunk(self):
+        sizes = self._upload(b"x" * 3000, min_length="1000", chunk_size=100,
+                             max_chunk_size=100)
+        assert sizes == [1000, 1000, 1000]
+
+    def test_chunks_grow_up_to_cap(self):
+        sizes = self._upload(b"x" * 10_000, chunk_size=100, max_chunk_size=2000)
+        assert sizes[:3] == [100, 400, 1600]
+        assert max(sizes) == 2000
+        assert sum(sizes) == 10_000
+
+    def test_fixed_size_when_cap_equals_chunk_size(self):
+        sizes = self._upload(b"x" * 1000, chunk_size=250, max_chunk_size=250)
+        assert sizes == [250, 250, 250, 250]
+
+    def test_malformed_minimum_ignored(self):
+        sizes = self._upload(b"x" * 200, min_length="lots", chunk_size=100,
+                             max_chunk_size=100)
+        assert sizes == [100, 100]
+
+
+class TestUploadBlobStreamed:
+
+    def _client(self, put_digest: str = DIGEST) -> MagicMock:
+        client = _make_client()
+        client.post.return_value = _make_post_response(
+            f"/v2/{REPO}/blobs/uploads/abc-123"
+        )
+        sent = []
+
+        def _patch(path, data, headers):
+            sent.extend(data)  # drain the generator as requests would
+            return _make_patch_response(
+                location=f"/v2/{REPO}/blobs/uploads/abc-123?_state=s2"
+            )
+
+        client.patch.side_effect = _patch
+        client.put.return_value = _make_put_response(put_digest)
+        client.sent = sent
+        return client
+
+    @pytest.mark.parametrize("pipelined", [True, False])
+    def test_pipelined_opt_in(self, pipelined):
+        import io
+        from regshape.libs.blobs import operations
+        from regshape.libs.blobs.pipeline import ChunkPipeline
+
+        data = CONTENT * 100
+        client = self._client(put_digest=_sha256_of(data))
+        with patch.object(operations, "ChunkPipeline", wraps=ChunkPipeline) as pipeline:
+            upload_blob_streamed(client, REPO, io.BytesIO(data), pipelined=pipelined)
+        assert pipeline.call_args.kwargs["threaded"] is pipelined
+        assert b"".join(client.sent) == data
+
+    def test_single_patch_without_content_range(self):
+        import io
+        data = CONTENT * 100
+        client = self._client(put_digest=_sha256_of(data))
+        upload_blob_streamed(
+            client, REPO, io.BytesIO(data), digest=_sha256_of(data), chunk_size=64
+        )
+        assert client.patch.call_count == 1
+        headers = client.patch.call_args.kwargs["headers"]
+        assert "Content-Range" not in headers
+        assert "Content-Length" not in headers
+        assert b"".join(client.sent) == data
+        assert max(len(c) for c in client.sent) == 64
+
+    def test_digest_computed_when_not_given(self):
+        import io
+        client = self._client()
+        confirmed = upload_blob_streamed(client, REPO, io.BytesIO(CONTENT))
+        assert confirmed == DIGEST
+        params = client.put.call_args.kwargs["params"]
+        assert params == [("_state", "s2"), ("digest", DIGEST)]
+
+    def test_mismatch_raises_before_put(self):
+        import io
+        client = self._client()
+        with pytest.raises(BlobError, match="Digest mismatch"):
+            upload_blob_streamed(
+                client, REPO, io.BytesIO(b"other"), digest=DIGEST
+            )
+        client.put.assert_not_called()
+
+    def test_sha512_algorithm(self):
+        import io
+        client = self._client(put_digest=_sha512_of(CONTENT))
+        confirmed = upload_blob_streamed(
+            client, REPO, io.BytesIO(CONTENT), algorithm="sha512"
+        )
+        assert confirmed == _sha512_of(CONTENT)
+
+
+class TestChunkSizer:
+
+    def test_targets_one_second_patches(self):
+        from regshape.libs.blobs.operations import _ChunkSizer
+        sizer = _ChunkSizer(1_000_000, maximum=100_000_000)
+        sizer.record(1_000_000, 0.5)          # 2 MB/s -> 2 MB chunks
+        assert sizer.size == 2_000_000
+        sizer.record(2_000_000, 8.0)          # slow link: shrink at most by half
+        assert sizer.size == 1_000_000
+
+    def test_grown_sizes_stay_multiples_of_minimum(self):
+        from regshape.libs.blobs.operations import _ChunkSizer
+        sizer = _ChunkSizer(1000, minimum=300, maximum=10_000)
+        sizer.record(900, 0.3)
+        assert sizer.size % 300 == 0
+        assert sizer.size >= 300
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""Tests for :mod:`regshape.libs.blobs.pipeline`."""
+
+import hashlib
+import io
+import threading
+
+import pytest
+
+from regshape.libs.blobs.pipeline import ChunkPipeline
+
+CHUNKS = [bytes([i]) * 100_000 for i in range(20)]
+
+
+class TestChunkPipeline:
+
+    @pytest.mark.parametrize("threaded", [True, False])
+    def test_every_consumer_sees_every_chunk_in_order(self, threaded):
+        hasher = hashlib.sha512()
+        sink = io.BytesIO()
+        with ChunkPipeline(hasher.update, sink.write, threaded=threaded) as pipeline:
+            for chunk in CHUNKS:
+                pipeline.feed(chunk)
+        assert sink.getvalue() == b"".join(CHUNKS)
+        assert hasher.hexdigest() == hashlib.sha512(b"".join(CHUNKS)).hexdigest()
+
+    def test_consumers_run_off_the_producer_thread(self):
+        threads = set()
+        with ChunkPipeline(lambda chunk: threads.add(threading.current_thread())) as pipeline:
+            pipeline.feed(b"x")
+        assert threading.current_thread() not in threads
+
+    def test_consumer_error_raised_on_close(self):
+        def _fail(chunk):
+            raise OSError("disk full")
+
+        with pytest.raises(OSError, match="disk full"):
+            with ChunkPipeline(_fail) as pipeline:
+                pipeline.feed(b"x")
+
+    def test_consumer_error_raised_on_later_feed(self):
+        failed = threading.Event()
+
+        def _fail(chunk):
+            failed.set()
+            raise OSError("disk full")
+
+        pipeline = ChunkPipeline(_fail, depth=1)
+        pipeline.feed(b"x")
+        failed.wait(5)
+        with pytest.raises(OSError):
+            for _ in range(10):
+                pipeline.feed(b"x")
+        pipeline.abort()
+
+    def test_bounded_queue_applies_backpressure(self):
+        release = threading.Event()
+        pipeline = ChunkPipeline(lambda chunk: release.wait(5), depth=2)
+        fed = []
+        producer = threading.Thread(
+            target=lambda: [pipeline.feed(b"x") or fed.append(1) for _ in range(10)]
+        )
+        producer.start()
+        producer.join(0.2)
+        assert len(fed) <= 3  # one in progress plus a full queue
+        release.set()
+        producer.join(5)
+        pipeline.close()
+        assert len(fed) == 10
+
+    def test_abort_on_exception_discards_queue(self):
+        seen = []
+        with pytest.raises(RuntimeError):
+            with ChunkPipeline(seen.append) as pipeline:
+                pipeline.feed(b"x")
+                raise RuntimeError("producer failed")
+        assert len(seen) <= 1
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""Tests for the lazily-loaded top-level CLI group."""
+
+import os
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+from regshape.cli.main import _SUBCOMMANDS, regshape
+
+
+def _loaded_modules(code: str) -> set[str]:
+    """Run *code* in a fresh interpreter and return the imported module names."""
+    result = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys; print('\\n'.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p)),
+    )
+    return set(result.stdout.split())
+
+
+class TestLazyGroup:
+    """Tests for LazyGroup command resolution and help output."""
+
+    def test_all_subcommands_listed(self):
+        result = CliRunner().invoke(regshape, ["--help"])
+        assert result.exit_code == 0
+        for name, (_path, short_help) in _SUBCOMMANDS.items():
+            assert name in result.output
+            assert short_help in result.output
+
+    def test_short_help_matches_command_docstring(self):
+        for name, (_path, short_help) in _SUBCOMMANDS.items():
+            command = regshape.get_command(None, name)
+            assert command.get_short_help_str(limit=80) == short_help
+
+    def test_unknown_command_errors(self):
+        result = CliRunner().invoke(regshape, ["nope"])
+        assert result.exit_code != 0
+        assert "No such command" in result.output
+
+    def test_help_does_not_import_subcommands(self):
+        modules = _loaded_modules(
+            "from click.testing import CliRunner\n"
+            "from regshape.cli.main import regshape\n"
+            "CliRunner().invoke(regshape, ['--help'])"
+        )
+        assert "regshape.cli.main" in modules
+        assert "regshape.cli.tag" not in modules
+        assert "requests" not in modules
+
+    def test_subcommand_imports_only_its_module(self):
+        modules = _loaded_modules(
+            "from click.testing import CliRunner\n"
+            "from regshape.cli.main import regshape\n"
+            "CliRunner().invoke(regshape, ['tag', '--help'])"
+        )
+        assert "regshape.cli.tag" in modules
+        assert "regshape.cli.docker" not in modules
+        assert "docker" not in modules
+
+
+class TestDockerSdkDeferred:
+    """The Docker SDK is imported only when a Docker operation runs."""
+
+    def test_importing_docker_operations_does_not_import_sdk(self):
+        modules = _loaded_modules("import regshape.libs.docker")
+        assert "regshape.libs.docker.operations" in modules
+        assert "docker" not in modules
+
+
+class TestTelemetryExporterDeferred:
+    """The Prometheus exporter (and http.server) is imported only when used."""
+
+    def test_importing_decorators_does_not_import_exporter(self):
+        modules = _loaded_modules(
+            "from click.testing import CliRunner\n"
+            "from regshape.cli.main import regshape\n"
+            "CliRunner().invoke(regshape, ['tag', '--help'])"
+        )
+        assert "regshape.libs.decorators" in modules
+        assert "regshape.libs.decorators.exporter" not in modules
+        assert "http.server" not in modules
+
+    def test_exporter_names_still_importable_from_package(self):
+        from regshape.libs import decorators
+        from regshape.libs.decorators import exporter
+
+        for name in ("MetricsServer", "format_prometheus",
+                     "start_metrics_server", "write_metrics_textfile"):
+            assert name in decorators.__all__
+            assert getattr(decorators, name) is getattr(exporter, name)
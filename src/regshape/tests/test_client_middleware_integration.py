@@ -762,4 +762,117 @@ class TestAuthV2Fallback:
             response = client.get("/v2/test/tags/list")
 
         assert response.status_code == 200
-        assert mock_http_request.call_count == 3
\ No newline at end of file
+        assert mock_http_request.call_count == 3
+
+
+_BEARER_CHALLENGE = {
+    "WWW-Authenticate": 'Bearer realm="https://auth.example.com/token",service="registry"',
+}
+
+
+class TestPreemptiveAuthorization:
+    """AuthMiddleware reuses negotiated headers for later requests."""
+
+    @patch('regshape.libs.transport.client.resolve_credentials')
+    @patch('regshape.libs.transport.client.http_request')
+    def test_second_request_same_scope_sends_cached_header(self, mock_http_request, mock_resolve):
+        mock_resolve.return_value = ("user", "pass")
+        mock_http_request.side_effect = [
+            _create_mock_response(401, _BEARER_CHALLENGE, b""),
+            _create_mock_response(200, {}, b"{}"),
+            _create_mock_response(200, {}, b"{}"),
+        ]
+        client = RegistryClient(TransportConfig("registry.example.com"))
+
+        with patch("regshape.libs.transport.middleware.registryauth.authenticate") as mock_auth:
+            mock_auth.return_value = "tok"
+            client.get("/v2/repo/manifests/v1")
+            client.head("/v2/repo/blobs/sha256:abc")
+
+        assert mock_http_request.call_count == 3
+        assert mock_auth.call_count == 1
+        third_headers = mock_http_request.call_args_list[2][1]["headers"]
+        assert third_headers["Authorization"] == "Bearer tok"
+
+    @patch('regshape.libs.transport.client.resolve_credentials')
+    @patch('regshape.libs.transport.client.http_request')
+    def test_push_scope_is_negotiated_separately(self, mock_http_request, mock_resolve):
+        mock_resolve.return_value = ("user", "pass")
+        mock_http_request.side_effect = [
+            _create_mock_response(401, _BEARER_CHALLENGE, b""),
+            _create_mock_response(200, {}, b"{}"),
+            _create_mock_response(401, _BEARER_CHALLENGE, b""),
+            _create_mock_response(201, {}, b""),
+        ]
+        client = RegistryClient(TransportConfig("registry.example.com"))
+
+        with patch("regshape.libs.transport.middleware.registryauth.authenticate") as mock_auth:
+            mock_auth.side_effect = ["pull-tok", "push-tok"]
+            client.get("/v2/repo/manifests/v1")
+            client.put("/v2/repo/manifests/v1", data=b"{}")
+
+        put_headers = mock_http_request.call_args_list[2][1]["headers"]
+        assert "Authorization" not in put_headers
+        assert mock_http_request.call_args_list[3][1]["headers"]["Authorization"] == "Bearer push-tok"
+
+    @patch('regshape.libs.transport.client.resolve_credentials')
+    @patch('regshape.libs.transport.client.http_request')
+    def test_expired_cached_header_is_renegotiated(self, mock_http_request, mock_resolve):
+        mock_resolve.return_value = ("user", "pass")
+        mock_http_request.side_effect = [
+            _create_mock_response(401, _BEARER_CHALLENGE, b""),
+            _create_mock_response(200, {}, b"{}"),
+            _create_mock_response(401, _BEARER_CHALLENGE, b""),
+            _create_mock_response(200, {}, b"{}"),
+            _create_mock_response(200, {}, b"{}"),
+        ]
+        client = RegistryClient(TransportConfig("registry.example.com"))
+
+        with patch("regshape.libs.transport.middleware.registryauth.authenticate") as mock_auth:
+            mock_auth.side_effect = ["old", "new"]
+            client.get("/v2/repo/manifests/v1")
+            response = client.get("/v2/repo/manifests/v2")
+            client.get("/v2/repo/manifests/v3")
+
+        assert response.status_code == 200
+        assert mock_http_request.call_args_list[3][1]["headers"]["Authorization"] == "Bearer new"
+        assert mock_http_request.call_args_list[4][1]["headers"]["Authorization"] == "Bearer new"
+
+
+class TestRegistryClientPool:
+    """Clients built inside use_client_pool share credentials, tokens and sessions."""
+
+    @patch('regshape.libs.auth.credentials.resolve_credentials')
+    @patch('regshape.libs.transport.client.http_request')
+    def test_clients_share_state(self, mock_http_request, mock_resolve):
+        from regshape.libs.transport.pool import use_client_pool
+
+        mock_resolve.return_value = ("user", "pass")
+        mock_http_request.side_effect = [
+            _create_mock_response(401, _BEARER_CHALLENGE, b""),
+            _create_mock_response(200, {}, b"{}"),
+            _create_mock_response(200, {}, b"{}"),
+        ]
+        with use_client_pool() as pool:
+            first = RegistryClient(TransportConfig("registry.example.com"))
+            second = RegistryClient(TransportConfig("registry.example.com"))
+            with patch("regshape.libs.transport.middleware.registryauth.authenticate") as mock_auth:
+                mock_auth.return_value = "tok"
+                first.get("/v2/repo/tags/list")
+                second.get("/v2/repo/tags/list")
+
+            assert pool.get("registry.example.com") is pool.get("registry.example.com")
+
+        assert mock_resolve.call_count == 1
+        assert mock_auth.call_count == 1
+        sessions = {c[1]["session"] for c in mock_http_request.call_args_list}
+        assert len(sessions) == 1
+        assert mock_http_request.call_args_list[2][1]["headers"]["Authorization"] == "Bearer tok"
+
+    @patch('regshape.libs.transport.client.resolve_credentials')
+    @patch('regshape.libs.transport.client.http_request')
+    def test_no_session_outside_pool(self, mock_http_request, mock_resolve):
+        mock_resolve.return_value = (None, None)
+        mock_http_request.return_value = _create_mock_response(200, {}, b"{}")
+        RegistryClient(TransportConfig("registry.example.com")).get("/v2/")
+        assert "session" not in mock_http_request.call_args[1]
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+"""Tests for :mod:`regshape.libs.compression`."""
+
+import gzip
+import hashlib
+import io
+import os
+import zlib
+
+import pytest
+
+from regshape.libs.compression import CompressingReader, compress_stream
+
+CONTENT = b"layer tar content " * 50_000
+
+
+def _sha256(data: bytes) -> str:
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+def _gzip_in_memory(data: bytes) -> bytes:
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb", mtime=0) as fh:
+        fh.write(data)
+    return buf.getvalue()
+
+
+class TestCompressingReader:
+
+    def test_gzip_output_matches_in_memory_compression(self):
+        reader = CompressingReader(io.BytesIO(CONTENT), "gzip", read_size=4096)
+        out = b"".join(iter(lambda: reader.read(1000), b""))
+        assert out == _gzip_in_memory(CONTENT)
+
+    def test_result_has_both_digests(self):
+        reader = CompressingReader(io.BytesIO(CONTENT))
+        out = reader.read()
+        assert reader.read() == b""
+        result = reader.result()
+        assert result.digest == _sha256(out)
+        assert result.size == len(out)
+        assert result.diff_id == _sha256(CONTENT)
+        assert result.uncompressed_size == len(CONTENT)
+        assert result.compression == "gzip"
+
+    def test_source_read_once_in_bounded_steps(self):
+        source = io.BytesIO(CONTENT)
+        reads = []
+        original = source.read
+        source.read = lambda n=-1: reads.append(n) or original(n)
+        reader = CompressingReader(source, read_size=65536)
+        while reader.read(65536):
+            pass
+        assert all(n == 65536 for n in reads)
+        assert source.tell() == len(CONTENT)
+
+    def test_result_before_eof_raises(self):
+        reader = CompressingReader(io.BytesIO(CONTENT))
+        reader.read(10)
+        with pytest.raises(ValueError):
+            reader.result()
+
+    def test_unsupported_compression(self):
+        with pytest.raises(ValueError, match="Unsupported compression"):
+            CompressingReader(io.BytesIO(b""), "bzip2")
+
+    def test_zstd_roundtrip(self):
+        zstd = pytest.importorskip("zstandard")
+        reader = CompressingReader(io.BytesIO(CONTENT), "zstd")
+        out = reader.read()
+        reader.read()
+        assert zstd.ZstdDecompressor().decompressobj().decompress(out) == CONTENT
+        assert reader.result().diff_id == _sha256(CONTENT)
+
+
+class TestParallelGzip:
+
+    # Several blocks, with a short last one, so block joins are exercised.
+    DATA = os.urandom(1 << 20) + CONTENT * 3
+
+    def _compress(self, data, threads, level=None):
+        reader = CompressingReader(io.BytesIO(data), "gzip", level=level, threads=threads)
+        out = b"".join(iter(lambda: reader.read(65536), b""))
+        return out, reader.result()
+
+    def test_output_is_a_single_valid_gzip_member(self):
+        out, result = self._compress(self.DATA, threads=4)
+        assert gzip.decompress(out) == self.DATA
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        assert decompressor.decompress(out) == self.DATA
+        assert decompressor.eof and decompressor.unused_data == b""
+        assert result.digest == _sha256(out)
+        assert result.diff_id == _sha256(self.DATA)
+        assert result.uncompressed_size == len(self.DATA)
+
+    def test_output_independent_of_thread_count(self):
+        digests = {self._compress(self.DATA, threads)[1].digest for threads in (2, 3, 8)}
+        assert len(digests) == 1
+
+    def test_ratio_close_to_single_threaded(self):
+        single, _ = self._compress(CONTENT * 3, threads=1)
+        parallel, _ = self._compress(CONTENT * 3, threads=4)
+        assert len(parallel) <= len(single) * 1.05
+
+    def test_level_applied(self):
+        fast, _ = self._compress(CONTENT, threads=2, level=1)
+        best, _ = self._compress(CONTENT, threads=2, level=9)
+        assert gzip.decompress(fast) == CONTENT
+        assert len(best) < len(fast)
+
+    def test_empty_input(self):
+        out, result = self._compress(b"", threads=4)
+        assert gzip.decompress(out) == b""
+        assert result.uncompressed_size == 0
+
+    def test_invalid_thread_count(self):
+        with pytest.raises(ValueError, match="at least 1"):
+            CompressingReader(io.BytesIO(b""), threads=0)
+
+    def test_zstd_multithreaded_roundtrip(self):
+        zstd = pytest.importorskip("zstandard")
+        reader = CompressingReader(io.BytesIO(self.DATA), "zstd", threads=4)
+        out = reader.read()
+        reader.read()
+        assert zstd.ZstdDecompressor().decompressobj().decompress(out) == self.DATA
+        assert reader.result().diff_id == _sha256(self.DATA)
+
+
+class TestCompressStream:
+
+    def test_writes_sink_and_returns_result(self):
+        sink = io.BytesIO()
+        result = compress_stream(io.BytesIO(CONTENT), sink, chunk_size=8192)
+        assert gzip.decompress(sink.getvalue()) == CONTENT
+        assert result.digest == _sha256(sink.getvalue())
+        assert result.diff_id == _sha256(CONTENT)
+
+    def test_threads_passed_to_reader(self):
+        sink = io.BytesIO()
+        result = compress_stream(io.BytesIO(CONTENT), sink, threads=2)
+        assert gzip.decompress(sink.getvalue()) == CONTENT
+        assert result.digest == _sha256(sink.getvalue())
@@ -166,3 +166,91 @@ class TestFormatCurlDebugEnhanced:
         assert "..." not in text
         # Full body should be present
         assert 'x' * 500 in text
+
+
+class TestDebugCallSampling:
+    """Tests for the --debug-sample / --debug-slow / --debug-errors filters."""
+
+    def teardown_method(self):
+        configure_telemetry(TelemetryConfig())
+
+    def _run(self, statuses, **config_kwargs):
+        from unittest.mock import MagicMock, patch
+        from regshape.libs.decorators.call_details import http_request
+
+        out = io.StringIO()
+        config = TelemetryConfig(debug_calls_enabled=True, output=out, **config_kwargs)
+        configure_telemetry(config)
+        with patch("regshape.libs.decorators.call_details.requests.request") as mock_request:
+            for status in statuses:
+                resp = MagicMock()
+                resp.status_code = status
+                resp.headers = {}
+                resp.content = b""
+                mock_request.return_value = resp
+                http_request(f"https://r.io/v2/?s={status}", "GET")
+        return out.getvalue().count("* Connected to"), config
+
+    def test_no_filters_logs_every_call(self):
+        logged, _ = self._run([200] * 5)
+        assert logged == 5
+
+    def test_sample_rate_logs_one_in_n(self):
+        logged, _ = self._run([200] * 9, debug_sample_rate=3)
+        assert logged == 3
+
+    def test_errors_only_logs_non_2xx(self):
+        logged, _ = self._run([200, 404, 200, 500], debug_errors_only=True)
+        assert logged == 2
+
+    def test_slow_threshold(self):
+        logged, _ = self._run([200, 200], debug_slow_threshold=0.0)
+        assert logged == 2
+        logged, _ = self._run([200, 200], debug_slow_threshold=60.0)
+        assert logged == 0
+
+    def test_metrics_recorded_for_unlogged_calls(self):
+        logged, config = self._run(
+            [200] * 4, debug_errors_only=True, metrics_enabled=True,
+        )
+        assert logged == 0
+        assert config.metrics.total_requests == 4
+
+
+class TestTelemetryWriter:
+    """Tests for the background telemetry writer."""
+
+    def teardown_method(self):
+        configure_telemetry(TelemetryConfig())
+
+    def test_lines_written_in_order_after_close(self):
+        from regshape.libs.decorators.output import TelemetryWriter, telemetry_write
+
+        out = io.StringIO()
+        log = io.StringIO()
+        writer = TelemetryWriter()
+        configure_telemetry(TelemetryConfig(writer=writer))
+        for i in range(100):
+            telemetry_write(f"line {i}", out, log)
+        writer.close()
+        expected = "".join(f"line {i}\n" for i in range(100))
+        assert out.getvalue() == expected
+        assert log.getvalue() == expected
+
+    def test_telemetry_async_option_drains_before_exit(self):
+        import click
+        from click.testing import CliRunner
+        from regshape.libs.decorators import get_telemetry_config, telemetry_options
+        from regshape.libs.decorators.output import telemetry_write
+
+        buf = io.StringIO()
+
+        @click.command()
+        @telemetry_options
+        def cmd():
+            assert get_telemetry_config().writer is not None
+            telemetry_write("queued", buf)
+
+        result = CliRunner().invoke(cmd, ["--telemetry-async"])
+        assert result.exit_code == 0, result.output
+        assert buf.getvalue() == "queued\n"
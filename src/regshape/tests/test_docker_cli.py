@@ -114,7 +114,10 @@ class TestDockerExportCLI:
         assert result.exit_code == 0, result.output
         assert "Exported" in result.output
         assert "nginx:latest" in result.output
-        mock_export.assert_called_once_with("nginx:latest", output, platform=None)
+        mock_export.assert_called_once_with(
+            "nginx:latest", output, platform=None, compress_level=None, compress_threads=1,
+            estargz=False,
+        )
 
     @patch("regshape.cli.docker.export_image")
     def test_export_json_output(self, mock_export, tmp_path):
@@ -139,7 +142,23 @@ class TestDockerExportCLI:
         assert result.exit_code == 0, result.output
         assert "linux/amd64" in result.output
         mock_export.assert_called_once_with(
-            "nginx:latest", output, platform="linux/amd64"
+            "nginx:latest", output, platform="linux/amd64",
+            compress_level=None, compress_threads=1,
+            estargz=False,
+        )
+
+    @patch("regshape.cli.docker.export_image")
+    def test_export_with_compress_options(self, mock_export, tmp_path):
+        output = str(tmp_path / "layout")
+        result = _runner().invoke(
+            regshape,
+            ["docker", "export", "--image", "nginx:latest", "--output", output,
+             "--compress-threads", "8", "--compress-level", "6"],
+        )
+        assert result.exit_code == 0, result.output
+        mock_export.assert_called_once_with(
+            "nginx:latest", output, platform=None, compress_level=6, compress_threads=8,
+            estargz=False,
         )
 
     @patch("regshape.cli.docker.export_image")
@@ -340,6 +340,37 @@ class TestExportImage:
         assert len(manifest_data["layers"]) == 1
         assert manifest_data["layers"][0]["mediaType"] == OCI_IMAGE_LAYER_TAR_GZIP
 
+    @patch("regshape.libs.docker.operations._get_docker_client")
+    def test_export_estargz(self, mock_get_client, tmp_path):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as layer_tar:
+            info = tarfile.TarInfo("etc/hostname")
+            info.size = 5
+            layer_tar.addfile(info, io.BytesIO(b"host\n"))
+        config = _make_docker_config()
+        config_path = f"{hashlib.sha256(config).hexdigest()}.json"
+        tar_bytes = _make_docker_save_tar(
+            [{"Config": config_path, "RepoTags": ["testimage:latest"], "Layers": ["l/layer.tar"]}],
+            {config_path: config},
+            {"l/layer.tar": buf.getvalue()},
+        )
+        mock_client = MagicMock()
+        mock_client.images.get.return_value.save = _mock_image_save(tar_bytes)
+        mock_get_client.return_value = mock_client
+
+        output = tmp_path / "layout"
+        export_image("testimage:latest", output, estargz=True)
+
+        blobs = output / "blobs" / "sha256"
+        index = json.loads((output / "index.json").read_text())
+        manifest = json.loads((blobs / index["manifests"][0]["digest"].split(":")[1]).read_text())
+        layer = manifest["layers"][0]
+        assert layer["mediaType"] == OCI_IMAGE_LAYER_TAR_GZIP
+        assert layer["annotations"]["containerd.io/snapshot/stargz/toc.digest"].startswith("sha256:")
+        layer_blob = (blobs / layer["digest"].split(":")[1]).read_bytes()
+        oci_config = json.loads((blobs / manifest["config"]["digest"].split(":")[1]).read_text())
+        assert oci_config["rootfs"]["diff_ids"] == [_sha256(gzip.decompress(layer_blob))]
+
     @patch("regshape.libs.docker.operations._get_docker_client")
     def test_export_multi_platform_all(self, mock_get_client, tmp_path):
         tar_bytes = _make_multi_platform_tar()
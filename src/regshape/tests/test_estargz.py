@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""Tests for :mod:`regshape.libs.estargz`."""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import tarfile
+import zlib
+
+import pytest
+
+from regshape.libs.estargz import (
+    FOOTER_SIZE,
+    TOC_DIGEST_ANNOTATION,
+    TOC_TAR_NAME,
+    UNCOMPRESSED_SIZE_ANNOTATION,
+    EStargzReader,
+)
+
+BIG = os.urandom(300_000)
+
+
+def _sha256(data: bytes) -> str:
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+def _layer_tar() -> bytes:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        directory = tarfile.TarInfo("usr")
+        directory.type = tarfile.DIRTYPE
+        directory.mode = 0o755
+        tar.addfile(directory)
+        for name, data in (("usr/big", BIG), ("usr/small", b"hello"), ("usr/empty", b"")):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        link = tarfile.TarInfo("usr/link")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "small"
+        tar.addfile(link)
+    return buf.getvalue()
+
+
+def _convert(source: bytes, **kwargs):
+    reader = EStargzReader(io.BytesIO(source), **kwargs)
+    blob = b"".join(iter(lambda: reader.read(8192), b""))
+    return blob, reader.result()
+
+
+def _read_toc(blob: bytes) -> dict:
+    footer = blob[-FOOTER_SIZE:]
+    assert gzip.decompress(footer) == b""
+    offset = int(footer[16:32], 16)
+    member = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(blob[offset:])
+    with tarfile.open(fileobj=io.BytesIO(member)) as tar:
+        return json.loads(tar.extractfile(TOC_TAR_NAME).read())
+
+
+class TestEStargzReader:
+
+    def test_blob_is_a_gzip_tar_of_the_source_entries(self):
+        blob, result = _convert(_layer_tar(), chunk_size=100_000)
+        content = gzip.decompress(blob)
+        assert result.digest == _sha256(blob)
+        assert result.size == len(blob)
+        assert result.diff_id == _sha256(content)
+        assert result.uncompressed_size == len(content)
+        with tarfile.open(fileobj=io.BytesIO(content)) as tar:
+            assert tar.getnames() == [
+                ".no.prefetch.landmark", "usr", "usr/big", "usr/small", "usr/empty",
+                "usr/link", TOC_TAR_NAME,
+            ]
+            assert tar.extractfile("usr/big").read() == BIG
+
+    def test_toc_locates_each_chunk(self):
+        blob, result = _convert(_layer_tar(), chunk_size=100_000)
+        toc = _read_toc(blob)
+        assert result.toc_digest == _sha256(json.dumps(toc, indent="\t").encode())
+        big = [entry for entry in toc["entries"] if entry["name"] == "usr/big"]
+        assert [entry["type"] for entry in big] == ["reg", "chunk", "chunk"]
+        assert big[0]["digest"] == _sha256(BIG)
+        for entry in big:
+            start = entry.get("chunkOffset", 0)
+            size = entry.get("chunkSize", len(BIG) - start)
+            data = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(blob[entry["offset"]:])
+            assert data[:size] == BIG[start:start + size]
+            assert entry["chunkDigest"] == _sha256(BIG[start:start + size])
+
+    def test_toc_entry_metadata(self):
+        blob, _result = _convert(_layer_tar())
+        entries = {entry["name"]: entry for entry in _read_toc(blob)["entries"]}
+        assert entries["usr/"]["type"] == "dir"
+        assert entries["usr/"]["mode"] == 0o755
+        assert entries["usr/link"] == {
+            "name": "usr/link", "type": "symlink", "linkName": "small", "mode": 0o644,
+        }
+        assert entries["usr/empty"]["digest"] == _sha256(b"")
+
+    def test_annotations(self):
+        _blob, result = _convert(_layer_tar())
+        assert result.annotations() == {
+            TOC_DIGEST_ANNOTATION: result.toc_digest,
+            UNCOMPRESSED_SIZE_ANNOTATION: str(result.uncompressed_size),
+        }
+
+    def test_output_is_reproducible(self):
+        assert _convert(_layer_tar())[1].digest == _convert(_layer_tar())[1].digest
+
+    def test_not_a_tar(self):
+        with pytest.raises(ValueError, match="not a valid tar"):
+            _convert(b"not a tar archive" * 100)
+
+    def test_existing_toc_rejected(self):
+        blob, _result = _convert(_layer_tar())
+        with pytest.raises(ValueError, match=TOC_TAR_NAME):
+            _convert(gzip.decompress(blob))
+
+    def test_result_before_eof_raises(self):
+        reader = EStargzReader(io.BytesIO(_layer_tar()))
+        reader.read(10)
+        with pytest.raises(ValueError):
+            reader.result()
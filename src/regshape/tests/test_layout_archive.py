@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+"""Tests for streaming OCI Image Layouts to and from tar archives
+(:func:`~regshape.libs.layout.export_layout_archive` and
+:func:`~regshape.libs.layout.import_layout_archive`)."""
+
+import gzip
+import hashlib
+import io
+import json
+import tarfile
+
+import pytest
+
+from regshape.libs.errors import LayoutError
+from regshape.libs.layout import (
+    add_blob,
+    export_layout_archive,
+    find_manifest,
+    generate_config,
+    generate_manifest,
+    import_layout_archive,
+    init_layout,
+    read_index,
+    stage_layer,
+    validate_layout,
+)
+from regshape.libs.models.mediatype import OCI_IMAGE_LAYER_TAR_GZIP
+
+
+def _build_layout(path, ref="v1", content=b"layer content"):
+    init_layout(path)
+    stage_layer(path, gzip.compress(content, mtime=0), OCI_IMAGE_LAYER_TAR_GZIP)
+    generate_config(path)
+    return generate_manifest(path, ref_name=ref)
+
+
+def _export(layout, **kwargs) -> bytes:
+    buf = io.BytesIO()
+    export_layout_archive(layout, buf, **kwargs)
+    return buf.getvalue()
+
+
+class _Pipe(io.RawIOBase):
+    """Write-only, non-seekable sink, like standard output."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.data += b
+        return len(b)
+
+
+class TestExportLayoutArchive:
+
+    def test_metadata_first_then_manifest_config_layers(self, tmp_path):
+        layout = tmp_path / "layout"
+        manifest = _build_layout(layout)
+        extra_digest, _ = add_blob(layout, b"unreferenced")
+        names = tarfile.open(fileobj=io.BytesIO(_export(layout))).getnames()
+
+        content = json.loads((layout / "blobs" / "sha256" / manifest.digest[7:]).read_bytes())
+        expected_blobs = [manifest.digest, content["config"]["digest"],
+                          content["layers"][0]["digest"], extra_digest]
+        assert names[:4] == ["oci-layout", "index.json", "blobs", "blobs/sha256"]
+        assert names[4:] == [f"blobs/sha256/{d[7:]}" for d in expected_blobs]
+        assert ".regshape-stage.json" not in names
+
+    def test_streams_to_non_seekable_output(self, tmp_path):
+        layout = tmp_path / "layout"
+        _build_layout(layout)
+        pipe = _Pipe()
+        result = export_layout_archive(layout, pipe)
+        assert bytes(pipe.data) == _export(layout)
+        assert result.blobs == 3
+        assert len(result.manifests) == 1
+
+    def test_corrupt_blob_fails(self, tmp_path):
+        layout = tmp_path / "layout"
+        manifest = _build_layout(layout)
+        content = json.loads((layout / "blobs" / "sha256" / manifest.digest[7:]).read_bytes())
+        layer = layout / "blobs" / "sha256" / content["layers"][0]["digest"][7:]
+        layer.write_bytes(b"X" * layer.stat().st_size)
+        with pytest.raises(LayoutError, match="does not match its digest"):
+            _export(layout)
+
+    def test_corrupt_manifest_not_archived(self, tmp_path):
+        layout = tmp_path / "layout"
+        manifest = _build_layout(layout)
+        blob = layout / "blobs" / "sha256" / manifest.digest[7:]
+        blob.write_bytes(blob.read_bytes().replace(b'"schemaVersion":2', b'"schemaVersion":3'))
+        buf = io.BytesIO()
+        with pytest.raises(LayoutError, match="does not match its digest"):
+            export_layout_archive(layout, buf)
+        assert f"blobs/sha256/{manifest.digest[7:]}".encode() not in buf.getvalue()
+
+    def test_gzip_archive(self, tmp_path):
+        layout = tmp_path / "layout"
+        _build_layout(layout)
+        archive = _export(layout, compression="gzip")
+        assert gzip.decompress(archive) == _export(layout)
+
+
+class TestImportLayoutArchive:
+
+    def test_roundtrip_into_new_directory(self, tmp_path):
+        source = tmp_path / "source"
+        manifest = _build_layout(source)
+        target = tmp_path / "target"
+        result = import_layout_archive(io.BytesIO(_export(source)), target)
+        validate_layout(target)
+        assert find_manifest(target, "v1").digest == manifest.digest
+        assert result.blobs == 3
+        assert [d.digest for d in result.manifests] == [manifest.digest]
+
+    def test_gzip_archive_detected(self, tmp_path):
+        source = tmp_path / "source"
+        _build_layout(source)
+        target = tmp_path / "target"
+        import_layout_archive(io.BytesIO(_export(source, compression="gzip")), target)
+        validate_layout(target)
+
+    def test_merges_into_existing_layout(self, tmp_path):
+        source = tmp_path / "source"
+        _build_layout(source, ref="v2", content=b"other")
+        target = tmp_path / "target"
+        _build_layout(target, ref="v1")
+        archive = _export(source)
+        import_layout_archive(io.BytesIO(archive), target)
+        import_layout_archive(io.BytesIO(archive), target)
+        assert sorted(
+            d.annotations["org.opencontainers.image.ref.name"]
+            for d in read_index(target).manifests
+        ) == ["v1", "v2"]
+        validate_layout(target)
+
+    def test_digest_mismatch_rejected_and_index_unchanged(self, tmp_path):
+        source = tmp_path / "source"
+        _build_layout(source)
+        out = io.BytesIO()
+        with tarfile.open(fileobj=io.BytesIO(_export(source))) as src, \
+                tarfile.open(fileobj=out, mode="w") as dst:
+            for member in src:
+                data = src.extractfile(member).read() if member.isreg() else None
+                if data is not None and member.name.startswith("blobs/") and member.size > 100:
+                    data = b"\0" * len(data)
+                dst.addfile(member, io.BytesIO(data) if data is not None else None)
+        target = tmp_path / "target"
+        with pytest.raises(LayoutError, match="Digest mismatch"):
+            import_layout_archive(io.BytesIO(out.getvalue()), target)
+        assert read_index(target).manifests == []
+
+    def test_missing_layer_rejected_and_index_unchanged(self, tmp_path):
+        source = tmp_path / "source"
+        manifest = _build_layout(source)
+        content = json.loads((source / "blobs" / "sha256" / manifest.digest[7:]).read_bytes())
+        layer_name = "blobs/sha256/" + content["layers"][0]["digest"][7:]
+        out = io.BytesIO()
+        with tarfile.open(fileobj=io.BytesIO(_export(source))) as src, \
+                tarfile.open(fileobj=out, mode="w") as dst:
+            for member in src:
+                if member.name != layer_name:
+                    dst.addfile(member, src.extractfile(member) if member.isreg() else None)
+        target = tmp_path / "target"
+        with pytest.raises(LayoutError, match=f"manifest {manifest.digest} references missing blob"):
+            import_layout_archive(io.BytesIO(out.getvalue()), target)
+        assert read_index(target).manifests == []
+
+    def test_unsafe_and_unknown_entries_ignored(self, tmp_path):
+        source = tmp_path / "source"
+        _build_layout(source)
+        out = io.BytesIO()
+        with tarfile.open(fileobj=io.BytesIO(_export(source))) as src, \
+                tarfile.open(fileobj=out, mode="w") as dst:
+            for member in src:
+                dst.addfile(member, src.extractfile(member) if member.isreg() else None)
+            for name in ("../escape", "blobs/sha256/../../escape", "manifest.json"):
+                info = tarfile.TarInfo(name)
+                info.size = 1
+                dst.addfile(info, io.BytesIO(b"x"))
+        target = tmp_path / "sub" / "target"
+        import_layout_archive(io.BytesIO(out.getvalue()), target)
+        assert not (tmp_path / "escape").exists()
+        assert not (tmp_path / "sub" / "escape").exists()
+        assert not (target / "manifest.json").exists()
+
+    def test_missing_index_rejected(self, tmp_path):
+        out = io.BytesIO()
+        with tarfile.open(fileobj=out, mode="w") as tar:
+            blob = b"data"
+            info = tarfile.TarInfo("blobs/sha256/" + hashlib.sha256(blob).hexdigest())
+            info.size = len(blob)
+            tar.addfile(info, io.BytesIO(blob))
+        with pytest.raises(LayoutError, match="not an OCI Image Layout"):
+            import_layout_archive(io.BytesIO(out.getvalue()), tmp_path / "target")
+
+    def test_not_a_tar_rejected(self, tmp_path):
+        with pytest.raises(LayoutError, match="not a valid tar"):
+            import_layout_archive(io.BytesIO(b"garbage" * 200), tmp_path / "target")
+
+    def test_non_layout_directory_rejected(self, tmp_path):
+        target = tmp_path / "target"
+        target.mkdir()
+        (target / "file").write_text("x")
+        with pytest.raises(LayoutError, match="not empty"):
+            import_layout_archive(io.BytesIO(b""), target)
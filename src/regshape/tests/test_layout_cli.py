@@ -9,6 +9,8 @@ Library internals are not mocked — tests use real temporary directories.
 import gzip
 import io
 import json
+import os
+import tarfile
 
 import pytest
 from click.testing import CliRunner
@@ -149,6 +151,105 @@ class TestLayoutAddLayerCLI:
         # Should succeed — content auto-compressed
         assert result.exit_code == 0, result.output
 
+    def test_add_multiple_layers_in_order(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        files = []
+        for n in range(3):
+            layer_file = tmp_path / f"layer{n}.tar.gz"
+            layer_file.write_bytes(_make_gzip(f"content {n}".encode()))
+            files += ["--file", str(layer_file)]
+
+        result = _runner().invoke(regshape, [
+            "layout", "add", "layer", "--path", str(layout_dir), *files, "--json",
+        ])
+        assert result.exit_code == 0, result.output
+        data = json.loads(result.output)
+        stage = json.loads((layout_dir / ".regshape-stage.json").read_text())
+        assert [d["digest"] for d in data] == [layer["digest"] for layer in stage["layers"]]
+        assert len(data) == 3
+
+    def test_add_multiple_layers_all_or_nothing(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        layer_file = tmp_path / "layer.tar.gz"
+        layer_file.write_bytes(_make_gzip(b"content"))
+        unreadable = tmp_path / "unreadable"
+        unreadable.mkdir()
+
+        result = _runner().invoke(regshape, [
+            "layout", "add", "layer", "--path", str(layout_dir),
+            "--file", str(layer_file), "--file", str(unreadable),
+        ])
+        assert result.exit_code == 1
+        assert json.loads((layout_dir / ".regshape-stage.json").read_text())["layers"] == []
+
+    def test_add_layer_compress_threads_and_level(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        content = os.urandom(1 << 20) + b"tar content " * 200_000
+        layer_file = tmp_path / "layer.tar"
+        layer_file.write_bytes(content)
+
+        result = _runner().invoke(regshape, [
+            "layout", "add", "layer", "--path", str(layout_dir),
+            "--file", str(layer_file),
+            "--compress-threads", "4", "--compress-level", "6", "--json",
+        ])
+        assert result.exit_code == 0, result.output
+        digest = json.loads(result.output)["digest"]
+        blob = layout_dir / "blobs" / "sha256" / digest.split(":", 1)[1]
+        assert gzip.decompress(blob.read_bytes()) == content
+
+    def test_add_layer_estargz_from_gzip_tar(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            info = tarfile.TarInfo("file")
+            info.size = 4
+            tar.addfile(info, io.BytesIO(b"data"))
+        layer_file = tmp_path / "layer.tar.gz"
+        layer_file.write_bytes(_make_gzip(buf.getvalue()))
+
+        result = _runner().invoke(regshape, [
+            "layout", "add", "layer", "--path", str(layout_dir),
+            "--file", str(layer_file), "--compress-format", "estargz", "--json",
+        ])
+        assert result.exit_code == 0, result.output
+        data = json.loads(result.output)
+        assert data["media_type"] == OCI_IMAGE_LAYER_TAR_GZIP
+        assert "containerd.io/snapshot/stargz/toc.digest" in data["annotations"]
+        blob = layout_dir / "blobs" / "sha256" / data["digest"].split(":", 1)[1]
+        with tarfile.open(fileobj=io.BytesIO(gzip.decompress(blob.read_bytes()))) as tar:
+            assert tar.extractfile("file").read() == b"data"
+
+    def test_add_layer_estargz_rejects_non_tar(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        layer_file = tmp_path / "layer.bin"
+        layer_file.write_bytes(b"not a tar archive" * 100)
+
+        result = _runner().invoke(regshape, [
+            "layout", "add", "layer", "--path", str(layout_dir),
+            "--file", str(layer_file), "--compress-format", "estargz",
+        ])
+        assert result.exit_code == 1
+        assert "not a valid tar" in result.output
+
+    def test_add_layer_rejects_gzip_level_out_of_range(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        layer_file = tmp_path / "layer.tar"
+        layer_file.write_bytes(b"content")
+
+        result = _runner().invoke(regshape, [
+            "layout", "add", "layer", "--path", str(layout_dir),
+            "--file", str(layer_file), "--compress-level", "12",
+        ])
+        assert result.exit_code == 1
+        assert "0-9" in result.output
+
     def test_add_layer_fails_on_missing_layout(self, tmp_path):
         layer_file = tmp_path / "layer.tar.gz"
         layer_file.write_bytes(_make_gzip(b"content"))
@@ -504,3 +605,93 @@ class TestLayoutValidateCLI:
         ])
         assert result.exit_code == 0, result.output
         assert "valid" in result.output
+
+    def test_full_detects_stat_preserving_tamper(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        _full_pipeline(layout_dir)
+        stamp = 1_000_000_000_000_000_000
+        for path in layout_dir.rglob("*"):
+            os.utime(path, ns=(stamp, stamp))
+        args = ["layout", "validate", "--path", str(layout_dir)]
+        assert _runner().invoke(regshape, args).exit_code == 0
+
+        config_digest = json.loads((layout_dir / ".regshape-stage.json").read_text())["config"]["digest"]
+        config = layout_dir / "blobs" / "sha256" / config_digest.split(":")[1]
+        with open(config, "r+b") as fh:
+            fh.write(b" ")
+        os.utime(config, ns=(stamp, stamp))
+
+        assert _runner().invoke(regshape, args).exit_code == 0
+        result = _runner().invoke(regshape, args + ["--full"])
+        assert result.exit_code == 1
+        assert "digest mismatch" in result.output
+
+    def test_reports_every_violation(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        _full_pipeline(layout_dir)
+        stage = json.loads((layout_dir / ".regshape-stage.json").read_text())
+        for desc in [stage["config"]] + stage["layers"]:
+            (layout_dir / "blobs" / "sha256" / desc["digest"].split(":")[1]).unlink()
+        result = _runner().invoke(regshape, [
+            "layout", "validate", "--path", str(layout_dir), "--concurrency", "2",
+        ])
+        assert result.exit_code == 1
+        assert result.output.count("does not exist") >= 2
+
+
+# ---------------------------------------------------------------------------
+# layout export / import
+# ---------------------------------------------------------------------------
+
+
+class TestLayoutExportImportCLI:
+    def test_export_to_file_and_import(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        manifest = _full_pipeline(layout_dir)
+        archive = tmp_path / "layout.tar"
+
+        result = _runner().invoke(regshape, [
+            "layout", "export", "--path", str(layout_dir), "--output", str(archive), "--json",
+        ])
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output)["blobs"] == 3
+
+        target = tmp_path / "target"
+        result = _runner().invoke(regshape, [
+            "layout", "import", "--path", str(target), "--input", str(archive), "--json",
+        ])
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output)["manifests"][0]["digest"] == manifest.digest
+        result = _runner().invoke(regshape, ["layout", "validate", "--path", str(target)])
+        assert result.exit_code == 0, result.output
+
+    def test_export_to_stdout_import_from_stdin(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        _full_pipeline(layout_dir)
+
+        result = _runner().invoke(regshape, [
+            "layout", "export", "--path", str(layout_dir), "--output", "-",
+            "--format", "tar+gzip",
+        ])
+        assert result.exit_code == 0, result.stderr
+        assert result.stdout_bytes[:2] == b"\x1f\x8b"
+        assert "Exported 1 manifest(s), 3 blob(s)" in result.stderr
+
+        target = tmp_path / "target"
+        result = _runner().invoke(
+            regshape, ["layout", "import", "--path", str(target)], input=result.stdout_bytes,
+        )
+        assert result.exit_code == 0, result.output
+        assert "Imported 1 manifest(s), 3 blob(s)" in result.output
+
+    def test_import_rejects_invalid_archive(self, tmp_path):
+        result = _runner().invoke(
+            regshape, ["layout", "import", "--path", str(tmp_path / "target")],
+            input=b"not an archive" * 100,
+        )
+        assert result.exit_code == 1
+        assert "not a valid tar" in result.output
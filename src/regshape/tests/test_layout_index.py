@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""Tests for :mod:`regshape.libs.layout.index` and the batched
+``index.json`` operations built on it."""
+
+import hashlib
+from unittest.mock import patch
+
+import pytest
+
+from regshape.libs.layout.index import LayoutIndex
+from regshape.libs.layout.operations import (
+    _write_index,
+    add_manifest,
+    find_manifest,
+    index_batch,
+    init_layout,
+    read_index,
+)
+from regshape.libs.models.descriptor import Descriptor
+from regshape.libs.models.manifest import ImageIndex
+from regshape.libs.models.mediatype import OCI_IMAGE_INDEX, OCI_IMAGE_MANIFEST
+
+REF = "org.opencontainers.image.ref.name"
+
+
+def _manifest(n: int) -> bytes:
+    config = "sha256:" + hashlib.sha256(str(n).encode()).hexdigest()
+    return (
+        '{"schemaVersion":2,"mediaType":"%s","config":{"mediaType":'
+        '"application/vnd.oci.empty.v1+json","digest":"%s","size":2},"layers":[]}'
+        % (OCI_IMAGE_MANIFEST, config)
+    ).encode()
+
+
+def _desc(n: int, **annotations) -> Descriptor:
+    return Descriptor(
+        OCI_IMAGE_MANIFEST, "sha256:" + f"{n:064x}", n, annotations=annotations or None,
+    )
+
+
+class TestLayoutIndex:
+
+    def test_lookups(self):
+        index = LayoutIndex(ImageIndex(2, OCI_IMAGE_INDEX, [
+            _desc(1, **{REF: "v1"}), _desc(2, **{REF: "v2"}), _desc(1, **{REF: "stable"}),
+        ]))
+        assert index.find("v2").digest == _desc(2).digest
+        assert index.find("missing") is None
+        assert len(index.get(_desc(1).digest)) == 2
+        assert _desc(2).digest in index
+        assert sorted(index.ref_names()) == ["stable", "v1", "v2"]
+        assert not index.dirty
+
+    def test_identical_entry_not_duplicated(self):
+        index = LayoutIndex(ImageIndex(2, OCI_IMAGE_INDEX, [_desc(1, **{REF: "v1"})]))
+        assert index.add(_desc(1, **{REF: "v1"})) is index.index.manifests[0]
+        assert not index.dirty
+        index.add(_desc(1, **{REF: "latest"}))
+        assert len(index) == 2 and index.dirty
+
+    def test_replace_keeps_annotations(self):
+        index = LayoutIndex(ImageIndex(2, OCI_IMAGE_INDEX, [_desc(1, **{REF: "v1"}), _desc(2)]))
+        updated = index.replace(_desc(1).digest, _desc(3))
+        assert updated.digest == _desc(3).digest
+        assert index.find("v1") is updated
+        assert _desc(1).digest not in index
+        assert index.replace(_desc(9).digest, _desc(4)) is None
+
+
+class TestIndexBatch:
+
+    def test_batch_writes_index_once(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        with patch("regshape.libs.layout.operations._write_index", wraps=_write_index) as mock_write:
+            with index_batch(layout_dir) as index:
+                for n in range(500):
+                    add_manifest(layout_dir, _manifest(n), OCI_IMAGE_MANIFEST,
+                                 ref_name=f"v{n}", index=index)
+        assert mock_write.call_count == 1
+        assert len(read_index(layout_dir).manifests) == 500
+        assert find_manifest(layout_dir, "v42").digest == "sha256:" + hashlib.sha256(_manifest(42)).hexdigest()
+
+    def test_failed_batch_leaves_index_unchanged(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        before = (layout_dir / "index.json").read_bytes()
+        with pytest.raises(RuntimeError):
+            with index_batch(layout_dir) as index:
+                add_manifest(layout_dir, _manifest(1), OCI_IMAGE_MANIFEST, index=index)
+                raise RuntimeError("boom")
+        assert (layout_dir / "index.json").read_bytes() == before
+
+    def test_unchanged_batch_not_written(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        add_manifest(layout_dir, _manifest(1), OCI_IMAGE_MANIFEST, ref_name="v1")
+        with patch("regshape.libs.layout.operations._write_index") as mock_write:
+            add_manifest(layout_dir, _manifest(1), OCI_IMAGE_MANIFEST, ref_name="v1")
+        mock_write.assert_not_called()
+        assert len(read_index(layout_dir).manifests) == 1
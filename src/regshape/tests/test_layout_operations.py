@@ -3,6 +3,7 @@
 """Tests for :mod:`regshape.libs.layout.operations`."""
 
 import hashlib
+import io
 import json
 import os
 
@@ -11,9 +12,13 @@ import pytest
 from regshape.libs.errors import LayoutError
 from regshape.libs.layout.operations import (
     add_blob,
+    add_blob_from_file,
+    add_blob_from_stream,
     add_manifest,
+    check_layout,
     init_layout,
     read_blob,
+    read_blob_view,
     read_index,
     validate_layout,
 )
@@ -130,6 +135,111 @@ class TestAddBlob:
             add_blob(tmp_path / "nonexistent", b"data")
 
 
+class _ChunkRecorder(io.BytesIO):
+    """BytesIO recording the size of every read request."""
+
+    def __init__(self, content: bytes) -> None:
+        super().__init__(content)
+        self.reads: list[int] = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+class TestAddBlobFromStream:
+    def test_matches_add_blob(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        content = os.urandom(10_000)
+        digest, size = add_blob_from_stream(layout_dir, io.BytesIO(content), chunk_size=4096)
+
+        assert (digest, size) == (_sha256(content), len(content))
+        hex_ = digest.split(":")[1]
+        assert (layout_dir / "blobs" / "sha256" / hex_).read_bytes() == content
+        assert not list((layout_dir / "blobs" / "sha256").glob(".tmp-*"))
+
+    def test_reads_in_bounded_chunks(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        source = _ChunkRecorder(b"x" * 10_000)
+        add_blob_from_stream(layout_dir, source, chunk_size=1024)
+        assert set(source.reads) == {1024}
+
+    def test_existing_digest_short_circuits(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        content = b"already there"
+        digest, _ = add_blob(layout_dir, content)
+        source = _ChunkRecorder(content)
+
+        assert add_blob_from_stream(layout_dir, source, digest=digest) == (digest, len(content))
+        assert source.reads == []
+
+    def test_digest_mismatch_leaves_no_blob(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        wrong = _sha256(b"something else")
+        with pytest.raises(LayoutError, match="Digest mismatch"):
+            add_blob_from_stream(layout_dir, io.BytesIO(b"content"), digest=wrong)
+        assert os.listdir(layout_dir / "blobs" / "sha256") == []
+
+    def test_sha512_digest(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        content = b"sha512 content"
+        digest = "sha512:" + hashlib.sha512(content).hexdigest()
+        assert add_blob_from_stream(layout_dir, io.BytesIO(content), digest=digest) == (
+            digest, len(content),
+        )
+        assert (layout_dir / "blobs" / "sha512" / digest.split(":")[1]).exists()
+
+    def test_unsupported_digest_rejected(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        with pytest.raises(LayoutError, match="Unsupported digest"):
+            add_blob_from_stream(layout_dir, io.BytesIO(b"x"), digest="md5:abc")
+
+    @pytest.mark.parametrize("digest", [
+        "sha256:../../oci-layout",
+        "sha256:" + "A" * 64,
+        "sha512:" + "a" * 64,
+    ])
+    def test_malformed_digest_rejected(self, tmp_path, digest):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        with pytest.raises(LayoutError, match="Malformed digest"):
+            add_blob_from_stream(layout_dir, io.BytesIO(b"x"), digest=digest)
+        with pytest.raises(LayoutError, match="Malformed digest"):
+            add_blob_from_file(layout_dir, layout_dir / "oci-layout", digest=digest)
+
+
+class TestAddBlobFromFile:
+    def test_stores_file(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        source = tmp_path / "layer.tar"
+        source.write_bytes(b"layer bytes")
+
+        digest, size = add_blob_from_file(layout_dir, source)
+
+        assert (digest, size) == (_sha256(b"layer bytes"), 11)
+        assert read_blob(layout_dir, digest) == b"layer bytes"
+
+    def test_existing_digest_skips_read(self, tmp_path, monkeypatch):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        source = tmp_path / "layer.tar"
+        source.write_bytes(b"layer bytes")
+        digest, _ = add_blob_from_file(layout_dir, source)
+
+        def fail_open(*args, **kwargs):
+            raise AssertionError("file should not be opened")
+
+        monkeypatch.setattr("builtins.open", fail_open)
+        assert add_blob_from_file(layout_dir, source, digest=digest) == (digest, 11)
+
+
 # ---------------------------------------------------------------------------
 # add_manifest
 # ---------------------------------------------------------------------------
@@ -320,6 +430,44 @@ class TestReadBlob:
             read_blob(layout_dir, "md5:" + "a" * 32)
 
 
+class TestReadBlobView:
+    def test_yields_mapped_content(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        content = b"some blob data" * 1000
+        digest, _ = add_blob(layout_dir, content)
+        with read_blob_view(layout_dir, digest) as view:
+            assert isinstance(view, memoryview)
+            assert view.readonly
+            assert view == content
+            assert _sha256(view) == digest
+        with pytest.raises(ValueError):
+            len(view)  # released on exit
+
+    def test_empty_blob(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        digest, _ = add_blob(layout_dir, b"")
+        with read_blob_view(layout_dir, digest) as view:
+            assert view.nbytes == 0
+
+    def test_raises_on_digest_mismatch(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        digest, _ = add_blob(layout_dir, b"original")
+        (layout_dir / "blobs" / "sha256" / digest.split(":")[1]).write_bytes(b"corrupted")
+        with pytest.raises(LayoutError, match="Digest mismatch"):
+            with read_blob_view(layout_dir, digest):
+                pass
+
+    def test_raises_if_blob_not_found(self, tmp_path):
+        layout_dir = tmp_path / "layout"
+        init_layout(layout_dir)
+        with pytest.raises(LayoutError, match="not found"):
+            with read_blob_view(layout_dir, "sha256:" + "a" * 64):
+                pass
+
+
 # ---------------------------------------------------------------------------
 # validate_layout
 # ---------------------------------------------------------------------------
@@ -412,3 +560,46 @@ class TestValidateLayout:
 
         with pytest.raises(LayoutError, match="[Dd]igest mismatch"):
             validate_layout(layout_dir)
+
+    def test_reports_every_violation(self, tmp_path):
+        layout_dir = self._build_valid_layout(tmp_path)
+        manifest = json.loads(read_blob(layout_dir, read_index(layout_dir).manifests[0].digest))
+        for desc in (manifest["config"], manifest["layers"][0]):
+            (layout_dir / "blobs" / "sha256" / desc["digest"].split(":")[1]).unlink()
+
+        violations = check_layout(layout_dir)
+        assert len(violations) == 2
+        assert all("does not exist" in v.message for v in violations)
+        with pytest.raises(LayoutError, match="2 violations") as exc_info:
+            validate_layout(layout_dir)
+        assert [v.message for v in exc_info.value.violations] == [v.message for v in violations]
+
+    def test_recurses_into_nested_index(self, tmp_path):
+        layout_dir = self._build_valid_layout(tmp_path)
+        entry = read_index(layout_dir).manifests[0]
+        nested = ImageIndex(
+            schema_version=2,
+            media_type=OCI_IMAGE_INDEX,
+            manifests=[Descriptor(OCI_IMAGE_MANIFEST, entry.digest, entry.size)],
+        )
+        add_manifest(layout_dir, nested.to_json().encode("utf-8"), OCI_IMAGE_INDEX, ref_name="multi")
+        manifest = json.loads(read_blob(layout_dir, entry.digest))
+        (layout_dir / "blobs" / "sha256" / manifest["layers"][0]["digest"].split(":")[1]).unlink()
+
+        violations = check_layout(layout_dir)
+        assert len(violations) == 1
+        assert "does not exist" in violations[0].message
+
+    def test_shared_blobs_hashed_once(self, tmp_path):
+        layout_dir = self._build_valid_layout(tmp_path)
+        entry = read_index(layout_dir).manifests[0]
+        manifest = json.loads(read_blob(layout_dir, entry.digest))
+        manifest["annotations"] = {"copy": "true"}
+        add_manifest(layout_dir, json.dumps(manifest).encode("utf-8"), OCI_IMAGE_MANIFEST, ref_name="copy")
+
+        events = []
+        check_layout(layout_dir, full=True, progress_callback=lambda e, **kw: events.append((e, kw)))
+        assert events[0] == ("blobs_found", {"total": 2})
+        checked = [kw for e, kw in events if e == "blob_checked"]
+        assert sorted(kw["done"] for kw in checked) == [1, 2]
+        assert all(kw["ok"] and kw["total"] == 2 for kw in checked)
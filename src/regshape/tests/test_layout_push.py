@@ -7,6 +7,7 @@ CLI tests use the Click test runner.
 """
 
 import gzip
+import hashlib
 import io
 import json
 from dataclasses import dataclass
@@ -91,7 +92,7 @@ class TestPushLayout:
 
     @patch("regshape.libs.manifests.push_manifest")
     @patch("regshape.libs.blobs.upload_blob")
-    @patch("regshape.libs.blobs.head_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
     def test_push_uploads_all_blobs_and_manifest(
         self, mock_head, mock_upload, mock_push_manifest, tmp_path
     ):
@@ -99,7 +100,7 @@ class TestPushLayout:
         client = _mock_client()
 
         # All blobs are new (HEAD returns 404)
-        mock_head.side_effect = BlobError("not found", "404")
+        mock_head.side_effect = BlobError("not found", "404", status_code=404)
         mock_upload.return_value = "sha256:confirmed"
         mock_push_manifest.return_value = "sha256:manifest_confirmed"
 
@@ -115,7 +116,7 @@ class TestPushLayout:
 
     @patch("regshape.libs.manifests.push_manifest")
     @patch("regshape.libs.blobs.upload_blob")
-    @patch("regshape.libs.blobs.head_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
     def test_push_skips_existing_blobs(
         self, mock_head, mock_upload, mock_push_manifest, tmp_path
     ):
@@ -135,7 +136,7 @@ class TestPushLayout:
 
     @patch("regshape.libs.manifests.push_manifest")
     @patch("regshape.libs.blobs.upload_blob")
-    @patch("regshape.libs.blobs.head_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
     def test_push_force_skips_head_check(
         self, mock_head, mock_upload, mock_push_manifest, tmp_path
     ):
@@ -151,16 +152,38 @@ class TestPushLayout:
         mock_head.assert_not_called()
         assert result.blobs_uploaded == 2
 
+    @patch("regshape.libs.manifests.push_manifest")
+    @patch("regshape.libs.blobs.upload_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
+    def test_push_uploads_from_mapped_view(
+        self, mock_head, mock_upload, mock_push_manifest, tmp_path
+    ):
+        layout_dir = _build_layout(tmp_path)
+        bodies = []
+
+        def upload(client, repo, data, digest):
+            bodies.append((type(data), bytes(data), digest))
+            return digest
+
+        mock_upload.side_effect = upload
+        push_layout(layout_dir, _mock_client(), "myrepo/myimage",
+                    tag_override="latest", force=True)
+
+        assert len(bodies) == 2
+        for body_type, body, digest in bodies:
+            assert body_type is memoryview
+            assert "sha256:" + hashlib.sha256(body).hexdigest() == digest
+
     @patch("regshape.libs.manifests.push_manifest")
     @patch("regshape.libs.blobs.upload_blob_chunked")
-    @patch("regshape.libs.blobs.head_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
     def test_push_chunked_mode(
         self, mock_head, mock_upload_chunked, mock_push_manifest, tmp_path
     ):
         layout_dir = _build_layout(tmp_path)
         client = _mock_client()
 
-        mock_head.side_effect = BlobError("not found", "404")
+        mock_head.side_effect = BlobError("not found", "404", status_code=404)
         mock_upload_chunked.return_value = "sha256:confirmed"
         mock_push_manifest.return_value = "sha256:manifest_confirmed"
 
@@ -171,16 +194,36 @@ class TestPushLayout:
         assert mock_upload_chunked.call_count == 2
         assert result.blobs_uploaded == 2
 
+    @patch("regshape.libs.manifests.push_manifest")
+    @patch("regshape.libs.blobs.upload_blob_chunked")
+    @patch("regshape.libs.blobs.operations.head_blob")
+    def test_chunked_default_matches_blob_library(
+        self, mock_head, mock_upload_chunked, mock_push_manifest, tmp_path
+    ):
+        from regshape.libs.blobs.operations import _DEFAULT_CHUNK_SIZE
+
+        layout_dir = _build_layout(tmp_path)
+        mock_head.side_effect = BlobError("not found", "404", status_code=404)
+        mock_upload_chunked.return_value = "sha256:confirmed"
+        mock_push_manifest.return_value = "sha256:manifest_confirmed"
+
+        push_layout(layout_dir, _mock_client(), "myrepo/myimage",
+                    tag_override="latest", chunked=True)
+
+        assert {c.kwargs["chunk_size"] for c in mock_upload_chunked.call_args_list} == {
+            _DEFAULT_CHUNK_SIZE
+        }
+
     @patch("regshape.libs.manifests.push_manifest")
     @patch("regshape.libs.blobs.upload_blob")
-    @patch("regshape.libs.blobs.head_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
     def test_push_uses_ref_name_annotation(
         self, mock_head, mock_upload, mock_push_manifest, tmp_path
     ):
         layout_dir = _build_layout(tmp_path, ref_name="v1.0")
         client = _mock_client()
 
-        mock_head.side_effect = BlobError("not found", "404")
+        mock_head.side_effect = BlobError("not found", "404", status_code=404)
         mock_upload.return_value = "sha256:confirmed"
         mock_push_manifest.return_value = "sha256:manifest_confirmed"
 
@@ -193,14 +236,14 @@ class TestPushLayout:
 
     @patch("regshape.libs.manifests.push_manifest")
     @patch("regshape.libs.blobs.upload_blob")
-    @patch("regshape.libs.blobs.head_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
     def test_push_tag_override_wins(
         self, mock_head, mock_upload, mock_push_manifest, tmp_path
     ):
         layout_dir = _build_layout(tmp_path, ref_name="v1.0")
         client = _mock_client()
 
-        mock_head.side_effect = BlobError("not found", "404")
+        mock_head.side_effect = BlobError("not found", "404", status_code=404)
         mock_upload.return_value = "sha256:confirmed"
         mock_push_manifest.return_value = "sha256:manifest_confirmed"
 
@@ -254,14 +297,14 @@ class TestPushLayout:
 
     @patch("regshape.libs.manifests.push_manifest")
     @patch("regshape.libs.blobs.upload_blob")
-    @patch("regshape.libs.blobs.head_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
     def test_push_progress_callback_receives_events(
         self, mock_head, mock_upload, mock_push_manifest, tmp_path
     ):
         layout_dir = _build_layout(tmp_path)
         client = _mock_client()
 
-        mock_head.side_effect = BlobError("not found", "404")
+        mock_head.side_effect = BlobError("not found", "404", status_code=404)
         mock_upload.return_value = "sha256:confirmed"
         mock_push_manifest.return_value = "sha256:manifest_confirmed"
 
@@ -279,7 +322,7 @@ class TestPushLayout:
 
     @patch("regshape.libs.manifests.push_manifest")
     @patch("regshape.libs.blobs.upload_blob")
-    @patch("regshape.libs.blobs.head_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
     def test_push_result_has_correct_summary(
         self, mock_head, mock_upload, mock_push_manifest, tmp_path
     ):
@@ -291,7 +334,7 @@ class TestPushLayout:
         def head_side_effect(*args, **kwargs):
             call_count[0] += 1
             if call_count[0] == 1:
-                raise BlobError("not found", "404")
+                raise BlobError("not found", "404", status_code=404)
             return MagicMock()
 
         mock_head.side_effect = head_side_effect
@@ -307,6 +350,92 @@ class TestPushLayout:
         assert result.bytes_uploaded > 0
 
 
+class TestPushLayoutMount:
+    """Tests for cross-repository mounts during push_layout."""
+
+    @patch("regshape.libs.manifests.push_manifest", return_value="sha256:m")
+    @patch("regshape.libs.blobs.upload_blob")
+    @patch("regshape.libs.blobs.mount_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
+    def test_mount_from_hint_replaces_upload(
+        self, mock_head, mock_mount, mock_upload, _push, tmp_path
+    ):
+        layout_dir = _build_layout(tmp_path)
+        mock_head.side_effect = BlobError("not found", "404", status_code=404)
+        events = []
+
+        result = push_layout(
+            layout_dir, _mock_client(), "team-b/app",
+            mount_from=["registry.io/base/app"],
+            progress_callback=lambda event, **kw: events.append((event, kw.get("source"))),
+        )
+
+        assert result.blobs_mounted == 2
+        assert result.blobs_uploaded == 0
+        mock_upload.assert_not_called()
+        assert mock_mount.call_args[0][3] == "base/app"
+        assert ("blob_mount", "base/app") in events
+        assert {b.action for b in result.manifests[0].blobs} == {"mounted"}
+
+    @patch("regshape.libs.manifests.push_manifest", return_value="sha256:m")
+    @patch("regshape.libs.blobs.upload_blob")
+    @patch("regshape.libs.blobs.mount_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
+    def test_mount_not_accepted_falls_back_to_upload(
+        self, mock_head, mock_mount, mock_upload, _push, tmp_path
+    ):
+        layout_dir = _build_layout(tmp_path)
+        mock_head.side_effect = BlobError("not found", "404", status_code=404)
+        mock_mount.side_effect = BlobError("Blob mount not accepted", "202")
+
+        result = push_layout(
+            layout_dir, _mock_client(), "team-b/app", mount_from=["base/app"],
+        )
+
+        assert result.blobs_mounted == 0
+        assert result.blobs_uploaded == 2
+        assert mock_upload.call_count == 2
+
+    @patch("regshape.libs.manifests.push_manifest", return_value="sha256:m")
+    @patch("regshape.libs.blobs.upload_blob")
+    @patch("regshape.libs.blobs.mount_blob")
+    @patch("regshape.libs.blobs.operations.head_blob")
+    def test_known_blob_store_supplies_mount_source(
+        self, mock_head, mock_mount, mock_upload, _push, tmp_path
+    ):
+        from regshape.libs.blobs.known import KnownBlobStore, use_known_blobs
+        from regshape.libs.layout.operations import read_index
+
+        layout_dir = _build_layout(tmp_path)
+        manifest = json.loads(
+            (layout_dir / "blobs" / "sha256"
+             / read_index(layout_dir).manifests[0].digest.split(":")[1]).read_text()
+        )
+        layer_digest = manifest["layers"][0]["digest"]
+        mock_head.side_effect = BlobError("not found", "404", status_code=404)
+
+        store = KnownBlobStore(tmp_path / "known")
+        store.record("registry.io", "team-a/app", layer_digest)
+        store.save()
+        with use_known_blobs(KnownBlobStore(tmp_path / "known")):
+            result = push_layout(layout_dir, _mock_client(), "team-b/app")
+
+        mock_mount.assert_called_once()
+        assert mock_mount.call_args[0][2:] == (layer_digest, "team-a/app")
+        assert result.blobs_mounted == 1
+        assert result.blobs_uploaded == 1
+
+    @patch("regshape.libs.manifests.push_manifest", return_value="sha256:m")
+    @patch("regshape.libs.blobs.upload_blob")
+    @patch("regshape.libs.blobs.mount_blob")
+    def test_force_never_mounts(self, mock_mount, mock_upload, _push, tmp_path):
+        layout_dir = _build_layout(tmp_path)
+        push_layout(layout_dir, _mock_client(), "team-b/app", force=True,
+                    mount_from=["base/app"])
+        mock_mount.assert_not_called()
+        assert mock_upload.call_count == 2
+
+
 # ---------------------------------------------------------------------------
 # CLI: layout push
 # ---------------------------------------------------------------------------
@@ -475,6 +604,54 @@ class TestPushCLI:
         assert call_kwargs["chunked"] is True
         assert call_kwargs["chunk_size"] == 1048576
 
+    @patch("regshape.cli.layout.RegistryClient")
+    @patch("regshape.cli.layout.push_layout")
+    def test_push_chunk_size_default_matches_blob_library(
+        self, mock_push, mock_client_cls, tmp_path
+    ):
+        from regshape.libs.blobs.operations import _DEFAULT_CHUNK_SIZE
+
+        layout_dir = _build_layout(tmp_path)
+        mock_push.return_value = PushResult(
+            layout_path=str(layout_dir),
+            destination="registry.io/myrepo",
+            manifests_pushed=1,
+            blobs_uploaded=2,
+            blobs_skipped=0,
+            bytes_uploaded=1024,
+        )
+
+        result = _runner().invoke(regshape, [
+            "layout", "push",
+            "--path", str(layout_dir),
+            "--dest", "registry.io/myrepo:latest",
+            "--chunked",
+        ])
+        assert result.exit_code == 0, result.output
+        assert mock_push.call_args[1]["chunk_size"] == _DEFAULT_CHUNK_SIZE
+
+    @patch("regshape.cli.layout.RegistryClient")
+    @patch("regshape.cli.layout.push_layout")
+    def test_push_with_mount_from(self, mock_push, mock_client_cls, tmp_path):
+        layout_dir = _build_layout(tmp_path)
+        mock_push.return_value = PushResult(
+            layout_path=str(layout_dir),
+            destination="registry.io/myrepo",
+            manifests_pushed=1,
+            blobs_mounted=2,
+        )
+
+        result = _runner().invoke(regshape, [
+            "layout", "push",
+            "--path", str(layout_dir),
+            "--dest", "registry.io/myrepo:latest",
+            "--mount-from", "base/app",
+            "--mount-from", "registry.io/other/app",
+        ])
+        assert result.exit_code == 0, result.output
+        assert mock_push.call_args[1]["mount_from"] == ["base/app", "registry.io/other/app"]
+        assert "2 blob(s) mounted" in result.stderr
+
     def test_dry_run_rejects_tag_override_with_multiple_manifests(self, tmp_path):
         layout_dir = _build_multi_manifest_layout(tmp_path)
 
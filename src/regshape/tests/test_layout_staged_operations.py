@@ -3,31 +3,38 @@
 """Tests for the staged-workflow functions in :mod:`regshape.libs.layout`.
 
 Covers ``stage_layer``, ``generate_config``, ``generate_manifest``,
-``read_stage``, ``update_layer_annotations``, ``update_config``, and
-``update_manifest_annotations``.
+``read_stage``, ``update_layer_annotations``, ``update_config``,
+``update_manifest_annotations`` and ``stage_session``.
 """
 
 import gzip
 import hashlib
 import io
 import json
+import tarfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 from regshape.libs.errors import LayoutError
 from regshape.libs.layout import (
+    add_manifest,
     generate_config,
     generate_manifest,
     init_layout,
+    read_index,
     read_stage,
     stage_layer,
+    stage_layer_from_stream,
+    stage_session,
     update_config,
     update_layer_annotations,
     update_manifest_annotations,
     validate_layout,
 )
-from regshape.libs.layout.operations import _STAGE_FILE
+from regshape.libs.layout.operations import _STAGE_FILE, _write_stage
 from regshape.libs.models.mediatype import (
     OCI_IMAGE_LAYER_TAR_GZIP,
     OCI_IMAGE_LAYER_TAR_ZSTD,
@@ -145,6 +152,79 @@ class TestStageLayer:
 # ---------------------------------------------------------------------------
 
 
+class TestStageLayerFromStream:
+    def test_compresses_and_records_diff_id(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+        desc = stage_layer_from_stream(
+            layout, io.BytesIO(b"raw tar"), OCI_IMAGE_LAYER_TAR_GZIP, compression="gzip"
+        )
+        gz = _make_gzip(b"raw tar")
+        assert desc.digest == _sha256(gz)
+        assert desc.size == len(gz)
+        hex_digest = desc.digest.split(":")[1]
+        assert (layout / "blobs" / "sha256" / hex_digest).read_bytes() == gz
+        layer = read_stage(layout)["layers"][0]
+        assert layer["diff_id"] == _sha256(b"raw tar")
+
+    def test_config_uses_diff_id(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+        stage_layer_from_stream(
+            layout, io.BytesIO(b"raw tar"), OCI_IMAGE_LAYER_TAR_GZIP, compression="gzip"
+        )
+        desc = generate_config(layout)
+        hex_digest = desc.digest.split(":")[1]
+        config = json.loads((layout / "blobs" / "sha256" / hex_digest).read_bytes())
+        assert config["rootfs"]["diff_ids"] == [_sha256(b"raw tar")]
+
+    def test_compressed_stream_hashed_once(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+        with patch("regshape.libs.layout.operations.hashlib", wraps=hashlib) as layout_hashlib:
+            desc = stage_layer_from_stream(
+                layout, io.BytesIO(b"raw tar"), OCI_IMAGE_LAYER_TAR_GZIP, compression="gzip"
+            )
+        layout_hashlib.new.assert_not_called()
+        assert desc.digest == _sha256(_make_gzip(b"raw tar"))
+
+    def test_without_compression_stores_as_is(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+        gz = _make_gzip(b"already")
+        desc = stage_layer_from_stream(layout, io.BytesIO(gz), OCI_IMAGE_LAYER_TAR_GZIP)
+        assert desc.digest == _sha256(gz)
+        assert "diff_id" not in read_stage(layout)["layers"][0]
+        assert not list((layout / "blobs" / "sha256").glob(".tmp-*"))
+
+    def test_parallel_compression(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+        content = b"raw tar " * 400_000
+        desc = stage_layer_from_stream(
+            layout, io.BytesIO(content), OCI_IMAGE_LAYER_TAR_GZIP,
+            compression="gzip", level=6, threads=4,
+        )
+        hex_digest = desc.digest.split(":")[1]
+        assert gzip.decompress((layout / "blobs" / "sha256" / hex_digest).read_bytes()) == content
+        assert read_stage(layout)["layers"][0]["diff_id"] == _sha256(content)
+
+    def test_estargz_records_toc_annotations(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            info = tarfile.TarInfo("file")
+            info.size = 4
+            tar.addfile(info, io.BytesIO(b"data"))
+        desc = stage_layer_from_stream(
+            layout, io.BytesIO(buf.getvalue()), OCI_IMAGE_LAYER_TAR_GZIP,
+            compression="estargz", annotations={"com.example.role": "base"},
+        )
+        layer = read_stage(layout)["layers"][0]
+        blob = (layout / "blobs" / "sha256" / desc.digest.split(":")[1]).read_bytes()
+        assert layer["diff_id"] == _sha256(gzip.decompress(blob))
+        assert layer["annotations"]["com.example.role"] == "base"
+        assert layer["annotations"]["containerd.io/snapshot/stargz/toc.digest"].startswith("sha256:")
+        assert layer["annotations"]["io.containers.estargz.uncompressed-size"] == str(
+            len(gzip.decompress(blob))
+        )
+
+
 class TestGenerateConfig:
     def test_config_descriptor_fields(self, tmp_path):
         layout = _setup_layout(tmp_path)
@@ -506,3 +586,106 @@ class TestUpdateManifestAnnotations:
         update_manifest_annotations(layout, {"k": "v"})
         # Should not raise
         validate_layout(layout)
+
+
+# ---------------------------------------------------------------------------
+# stage_session
+# ---------------------------------------------------------------------------
+
+
+class TestStageSession:
+    def test_many_layers_written_once(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+        with patch("regshape.libs.layout.operations._write_stage", wraps=_write_stage) as mock_write:
+            with stage_session(layout) as session:
+                for n in range(50):
+                    session.stage_layer(_make_gzip(b"layer %d" % n), OCI_IMAGE_LAYER_TAR_GZIP)
+                session.update_layer_annotations(0, {"k": "v"})
+                session.generate_config()
+                session.generate_manifest(ref_name="latest")
+        assert mock_write.call_count == 1
+        stage = read_stage(layout)
+        assert len(stage["layers"]) == 50
+        assert stage["layers"][0]["annotations"] == {"k": "v"}
+        validate_layout(layout)
+
+    def test_failure_leaves_files_unchanged(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+        _stage_one_layer(layout)
+        before = (layout / _STAGE_FILE).read_bytes(), (layout / "index.json").read_bytes()
+        with pytest.raises(RuntimeError):
+            with stage_session(layout) as session:
+                session.stage_layer(_make_gzip(b"second"), OCI_IMAGE_LAYER_TAR_GZIP)
+                session.generate_config()
+                session.generate_manifest(ref_name="latest")
+                raise RuntimeError("boom")
+        assert ((layout / _STAGE_FILE).read_bytes(), (layout / "index.json").read_bytes()) == before
+
+    def test_failed_update_keeps_old_blobs(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+        _stage_one_layer(layout)
+        generate_config(layout)
+        generate_manifest(layout, ref_name="latest")
+        with pytest.raises(RuntimeError):
+            with stage_session(layout) as session:
+                session.update_config(architecture="arm64")
+                session.update_manifest_annotations({"a": "b"})
+                raise RuntimeError("boom")
+        validate_layout(layout)
+
+    def test_commit_removes_replaced_blobs(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+        _stage_one_layer(layout)
+        generate_config(layout)
+        generate_manifest(layout, ref_name="latest")
+        old = read_stage(layout)
+        with stage_session(layout) as session:
+            session.update_config(architecture="arm64")
+            session.update_manifest_annotations({"a": "b"})
+            for key in ("config", "manifest"):
+                algorithm, hex_digest = old[key]["digest"].split(":")
+                assert (layout / "blobs" / algorithm / hex_digest).exists()
+        for key in ("config", "manifest"):
+            algorithm, hex_digest = old[key]["digest"].split(":")
+            assert not (layout / "blobs" / algorithm / hex_digest).exists()
+
+    def test_raises_if_not_a_layout(self, tmp_path):
+        with pytest.raises(LayoutError, match="not an OCI Image Layout"):
+            with stage_session(tmp_path):
+                pass
+
+
+def _stage_layers(layout: str, worker: int, count: int) -> None:
+    for n in range(count):
+        stage_layer(layout, _make_gzip(b"worker %d layer %d" % (worker, n)), OCI_IMAGE_LAYER_TAR_GZIP)
+
+
+class TestConcurrentWriters:
+    def test_processes_staging_into_one_layout(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(_stage_layers, str(layout), w, 10) for w in range(4)]
+            for future in futures:
+                future.result()
+        assert len(read_stage(layout)["layers"]) == 40
+
+    def test_threads_adding_manifests(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+
+        def add(n):
+            manifest = b'{"schemaVersion":2,"n":%d}' % n
+            add_manifest(layout, manifest, "application/vnd.oci.image.manifest.v1+json", ref_name=f"v{n}")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(add, range(40)))
+        assert len(read_index(layout).manifests) == 40
+
+    def test_commit_replays_onto_newer_stage(self, tmp_path):
+        layout = _setup_layout(tmp_path)
+        with stage_session(layout) as session:
+            session.stage_layer(_make_gzip(b"mine"), OCI_IMAGE_LAYER_TAR_GZIP)
+            _stage_one_layer(layout, b"theirs")
+        layers = read_stage(layout)["layers"]
+        assert [layer["digest"] for layer in layers] == [
+            _sha256(_make_gzip(b"theirs")), _sha256(_make_gzip(b"mine")),
+        ]
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""Tests for :mod:`regshape.libs.layout.verify` and its use by
+``validate_layout`` and ``read_blob``."""
+
+import gzip
+import io
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from regshape.libs.errors import LayoutError
+from regshape.libs.layout.operations import (
+    generate_config,
+    generate_manifest,
+    init_layout,
+    read_blob,
+    stage_layer,
+    validate_layout,
+)
+from regshape.libs.layout.verify import VERIFY_CACHE_FILE, VerificationCache, hash_file
+from regshape.libs.models.mediatype import OCI_IMAGE_LAYER_TAR_GZIP
+
+
+def _age(layout_dir, seconds: int = 60) -> None:
+    """Backdate every file so it falls outside the racy-timestamp window."""
+    stamp = time.time_ns() - seconds * 1_000_000_000
+    for path in layout_dir.rglob("*"):
+        os.utime(path, ns=(stamp, stamp))
+
+
+def _layout(tmp_path):
+    layout_dir = tmp_path / "layout"
+    init_layout(layout_dir)
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb", mtime=0) as f:
+        f.write(b"layer content")
+    desc = stage_layer(layout_dir, buf.getvalue(), OCI_IMAGE_LAYER_TAR_GZIP)
+    generate_config(layout_dir)
+    generate_manifest(layout_dir, ref_name="latest")
+    _age(layout_dir)
+    return layout_dir, layout_dir / "blobs" / "sha256" / desc.digest.split(":")[1]
+
+
+class TestValidateLayoutCache:
+
+    def test_second_run_does_not_hash(self, tmp_path):
+        layout_dir, _ = _layout(tmp_path)
+        validate_layout(layout_dir)
+        assert (layout_dir / VERIFY_CACHE_FILE).exists()
+
+        with patch("regshape.libs.layout.verify.hash_file", wraps=hash_file) as mock_hash:
+            validate_layout(layout_dir)
+        mock_hash.assert_not_called()
+
+    def test_full_rehashes(self, tmp_path):
+        layout_dir, _ = _layout(tmp_path)
+        validate_layout(layout_dir)
+
+        with patch("regshape.libs.layout.verify.hash_file", wraps=hash_file) as mock_hash:
+            validate_layout(layout_dir, full=True)
+        assert mock_hash.call_count == 2  # config + layer
+
+    def test_modified_blob_detected(self, tmp_path):
+        layout_dir, layer = _layout(tmp_path)
+        validate_layout(layout_dir)
+
+        layer.write_bytes(b"X" * layer.stat().st_size)
+        with pytest.raises(LayoutError, match="digest mismatch"):
+            validate_layout(layout_dir)
+
+    def test_stat_preserving_tamper_needs_full(self, tmp_path):
+        layout_dir, layer = _layout(tmp_path)
+        validate_layout(layout_dir)
+
+        st = layer.stat()
+        with open(layer, "r+b") as fh:
+            fh.write(b"X")
+        os.utime(layer, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        validate_layout(layout_dir)
+        with pytest.raises(LayoutError, match="digest mismatch"):
+            validate_layout(layout_dir, full=True)
+
+    def test_recently_modified_files_not_recorded(self, tmp_path):
+        layout_dir, layer = _layout(tmp_path)
+        os.utime(layer)  # now
+        validate_layout(layout_dir)
+
+        entries = json.loads((layout_dir / VERIFY_CACHE_FILE).read_text())["entries"]
+        assert layer.relative_to(layout_dir).as_posix() not in entries
+        assert len(entries) == 2  # manifest + config
+
+    def test_corrupt_cache_file_ignored(self, tmp_path):
+        layout_dir, _ = _layout(tmp_path)
+        (layout_dir / VERIFY_CACHE_FILE).write_text("not json")
+        validate_layout(layout_dir)
+        assert json.loads((layout_dir / VERIFY_CACHE_FILE).read_text())["version"] == 1
+
+
+class TestReadBlobCache:
+
+    def test_verified_blob_not_rehashed(self, tmp_path):
+        layout_dir, layer = _layout(tmp_path)
+        digest = "sha256:" + layer.name
+        read_blob(layout_dir, digest)
+
+        with patch("regshape.libs.layout.operations.hashlib.sha256") as mock_sha:
+            assert read_blob(layout_dir, digest) == layer.read_bytes()
+        mock_sha.assert_not_called()
+
+    def test_entries_for_deleted_blobs_dropped(self, tmp_path):
+        layout_dir, layer = _layout(tmp_path)
+        cache = VerificationCache(layout_dir)
+        cache.mark_verified(layer, layer.stat())
+        layer.unlink()
+        cache.save()
+        assert json.loads((layout_dir / VERIFY_CACHE_FILE).read_text())["entries"] == {}
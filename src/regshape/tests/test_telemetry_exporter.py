@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+"""Tests for the Prometheus / OpenMetrics telemetry exporter."""
+
+import os
+import tempfile
+import urllib.request
+from unittest.mock import MagicMock, patch
+
+import click
+from click.testing import CliRunner
+
+from regshape.libs.decorators import (
+    TelemetryConfig,
+    configure_telemetry,
+    get_telemetry_config,
+    telemetry_options,
+)
+from regshape.libs.decorators.call_details import http_request
+from regshape.libs.decorators.exporter import (
+    format_prometheus,
+    start_metrics_server,
+    write_metrics_textfile,
+)
+from regshape.libs.decorators.metrics import (
+    LATENCY_BUCKETS,
+    PerformanceMetrics,
+    classify_operation,
+)
+
+
+def _labelled_metrics():
+    m = PerformanceMetrics()
+    m.record_request(
+        status_code=200, bytes_received=1024, elapsed=0.1,
+        registry="ghcr.io", operation="blob_get",
+    )
+    m.record_request(
+        status_code=404, elapsed=0.3,
+        registry="ghcr.io", operation="blob_get",
+    )
+    m.record_request(
+        status_code=201, bytes_sent=512, elapsed=0.2, is_retry=True,
+        registry="ghcr.io", operation="blob_upload_complete",
+    )
+    return m
+
+
+class TestClassifyOperation:
+    """Tests for classify_operation()."""
+
+    def test_ping(self):
+        assert classify_operation("GET", "https://r.io/v2/") == "ping"
+
+    def test_blob_head(self):
+        url = "https://r.io/v2/a/b/blobs/sha256:abc"
+        assert classify_operation("HEAD", url) == "blob_head"
+
+    def test_upload_phases(self):
+        url = "https://r.io/v2/repo/blobs/uploads/uuid?digest=sha256:x"
+        assert classify_operation("POST", "/v2/repo/blobs/uploads/") == "blob_upload_init"
+        assert classify_operation("PATCH", url) == "blob_upload_chunk"
+        assert classify_operation("PUT", url) == "blob_upload_complete"
+
+    def test_manifest_and_tags(self):
+        assert classify_operation("PUT", "/v2/repo/manifests/latest") == "manifest_put"
+        assert classify_operation("GET", "/v2/repo/tags/list?n=10") == "tag_list"
+
+    def test_non_registry_paths(self):
+        assert classify_operation("GET", "https://auth.io/token?scope=x") == "auth_token"
+        assert classify_operation("GET", "https://s3.aws.com/bucket/obj") == "external"
+
+
+class TestLabelledSeries:
+    """Tests for labelled series and latency quantiles."""
+
+    def test_series_keyed_by_status(self):
+        m = _labelled_metrics()
+        assert m.series[("ghcr.io", "blob_get", 200)].bytes_received == 1024
+        assert m.series[("ghcr.io", "blob_get", 404)].requests == 1
+
+    def test_unlabelled_requests_do_not_create_series(self):
+        m = PerformanceMetrics()
+        m.record_request(status_code=200)
+        assert m.series == {}
+        assert m.total_requests == 1
+
+    def test_latency_histogram_buckets(self):
+        m = PerformanceMetrics()
+        for elapsed in (0.005, 0.006, 0.3, 120.0):
+            m.record_request(status_code=200, elapsed=elapsed, registry="r", operation="o")
+        histogram = m.latencies[("r", "o")]
+        cumulative = dict(histogram.cumulative())
+        assert cumulative[0.005] == 1
+        assert cumulative[0.01] == 2
+        assert cumulative[0.5] == 3
+        assert cumulative[60.0] == 3
+        assert cumulative[float("inf")] == histogram.count == 4
+
+    def test_latency_memory_is_bounded(self):
+        m = PerformanceMetrics()
+        for i in range(10000):
+            m.record_request(status_code=200, elapsed=i / 1000, registry="r", operation="o")
+        assert len(m.latencies[("r", "o")].buckets) == len(LATENCY_BUCKETS) + 1
+
+    def test_snapshot_is_independent(self):
+        m = _labelled_metrics()
+        snap = m.snapshot()
+        m.record_request(status_code=200, registry="ghcr.io", operation="blob_get")
+        assert snap.series[("ghcr.io", "blob_get", 200)].requests == 1
+
+
+class TestFormatPrometheus:
+    """Tests for format_prometheus()."""
+
+    def test_request_counter_lines(self):
+        text = format_prometheus(_labelled_metrics(), timestamp=0)
+        assert "# TYPE regshape_http_requests_total counter" in text
+        assert (
+            'regshape_http_requests_total{registry="ghcr.io",operation="blob_get",status="404"} 1'
+            in text
+        )
+
+    def test_error_and_byte_aggregates(self):
+        text = format_prometheus(_labelled_metrics(), timestamp=0)
+        assert 'regshape_http_request_errors_total{registry="ghcr.io",operation="blob_get"} 1' in text
+        assert 'regshape_http_sent_bytes_total{registry="ghcr.io",operation="blob_upload_complete"} 512' in text
+        assert 'regshape_http_retries_total 1' in text
+
+    def test_histogram_has_buckets_sum_and_count(self):
+        text = format_prometheus(_labelled_metrics(), timestamp=0)
+        assert "# TYPE regshape_http_request_duration_seconds histogram" in text
+        assert 'regshape_http_request_duration_seconds_bucket{registry="ghcr.io",operation="blob_get",le="0.1"} 1' in text
+        assert 'regshape_http_request_duration_seconds_bucket{registry="ghcr.io",operation="blob_get",le="0.5"} 2' in text
+        assert 'regshape_http_request_duration_seconds_bucket{registry="ghcr.io",operation="blob_get",le="+Inf"} 2' in text
+        assert 'regshape_http_request_duration_seconds_count{registry="ghcr.io",operation="blob_get"} 2' in text
+
+    def test_openmetrics_strips_total_and_ends_with_eof(self):
+        text = format_prometheus(_labelled_metrics(), openmetrics=True, timestamp=0)
+        assert "# TYPE regshape_http_requests counter" in text
+        assert text.endswith("# EOF\n")
+
+    def test_label_values_are_escaped(self):
+        m = PerformanceMetrics()
+        m.record_request(status_code=200, registry='a"b', operation="ping")
+        assert 'registry="a\\"b"' in format_prometheus(m, timestamp=0)
+
+
+class TestExportSinks:
+    """Tests for the textfile writer and the /metrics server."""
+
+    def test_write_metrics_textfile(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "regshape.prom")
+            write_metrics_textfile(_labelled_metrics(), path)
+            with open(path) as fh:
+                assert "regshape_http_requests_total" in fh.read()
+            assert os.listdir(tmpdir) == ["regshape.prom"]
+
+    def test_metrics_server_serves_scrapes(self):
+        config = TelemetryConfig()
+        config.export_metrics.record_request(
+            status_code=200, registry="r.io", operation="ping",
+        )
+        server = start_metrics_server(0, config=config)
+        try:
+            assert config.metrics_export_enabled
+            base = f"http://127.0.0.1:{server.port}"
+            with urllib.request.urlopen(f"{base}/metrics") as resp:
+                body = resp.read().decode()
+                assert resp.headers["Content-Type"].startswith("text/plain")
+            assert 'operation="ping"' in body
+
+            req = urllib.request.Request(
+                f"{base}/metrics",
+                headers={"Accept": "application/openmetrics-text"},
+            )
+            with urllib.request.urlopen(req) as resp:
+                assert resp.read().decode().endswith("# EOF\n")
+        finally:
+            server.stop()
+
+
+class TestDebugCallExport:
+    """Tests for labelled recording through @debug_call."""
+
+    def teardown_method(self):
+        configure_telemetry(TelemetryConfig())
+
+    @patch("regshape.libs.decorators.call_details.requests.request")
+    def test_http_request_records_labelled_series(self, mock_request):
+        resp = MagicMock()
+        resp.status_code = 200
+        resp.headers = {"Content-Length": "10"}
+        resp.content = b"0123456789"
+        mock_request.return_value = resp
+
+        config = TelemetryConfig(metrics_export_enabled=True)
+        configure_telemetry(config)
+        http_request("https://r.io:5000/v2/repo/manifests/latest", "GET")
+
+        entry = config.export_metrics.series[("r.io:5000", "manifest_get", 200)]
+        assert entry.requests == 1
+        assert entry.bytes_received == 10
+        assert config.metrics.total_requests == 0
+
+    @patch("regshape.libs.decorators.call_details.requests.request")
+    def test_metrics_file_option_writes_textfile(self, mock_request):
+        resp = MagicMock()
+        resp.status_code = 200
+        resp.headers = {}
+        resp.content = b""
+        mock_request.return_value = resp
+
+        @click.command()
+        @telemetry_options
+        def cmd():
+            http_request("https://r.io/v2/", "GET")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "out.prom")
+            result = CliRunner().invoke(cmd, ["--metrics-file", path])
+            assert result.exit_code == 0, result.output
+            with open(path) as fh:
+                assert 'operation="ping",status="200"} 1' in fh.read()
+            assert get_telemetry_config().metrics_file_path == path
+
+    def test_metrics_file_failure_keeps_command_exit_code(self):
+        @click.command()
+        @telemetry_options
+        def cmd():
+            raise SystemExit(3)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "missing", "out.prom")
+            with patch("regshape.libs.decorators.output.TelemetryWriter.close") as mock_close:
+                result = CliRunner().invoke(
+                    cmd, ["--metrics-file", path, "--telemetry-async", "--metrics"],
+                )
+        assert result.exit_code == 3
+        assert f"could not write metrics to {path}" in result.stderr
+        mock_close.assert_called_once()
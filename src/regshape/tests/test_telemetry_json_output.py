@@ -86,6 +86,8 @@ class TestMetricsJsonOutput:
         assert metrics_event["errors"] == 1
         assert metrics_event["status_code_counts"]["200"] == 2
         assert metrics_event["status_code_counts"]["401"] == 1
+        # 950 bytes moved in a 0.5 s scenario
+        assert metrics_event["throughput_bytes_per_s"] == 1900.0
         assert "timestamp" in metrics_event
 
     def test_no_metrics_event_when_empty(self):
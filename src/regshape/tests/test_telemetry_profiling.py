@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+"""Tests for the --profile telemetry option."""
+
+import io
+import json
+import os
+import pstats
+import tempfile
+import time
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from regshape.libs.decorators import TelemetryConfig, configure_telemetry, telemetry_options
+from regshape.libs.decorators.output import print_telemetry_block
+from regshape.libs.decorators.profiling import (
+    CProfileProfiler,
+    SamplingProfiler,
+    create_profiler,
+)
+
+
+def _busy(seconds: float) -> int:
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+@click.command()
+@telemetry_options
+def _profiled_cmd():
+    _busy(0.05)
+
+
+class TestProfilers:
+    """Tests for the profiler implementations."""
+
+    def test_create_profiler_modes(self):
+        assert isinstance(create_profiler("cprofile"), CProfileProfiler)
+        assert isinstance(create_profiler("sampling"), SamplingProfiler)
+        with pytest.raises(ValueError):
+            create_profiler("perf")
+
+    def test_cprofile_top_functions_sorted_by_self_time(self):
+        profiler = CProfileProfiler()
+        profiler.start()
+        _busy(0.02)
+        profiler.stop()
+        top = profiler.top_functions(5)
+        assert len(top) <= 5
+        assert [t for _, t in top] == sorted((t for _, t in top), reverse=True)
+
+    def test_sampling_profiler_collects_collapsed_stacks(self):
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        _busy(0.05)
+        profiler.stop()
+        assert any("test_telemetry_profiling.py:_busy" in s for s in profiler.stacks)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "stacks.txt")
+            profiler.dump(path)
+            with open(path) as fh:
+                stack, count = fh.readline().rstrip("\n").rsplit(" ", 1)
+            assert ";" in stack
+            assert int(count) >= 1
+
+
+class TestProfileOption:
+    """Tests for --profile wired through telemetry_options."""
+
+    def teardown_method(self):
+        configure_telemetry(TelemetryConfig())
+
+    def test_cprofile_writes_pstats_and_summary(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "out.pstats")
+            result = CliRunner().invoke(_profiled_cmd, ["--profile", path])
+            assert result.exit_code == 0, result.output
+            assert pstats.Stats(path).total_calls > 0
+        assert "test_telemetry_profiling.py:" in result.output
+        assert "(_busy)" in result.output
+
+    def test_sampling_mode_writes_collapsed_stacks(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "out.folded")
+            result = CliRunner().invoke(
+                _profiled_cmd, ["--profile", path, "--profile-mode", "sampling"],
+            )
+            assert result.exit_code == 0, result.output
+            with open(path) as fh:
+                assert "_busy" in fh.read()
+
+    def test_dump_failure_reported_not_raised(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "missing", "out.pstats")
+            result = CliRunner().invoke(_profiled_cmd, ["--profile", path])
+        assert result.exit_code == 0, result.output
+        assert f"could not write profile to {path}" in result.stderr
+
+
+class TestProfileRendering:
+    """Tests for profile rows in the telemetry block."""
+
+    def teardown_method(self):
+        configure_telemetry(TelemetryConfig())
+
+    def test_text_rows(self):
+        buf = io.StringIO()
+        configure_telemetry(TelemetryConfig(output=buf))
+        print_telemetry_block(None, None, [], buf, profile=[("gzip.py:compress", 1.5)])
+        assert "   profile  gzip.py:compress" in buf.getvalue()
+        assert "1.500s" in buf.getvalue()
+
+    def test_json_event(self):
+        buf = io.StringIO()
+        configure_telemetry(TelemetryConfig(output=buf, output_format="json"))
+        print_telemetry_block(None, None, [], buf, profile=[("a.py:f", 0.25)])
+        event = json.loads(buf.getvalue())
+        assert event["type"] == "profile"
+        assert event["functions"] == [{"name": "a.py:f", "self_s": 0.25}]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+"""Tests for :mod:`regshape.libs.transport.redirects` and the blob redirect
+handling in :class:`~regshape.libs.transport.client.RegistryClient`."""
+
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from regshape.libs.decorators import TelemetryConfig, configure_telemetry
+from regshape.libs.decorators.call_details import http_request
+from regshape.libs.transport.client import RegistryClient, TransportConfig
+from regshape.libs.transport.redirects import (
+    RedirectCache,
+    is_blob_fetch,
+    redirect_headers,
+    signed_url_expiry,
+)
+
+REGISTRY = "registry.example.io"
+BLOB_PATH = "/v2/myrepo/blobs/sha256:" + "a" * 64
+BLOB_URL = f"https://{REGISTRY}{BLOB_PATH}"
+S3_URL = (
+    "https://bucket.s3.amazonaws.com/blob"
+    "?X-Amz-Date=20260101T000000Z&X-Amz-Expires=1200&X-Amz-Signature=abc"
+)
+# 2026-01-01T00:00:00Z
+S3_SIGNED_AT = 1767225600
+
+
+def _response(status_code: int, headers: dict | None = None) -> MagicMock:
+    response = MagicMock(spec=requests.Response)
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = b""
+    return response
+
+
+def _client() -> RegistryClient:
+    with patch("regshape.libs.transport.client.resolve_credentials", return_value=(None, None)):
+        return RegistryClient(TransportConfig(registry=REGISTRY))
+
+
+class TestHelpers:
+
+    def test_is_blob_fetch(self):
+        assert is_blob_fetch("GET", BLOB_PATH)
+        assert is_blob_fetch("head", BLOB_PATH)
+        assert not is_blob_fetch("PUT", BLOB_PATH)
+        assert not is_blob_fetch("GET", "/v2/myrepo/blobs/uploads/abc")
+        assert not is_blob_fetch("GET", "/v2/myrepo/manifests/latest")
+
+    def test_credentials_dropped_cross_host_only(self):
+        headers = {"Authorization": "Bearer t", "Range": "bytes=0-9"}
+        assert redirect_headers(headers, BLOB_URL, S3_URL) == {"Range": "bytes=0-9"}
+        same_host = f"https://{REGISTRY}/storage/blob"
+        assert redirect_headers(headers, BLOB_URL, same_host) == headers
+
+    def test_expiry_formats(self):
+        assert signed_url_expiry(S3_URL) == S3_SIGNED_AT + 1200
+        gcs = "https://storage.googleapis.com/b?X-Goog-Date=20260101T000000Z&X-Goog-Expires=60"
+        assert signed_url_expiry(gcs) == S3_SIGNED_AT + 60
+        azure = "https://acct.blob.core.windows.net/c/b?se=2026-01-01T00:10:00Z&sig=x"
+        assert signed_url_expiry(azure) == S3_SIGNED_AT + 600
+        cloudfront = f"https://cdn.example.com/b?Expires={S3_SIGNED_AT}&Signature=x"
+        assert signed_url_expiry(cloudfront) == S3_SIGNED_AT
+        assert signed_url_expiry("https://cdn.example.com/b") is None
+
+
+class TestRedirectCache:
+
+    def test_entry_expires_before_signature(self):
+        cache = RedirectCache()
+        cache.put(BLOB_URL, S3_URL, now=S3_SIGNED_AT)
+        assert cache.get(BLOB_URL, now=S3_SIGNED_AT + 1000) == S3_URL
+        assert cache.get(BLOB_URL, now=S3_SIGNED_AT + 1195) is None
+        assert len(cache) == 0
+
+    def test_unsigned_target_uses_default_ttl(self):
+        cache = RedirectCache(default_ttl=30)
+        cache.put(BLOB_URL, "https://cdn.example.com/b", now=100)
+        assert cache.get(BLOB_URL, now=129) == "https://cdn.example.com/b"
+        assert cache.get(BLOB_URL, now=131) is None
+
+    def test_expired_target_not_stored(self):
+        cache = RedirectCache()
+        cache.put(BLOB_URL, S3_URL, now=S3_SIGNED_AT + 2000)
+        assert len(cache) == 0
+
+
+@patch("regshape.libs.transport.redirects.time.time", return_value=S3_SIGNED_AT)
+class TestClientBlobRedirects:
+
+    @patch("regshape.libs.transport.client.http_request")
+    def test_follows_redirect_without_authorization(self, mock_http, _time):
+        mock_http.side_effect = [
+            _response(307, {"Location": S3_URL}),
+            _response(200, {"Content-Length": "5"}),
+        ]
+        client = _client()
+        response = client.get(BLOB_PATH, headers={"Authorization": "Bearer t"}, stream=True)
+
+        assert response.status_code == 200
+        registry_call, storage_call = mock_http.call_args_list
+        assert registry_call.kwargs["allow_redirects"] is False
+        assert registry_call.kwargs["headers"]["Authorization"] == "Bearer t"
+        assert storage_call.kwargs["url"] == S3_URL
+        assert "Authorization" not in storage_call.kwargs["headers"]
+        assert storage_call.kwargs["storage"] is True
+
+    @patch("regshape.libs.transport.client.http_request")
+    def test_cached_target_skips_registry(self, mock_http, _time):
+        mock_http.side_effect = [
+            _response(307, {"Location": S3_URL}),
+            _response(200),
+            _response(206),
+        ]
+        client = _client()
+        client.get(BLOB_PATH, stream=True)
+        response = client.get(BLOB_PATH, headers={"Range": "bytes=5-"}, stream=True)
+
+        assert response.status_code == 206
+        assert mock_http.call_count == 3
+        last = mock_http.call_args_list[-1].kwargs
+        assert last["url"] == S3_URL
+        assert last["headers"] == {"Range": "bytes=5-"}
+
+    @patch("regshape.libs.transport.client.http_request")
+    def test_rejected_cached_target_falls_back_to_registry(self, mock_http, _time):
+        fresh = S3_URL.replace("abc", "def")
+        mock_http.side_effect = [
+            _response(307, {"Location": S3_URL}),
+            _response(200),
+            _response(403),
+            _response(307, {"Location": fresh}),
+            _response(200),
+        ]
+        client = _client()
+        client.get(BLOB_PATH, stream=True)
+        response = client.get(BLOB_PATH, stream=True)
+
+        assert response.status_code == 200
+        assert mock_http.call_args_list[3].kwargs["url"] == BLOB_URL
+        assert client._redirects.get(BLOB_URL) == fresh
+
+    @patch("regshape.libs.transport.client.http_request")
+    def test_failed_fetch_not_cached(self, mock_http, _time):
+        mock_http.side_effect = [
+            _response(307, {"Location": S3_URL}),
+            _response(500),
+        ]
+        client = _client()
+        client.get(BLOB_PATH, stream=True)
+        assert len(client._redirects) == 0
+
+    @patch("regshape.libs.transport.client.http_request")
+    def test_other_requests_untouched(self, mock_http, _time):
+        mock_http.return_value = _response(200)
+        client = _client()
+        client.get("/v2/myrepo/manifests/latest")
+        assert "allow_redirects" not in mock_http.call_args.kwargs
+
+
+class TestStorageMetrics:
+
+    @patch("requests.request")
+    def test_storage_requests_counted_separately(self, mock_request):
+        mock_request.return_value = _response(200, {"Content-Length": "100"})
+        config = TelemetryConfig(metrics_enabled=True)
+        configure_telemetry(config)
+        try:
+            http_request(BLOB_URL, "GET", stream=True)
+            http_request(S3_URL, "GET", storage=True, stream=True)
+        finally:
+            configure_telemetry(TelemetryConfig())
+
+        assert config.metrics.total_requests == 2
+        assert config.metrics.storage_requests == 1
+        assert config.metrics.storage_bytes_received == 100
+        assert "storage" not in mock_request.call_args.kwargs